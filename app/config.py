@@ -39,6 +39,54 @@ class Config:
     LLAVA_SERVICE_URL: str = env.get("LLAVA_SERVICE_URL", "http://127.0.0.1:8003")
     LOCAL_EMBEDDING_MODEL: str = env.get("LOCAL_EMBEDDING_MODEL", "text-embedding-nomic-embed-text-v1.5")
     LOCAL_CHAT_MODEL: str = env.get("LOCAL_CHAT_MODEL", "llava-1.6-mistral-7b")
+    # Longest a text waits for other concurrent requests to share its embedding batch
+    EMBEDDING_BATCH_WAIT_MS: float = env.get_float("EMBEDDING_BATCH_WAIT_MS", 5.0)
+    # Embedding cache: in-process LRU entries, and rows kept in the embedding_cache table
+    EMBEDDING_CACHE_SIZE: int = env.get_int("EMBEDDING_CACHE_SIZE", 4096)
+    EMBEDDING_CACHE_PERSISTENT: bool = env.get_bool("EMBEDDING_CACHE_PERSISTENT", True)
+    EMBEDDING_CACHE_MAX_ROWS: int = env.get_int("EMBEDDING_CACHE_MAX_ROWS", 200000)
+    # Search caches: query embeddings by normalized text, and results until the next
+    # write (entries are also dropped after their TTL in seconds; size 0 disables)
+    QUERY_EMBEDDING_CACHE_SIZE: int = env.get_int("QUERY_EMBEDDING_CACHE_SIZE", 1024)
+    QUERY_EMBEDDING_CACHE_TTL: float = env.get_float("QUERY_EMBEDDING_CACHE_TTL", 600.0)
+    SEARCH_CACHE_SIZE: int = env.get_int("SEARCH_CACHE_SIZE", 1024)
+    SEARCH_CACHE_TTL: float = env.get_float("SEARCH_CACHE_TTL", 30.0)
+    # Background backfill of missing/stale embeddings: memories per batch, concurrent
+    # embedding requests, and memories embedded per second (0 disables the limit)
+    BACKFILL_BATCH_SIZE: int = env.get_int("BACKFILL_BATCH_SIZE", 100)
+    BACKFILL_CONCURRENCY: int = env.get_int("BACKFILL_CONCURRENCY", 4)
+    BACKFILL_RATE_LIMIT: float = env.get_float("BACKFILL_RATE_LIMIT", 20.0)
+    # Online migration to a new embedding model: shadow vectors are filled with the
+    # same batch/concurrency/rate controls as the backfill, the switch waits at most
+    # EMBEDDING_MIGRATION_LOCK_TIMEOUT seconds for its lock, and other processes
+    # adopt the new model every EMBEDDING_MIGRATION_POLL_INTERVAL seconds
+    EMBEDDING_MIGRATION_BATCH_SIZE: int = env.get_int("EMBEDDING_MIGRATION_BATCH_SIZE", 100)
+    EMBEDDING_MIGRATION_CONCURRENCY: int = env.get_int("EMBEDDING_MIGRATION_CONCURRENCY", 4)
+    EMBEDDING_MIGRATION_RATE_LIMIT: float = env.get_float("EMBEDDING_MIGRATION_RATE_LIMIT", 20.0)
+    EMBEDDING_MIGRATION_LOCK_TIMEOUT: float = env.get_float(
+        "EMBEDDING_MIGRATION_LOCK_TIMEOUT", 2.0
+    )
+    EMBEDDING_MIGRATION_POLL_INTERVAL: int = env.get_int("EMBEDDING_MIGRATION_POLL_INTERVAL", 60)
+    # Embed new and edited memories in background workers instead of in the request.
+    # Jobs are queued in the embedding_jobs table; EMBEDDING_WORKERS=0 only enqueues
+    # (for deployments where other nodes run the workers).
+    ASYNC_EMBEDDINGS: bool = env.get_bool("ASYNC_EMBEDDINGS", False)
+    EMBEDDING_WORKERS: int = env.get_int("EMBEDDING_WORKERS", 1)
+    EMBEDDING_JOB_BATCH_SIZE: int = env.get_int("EMBEDDING_JOB_BATCH_SIZE", 32)
+    EMBEDDING_JOB_POLL_INTERVAL: float = env.get_float("EMBEDDING_JOB_POLL_INTERVAL", 1.0)
+    EMBEDDING_JOB_LEASE_SECONDS: float = env.get_float("EMBEDDING_JOB_LEASE_SECONDS", 300.0)
+    EMBEDDING_JOB_MAX_ATTEMPTS: int = env.get_int("EMBEDDING_JOB_MAX_ATTEMPTS", 5)
+    # Passage chunking: memories longer than CHUNK_MAX_TOKENS are split into
+    # overlapping passages stored in memory_chunks, embedded at most
+    # CHUNK_EMBED_CONCURRENCY at a time; vector and hybrid search match each
+    # memory by its best passage, fetching CHUNK_SEARCH_FACTOR hits per result.
+    # Off by default: passage search scans memory_chunks until the passage
+    # index exists, so build it (POST /api/v2/search/vector-index) when turning this on
+    CHUNKING_ENABLED: bool = env.get_bool("CHUNKING_ENABLED", False)
+    CHUNK_MAX_TOKENS: int = env.get_int("CHUNK_MAX_TOKENS", 256)
+    CHUNK_OVERLAP_TOKENS: int = env.get_int("CHUNK_OVERLAP_TOKENS", 32)
+    CHUNK_EMBED_CONCURRENCY: int = env.get_int("CHUNK_EMBED_CONCURRENCY", 16)
+    CHUNK_SEARCH_FACTOR: int = env.get_int("CHUNK_SEARCH_FACTOR", 4)
 
     # Container Security (Single User)
     CONTAINER_API_KEY: str = env.get("CONTAINER_API_KEY", "")
@@ -72,6 +120,54 @@ class Config:
     BATCH_SIZE: int = env.get_int("BATCH_SIZE", 100)
     SIMILARITY_THRESHOLD: float = env.get_float("SIMILARITY_THRESHOLD", 0.7)
 
+    # Quantized Vector Search ("none", "halfvec" or "binary")
+    VECTOR_QUANTIZATION: str = env.get("VECTOR_QUANTIZATION", "none")
+    VECTOR_RERANK_FACTOR: int = env.get_int("VECTOR_RERANK_FACTOR", 4)
+    VECTOR_RECALL_TOLERANCE: float = env.get_float("VECTOR_RECALL_TOLERANCE", 0.02)
+
+    # Incremental Duplicate Detection. This sweep and the relationship sweep
+    # below follow updated_at with a 30s lag; a memory written by a transaction
+    # that commits more than 30s after its updated_at is skipped until its next write
+    DUPLICATE_SWEEP_INTERVAL: int = env.get_int("DUPLICATE_SWEEP_INTERVAL", 300)
+    DUPLICATE_NEIGHBORS: int = env.get_int("DUPLICATE_NEIGHBORS", 10)
+    DUPLICATE_MIN_SIMILARITY: float = env.get_float("DUPLICATE_MIN_SIMILARITY", 0.8)
+
+    # Background "similar" relationship discovery for newly embedded memories
+    # (same commit lag limit as the duplicate sweep)
+    RELATIONSHIP_SWEEP_INTERVAL: int = env.get_int("RELATIONSHIP_SWEEP_INTERVAL", 60)
+    RELATIONSHIP_NEIGHBORS: int = env.get_int("RELATIONSHIP_NEIGHBORS", 5)
+    RELATIONSHIP_MIN_SIMILARITY: float = env.get_float("RELATIONSHIP_MIN_SIMILARITY", 0.95)
+
+    # Soft-Delete Purge and Table Maintenance
+    MAINTENANCE_INTERVAL: int = env.get_int("MAINTENANCE_INTERVAL", 3600)
+    SOFT_DELETE_RETENTION_DAYS: float = env.get_float("SOFT_DELETE_RETENTION_DAYS", 30.0)
+    MAINTENANCE_PURGE_BATCH_SIZE: int = env.get_int("MAINTENANCE_PURGE_BATCH_SIZE", 500)
+    MAINTENANCE_MIN_DEAD_TUPLES: int = env.get_int("MAINTENANCE_MIN_DEAD_TUPLES", 1000)
+    MAINTENANCE_VACUUM_DEAD_RATIO: float = env.get_float("MAINTENANCE_VACUUM_DEAD_RATIO", 0.1)
+    MAINTENANCE_REINDEX_DEAD_RATIO: float = env.get_float("MAINTENANCE_REINDEX_DEAD_RATIO", 0.3)
+
+    # Search history: buffered rows are written in batches every FLUSH_INTERVAL
+    # seconds (searches beyond BUFFER_SIZE are dropped) and purged after
+    # RETENTION_DAYS by the maintenance job (0 keeps them forever)
+    SEARCH_HISTORY_FLUSH_INTERVAL: float = env.get_float("SEARCH_HISTORY_FLUSH_INTERVAL", 5.0)
+    SEARCH_HISTORY_BUFFER_SIZE: int = env.get_int("SEARCH_HISTORY_BUFFER_SIZE", 10000)
+    SEARCH_HISTORY_RETENTION_DAYS: float = env.get_float("SEARCH_HISTORY_RETENTION_DAYS", 90.0)
+
+    # In-process BM25 index for search while PostgreSQL or embeddings are unavailable.
+    # It is warm-started from the snapshot file and caught up with other processes'
+    # writes every TEXT_INDEX_REFRESH_INTERVAL seconds.
+    TEXT_INDEX_ENABLED: bool = env.get_bool("TEXT_INDEX_ENABLED", True)
+    TEXT_INDEX_SNAPSHOT_PATH: str = env.get("TEXT_INDEX_SNAPSHOT_PATH", "data/text_index.pkl")
+    TEXT_INDEX_REFRESH_INTERVAL: int = env.get_int("TEXT_INDEX_REFRESH_INTERVAL", 60)
+    # Until the index is ready, fallback search substring-scans at most this many memories
+    FALLBACK_SEARCH_MAX_SCAN: int = env.get_int("FALLBACK_SEARCH_MAX_SCAN", 5000)
+
+    # Knowledge Graph Limits
+    GRAPH_MAX_DEPTH: int = env.get_int("GRAPH_MAX_DEPTH", 3)
+    GRAPH_MAX_FANOUT: int = env.get_int("GRAPH_MAX_FANOUT", 25)
+    GRAPH_MAX_NODES: int = env.get_int("GRAPH_MAX_NODES", 500)
+    GRAPH_TIMEOUT_MS: int = env.get_int("GRAPH_TIMEOUT_MS", 2000)
+
     # Monitoring Configuration
     OTEL_EXPORTER_OTLP_ENDPOINT: str = env.get("OTEL_EXPORTER_OTLP_ENDPOINT", "")
     OTEL_SERVICE_NAME: str = env.get("OTEL_SERVICE_NAME", "second-brain")
@@ -31,9 +31,9 @@ async def verify_container_access(api_key: str = Security(api_key_header)) -> bo
     return True
 
 
-# Service dependencies - Simple direct instantiation for single-user container
+# Service dependencies - application-scoped instances for single-user container
 def get_memory_service():
     """Get memory service instance - single instance per container."""
-    from app.services.memory_service import MemoryService
+    from app.factory import get_service_registry
 
-    return MemoryService()
+    return get_service_registry().memory_service
@@ -6,6 +6,7 @@ Creates configured FastAPI instances for different environments
 import asyncio
 import os
 from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
@@ -26,11 +27,75 @@ class AppState:
         self.memory_service = None
         self.qdrant_client = None
         self.persistence_task = None
+        self.maintenance_tasks = []
         self.shutdown_event = asyncio.Event()
         self.startup_time = None
         self.memory_count = 0
 
 
+class ServiceRegistry:
+    """
+    Application-scoped service registry
+
+    Owns the single MemoryService, and therefore the single asyncpg pool, for
+    the process. The lifespan starts it before serving traffic and closes it
+    on shutdown; router dependencies resolve services here instead of building
+    a new service (and pool) per request.
+    """
+
+    def __init__(self):
+        self._memory_service = None
+
+    @property
+    def memory_service(self):
+        """Process-wide MemoryService (constructed on first access)"""
+        if self._memory_service is None:
+            from app.services.memory_service import MemoryService
+
+            self._memory_service = MemoryService()
+        return self._memory_service
+
+    @property
+    def started(self) -> bool:
+        """Whether the MemoryService was started and its pool is open"""
+        return self._memory_service is not None and self._memory_service._initialized
+
+    async def start(self):
+        """Create and warm the connection pool (idempotent)"""
+        await self.memory_service.initialize()
+        return self.memory_service
+
+    async def close(self):
+        """Close the connection pool and drop the service"""
+        if self._memory_service is not None:
+            await self._memory_service.close()
+            self._memory_service = None
+
+
+services = ServiceRegistry()
+
+
+def get_service_registry() -> ServiceRegistry:
+    """Get the application-scoped service registry"""
+    return services
+
+
+def get_memory_service_instance():
+    """Get the application-scoped PostgreSQL memory service (may not be started yet)"""
+    return services.memory_service.service
+
+
+async def get_memory_service():
+    """Dependency: application-scoped MemoryService, started on first use"""
+    return await services.start()
+
+
+async def get_postgres_memory_service():
+    """Dependency: application-scoped MemoryServicePostgres sharing the same pool"""
+    await services.start()
+    return services.memory_service.service
+
+
 def create_lifespan(config_name: str):
     """Create lifespan handler for specific configuration"""
 
@@ -52,6 +117,7 @@ def create_lifespan(config_name: str):
 
             # Try PostgreSQL first, fall back to mock if it fails
             use_mock = os.getenv("USE_MOCK_DB", "false").lower() == "true"
+            use_postgres = False
             
             if use_mock:
                 logger.info("📦 Using mock storage (USE_MOCK_DB=true)")
@@ -60,10 +126,9 @@ def create_lifespan(config_name: str):
                 await app.state.memory_service.initialize()
             else:
                 try:
-                    # Initialize memory service with PostgreSQL backend
-                    from app.services.memory_service import MemoryService
-                    app.state.memory_service = MemoryService()
-                    await app.state.memory_service.initialize()
+                    # Create the process-wide PostgreSQL pool before serving traffic
+                    app.state.memory_service = await services.start()
+                    use_postgres = True
                 except Exception as e:
                     logger.warning(f"⚠️ PostgreSQL failed: {e}, falling back to mock storage")
                     from app.storage.mock_storage import MockStorage
@@ -88,6 +153,35 @@ def create_lifespan(config_name: str):
                     periodic_persistence(app.state.memory_service)
                 )
 
+            # Incremental PostgreSQL maintenance (not for mock storage or tests)
+            if use_postgres and config_name != "testing":
+                from app.config import Config
+
+                service = services.memory_service.service
+                jobs = (
+                    (service.sweep_duplicates, Config.DUPLICATE_SWEEP_INTERVAL, "Duplicate sweep"),
+                    (
+                        service.sweep_relationships,
+                        Config.RELATIONSHIP_SWEEP_INTERVAL,
+                        "Relationship sweep",
+                    ),
+                    (
+                        service.refresh_text_index,
+                        Config.TEXT_INDEX_REFRESH_INTERVAL,
+                        "Text index refresh",
+                    ),
+                    (service.run_maintenance, Config.MAINTENANCE_INTERVAL, "Maintenance"),
+                    (
+                        service.refresh_embedding_model,
+                        Config.EMBEDDING_MIGRATION_POLL_INTERVAL,
+                        "Embedding model refresh",
+                    ),
+                )
+                for fn, interval, label in jobs:
+                    app.state.maintenance_tasks.append(
+                        asyncio.create_task(_periodic(fn, interval, label))
+                    )
+
             # Mark as ready
             app.state.ready = True
             logger.info("✅ Application ready to serve requests")
@@ -112,6 +206,13 @@ def create_lifespan(config_name: str):
             except asyncio.CancelledError:
                 pass
 
+        for task in app.state.maintenance_tasks:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
         # Final persistence
         if app.state.memory_service and config_name != "testing":
             try:
@@ -120,6 +221,12 @@ def create_lifespan(config_name: str):
             except Exception as e:
                 logger.error(f"Failed to persist memories on shutdown: {e}")
 
+        # Close the application-scoped services (and connection pool)
+        try:
+            await services.close()
+        except Exception as e:
+            logger.error(f"Failed to close services on shutdown: {e}")
+
         logger.info("✅ Shutdown complete")
 
     return lifespan
@@ -140,6 +247,19 @@ async def periodic_persistence(memory_service, interval: int = 30):
             logger.error(f"Persistence error: {e}")
 
 
+async def _periodic(fn: Callable[[], Awaitable[Any]], interval: float, label: str):
+    """Run ``fn`` every ``interval`` seconds, logging its errors instead of stopping"""
+    while True:
+        try:
+            await asyncio.sleep(interval)
+            result = await fn()
+            logger.debug(f"{label}: {result}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"{label} error: {e}")
+
+
 def create_app(config_name: str = "development") -> FastAPI:
     """
     Application factory for creating configured FastAPI instances
@@ -47,6 +47,8 @@ class ConsolidationResult(BaseModel):
     memories_deleted: int = 0
     duplicate_groups: List[DuplicateGroup] = []
     strategy_used: MergeStrategy
+    errors: int = 0
     execution_time_ms: float = 0.0
+    timings: Dict[str, float] = {}
     dry_run: bool = False
     created_at: datetime = Field(default_factory=datetime.now)
@@ -81,10 +81,11 @@ def get_uptime() -> float:
 def check_memory_service() -> Dict[str, Any]:
     """Check memory service health"""
     try:
-        from app.services.memory_service import MemoryService
+        from app.factory import get_service_registry
 
-        service = MemoryService()
-        # Basic check - service can be instantiated
+        # The application-scoped service must have started its connection pool
+        if not get_service_registry().started:
+            return {"status": "unhealthy", "error": "Memory service not started"}
         return {
             "status": "healthy",
             "type": "in-memory",
@@ -276,6 +277,36 @@ async def get_degradation_status():
         return {"error": str(e), "level": "UNKNOWN", "features_disabled": []}
 
 
+@router.get(
+    "/health/tables",
+    summary="Table health",
+    description="Dead tuples, vacuum history and bloat of the memory tables",
+)
+async def get_table_health():
+    """
+    Get PostgreSQL table health for the memory store.
+
+    Reports dead-tuple ratios, the soft-deleted backlog awaiting purge and
+    vector index sizes, next to the thresholds the maintenance job acts on.
+    """
+    from app.factory import get_postgres_memory_service
+
+    try:
+        memory_service = await get_postgres_memory_service()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Memory service unavailable: {e}",
+        )
+
+    health = await memory_service.get_table_health()
+    if "error" in health:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=health["error"]
+        )
+    return health
+
+
 @router.get("/info", summary="System information", description="Get detailed system information")
 async def get_system_info():
     """
@@ -8,9 +8,11 @@ from typing import Dict, List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_serializer
 
+from app.factory import get_memory_service as get_app_memory_service
 from app.services.memory_service import MemoryService
+from app.storage.postgres_unified import FIELDS_PATTERN
 from app.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -67,6 +69,25 @@ class Memory(MemoryBase):
     updated_at: datetime
     access_count: int = 0
     last_accessed: Optional[datetime] = None
+    content_length: Optional[int] = Field(
+        None, description="Length of the full content when only a preview is returned"
+    )
+    embedding: Optional[List[float]] = Field(
+        None, description="Embedding vector, only returned with fields=with_embedding"
+    )
+    has_embedding: Optional[bool] = Field(None, description="Whether an embedding is stored")
+    embedding_pending: Optional[bool] = Field(
+        None, description="Whether an embedding job is queued for this memory"
+    )
+
+    @model_serializer(mode="wrap")
+    def _omit_unrequested(self, handler):
+        """Leave out projection and embedding-status fields the backend did not report"""
+        data = handler(self)
+        for key in ("content_length", "embedding", "has_embedding", "embedding_pending"):
+            if data.get(key) is None:
+                data.pop(key, None)
+        return data
 
 
 class MemoryResponse(BaseModel):
@@ -77,6 +98,20 @@ class MemoryResponse(BaseModel):
     message: Optional[str] = None
 
 
+class BatchGetRequest(BaseModel):
+    """Batch retrieval request"""
+
+    memory_ids: List[UUID] = Field(..., min_length=1, max_length=1000)
+
+
+class BatchGetResponse(BaseModel):
+    """Batch retrieval response; memories follow the request order"""
+
+    success: bool
+    memories: List[Memory]
+    missing: List[UUID] = Field(default_factory=list)
+
+
 class MemoriesResponse(BaseModel):
     """Multiple memories response with pagination"""
 
@@ -87,14 +122,16 @@ class MemoriesResponse(BaseModel):
     page_size: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
 
 
 # ==================== Dependencies ====================
 
 
 async def get_memory_service() -> MemoryService:
-    """Get memory service instance"""
-    return MemoryService()
+    """Get the application-scoped memory service"""
+    return await get_app_memory_service()
 
 
 async def validate_pagination(
@@ -152,6 +189,8 @@ async def create_memory(
             created_at=datetime.fromisoformat(created_memory["created_at"]),
             updated_at=datetime.fromisoformat(created_memory["updated_at"]),
             access_count=0,
+            has_embedding=created_memory.get("has_embedding"),
+            embedding_pending=created_memory.get("embedding_pending"),
         )
 
         return MemoryResponse(
@@ -186,11 +225,50 @@ async def get_memory(memory_id: UUID, memory_service: MemoryService = Depends(ge
         created_at=datetime.fromisoformat(memory_data["created_at"]),
         updated_at=datetime.fromisoformat(memory_data["updated_at"]),
         access_count=memory_data.get("access_count", 0),
+        has_embedding=memory_data.get("has_embedding"),
+        embedding_pending=memory_data.get("embedding_pending"),
     )
 
     return MemoryResponse(success=True, memory=memory)
 
 
+@router.post(
+    "/batch-get",
+    response_model=BatchGetResponse,
+    summary="Get many memories",
+    description="Retrieve up to 1000 memories by ID in a single query",
+)
+async def batch_get_memories(
+    request: BatchGetRequest, memory_service: MemoryService = Depends(get_memory_service)
+):
+    """Get many memories by ID in one round trip"""
+    memory_ids = [str(memory_id) for memory_id in request.memory_ids]
+    found = await memory_service.get_memories(memory_ids)
+
+    memories = [
+        Memory(
+            id=UUID(mem_data["id"]),
+            content=mem_data["content"],
+            memory_type=mem_data["memory_type"],
+            importance_score=mem_data["importance_score"],
+            tags=mem_data["tags"],
+            metadata=mem_data["metadata"],
+            created_at=datetime.fromisoformat(mem_data["created_at"]),
+            updated_at=datetime.fromisoformat(mem_data["updated_at"]),
+            access_count=mem_data.get("access_count", 0),
+            has_embedding=mem_data.get("has_embedding"),
+            embedding_pending=mem_data.get("embedding_pending"),
+        )
+        for mem_data in found
+    ]
+    found_ids = {memory.id for memory in memories}
+    missing = [
+        memory_id for memory_id in dict.fromkeys(request.memory_ids) if memory_id not in found_ids
+    ]
+
+    return BatchGetResponse(success=True, memories=memories, missing=missing)
+
+
 @router.get(
     "/",
     response_model=MemoriesResponse,
@@ -199,50 +277,65 @@ async def get_memory(memory_id: UUID, memory_service: MemoryService = Depends(ge
 )
 async def list_memories(
     pagination: Dict[str, int] = Depends(validate_pagination),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from a previous page's next_cursor"
+    ),
     memory_type: Optional[str] = Query(None, description="Filter by memory type"),
     tags: Optional[List[str]] = Query(None, description="Filter by tags"),
     importance_min: Optional[float] = Query(None, ge=0, le=1),
+    exact_total: bool = Query(False, description="Count exactly instead of estimating"),
+    fields: str = Query(
+        "summary",
+        pattern=FIELDS_PATTERN,
+        description="summary (content preview), full, or with_embedding",
+    ),
     memory_service: MemoryService = Depends(get_memory_service),
 ):
-    """List memories with advanced filtering and pagination"""
-    memories_data = await memory_service.list_memories(
-        limit=pagination["limit"], offset=pagination["offset"]
-    )
-
-    memories = []
-    for mem_data in memories_data:
-        # Apply filters
-        if memory_type and mem_data["memory_type"] != memory_type:
-            continue
-        if tags and not any(tag in mem_data["tags"] for tag in tags):
-            continue
-        if importance_min and mem_data["importance_score"] < importance_min:
-            continue
-
-        memories.append(
-            Memory(
-                id=UUID(mem_data["id"]),
-                content=mem_data["content"],
-                memory_type=mem_data["memory_type"],
-                importance_score=mem_data["importance_score"],
-                tags=mem_data["tags"],
-                metadata=mem_data["metadata"],
-                created_at=datetime.fromisoformat(mem_data["created_at"]),
-                updated_at=datetime.fromisoformat(mem_data["updated_at"]),
-                access_count=mem_data.get("access_count", 0),
-            )
+    """List memories with advanced filtering and keyset pagination"""
+    # Filters run in SQL; with a cursor, deep pages cost the same as the first
+    try:
+        page = await memory_service.list_memories_page(
+            limit=pagination["limit"],
+            cursor=cursor,
+            offset=0 if cursor else pagination["offset"],
+            memory_type=memory_type,
+            tags=tags,
+            min_importance=importance_min,
+            exact_total=exact_total,
+            projection=fields,
         )
-
-    total = len(memories_data) * 10  # Estimate
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    memories = [
+        Memory(
+            id=UUID(mem_data["id"]),
+            content=mem_data["content"],
+            memory_type=mem_data["memory_type"],
+            importance_score=mem_data["importance_score"],
+            tags=mem_data["tags"],
+            metadata=mem_data["metadata"],
+            created_at=datetime.fromisoformat(mem_data["created_at"]),
+            updated_at=datetime.fromisoformat(mem_data["updated_at"]),
+            access_count=mem_data.get("access_count", 0),
+            has_embedding=mem_data.get("has_embedding"),
+            embedding_pending=mem_data.get("embedding_pending"),
+            content_length=mem_data.get("content_length"),
+            embedding=mem_data.get("embedding"),
+        )
+        for mem_data in page["memories"]
+    ]
 
     return MemoriesResponse(
         success=True,
         memories=memories,
-        total=total,
+        total=page["total"],
         page=pagination["page"],
         page_size=pagination["page_size"],
-        has_next=len(memories) == pagination["page_size"],
-        has_prev=pagination["page"] > 1,
+        has_next=page["next_cursor"] is not None,
+        has_prev=cursor is not None or pagination["page"] > 1,
+        next_cursor=page["next_cursor"],
+        total_is_estimate=page["total_is_estimate"],
     )
 
 
@@ -259,7 +352,7 @@ async def update_memory(
     memory_service: MemoryService = Depends(get_memory_service),
 ):
     """Update a memory with partial data"""
-    existing = await memory_service.get_memory(str(memory_id))
+    existing = await memory_service.get_memory(str(memory_id), track=False)
     if not existing:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Memory not found")
 
@@ -285,6 +378,8 @@ async def update_memory(
         created_at=datetime.fromisoformat(updated_data["created_at"]),
         updated_at=datetime.fromisoformat(updated_data["updated_at"]),
         access_count=updated_data.get("access_count", 0),
+        has_embedding=updated_data.get("has_embedding"),
+        embedding_pending=updated_data.get("embedding_pending"),
     )
 
     return MemoryResponse(success=True, memory=memory, message="Memory updated successfully")
@@ -297,7 +392,7 @@ async def delete_memory(
     memory_service: MemoryService = Depends(get_memory_service),
 ):
     """Delete a memory"""
-    existing = await memory_service.get_memory(str(memory_id))
+    existing = await memory_service.get_memory(str(memory_id), track=False)
     if not existing:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Memory not found")
 
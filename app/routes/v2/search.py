@@ -4,14 +4,16 @@ Handles semantic, keyword, and hybrid search operations
 """
 
 from datetime import datetime
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel, Field
 
 from app.routes.v2.memories import Memory
+from app.factory import get_memory_service as get_app_memory_service
 from app.services.memory_service import MemoryService
+from app.storage.postgres_unified import FIELDS_PATTERN, RECALL_PATTERN
 from app.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -41,6 +43,16 @@ class SearchRequest(BaseModel):
     offset: int = Field(0, ge=0, description="Offset for pagination")
     include_similar: bool = Field(True, description="Include similar memories")
     similarity_threshold: float = Field(0.7, ge=0, le=1, description="Minimum similarity score")
+    recall: Optional[str] = Field(
+        None,
+        pattern=RECALL_PATTERN,
+        description="Vector search accuracy hint (chosen automatically when omitted)",
+    )
+    fields: str = Field(
+        "full",
+        pattern=FIELDS_PATTERN,
+        description="summary (content preview), full, or with_embedding",
+    )
 
 
 class SearchResult(BaseModel):
@@ -67,8 +79,8 @@ class SearchResponse(BaseModel):
 
 
 async def get_memory_service() -> MemoryService:
-    """Get memory service instance"""
-    return MemoryService()
+    """Get the application-scoped memory service"""
+    return await get_app_memory_service()
 
 
 # ==================== Endpoints ====================
@@ -96,7 +108,13 @@ async def search_memories(
 
     start_time = time.time()
 
-    results = await memory_service.search_memories(query=search.query, limit=search.limit)
+    results = await memory_service.search_memories(
+        query=search.query,
+        limit=search.limit,
+        search_type=search.search_type,
+        recall=search.recall,
+        projection=search.fields,
+    )
 
     # Convert to SearchResult objects
     search_results = []
@@ -111,6 +129,8 @@ async def search_memories(
             created_at=datetime.fromisoformat(mem_data["created_at"]),
             updated_at=datetime.fromisoformat(mem_data["updated_at"]),
             access_count=mem_data.get("access_count", 0),
+            content_length=mem_data.get("content_length"),
+            embedding=mem_data.get("embedding"),
         )
 
         # Calculate basic relevance score
@@ -144,6 +164,8 @@ async def semantic_search(
     query: str,
     limit: int = 10,
     threshold: float = 0.7,
+    recall: Optional[str] = Query(None, pattern=RECALL_PATTERN),
+    fields: str = Query("full", pattern=FIELDS_PATTERN),
     memory_service: MemoryService = Depends(get_memory_service),
 ):
     """
@@ -153,7 +175,12 @@ async def semantic_search(
     Results are sorted by cosine similarity.
     """
     search_request = SearchRequest(
-        query=query, search_type="semantic", limit=limit, similarity_threshold=threshold
+        query=query,
+        search_type="semantic",
+        limit=limit,
+        similarity_threshold=threshold,
+        recall=recall,
+        fields=fields,
     )
 
     return await search_memories(search_request, memory_service)
@@ -166,14 +193,19 @@ async def semantic_search(
     description="Traditional keyword-based search",
 )
 async def keyword_search(
-    query: str, limit: int = 10, memory_service: MemoryService = Depends(get_memory_service)
+    query: str,
+    limit: int = 10,
+    fields: str = Query("full", pattern=FIELDS_PATTERN),
+    memory_service: MemoryService = Depends(get_memory_service),
 ):
     """
     Perform traditional keyword search.
 
     Searches for exact and partial matches in memory content.
     """
-    search_request = SearchRequest(query=query, search_type="keyword", limit=limit)
+    search_request = SearchRequest(
+        query=query, search_type="keyword", limit=limit, fields=fields
+    )
 
     return await search_memories(search_request, memory_service)
 
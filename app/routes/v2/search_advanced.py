@@ -8,7 +8,10 @@ from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
 
+from app.factory import get_postgres_memory_service
+from app.models.synthesis.consolidation_models import ConsolidationRequest, ConsolidationResult
 from app.services.memory_service_postgres import MemoryServicePostgres
+from app.storage.postgres_unified import FIELDS_PATTERN, RECALL_PATTERN
 from app.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -33,6 +36,16 @@ class VectorSearchRequest(BaseModel):
     limit: int = Field(10, ge=1, le=100, description="Maximum results")
     min_similarity: float = Field(0.7, ge=0.0, le=1.0, description="Minimum similarity score")
     generate_embedding: bool = Field(True, description="Generate embedding from query")
+    recall: Optional[str] = Field(
+        None,
+        pattern=RECALL_PATTERN,
+        description="Vector search accuracy hint (chosen automatically when omitted)",
+    )
+    fields: str = Field(
+        "full",
+        pattern=FIELDS_PATTERN,
+        description="summary (content preview), full, or with_embedding",
+    )
 
 
 class HybridSearchRequest(BaseModel):
@@ -45,6 +58,16 @@ class HybridSearchRequest(BaseModel):
     )
     min_score: float = Field(0.0, ge=0.0, le=1.0, description="Minimum combined score")
     filters: Optional[Dict[str, Any]] = Field(None, description="Additional filters")
+    recall: Optional[str] = Field(
+        None,
+        pattern=RECALL_PATTERN,
+        description="Vector search accuracy hint (chosen automatically when omitted)",
+    )
+    fields: str = Field(
+        "full",
+        pattern=FIELDS_PATTERN,
+        description="summary (content preview), full, or with_embedding",
+    )
 
 
 class RelationshipSearchRequest(BaseModel):
@@ -73,6 +96,28 @@ class KnowledgeGraphResponse(BaseModel):
     edges: List[Dict[str, Any]]
     center: str
     depth: int
+    truncated: bool = False
+
+
+class VectorIndexRequest(BaseModel):
+    """ANN index build request"""
+
+    method: str = Field("hnsw", pattern="^(hnsw|ivfflat)$", description="Index type")
+    m: int = Field(16, ge=2, le=100, description="HNSW connections per layer")
+    ef_construction: int = Field(64, ge=4, le=1000, description="HNSW build candidate list")
+    lists: Optional[int] = Field(
+        None, ge=1, le=100000, description="IVFFlat lists (derived from row count if omitted)"
+    )
+    rebuild: bool = Field(False, description="Replace an existing valid index")
+
+
+class QuantizationRequest(BaseModel):
+    """Quantized embedding column request"""
+
+    mode: Optional[str] = Field(
+        None, pattern="^(halfvec|binary)$", description="Quantization (defaults to configured)"
+    )
+    batch_size: int = Field(5000, ge=100, le=50000, description="Rows per backfill batch")
 
 
 class DuplicateCheckResponse(BaseModel):
@@ -87,10 +132,8 @@ class DuplicateCheckResponse(BaseModel):
 
 
 async def get_memory_service() -> MemoryServicePostgres:
-    """Get memory service instance"""
-    service = MemoryServicePostgres()
-    await service.initialize()
-    return service
+    """Get the application-scoped memory service"""
+    return await get_postgres_memory_service()
 
 
 # ==================== Endpoints ====================
@@ -116,7 +159,11 @@ async def vector_search(
 
     try:
         results = await service.semantic_search(
-            query=request.query, limit=request.limit, min_similarity=request.min_similarity
+            query=request.query,
+            limit=request.limit,
+            min_similarity=request.min_similarity,
+            recall=request.recall,
+            projection=request.fields,
         )
 
         execution_time = (time.time() - start) * 1000
@@ -160,6 +207,8 @@ async def hybrid_search(
             search_type="hybrid",
             min_score=request.min_score,
             filters=request.filters,
+            recall=request.recall,
+            projection=request.fields,
         )
 
         execution_time = (time.time() - start) * 1000
@@ -228,20 +277,32 @@ async def build_knowledge_graph(
     memory_id: str,
     depth: int = Query(2, ge=1, le=3, description="Graph traversal depth"),
     min_strength: float = Query(0.5, ge=0.0, le=1.0, description="Minimum relationship strength"),
+    max_nodes: Optional[int] = Query(None, ge=1, description="Maximum nodes to return"),
+    fields: str = Query(
+        "summary", pattern="^(summary|full)$", description="Truncated or full node content"
+    ),
     service: MemoryServicePostgres = Depends(get_memory_service),
 ):
     """
     Build a knowledge graph centered around a specific memory.
 
-    Traverses relationships up to the specified depth.
+    Traverses relationships up to the specified depth in a single query.
     """
     try:
         graph = await service.build_knowledge_graph(
-            center_memory_id=memory_id, depth=depth, min_strength=min_strength
+            center_memory_id=memory_id,
+            depth=depth,
+            min_strength=min_strength,
+            max_nodes=max_nodes,
+            projection=fields,
         )
 
         return KnowledgeGraphResponse(
-            nodes=graph["nodes"], edges=graph["edges"], center=graph["center"], depth=depth
+            nodes=graph["nodes"],
+            edges=graph["edges"],
+            center=graph["center"],
+            depth=depth,
+            truncated=graph["truncated"],
         )
     except Exception as e:
         logger.error(f"Knowledge graph generation failed: {e}")
@@ -264,20 +325,23 @@ async def find_duplicates(
 ):
     """
     Find duplicate or near-duplicate memories based on embedding similarity.
+
+    Pairs come from the candidate table refreshed by the background sweep.
     """
     try:
-        duplicates = await service.find_duplicate_memories(similarity_threshold)
+        duplicates = await service.find_duplicate_memories(similarity_threshold, limit=limit)
+        total_found = await service.count_duplicate_memories(similarity_threshold)
 
         # Format results
         formatted_duplicates = []
-        for memory1_id, memory2_id, similarity in duplicates[:limit]:
+        for memory1_id, memory2_id, similarity in duplicates:
             formatted_duplicates.append(
                 {"memory1_id": memory1_id, "memory2_id": memory2_id, "similarity": similarity}
             )
 
         return DuplicateCheckResponse(
             duplicates=formatted_duplicates,
-            total_found=len(duplicates),
+            total_found=total_found,
             similarity_threshold=similarity_threshold,
         )
     except Exception as e:
@@ -301,7 +365,10 @@ async def consolidate_duplicates(
     """
     Automatically consolidate duplicate memories into single entries.
 
-    Use dry_run=true to preview what would be consolidated.
+    Each group of duplicates is merged into its most important memory.
+    found counts duplicate groups, consolidated the merged groups and
+    deleted the duplicates removed. Use dry_run=true to preview what
+    would be consolidated.
     """
     try:
         results = await service.auto_consolidate_duplicates(
@@ -311,10 +378,44 @@ async def consolidate_duplicates(
         return {
             "found": results["found"],
             "consolidated": results["consolidated"],
+            "deleted": results.get("deleted", 0),
             "errors": results["errors"],
             "dry_run": results["dry_run"],
+            "groups": results.get("groups", []),
+            "execution_time_ms": results.get("execution_time_ms"),
+            "timings": results.get("timings", {}),
             "message": "Dry run completed" if dry_run else "Consolidation completed",
         }
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error(f"Consolidation failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to consolidate duplicates: {str(e)}",
+        )
+
+
+@router.post(
+    "/consolidate",
+    response_model=ConsolidationResult,
+    summary="Consolidate duplicate groups",
+    description="Cluster duplicates and merge each group with a chosen strategy",
+)
+async def consolidate_duplicate_groups(
+    request: ConsolidationRequest,
+    service: MemoryServicePostgres = Depends(get_memory_service),
+):
+    """
+    Cluster duplicate pairs and merge each cluster into one surviving memory.
+
+    Groups are only reported unless auto_merge is set and dry_run is not;
+    memory_ids restricts the duplicates considered.
+    """
+    try:
+        return await service.consolidate_duplicates(request)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except Exception as e:
         logger.error(f"Consolidation failed: {e}")
         raise HTTPException(
@@ -380,9 +481,266 @@ async def reindex_memories(
             "skipped": results["skipped"],
             "message": f"Reindexing completed: {results['success']}/{results['processed']} successful",
         }
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except Exception as e:
         logger.error(f"Reindexing failed: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to reindex memories: {str(e)}",
         )
+
+
+@router.get(
+    "/embeddings/jobs",
+    summary="Embedding job queue status",
+    description="Report queued, retrying and failed embedding jobs and worker counters",
+)
+async def get_embedding_job_status(service: MemoryServicePostgres = Depends(get_memory_service)):
+    """
+    Report the queue of memories waiting for an asynchronous embedding.
+    """
+    status_info = await service.get_embedding_job_status()
+    if "error" in status_info:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to read embedding job status: {status_info['error']}",
+        )
+    return status_info
+
+
+@router.get(
+    "/embeddings/backfill",
+    summary="Embedding backfill progress",
+    description="Report checkpoint, processed and remaining counts of the embedding backfill",
+)
+async def get_embedding_backfill_status(
+    service: MemoryServicePostgres = Depends(get_memory_service),
+):
+    """
+    Report progress of the background job that embeds memories missing a
+    vector from the current model.
+    """
+    status_info = await service.get_embedding_backfill_status()
+    if "error" in status_info:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to read backfill status: {status_info['error']}",
+        )
+    return status_info
+
+
+@router.post(
+    "/embeddings/backfill",
+    summary="Start embedding backfill",
+    description="Start or resume the rate-limited background embedding backfill",
+)
+async def start_embedding_backfill(
+    reset: bool = Query(False, description="Start over instead of resuming from the checkpoint"),
+    service: MemoryServicePostgres = Depends(get_memory_service),
+):
+    """
+    Start the backfill in the background and return its progress.
+
+    Calling this while the job runs is a no-op; a stopped job resumes after
+    its last committed batch.
+    """
+    try:
+        return await service.start_embedding_backfill(reset=reset)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error(f"Embedding backfill start failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start embedding backfill: {str(e)}",
+        )
+
+
+@router.delete(
+    "/embeddings/backfill",
+    summary="Stop embedding backfill",
+    description="Stop the background embedding backfill, keeping its checkpoint",
+)
+async def stop_embedding_backfill(service: MemoryServicePostgres = Depends(get_memory_service)):
+    """
+    Stop the backfill; starting it again resumes where it stopped.
+    """
+    try:
+        return await service.stop_embedding_backfill()
+    except Exception as e:
+        logger.error(f"Embedding backfill stop failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to stop embedding backfill: {str(e)}",
+        )
+
+
+@router.get(
+    "/embeddings/migration",
+    summary="Embedding model migration progress",
+    description="Report coverage, throughput and ETA of the embedding model migration",
+)
+async def get_embedding_migration_status(
+    service: MemoryServicePostgres = Depends(get_memory_service),
+):
+    """
+    Report progress of the latest migration to a new embedding model.
+    """
+    status_info = await service.get_embedding_migration_status()
+    if "error" in status_info:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to read migration status: {status_info['error']}",
+        )
+    return status_info
+
+
+@router.post(
+    "/embeddings/migration",
+    summary="Start embedding model migration",
+    description="Re-embed every memory with a new model in the background, then switch search",
+)
+async def start_embedding_migration(
+    model: Optional[str] = Query(
+        None, description="Target embedding model; resumes the unfinished migration when omitted"
+    ),
+    service: MemoryServicePostgres = Depends(get_memory_service),
+):
+    """
+    Start (or resume) the migration and return its progress.
+
+    Search keeps using the current vectors until the new ones cover every
+    memory; the switch then happens in one short transaction.
+    """
+    try:
+        return await service.start_embedding_migration(model)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error(f"Embedding migration start failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to start embedding migration: {str(e)}",
+        )
+
+
+@router.delete(
+    "/embeddings/migration",
+    summary="Stop or cancel embedding model migration",
+    description="Stop the migration, keeping its checkpoint, or cancel it and drop its vectors",
+)
+async def stop_embedding_migration(
+    cancel: bool = Query(False, description="Drop the new vectors instead of pausing"),
+    service: MemoryServicePostgres = Depends(get_memory_service),
+):
+    """
+    Stop the migration; starting it again resumes where it stopped unless
+    it was cancelled.
+    """
+    try:
+        if cancel:
+            return await service.cancel_embedding_migration()
+        return await service.stop_embedding_migration()
+    except Exception as e:
+        logger.error(f"Embedding migration stop failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to stop embedding migration: {str(e)}",
+        )
+
+
+@router.get(
+    "/vector-index",
+    summary="Vector index status",
+    description="Report ANN index type, size, validity and build progress",
+)
+async def get_vector_index_status(service: MemoryServicePostgres = Depends(get_memory_service)):
+    """
+    Report the state of the ANN indexes used by vector and hybrid search.
+    """
+    status_info = await service.get_vector_index_status()
+    if "error" in status_info:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to read vector index status: {status_info['error']}",
+        )
+    return status_info
+
+
+@router.post(
+    "/vector-index",
+    summary="Create or rebuild vector index",
+    description="Build an HNSW or IVFFlat index with the given parameters",
+)
+async def create_vector_index(
+    request: VectorIndexRequest, service: MemoryServicePostgres = Depends(get_memory_service)
+):
+    """
+    Create the ANN index, or rebuild it with new parameters.
+
+    The build runs concurrently; searches keep using the current index until
+    the replacement is ready.
+    """
+    try:
+        return await service.create_vector_index(
+            method=request.method,
+            m=request.m,
+            ef_construction=request.ef_construction,
+            lists=request.lists,
+            rebuild=request.rebuild,
+        )
+    except Exception as e:
+        logger.error(f"Vector index build failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to build vector index: {str(e)}",
+        )
+
+
+@router.post(
+    "/vector-index/quantize",
+    summary="Enable quantized vector search",
+    description="Add, backfill and index a halfvec or binary embedding column",
+)
+async def enable_quantization(
+    request: QuantizationRequest, service: MemoryServicePostgres = Depends(get_memory_service)
+):
+    """
+    Prepare the quantized first-stage column used by vector search.
+
+    Safe to re-run; an interrupted backfill resumes where it stopped.
+    """
+    try:
+        return await service.enable_quantization(mode=request.mode, batch_size=request.batch_size)
+    except Exception as e:
+        logger.error(f"Quantization setup failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to enable quantization: {str(e)}",
+        )
+
+
+@router.get(
+    "/vector-index/recall",
+    summary="Measure quantized recall",
+    description="Compare quantized search with an exact scan on sampled queries",
+)
+async def check_quantized_recall(
+    sample_size: int = Query(20, ge=1, le=200, description="Sampled query vectors"),
+    k: int = Query(10, ge=1, le=100, description="Results compared per query"),
+    service: MemoryServicePostgres = Depends(get_memory_service),
+):
+    """
+    Report recall@k of quantized search and whether it is within tolerance.
+    """
+    try:
+        return await service.check_quantized_recall(sample_size=sample_size, k=k)
+    except RuntimeError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error(f"Recall measurement failed: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to measure recall: {str(e)}",
+        )
@@ -21,13 +21,18 @@ from fastapi import (
     status,
 )
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_serializer
 
+from app.factory import get_memory_service as get_app_memory_service
 from app.services.memory_service import MemoryService
+from app.storage.postgres_unified import FIELDS_PATTERN, RECALL_PATTERN
 from app.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Memories per create_memories call (and transaction) during an import
+IMPORT_BATCH_SIZE = 1000
+
 # ========================= MODELS =========================
 
 
@@ -69,7 +74,25 @@ class Memory(MemoryBase):
     updated_at: datetime
     access_count: int = 0
     last_accessed: Optional[datetime] = None
-    embedding: Optional[List[float]] = Field(None, exclude=True)
+    content_length: Optional[int] = Field(
+        None, description="Length of the full content when only a preview is returned"
+    )
+    embedding: Optional[List[float]] = Field(
+        None, description="Embedding vector, only returned with fields=with_embedding"
+    )
+    has_embedding: Optional[bool] = Field(None, description="Whether an embedding is stored")
+    embedding_pending: Optional[bool] = Field(
+        None, description="Whether an embedding job is queued for this memory"
+    )
+
+    @model_serializer(mode="wrap")
+    def _omit_unrequested(self, handler):
+        """Leave out projection and embedding-status fields the backend did not report"""
+        data = handler(self)
+        for key in ("content_length", "embedding", "has_embedding", "embedding_pending"):
+            if data.get(key) is None:
+                data.pop(key, None)
+        return data
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -82,6 +105,20 @@ class MemoryResponse(BaseModel):
     message: Optional[str] = None
 
 
+class BatchGetRequest(BaseModel):
+    """Batch retrieval request"""
+
+    memory_ids: List[UUID] = Field(..., min_length=1, max_length=1000)
+
+
+class BatchGetResponse(BaseModel):
+    """Batch retrieval response; memories follow the request order"""
+
+    success: bool
+    memories: List[Memory]
+    missing: List[UUID] = Field(default_factory=list)
+
+
 class MemoriesResponse(BaseModel):
     """Multiple memories response with pagination"""
 
@@ -92,6 +129,8 @@ class MemoriesResponse(BaseModel):
     page_size: int
     has_next: bool
     has_prev: bool
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
 
 
 class SearchRequest(BaseModel):
@@ -104,6 +143,16 @@ class SearchRequest(BaseModel):
     offset: int = Field(0, ge=0)
     include_similar: bool = True
     similarity_threshold: float = Field(0.7, ge=0, le=1)
+    recall: Optional[str] = Field(
+        None,
+        pattern=RECALL_PATTERN,
+        description="Vector search accuracy hint (chosen automatically when omitted)",
+    )
+    fields: str = Field(
+        "full",
+        pattern=FIELDS_PATTERN,
+        description="summary (content preview), full, or with_embedding",
+    )
 
 
 class BulkOperation(BaseModel):
@@ -145,8 +194,8 @@ class WebSocketResponse(BaseModel):
 
 
 async def get_memory_service() -> MemoryService:
-    """Get memory service instance"""
-    return MemoryService()
+    """Get the application-scoped memory service"""
+    return await get_app_memory_service()
 
 
 async def validate_pagination(
@@ -215,6 +264,9 @@ class ConnectionManager:
 # Global connection manager
 manager = ConnectionManager()
 
+# Rows fetched per server-side cursor round trip during exports
+EXPORT_BATCH_SIZE = 500
+
 
 # ========================= ROUTER =========================
 
@@ -260,6 +312,8 @@ async def create_memory(
             created_at=datetime.fromisoformat(created_memory["created_at"]),
             updated_at=datetime.fromisoformat(created_memory["updated_at"]),
             access_count=0,
+            has_embedding=created_memory.get("has_embedding"),
+            embedding_pending=created_memory.get("embedding_pending"),
         )
 
         # Background tasks
@@ -292,61 +346,107 @@ async def get_memory(memory_id: UUID, memory_service: MemoryService = Depends(ge
         created_at=datetime.fromisoformat(memory_data["created_at"]),
         updated_at=datetime.fromisoformat(memory_data["updated_at"]),
         access_count=memory_data.get("access_count", 0),
+        has_embedding=memory_data.get("has_embedding"),
+        embedding_pending=memory_data.get("embedding_pending"),
     )
 
     return MemoryResponse(success=True, memory=memory)
 
 
+@router.post("/memories/batch-get", response_model=BatchGetResponse)
+async def batch_get_memories(
+    request: BatchGetRequest, memory_service: MemoryService = Depends(get_memory_service)
+):
+    """Get many memories by ID in one round trip"""
+    memory_ids = [str(memory_id) for memory_id in request.memory_ids]
+    found = await memory_service.get_memories(memory_ids)
+
+    memories = [
+        Memory(
+            id=UUID(mem_data["id"]),
+            content=mem_data["content"],
+            memory_type=mem_data["memory_type"],
+            importance_score=mem_data["importance_score"],
+            tags=mem_data["tags"],
+            metadata=mem_data["metadata"],
+            created_at=datetime.fromisoformat(mem_data["created_at"]),
+            updated_at=datetime.fromisoformat(mem_data["updated_at"]),
+            access_count=mem_data.get("access_count", 0),
+            has_embedding=mem_data.get("has_embedding"),
+            embedding_pending=mem_data.get("embedding_pending"),
+        )
+        for mem_data in found
+    ]
+    found_ids = {memory.id for memory in memories}
+    missing = [
+        memory_id for memory_id in dict.fromkeys(request.memory_ids) if memory_id not in found_ids
+    ]
+
+    return BatchGetResponse(success=True, memories=memories, missing=missing)
+
+
 @router.get("/memories", response_model=MemoriesResponse)
 async def list_memories(
     pagination: Dict[str, int] = Depends(validate_pagination),
+    cursor: Optional[str] = Query(
+        None, description="Opaque cursor from a previous page's next_cursor"
+    ),
     memory_type: Optional[str] = Query(None, description="Filter by memory type"),
     tags: Optional[List[str]] = Query(None, description="Filter by tags"),
     importance_min: Optional[float] = Query(None, ge=0, le=1),
+    exact_total: bool = Query(False, description="Count exactly instead of estimating"),
+    fields: str = Query(
+        "summary",
+        pattern=FIELDS_PATTERN,
+        description="summary (content preview), full, or with_embedding",
+    ),
     memory_service: MemoryService = Depends(get_memory_service),
 ):
-    """List memories with advanced filtering and pagination"""
-    # Get memories (no user_id filtering)
-    memories_data = await memory_service.list_memories(
-        limit=pagination["limit"], offset=pagination["offset"]
-    )
-
-    # Convert to Memory objects
-    memories = []
-    for mem_data in memories_data:
-        # Apply filters
-        if memory_type and mem_data["memory_type"] != memory_type:
-            continue
-        if tags and not any(tag in mem_data["tags"] for tag in tags):
-            continue
-        if importance_min and mem_data["importance_score"] < importance_min:
-            continue
-
-        memories.append(
-            Memory(
-                id=UUID(mem_data["id"]),
-                content=mem_data["content"],
-                memory_type=mem_data["memory_type"],
-                importance_score=mem_data["importance_score"],
-                tags=mem_data["tags"],
-                metadata=mem_data["metadata"],
-                created_at=datetime.fromisoformat(mem_data["created_at"]),
-                updated_at=datetime.fromisoformat(mem_data["updated_at"]),
-                access_count=mem_data.get("access_count", 0),
-            )
+    """List memories with advanced filtering and keyset pagination"""
+    # Filters run in SQL; with a cursor, deep pages cost the same as the first
+    try:
+        page = await memory_service.list_memories_page(
+            limit=pagination["limit"],
+            cursor=cursor,
+            offset=0 if cursor else pagination["offset"],
+            memory_type=memory_type,
+            tags=tags,
+            min_importance=importance_min,
+            exact_total=exact_total,
+            projection=fields,
         )
-
-    # Calculate total (simplified)
-    total = len(memories_data) * 10  # Estimate
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    memories = [
+        Memory(
+            id=UUID(mem_data["id"]),
+            content=mem_data["content"],
+            memory_type=mem_data["memory_type"],
+            importance_score=mem_data["importance_score"],
+            tags=mem_data["tags"],
+            metadata=mem_data["metadata"],
+            created_at=datetime.fromisoformat(mem_data["created_at"]),
+            updated_at=datetime.fromisoformat(mem_data["updated_at"]),
+            access_count=mem_data.get("access_count", 0),
+            has_embedding=mem_data.get("has_embedding"),
+            embedding_pending=mem_data.get("embedding_pending"),
+            content_length=mem_data.get("content_length"),
+            embedding=mem_data.get("embedding"),
+        )
+        for mem_data in page["memories"]
+    ]
 
     return MemoriesResponse(
         success=True,
         memories=memories,
-        total=total,
+        total=page["total"],
         page=pagination["page"],
         page_size=pagination["page_size"],
-        has_next=len(memories) == pagination["page_size"],
-        has_prev=pagination["page"] > 1,
+        has_next=page["next_cursor"] is not None,
+        has_prev=cursor is not None or pagination["page"] > 1,
+        next_cursor=page["next_cursor"],
+        total_is_estimate=page["total_is_estimate"],
     )
 
 
@@ -359,7 +459,7 @@ async def update_memory(
 ):
     """Update a memory with partial data"""
     # Get existing memory
-    existing = await memory_service.get_memory(str(memory_id))
+    existing = await memory_service.get_memory(str(memory_id), track=False)
     if not existing:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Memory not found")
 
@@ -386,6 +486,8 @@ async def update_memory(
         created_at=datetime.fromisoformat(updated_data["created_at"]),
         updated_at=datetime.fromisoformat(updated_data["updated_at"]),
         access_count=updated_data.get("access_count", 0),
+        has_embedding=updated_data.get("has_embedding"),
+        embedding_pending=updated_data.get("embedding_pending"),
     )
 
     # Background task
@@ -402,7 +504,7 @@ async def delete_memory(
 ):
     """Delete a memory"""
     # Check if exists
-    existing = await memory_service.get_memory(str(memory_id))
+    existing = await memory_service.get_memory(str(memory_id), track=False)
     if not existing:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Memory not found")
 
@@ -427,7 +529,13 @@ async def search_memories(
     search: SearchRequest, memory_service: MemoryService = Depends(get_memory_service)
 ):
     """Advanced search with multiple strategies"""
-    results = await memory_service.search_memories(query=search.query, limit=search.limit)
+    results = await memory_service.search_memories(
+        query=search.query,
+        limit=search.limit,
+        search_type=search.search_type,
+        recall=search.recall,
+        projection=search.fields,
+    )
 
     # Convert to Memory objects
     memories = []
@@ -443,6 +551,10 @@ async def search_memories(
                 created_at=datetime.fromisoformat(mem_data["created_at"]),
                 updated_at=datetime.fromisoformat(mem_data["updated_at"]),
                 access_count=mem_data.get("access_count", 0),
+                has_embedding=mem_data.get("has_embedding"),
+                embedding_pending=mem_data.get("embedding_pending"),
+                content_length=mem_data.get("content_length"),
+                embedding=mem_data.get("embedding"),
             )
         )
 
@@ -465,38 +577,45 @@ async def bulk_operation(
     memory_service: MemoryService = Depends(get_memory_service),
 ):
     """Perform bulk operations on multiple memories"""
-    results = {"success": [], "failed": [], "total": len(operation.memory_ids)}
-
-    for memory_id in operation.memory_ids:
-        try:
-            # Check if exists
-            existing = await memory_service.get_memory(str(memory_id))
-            if not existing:
-                results["failed"].append({"id": str(memory_id), "error": "Not found"})
-                continue
+    memory_ids = [str(memory_id) for memory_id in operation.memory_ids]
+    results = {"success": [], "failed": [], "total": len(memory_ids)}
 
-            # Perform operation
-            if operation.operation == "delete":
-                success = await memory_service.delete_memory(str(memory_id))
-                if success:
-                    results["success"].append(str(memory_id))
-                else:
-                    results["failed"].append({"id": str(memory_id), "error": "Delete failed"})
-
-            elif operation.operation == "update" and operation.data:
-                # Update with provided data
-                await memory_service.update_memory(str(memory_id), **operation.data)
-                results["success"].append(str(memory_id))
-
-            elif operation.operation == "tag" and operation.data and "tags" in operation.data:
-                # Add tags
-                existing_tags = existing.get("tags", [])
-                new_tags = list(set(existing_tags + operation.data["tags"]))
-                await memory_service.update_memory(str(memory_id), tags=new_tags)
-                results["success"].append(str(memory_id))
-
-        except Exception as e:
-            results["failed"].append({"id": str(memory_id), "error": str(e)})
+    # One query for existence instead of a get per id
+    existing = {
+        memory["id"] for memory in await memory_service.get_memories(memory_ids, track=False)
+    }
+    results["failed"].extend(
+        {"id": memory_id, "error": "Not found"}
+        for memory_id in memory_ids
+        if memory_id not in existing
+    )
+    found_ids = [memory_id for memory_id in dict.fromkeys(memory_ids) if memory_id in existing]
+
+    if operation.operation == "delete":
+        deleted = set(await memory_service.delete_memories(found_ids))
+        for memory_id in found_ids:
+            if memory_id in deleted:
+                results["success"].append(memory_id)
+            else:
+                results["failed"].append({"id": memory_id, "error": "Delete failed"})
+
+    elif operation.operation == "tag" and operation.data and "tags" in operation.data:
+        # Tags are merged set-based in a single UPDATE
+        tagged = set(await memory_service.add_tags(found_ids, operation.data["tags"]))
+        for memory_id in found_ids:
+            if memory_id in tagged:
+                results["success"].append(memory_id)
+            else:
+                results["failed"].append({"id": memory_id, "error": "Tag failed"})
+
+    elif operation.operation == "update" and operation.data:
+        # Updates may re-embed content, so they stay per memory
+        for memory_id in found_ids:
+            try:
+                await memory_service.update_memory(memory_id, **operation.data)
+                results["success"].append(memory_id)
+            except Exception as e:
+                results["failed"].append({"id": memory_id, "error": str(e)})
 
     # Background notification
     background_tasks.add_task(broadcast_bulk_operation, operation.operation, results)
@@ -593,66 +712,81 @@ async def export_memories(
     memory_service: MemoryService = Depends(get_memory_service),
 ):
     """Export all memories in various formats"""
-    # Get all memories
-    all_memories = []
-    offset = 0
-    batch_size = 100
-
-    while True:
-        batch = await memory_service.list_memories(limit=batch_size, offset=offset)
-        if not batch:
-            break
-        all_memories.extend(batch)
-        offset += batch_size
-        if len(batch) < batch_size:
-            break
-
-    # Format based on request
+    # Stream the corpus through a server-side cursor so memory use stays bounded
     if format == "json":
-        content = json.dumps(all_memories, indent=2, default=str)
+        chunks = _export_json(memory_service)
         media_type = "application/json"
         filename = f"memories_export_{datetime.now().date()}.json"
 
     elif format == "csv":
-        import csv
-        import io
-
-        output = io.StringIO()
-        if all_memories:
-            writer = csv.DictWriter(output, fieldnames=all_memories[0].keys())
-            writer.writeheader()
-            writer.writerows(all_memories)
-
-        content = output.getvalue()
+        chunks = _export_csv(memory_service)
         media_type = "text/csv"
         filename = f"memories_export_{datetime.now().date()}.csv"
 
     else:  # markdown
-        lines = ["# Memory Export\n\n"]
-        for mem in all_memories:
-            lines.append(f"## {mem['created_at']}\n\n")
-            lines.append(f"{mem['content']}\n\n")
-            if include_metadata:
-                lines.append(f"- **Type**: {mem['memory_type']}\n")
-                lines.append(f"- **Importance**: {mem['importance_score']}\n")
-                lines.append(f"- **Tags**: {', '.join(mem['tags'])}\n")
-            lines.append("\n---\n\n")
-
-        content = "".join(lines)
+        chunks = _export_markdown(memory_service, include_metadata)
         media_type = "text/markdown"
         filename = f"memories_export_{datetime.now().date()}.md"
 
     return StreamingResponse(
-        io.BytesIO(content.encode()),
+        chunks,
         media_type=media_type,
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
 
 
+async def _export_json(memory_service: MemoryService):
+    """Yield a JSON array of all memories, one batch at a time"""
+    yield "["
+    first = True
+    async for batch in memory_service.iterate_memories(batch_size=EXPORT_BATCH_SIZE):
+        for mem in batch:
+            yield ("\n" if first else ",\n") + json.dumps(mem, indent=2, default=str)
+            first = False
+    yield "\n]"
+
+
+async def _export_csv(memory_service: MemoryService):
+    """Yield CSV rows for all memories, one batch at a time"""
+    import csv
+    import io
+
+    writer = None
+    output = io.StringIO()
+    async for batch in memory_service.iterate_memories(batch_size=EXPORT_BATCH_SIZE):
+        if writer is None:
+            writer = csv.DictWriter(output, fieldnames=batch[0].keys())
+            writer.writeheader()
+        writer.writerows(batch)
+
+        yield output.getvalue()
+        output.seek(0)
+        output.truncate()
+
+
+async def _export_markdown(memory_service: MemoryService, include_metadata: bool):
+    """Yield a Markdown document of all memories, one batch at a time"""
+    yield "# Memory Export\n\n"
+    async for batch in memory_service.iterate_memories(batch_size=EXPORT_BATCH_SIZE):
+        lines = []
+        for mem in batch:
+            lines.append(f"## {mem['created_at']}\n\n")
+            lines.append(f"{mem['content']}\n\n")
+            if include_metadata:
+                lines.append(f"- **Type**: {mem['memory_type']}\n")
+                lines.append(f"- **Importance**: {mem['importance_score']}\n")
+                lines.append(f"- **Tags**: {', '.join(mem['tags'])}\n")
+            lines.append("\n---\n\n")
+        yield "".join(lines)
+
+
 @router.post("/import")
 async def import_memories(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
+    generate_embeddings: bool = Query(
+        False, description="Embed during import (slow); otherwise reindex afterwards"
+    ),
     memory_service: MemoryService = Depends(get_memory_service),
 ):
     """Import memories from file"""
@@ -672,21 +806,37 @@ async def import_memories(
                 status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="CSV import not yet implemented"
             )
 
-        # Import memories
-        imported = 0
+        # Validate rows up front, then import them through the bulk COPY path
+        valid = []
         failed = 0
 
         for mem_data in memories_data:
+            if not isinstance(mem_data, dict) or not mem_data.get("content"):
+                failed += 1
+                continue
+            valid.append(
+                {
+                    "content": mem_data["content"],
+                    "memory_type": mem_data.get("memory_type", "generic"),
+                    "importance_score": mem_data.get("importance_score", 0.5),
+                    "tags": mem_data.get("tags", []),
+                    "metadata": mem_data.get("metadata", {}),
+                }
+            )
+
+        # Each batch commits on its own, so a failed batch only fails its own rows
+        imported = 0
+        for start in range(0, len(valid), IMPORT_BATCH_SIZE):
+            batch = valid[start : start + IMPORT_BATCH_SIZE]
             try:
-                await memory_service.create_memory(
-                    content=mem_data.get("content", ""),
-                    importance_score=mem_data.get("importance_score", 0.5),
-                    tags=mem_data.get("tags", []),
-                    metadata=mem_data.get("metadata", {}),
+                result = await memory_service.create_memories(
+                    batch, generate_embeddings=generate_embeddings
                 )
-                imported += 1
-            except:
-                failed += 1
+                imported += result["inserted"]
+                failed += result["skipped"]
+            except Exception as e:
+                logger.error(f"Bulk import of rows {start}-{start + len(batch) - 1} failed: {e}")
+                failed += len(batch)
 
         # Background notification
         background_tasks.add_task(broadcast_import_complete, imported, failed)
@@ -0,0 +1,190 @@
+"""
+Cluster-based duplicate consolidation
+Groups duplicate pairs with union-find and merges each cluster in one transaction
+"""
+
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models.synthesis.consolidation_models import (
+    ConsolidationRequest,
+    ConsolidationResult,
+    DuplicateGroup,
+    MergeStrategy,
+)
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class _DisjointSet:
+    """Union-find with path halving and union by size"""
+
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+        self.size: Dict[str, int] = {}
+
+    def find(self, item: str) -> str:
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+        while self.parent[item] != item:
+            self.parent[item] = self.parent[self.parent[item]]
+            item = self.parent[item]
+        return item
+
+    def union(self, a: str, b: str):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+
+
+def group_duplicates(
+    pairs: Iterable[Tuple[str, str, float]], strategy: MergeStrategy
+) -> List[DuplicateGroup]:
+    """
+    Cluster duplicate pairs into connected components
+
+    Each group reports its weakest pair similarity as ``similarity_score``, so
+    a group is never presented as tighter than its loosest link.
+
+    Args:
+        pairs: (memory1_id, memory2_id, similarity) tuples
+        strategy: Strategy suggested for every group
+
+    Returns:
+        Groups ordered by size, largest first
+    """
+    sets = _DisjointSet()
+    pair_list = list(pairs)
+    for memory1_id, memory2_id, _ in pair_list:
+        sets.union(memory1_id, memory2_id)
+
+    members: Dict[str, List[str]] = {}
+    for memory_id in sets.parent:
+        members.setdefault(sets.find(memory_id), []).append(memory_id)
+
+    similarities: Dict[str, List[float]] = {}
+    for memory1_id, _, similarity in pair_list:
+        similarities.setdefault(sets.find(memory1_id), []).append(similarity)
+
+    groups = []
+    for root, memory_ids in members.items():
+        memory_ids.sort()
+        scores = similarities[root]
+        groups.append(
+            DuplicateGroup(
+                group_id=f"dup_{memory_ids[0]}",
+                memory_ids=memory_ids,
+                similarity_score=min(scores),
+                suggested_action=strategy,
+                metadata={"pairs": len(scores), "max_similarity": max(scores)},
+            )
+        )
+
+    groups.sort(key=lambda group: (-len(group.memory_ids), group.group_id))
+    return groups
+
+
+class ConsolidationEngine:
+    """
+    Finds duplicate clusters and merges each into a single memory
+
+    Pairs come from the duplicate-candidate table, so transitive duplicates
+    (A~B, B~C) form one cluster and are merged once instead of pair by pair.
+    A failed cluster is rolled back on its own and counted as an error.
+    """
+
+    def __init__(self, backend, max_pairs: int = 1000, enqueue_embeddings: bool = True):
+        """
+        Initialize the engine
+
+        Args:
+            backend: PostgresUnifiedBackend holding memories and duplicate candidates
+            max_pairs: Most duplicate pairs read per run
+            enqueue_embeddings: Queue embedding jobs for merged content (the
+                caller re-embeds it otherwise)
+        """
+        self.backend = backend
+        self.max_pairs = max_pairs
+        self.enqueue_embeddings = enqueue_embeddings
+
+    async def find_groups(self, request: ConsolidationRequest) -> List[DuplicateGroup]:
+        """Cluster the duplicate pairs at or above the request's threshold"""
+        pairs = await self.backend.find_duplicates(
+            request.similarity_threshold, self.max_pairs, memory_ids=request.memory_ids
+        )
+        return group_duplicates(pairs, request.strategy)
+
+    async def consolidate(self, request: ConsolidationRequest) -> ConsolidationResult:
+        """
+        Find duplicate clusters and, unless this is a dry run, merge them
+
+        Merging requires ``auto_merge`` and a strategy other than ``manual``;
+        otherwise the groups are only reported.
+
+        Returns:
+            ConsolidationResult where ``duplicates_found`` counts memories in
+            groups, ``memories_merged`` counts merged groups and
+            ``memories_deleted`` the soft-deleted duplicates
+        """
+        started = time.perf_counter()
+        groups = await self.find_groups(request)
+        find_ms = (time.perf_counter() - started) * 1000
+
+        result = ConsolidationResult(
+            duplicates_found=sum(len(group.memory_ids) for group in groups),
+            duplicate_groups=groups,
+            strategy_used=request.strategy,
+            dry_run=request.dry_run,
+        )
+
+        merge = (
+            request.auto_merge and not request.dry_run and request.strategy != MergeStrategy.MANUAL
+        )
+        merge_started = time.perf_counter()
+        if merge:
+            for group in groups:
+                merged = await self._merge_group(group, request.strategy)
+                if merged is None:
+                    continue
+                if "error" in merged:
+                    result.errors += 1
+                    continue
+                result.memories_merged += 1
+                result.memories_deleted += len(merged["removed"])
+
+        merge_ms = (time.perf_counter() - merge_started) * 1000
+        result.execution_time_ms = (time.perf_counter() - started) * 1000
+        result.timings = {"find_ms": round(find_ms, 3), "merge_ms": round(merge_ms, 3)}
+
+        logger.info(
+            f"Consolidation found {len(groups)} groups, merged {result.memories_merged} "
+            f"(deleted {result.memories_deleted}, errors {result.errors}) "
+            f"in {result.execution_time_ms:.1f}ms"
+        )
+        return result
+
+    async def _merge_group(
+        self, group: DuplicateGroup, strategy: MergeStrategy
+    ) -> Optional[Dict[str, object]]:
+        """Merge one group, recording the outcome and timing on the group"""
+        started = time.perf_counter()
+        try:
+            merged = await self.backend.merge_duplicate_group(
+                group.memory_ids, strategy.value, enqueue_embedding=self.enqueue_embeddings
+            )
+        except Exception as e:
+            logger.error(f"Failed to merge duplicate group {group.group_id}: {e}")
+            merged = {"error": str(e)}
+
+        group.metadata["merge_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        if merged is None:
+            group.metadata["skipped"] = "already merged"
+        else:
+            group.metadata.update(merged)
+        return merged
@@ -0,0 +1,233 @@
+"""
+Degraded-mode search
+In-process BM25 index of memories kept current with writes, used when
+PostgreSQL or the embedding model is unavailable
+"""
+
+import asyncio
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from app.storage.postgres_unified import SUMMARY_CONTENT_CHARS
+from app.storage.text_index import BM25Index
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Memory fields kept next to each indexed document and returned by searches
+_SUMMARY_FIELDS = (
+    "id",
+    "memory_type",
+    "importance_score",
+    "tags",
+    "created_at",
+    "updated_at",
+    "container_id",
+)
+
+
+def _summary(memory: Dict[str, Any]) -> Dict[str, Any]:
+    """Summary-projection copy of a memory (content preview plus its length)"""
+    content = memory.get("content") or ""
+    summary = {field: memory.get(field) for field in _SUMMARY_FIELDS}
+    summary["content"] = content[:SUMMARY_CONTENT_CHARS]
+    summary["content_length"] = len(content)
+    return summary
+
+
+class DegradedSearchIndex:
+    """
+    BM25 index over one container's memories for search without PostgreSQL
+
+    Writes made through the memory service update the index directly.
+    ``refresh`` catches up on changes made by other processes by reading
+    memories updated or soft-deleted since the index watermark, and
+    ``warm_start`` loads the last snapshot before catching up, so a restart
+    does not re-tokenize the whole corpus. Results use the summary projection.
+    Hard deletes made by other processes are only noticed by a rebuild
+    (delete the snapshot).
+    """
+
+    def __init__(
+        self,
+        backend,
+        enabled: bool = True,
+        snapshot_path: Optional[str] = None,
+        container_id: str = "default",
+        batch_size: int = 1000,
+        lag_seconds: float = 30.0,
+    ):
+        """
+        Initialize the index
+
+        Args:
+            backend: PostgresUnifiedBackend the index is built from
+            enabled: Maintain the index at all (writes are ignored when False)
+            snapshot_path: File the index is saved to and warm-started from
+            container_id: Container to index
+            batch_size: Memories fetched per catch-up query
+            lag_seconds: Changes younger than this are left for the next
+                refresh, so rows from transactions still in flight are not missed
+        """
+        self.backend = backend
+        self.enabled = enabled
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.container_id = container_id
+        self.batch_size = batch_size
+        self.lag_seconds = lag_seconds
+
+        self.index = BM25Index()
+        self.ready = False
+        self._refresh_lock = asyncio.Lock()
+        self._warm_task: Optional[asyncio.Task] = None
+        self._stats = {"searches": 0, "indexed": 0, "removed": 0, "refreshes": 0}
+
+    def start(self) -> None:
+        """Warm-start the index in the background"""
+        if self.enabled and self._warm_task is None:
+            self._warm_task = asyncio.create_task(self._warm_start_logged())
+
+    async def stop(self) -> None:
+        """Cancel an unfinished warm start, or save a snapshot of the ready index"""
+        if self._warm_task is not None and not self._warm_task.done():
+            self._warm_task.cancel()
+            try:
+                await self._warm_task
+            except asyncio.CancelledError:
+                pass
+        self.save_snapshot()
+
+    async def _warm_start_logged(self) -> None:
+        try:
+            await self.warm_start()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Text index warm start failed: {e}")
+
+    async def warm_start(self) -> None:
+        """Load the snapshot (if any), catch up with the database and mark ready"""
+        started = time.monotonic()
+        if self.snapshot_path is not None:
+            try:
+                snapshot = await asyncio.to_thread(BM25Index.load, self.snapshot_path)
+            except Exception as e:
+                logger.warning(f"Ignoring unreadable text index snapshot: {e}")
+                snapshot = None
+            if snapshot is not None:
+                self.index = snapshot
+
+        rebuilt = self.index.watermark is None
+        await self.refresh()
+        self.ready = True
+        logger.info(
+            f"Text index ready with {len(self.index)} memories "
+            f"in {time.monotonic() - started:.1f}s"
+        )
+        if rebuilt:
+            self.save_snapshot()
+
+    async def refresh(self) -> Dict[str, int]:
+        """
+        Apply memories changed since the watermark
+
+        Returns:
+            Counts of memories indexed and removed
+        """
+        async with self._refresh_lock:
+            until = await self.backend.get_change_horizon(self.lag_seconds)
+            since = self.index.watermark
+            indexed = removed = 0
+
+            cursor = (since or datetime.min.replace(tzinfo=timezone.utc), None)
+            while True:
+                memories = await self.backend.fetch_changed_memories(
+                    cursor[0],
+                    until,
+                    after_id=cursor[1],
+                    limit=self.batch_size,
+                    container_id=self.container_id,
+                )
+                if not memories:
+                    break
+                for memory in memories:
+                    self.add(memory)
+                indexed += len(memories)
+                last = memories[-1]
+                cursor = (datetime.fromisoformat(last["updated_at"]), uuid.UUID(last["id"]))
+
+            if since is not None:
+                deleted = await self.backend.fetch_deleted_memory_ids(
+                    since, until, container_id=self.container_id
+                )
+                removed = self.remove(deleted)
+
+            if since is None or until > since:
+                self.index.watermark = until
+            self._stats["refreshes"] += 1
+            return {"indexed": indexed, "removed": removed}
+
+    async def reindex(self, memory_ids: Sequence[str]) -> None:
+        """Re-read memories changed in bulk; deleted ones leave the index"""
+        if not self.enabled or not memory_ids:
+            return
+        memories = await self.backend.get_memories(memory_ids, track=False)
+        self.remove(memory_ids)
+        for memory in memories:
+            self.add(memory)
+
+    def add(self, memory: Dict[str, Any]) -> None:
+        """Index (or re-index) one memory"""
+        if not self.enabled or memory.get("container_id", self.container_id) != self.container_id:
+            return
+        self.index.add(memory["id"], memory.get("content") or "", _summary(memory))
+        self._stats["indexed"] += 1
+
+    def remove(self, memory_ids: Sequence[str]) -> int:
+        """Drop memories from the index, returning how many were indexed"""
+        removed = sum(1 for memory_id in memory_ids if self.index.remove(str(memory_id)))
+        self._stats["removed"] += removed
+        return removed
+
+    def add_tags(self, memory_ids: Sequence[str], tags: List[str]) -> None:
+        """Merge tags into the stored summaries (tags are not indexed text)"""
+        for memory_id in memory_ids:
+            summary = self.index.get(str(memory_id))
+            if summary is not None:
+                summary["tags"] = list(dict.fromkeys([*(summary["tags"] or []), *tags]))
+
+    def search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Rank indexed memories against ``query`` (summary projection, BM25 ``text_rank``)"""
+        self._stats["searches"] += 1
+        return [
+            {**self.index.get(memory_id), "text_rank": score}
+            for memory_id, score in self.index.search(query, limit)
+        ]
+
+    def save_snapshot(self) -> None:
+        """
+        Write the index to the snapshot file
+
+        Runs on the event loop: the index must not change while it is pickled.
+        """
+        if self.snapshot_path is None or not self.ready:
+            return
+        try:
+            self.index.save(self.snapshot_path)
+        except Exception as e:
+            logger.warning(f"Failed to save text index snapshot: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size, readiness, watermark and usage counters"""
+        watermark = self.index.watermark
+        return {
+            **self._stats,
+            **self.index.get_stats(),
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "watermark": watermark.isoformat() if watermark else None,
+            "snapshot_path": str(self.snapshot_path) if self.snapshot_path else None,
+        }
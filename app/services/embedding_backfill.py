@@ -0,0 +1,287 @@
+"""
+Resumable embedding backfill
+Embeds memories that have no vector (or one from another model) in keyset batches
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.degradation import DegradationLevel
+from app.services.passages import ChunkRow, PassageEmbedder
+from app.storage.postgres_unified import is_embedding_model_mismatch
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class EmbeddingBackfill:
+    """
+    Background job that (re-)embeds the corpus for the service's current model
+
+    Memories are walked oldest first with a (created_at, id) keyset. Each batch
+    is embedded with at most ``concurrency`` requests in flight, written back
+    with one bulk UPDATE, and checkpointed in the same transaction, so a
+    stopped or crashed job resumes after its last committed batch. Memories
+    the cursor passed without embedding them (failed, edited meanwhile, or
+    before a resumed checkpoint) are picked up by another sweep from the
+    start, repeated while sweeps still make progress.
+    ``rate_limit`` caps memories embedded per second, leaving the embedding
+    model and the database free for interactive traffic. With a passage
+    embedder, long memories get their passages rewritten with the vector.
+    """
+
+    def __init__(
+        self,
+        service,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        rate_limit: Optional[float] = 20.0,
+        passages: Optional[PassageEmbedder] = None,
+    ):
+        """
+        Initialize the backfill
+
+        Args:
+            service: MemoryServicePostgres providing the backend and embeddings
+            batch_size: Memories per keyset batch (and per bulk update)
+            concurrency: Embedding requests in flight at once
+            rate_limit: Most memories embedded per second (None or 0 for no limit)
+            passages: Splits and embeds long memories; whole texts are embedded when None
+        """
+        self.service = service
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.rate_limit = rate_limit if rate_limit and rate_limit > 0 else None
+        self.passages = passages
+
+        self._task: Optional[asyncio.Task] = None
+        self._run_lock = asyncio.Lock()
+        self._stats = {
+            "batches": 0,
+            "embedded": 0,
+            "failed": 0,
+            "sweeps": 0,
+            "throttled_seconds": 0.0,
+        }
+
+    @property
+    def model(self) -> str:
+        """Embedding model the corpus is brought up to"""
+        return self.service.embedding_model
+
+    @property
+    def running(self) -> bool:
+        """Whether a backfill is in progress in this process"""
+        return self._run_lock.locked()
+
+    async def start(self, reset: bool = False) -> Dict[str, Any]:
+        """
+        Start the backfill in the background (no-op if it is already running)
+
+        Args:
+            reset: Start over from the oldest memory instead of the checkpoint
+
+        Returns:
+            Current progress
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_background(reset))
+            # Let the job claim its lock and checkpoint before reporting
+            await asyncio.sleep(0)
+        return await self.get_status()
+
+    async def stop(self) -> Dict[str, Any]:
+        """Stop the background backfill after its current batch is cancelled"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        return await self.get_status()
+
+    async def _run_background(self, reset: bool):
+        """Run the backfill as a task, logging instead of raising"""
+        try:
+            await self.run(reset=reset)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Embedding backfill failed: {e}")
+
+    async def run(
+        self,
+        reset: bool = False,
+        max_memories: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Backfill until the corpus is done, ``max_memories`` were processed or
+        the job is stopped
+
+        Args:
+            reset: Start over from the oldest memory instead of the checkpoint
+            max_memories: Stop (paused, resumable) after this many memories
+            batch_size: Override the configured batch size for this run
+
+        Returns:
+            Counts for this run: processed, success, errors, and the final status
+        """
+        if self._run_lock.locked():
+            raise RuntimeError(f"Embedding backfill for {self.model} is already running")
+
+        async with self._run_lock:
+            backend = self.service.backend
+            batch_size = max(1, batch_size or self.batch_size)
+            results = {"processed": 0, "success": 0, "errors": 0, "skipped": 0}
+
+            job = await backend.start_backfill_job(self.model, reset=reset)
+            cursor = None
+            if job.get("cursor_id") is not None:
+                cursor = (job["cursor_created_at"], uuid.UUID(str(job["cursor_id"])))
+            logger.info(f"Embedding backfill for {self.model} started ({job['total']} memories)")
+
+            # A sweep that skipped memories is followed by one from the start
+            swept_from_start = cursor is None
+            sweep_missed = sweep_updated = 0
+            status, error = "completed", None
+            try:
+                while True:
+                    if self.service.degradation_manager.current_level >= DegradationLevel.READONLY:
+                        status, error = "paused", "Service is in read-only mode"
+                        break
+
+                    limit = batch_size
+                    if max_memories is not None:
+                        limit = min(limit, max_memories - results["processed"])
+                        if limit <= 0:
+                            status = "paused"
+                            break
+
+                    started = time.monotonic()
+                    rows = await backend.fetch_backfill_batch(self.model, cursor, limit)
+                    if not rows:
+                        if cursor is not None and (
+                            not swept_from_start or (sweep_missed and sweep_updated)
+                        ):
+                            cursor = None
+                            swept_from_start = True
+                            sweep_missed = sweep_updated = 0
+                            self._stats["sweeps"] += 1
+                            continue
+                        break
+
+                    embedded = await self._embed_batch(rows)
+                    done = [
+                        (row["id"], row["version"], embedding)
+                        for row, (embedding, _) in zip(rows, embedded)
+                        if embedding is not None
+                    ]
+                    chunks = None
+                    if self.passages is not None:
+                        chunks = {
+                            row["id"]: chunk_rows
+                            for row, (embedding, chunk_rows) in zip(rows, embedded)
+                            if embedding is not None
+                        }
+                    if not done:
+                        # The model is unavailable; keep the checkpoint for a retry
+                        status, error = "failed", f"No embeddings returned for {len(rows)} memories"
+                        break
+
+                    failed = len(rows) - len(done)
+                    cursor = (rows[-1]["created_at"], rows[-1]["id"])
+                    updated = await backend.apply_backfill_batch(
+                        self.model, done, cursor, failed=failed, chunks=chunks
+                    )
+                    if updated:
+                        self.service.search_cache.invalidate()
+
+                    sweep_missed += len(rows) - updated
+                    sweep_updated += updated
+                    results["processed"] += len(rows)
+                    results["success"] += updated
+                    results["errors"] += failed
+                    results["skipped"] += len(done) - updated
+                    self._stats["batches"] += 1
+                    self._stats["embedded"] += updated
+                    self._stats["failed"] += failed
+
+                    await self._throttle(len(rows), started)
+            except asyncio.CancelledError:
+                await self._set_status("paused", "Stopped")
+                raise
+            except Exception as e:
+                await self._set_status("failed", str(e))
+                if is_embedding_model_mismatch(e):
+                    # A migration switched the model; the next run backfills for it
+                    await self.service.refresh_embedding_model()
+                raise
+
+            await self._set_status(status, error)
+            logger.info(
+                f"Embedding backfill for {self.model} {status}: "
+                f"{results['success']}/{results['processed']} embedded"
+            )
+            return {**results, "status": status, "error": error}
+
+    async def _embed_batch(
+        self, rows: List[Any]
+    ) -> List[Tuple[Optional[List[float]], List[ChunkRow]]]:
+        """Embed a batch with bounded concurrency (failures come back as (None, []))"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def embed(content: str) -> Tuple[Optional[List[float]], List[ChunkRow]]:
+            async with semaphore:
+                try:
+                    if self.passages is not None:
+                        return await self.passages.embed(content)
+                    return await self.service._generate_embedding(content), []
+                except Exception as e:
+                    logger.warning(f"Backfill embedding failed: {e}")
+                    return None, []
+
+        return await asyncio.gather(*(embed(row["content"]) for row in rows))
+
+    async def _throttle(self, count: int, started: float):
+        """Sleep so that this batch took at least ``count / rate_limit`` seconds"""
+        if self.rate_limit is None:
+            return
+        delay = count / self.rate_limit - (time.monotonic() - started)
+        if delay > 0:
+            self._stats["throttled_seconds"] += delay
+            await asyncio.sleep(delay)
+
+    async def _set_status(self, status: str, error: Optional[str] = None):
+        """Persist the job status without masking the error that ended the run"""
+        try:
+            await asyncio.shield(
+                self.service.backend.set_backfill_status(self.model, status, error)
+            )
+        except Exception as e:
+            logger.error(f"Failed to record embedding backfill status: {e}")
+
+    async def get_status(self) -> Dict[str, Any]:
+        """Get the persisted checkpoint merged with this process's counters"""
+        job = await self.service.backend.get_backfill_job(self.model) or {
+            "model": self.model,
+            "status": "never_run",
+            "total": 0,
+            "processed": 0,
+        }
+        total = job.get("total") or 0
+        return {
+            **job,
+            "remaining": max(total - job.get("processed", 0), 0),
+            "percent": (
+                min(round(100 * job.get("processed", 0) / total, 2), 100.0) if total else 100.0
+            ),
+            "running": self.running,
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency,
+            "rate_limit": self.rate_limit,
+            "session": dict(self._stats),
+        }
@@ -0,0 +1,144 @@
+"""
+Coalescing micro-batcher for text embeddings
+Groups concurrent embedding requests into single multi-input model calls
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Embeds many texts in one request; returns one vector (or None) per text
+EmbedMany = Callable[[Sequence[str]], Awaitable[Optional[List[Optional[List[float]]]]]]
+
+
+class EmbeddingBatcher:
+    """
+    Collects embedding requests and sends them to the model in batches
+
+    Each ``embed`` call gets its own future. A batch is dispatched as soon as
+    ``max_batch_size`` texts are waiting, or ``max_wait_ms`` after the first
+    text of a batch arrived, whichever comes first. Batches run concurrently,
+    so a slow model call never holds back the next batch.
+    """
+
+    def __init__(self, embed_many: EmbedMany, max_batch_size: int = 16, max_wait_ms: float = 5.0):
+        """
+        Initialize the batcher
+
+        Args:
+            embed_many: Coroutine embedding a list of texts in one model call
+            max_batch_size: Texts per model call
+            max_wait_ms: Longest a text waits for its batch to fill
+        """
+        self.embed_many = embed_many
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._in_flight: set = set()
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "errors": 0,
+            "max_batch_size_seen": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms_seen": 0.0,
+            "total_model_ms": 0.0,
+        }
+
+    async def embed(self, text: str) -> Optional[List[float]]:
+        """
+        Embed one text as part of the next batch
+
+        Returns:
+            The embedding for ``text``, or None if the model call failed
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, time.monotonic()))
+        self._stats["requests"] += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._dispatch)
+
+        return await future
+
+    def _dispatch(self):
+        """Start a model call for every full (or timed-out) batch that is waiting"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[: self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size :]
+            task = asyncio.create_task(self._run_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future, float]]):
+        """Embed one batch and hand each result to its own caller"""
+        started = time.monotonic()
+        waits = [(started - queued_at) * 1000 for _, _, queued_at in batch]
+
+        self._stats["batches"] += 1
+        self._stats["max_batch_size_seen"] = max(self._stats["max_batch_size_seen"], len(batch))
+        self._stats["total_wait_ms"] += sum(waits)
+        self._stats["max_wait_ms_seen"] = max(self._stats["max_wait_ms_seen"], max(waits))
+
+        try:
+            embeddings = await self.embed_many([text for text, _, _ in batch])
+            if embeddings is None or len(embeddings) != len(batch):
+                raise ValueError(
+                    f"Expected {len(batch)} embeddings, got "
+                    f"{'none' if embeddings is None else len(embeddings)}"
+                )
+        except Exception as e:
+            self._stats["errors"] += 1
+            logger.error(f"Embedding batch of {len(batch)} failed: {e}")
+            embeddings = [None] * len(batch)
+        finally:
+            self._stats["total_model_ms"] += (time.monotonic() - started) * 1000
+
+        for (_, future, _), embedding in zip(batch, embeddings):
+            # Callers that were cancelled meanwhile no longer want a result
+            if not future.done():
+                future.set_result(embedding)
+
+    async def close(self):
+        """Dispatch anything still waiting and wait for in-flight batches"""
+        self._dispatch()
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batch-size and wait-time counters"""
+        batches = self._stats["batches"]
+        requests_batched = self._stats["requests"] - len(self._pending)
+        return {
+            "requests": self._stats["requests"],
+            "batches": batches,
+            "errors": self._stats["errors"],
+            "pending": len(self._pending),
+            "in_flight": len(self._in_flight),
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "avg_batch_size": round(requests_batched / batches, 2) if batches else 0.0,
+            "max_batch_size_seen": self._stats["max_batch_size_seen"],
+            "avg_wait_ms": (
+                round(self._stats["total_wait_ms"] / requests_batched, 3)
+                if requests_batched
+                else 0.0
+            ),
+            "max_wait_ms_seen": round(self._stats["max_wait_ms_seen"], 3),
+            "avg_model_ms": (
+                round(self._stats["total_model_ms"] / batches, 3) if batches else 0.0
+            ),
+        }
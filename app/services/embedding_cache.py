@@ -0,0 +1,157 @@
+"""
+Content-hash embedding cache
+Bounded in-process LRU in front of the PostgreSQL embedding_cache table
+"""
+
+import asyncio
+import hashlib
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys (Unicode NFC, collapsed whitespace)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def content_hash(text: str) -> bytes:
+    """SHA-256 of the normalized text"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    """
+    Read-through cache for text embeddings keyed by (model, sha256(text))
+
+    Lookups check the in-process LRU first, then the persistent table, and
+    only then call the model. Concurrent misses for the same text share one
+    model call. Vectors are held as float32 arrays to keep the LRU compact.
+    """
+
+    def __init__(self, backend, model: str, max_entries: int = 4096, persistent: bool = True):
+        """
+        Initialize the cache
+
+        Args:
+            backend: PostgresUnifiedBackend holding the embedding_cache table
+            model: Embedding model name, part of every key
+            max_entries: In-process LRU capacity
+            persistent: Read and write the PostgreSQL table behind the LRU
+        """
+        self.backend = backend
+        self.model = model
+        self.max_entries = max_entries
+        self.persistent = persistent
+
+        self._lru: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._in_flight: Dict[bytes, asyncio.Future] = {}
+        self._stats = {
+            "memory_hits": 0,
+            "persistent_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+
+    async def get_or_compute(
+        self, text: str, compute: Callable[[], Awaitable[Optional[List[float]]]]
+    ) -> Optional[List[float]]:
+        """
+        Return the cached embedding for ``text`` or compute and cache it
+
+        Args:
+            text: Text to embed
+            compute: Coroutine factory that calls the model on a miss
+
+        Returns:
+            The embedding, or None if the model call failed (failures are not cached)
+        """
+        key = content_hash(text)
+
+        cached = self._lru.get(key)
+        if cached is not None:
+            self._lru.move_to_end(key)
+            self._stats["memory_hits"] += 1
+            return cached.tolist()
+
+        if key in self._in_flight:
+            return await asyncio.shield(self._in_flight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            embedding = await self._load_or_compute(key, compute)
+            future.set_result(embedding)
+            return embedding
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when no other caller was waiting
+            future.exception()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def _load_or_compute(
+        self, key: bytes, compute: Callable[[], Awaitable[Optional[List[float]]]]
+    ) -> Optional[List[float]]:
+        """Check the persistent table, then fall back to the model"""
+        if self.persistent:
+            try:
+                stored = await self.backend.get_cached_embeddings(self.model, [key])
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"Embedding cache lookup failed: {e}")
+                stored = {}
+            if key in stored:
+                self._stats["persistent_hits"] += 1
+                self._remember(key, stored[key])
+                return np.asarray(stored[key], dtype=np.float32).tolist()
+
+        self._stats["misses"] += 1
+        embedding = await compute()
+        if embedding is None:
+            return None
+
+        self._remember(key, embedding)
+        if self.persistent:
+            try:
+                await self.backend.store_cached_embeddings(self.model, [(key, embedding)])
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.warning(f"Embedding cache write failed: {e}")
+        return embedding
+
+    def _remember(self, key: bytes, embedding) -> None:
+        """Put an embedding in the LRU, evicting the least recently used entry"""
+        self._lru[key] = np.asarray(embedding, dtype=np.float32)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop all in-process entries"""
+        self._lru.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss and eviction counters"""
+        hits = self._stats["memory_hits"] + self._stats["persistent_hits"]
+        lookups = hits + self._stats["misses"]
+        return {
+            **self._stats,
+            "model": self.model,
+            "size": len(self._lru),
+            "max_entries": self.max_entries,
+            "persistent": self.persistent,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,352 @@
+"""
+Online embedding model migration
+Re-embeds the corpus into shadow columns and switches search over once they are complete
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.core.degradation import DegradationLevel
+from app.services.passages import ChunkRow, PassageEmbedder
+from app.storage.postgres_unified import ACTIVE_MIGRATION_STATUSES
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+Embed = Callable[[str], Awaitable[Tuple[Optional[List[float]], List[ChunkRow]]]]
+
+
+class EmbeddingMigration:
+    """
+    Background job that moves the corpus to a new embedding model
+
+    ``start(model)`` adds shadow columns (see start_embedding_migration)
+    and fills them without touching what search reads. Memories are walked
+    oldest first with a (created_at, id) keyset, embedded by the target
+    model with at most ``concurrency`` requests in flight and ``rate_limit``
+    memories per second, and written with one bulk UPDATE per batch
+    together with the checkpoint. Memories created or edited meanwhile are
+    caught by the next sweep. When a sweep from the start finds nothing
+    left, shadow ANN indexes are built and the backend swaps the columns in
+    one short transaction; the service then embeds queries and new
+    memories with the target model. Writes of vectors from the old model
+    are rejected from then on (see switch_embedding_migration); run the
+    embedding backfill after a switch so memories whose vector was
+    rejected get one.
+    """
+
+    def __init__(
+        self,
+        service,
+        batch_size: int = 100,
+        concurrency: int = 4,
+        rate_limit: Optional[float] = 20.0,
+        lock_timeout: float = 2.0,
+        switch_attempts: int = 5,
+        switch_retry_seconds: float = 5.0,
+    ):
+        """
+        Initialize the migration
+
+        Args:
+            service: MemoryServicePostgres providing the backend and embedders
+            batch_size: Memories per keyset batch (and per bulk update)
+            concurrency: Embedding requests in flight at once
+            rate_limit: Most memories embedded per second (None or 0 for no limit)
+            lock_timeout: Longest wait in seconds for the switch's table lock
+            switch_attempts: Switches tried before the migration is paused
+            switch_retry_seconds: Delay between switch attempts
+        """
+        self.service = service
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.rate_limit = rate_limit if rate_limit and rate_limit > 0 else None
+        self.lock_timeout = lock_timeout
+        self.switch_attempts = max(1, switch_attempts)
+        self.switch_retry_seconds = switch_retry_seconds
+
+        self._task: Optional[asyncio.Task] = None
+        self._run_lock = asyncio.Lock()
+        self._stats = {
+            "batches": 0,
+            "embedded": 0,
+            "failed": 0,
+            "sweeps": 0,
+            "switch_attempts": 0,
+            "active_seconds": 0.0,
+            "throttled_seconds": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        """Whether a migration is being filled in this process"""
+        return self._run_lock.locked()
+
+    async def start(self, target_model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Prepare a migration to ``target_model`` and fill it in the background
+
+        Without a model, the unfinished migration is resumed. Starting the
+        model already being migrated to resumes it as well.
+
+        Returns:
+            Current progress
+
+        Raises:
+            RuntimeError: If the target model returns no embedding or a
+                migration to another model is in progress
+        """
+        if target_model is not None:
+            dimensions = await self._probe_dimensions(target_model)
+            await self.service.backend.start_embedding_migration(
+                target_model,
+                dimensions,
+                source_model=self.service.embedding_model,
+                lock_timeout=self.lock_timeout,
+            )
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run_background(target_model))
+            # Let the job claim its lock before reporting
+            await asyncio.sleep(0)
+        return await self.get_status()
+
+    async def stop(self) -> Dict[str, Any]:
+        """Stop filling after the current batch is cancelled; it resumes from its checkpoint"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        return await self.get_status()
+
+    async def cancel(self) -> Dict[str, Any]:
+        """Stop and abandon the migration, dropping its shadow vectors"""
+        await self.stop()
+        await self.service.backend.cancel_embedding_migration(lock_timeout=self.lock_timeout)
+        return await self.get_status()
+
+    async def _run_background(self, target_model: Optional[str]):
+        """Run the migration as a task, logging instead of raising"""
+        try:
+            await self.run(target_model)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Embedding migration failed: {e}")
+
+    async def run(self, target_model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Fill the shadow vectors and switch once they cover every memory
+
+        Args:
+            target_model: Migration to run; the latest unfinished one when None
+
+        Returns:
+            Counts for this run: processed, success, errors, and the final status
+
+        Raises:
+            RuntimeError: If no migration is filling or another runner, in this
+                or another process, is filling it
+        """
+        if self._run_lock.locked():
+            raise RuntimeError("An embedding migration is already running")
+
+        async with self._run_lock, self.service.backend.embedding_migration_lease():
+            backend = self.service.backend
+            migration = await backend.get_embedding_migration(target_model)
+            if migration is None or migration["status"] not in ACTIVE_MIGRATION_STATUSES:
+                raise RuntimeError("No embedding migration in progress; start one with a model")
+            target_model = migration["target_model"]
+            await backend.set_embedding_migration_status(target_model, "running")
+
+            cursor = None
+            if migration.get("cursor_id") is not None:
+                cursor = (migration["cursor_created_at"], uuid.UUID(str(migration["cursor_id"])))
+            logger.info(
+                f"Embedding migration to {target_model} started "
+                f"({migration.get('remaining', 0)} memories to embed)"
+            )
+
+            batcher = self.service._model_batcher(target_model)
+            embed = self._embedder(batcher.embed)
+            results = {"processed": 0, "success": 0, "errors": 0}
+            status, error = "switched", None
+            switch_attempts = 0
+            try:
+                while True:
+                    if self.service.degradation_manager.current_level >= DegradationLevel.READONLY:
+                        status, error = "paused", "Service is in read-only mode"
+                        break
+
+                    started = time.monotonic()
+                    rows = await backend.fetch_migration_batch(cursor, self.batch_size)
+                    if not rows:
+                        if cursor is not None:
+                            # Memories written behind the cursor are found by a new sweep
+                            cursor = None
+                            self._stats["sweeps"] += 1
+                            continue
+
+                        await backend.build_migration_indexes()
+                        self._stats["switch_attempts"] += 1
+                        if await backend.switch_embedding_migration(
+                            target_model, lock_timeout=self.lock_timeout
+                        ):
+                            await self.service._use_embedding_model(target_model)
+                            break
+                        switch_attempts += 1
+                        if switch_attempts >= self.switch_attempts:
+                            status = "paused"
+                            error = f"Switch not done after {switch_attempts} attempts"
+                            break
+                        await asyncio.sleep(self.switch_retry_seconds)
+                        continue
+
+                    embedded = await self._embed_batch(rows, embed)
+                    done = [
+                        (row["id"], row["version"], embedding)
+                        for row, (embedding, _) in zip(rows, embedded)
+                        if embedding is not None
+                    ]
+                    if not done:
+                        # The model is unavailable; keep the checkpoint for a retry
+                        status, error = "failed", f"No embeddings returned for {len(rows)} memories"
+                        break
+
+                    chunks = None
+                    if self.service.passage_embedder is not None:
+                        chunks = {
+                            row["id"]: chunk_rows
+                            for row, (embedding, chunk_rows) in zip(rows, embedded)
+                            if embedding is not None
+                        }
+                    failed = len(rows) - len(done)
+                    cursor = (rows[-1]["created_at"], rows[-1]["id"])
+                    updated = await backend.apply_migration_batch(
+                        target_model, done, cursor, failed=failed, chunks=chunks
+                    )
+
+                    results["processed"] += len(rows)
+                    results["success"] += updated
+                    results["errors"] += failed
+                    self._stats["batches"] += 1
+                    self._stats["embedded"] += updated
+                    self._stats["failed"] += failed
+
+                    await self._throttle(len(rows), started)
+                    self._stats["active_seconds"] += time.monotonic() - started
+            except asyncio.CancelledError:
+                await self._set_status(target_model, "paused", "Stopped")
+                raise
+            except Exception as e:
+                await self._set_status(target_model, "failed", str(e))
+                raise
+            finally:
+                await batcher.close()
+
+            if status != "switched":
+                await self._set_status(target_model, status, error)
+            logger.info(
+                f"Embedding migration to {target_model} {status}: "
+                f"{results['success']}/{results['processed']} embedded"
+            )
+            return {**results, "status": status, "error": error}
+
+    def _embedder(self, embed_text: Callable[[str], Awaitable[Optional[List[float]]]]) -> Embed:
+        """Embed content with the target model, as passages when the service chunks"""
+        passages = self.service.passage_embedder
+        if passages is not None:
+            return PassageEmbedder(
+                embed_text,
+                max_tokens=passages.max_tokens,
+                overlap_tokens=passages.overlap_tokens,
+                concurrency=passages.concurrency,
+            ).embed
+
+        async def embed(content: str) -> Tuple[Optional[List[float]], List[ChunkRow]]:
+            return await embed_text(content), []
+
+        return embed
+
+    async def _embed_batch(
+        self, rows: List[Any], embed: Embed
+    ) -> List[Tuple[Optional[List[float]], List[ChunkRow]]]:
+        """Embed a batch with bounded concurrency (failures come back as (None, []))"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def embed_one(content: str) -> Tuple[Optional[List[float]], List[ChunkRow]]:
+            async with semaphore:
+                try:
+                    return await embed(content)
+                except Exception as e:
+                    logger.warning(f"Migration embedding failed: {e}")
+                    return None, []
+
+        return await asyncio.gather(*(embed_one(row["content"]) for row in rows))
+
+    async def _probe_dimensions(self, model: str) -> int:
+        """Vector dimension of ``model``, from one sample embedding"""
+        batcher = self.service._model_batcher(model)
+        try:
+            embedding = await batcher.embed("embedding dimension probe")
+        finally:
+            await batcher.close()
+        if not embedding:
+            raise RuntimeError(f"Embedding model {model} returned no embedding")
+        return len(embedding)
+
+    async def _throttle(self, count: int, started: float):
+        """Sleep so that this batch took at least ``count / rate_limit`` seconds"""
+        if self.rate_limit is None:
+            return
+        delay = count / self.rate_limit - (time.monotonic() - started)
+        if delay > 0:
+            self._stats["throttled_seconds"] += delay
+            await asyncio.sleep(delay)
+
+    async def _set_status(self, target_model: str, status: str, error: Optional[str] = None):
+        """Persist the migration status without masking the error that ended the run"""
+        try:
+            await asyncio.shield(
+                self.service.backend.set_embedding_migration_status(target_model, status, error)
+            )
+        except Exception as e:
+            logger.error(f"Failed to record embedding migration status: {e}")
+
+    async def get_status(self) -> Dict[str, Any]:
+        """
+        Get the latest migration with its coverage, throughput and ETA
+
+        Throughput is this process's rate while it fills the migration, and
+        the average since the migration started otherwise.
+        """
+        migration = await self.service.backend.get_embedding_migration() or {
+            "status": "never_run"
+        }
+
+        rate = None
+        if self._stats["active_seconds"] > 0 and self._stats["embedded"]:
+            rate = self._stats["embedded"] / self._stats["active_seconds"]
+        elif migration.get("embedded") and migration.get("updated_at"):
+            elapsed = (migration["updated_at"] - migration["started_at"]).total_seconds()
+            rate = migration["embedded"] / elapsed if elapsed > 0 else None
+
+        status = {
+            **migration,
+            "rate": round(rate, 2) if rate else None,
+            "running": self.running,
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency,
+            "rate_limit": self.rate_limit,
+            "session": dict(self._stats),
+        }
+        if "remaining" in migration:
+            total = migration["total"]
+            status["percent"] = round(100 * migration["covered"] / total, 2) if total else 100.0
+            status["eta_seconds"] = round(migration["remaining"] / rate) if rate else None
+        return status
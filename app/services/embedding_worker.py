@@ -0,0 +1,182 @@
+"""
+Embedding job workers
+Drain the embedding_jobs outbox filled by asynchronous creates and updates
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.degradation import DegradationLevel
+from app.services.passages import ChunkRow, PassageEmbedder
+from app.storage.postgres_unified import is_embedding_model_mismatch
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class EmbeddingWorker:
+    """
+    Claims queued embedding jobs, embeds them in batches and writes them back
+
+    Each worker task claims up to ``batch_size`` jobs with SKIP LOCKED, embeds
+    them concurrently (so they share batched model requests) and completes
+    them with one bulk update. Any number of tasks and processes can drain the
+    same queue. Writers call ``notify`` so new jobs are picked up without
+    waiting for the next poll. With a passage embedder, long memories are
+    embedded passage by passage and their passages stored with the vector.
+    """
+
+    def __init__(
+        self,
+        service,
+        workers: int = 1,
+        batch_size: int = 32,
+        poll_interval: float = 1.0,
+        lease_seconds: float = 300.0,
+        max_attempts: int = 5,
+        retry_seconds: float = 30.0,
+        passages: Optional[PassageEmbedder] = None,
+    ):
+        """
+        Initialize the worker pool
+
+        Args:
+            service: MemoryServicePostgres providing the backend and embeddings
+            workers: Concurrent worker tasks in this process (0 only enqueues)
+            batch_size: Jobs claimed per batch
+            poll_interval: Seconds between polls when the queue is empty
+            lease_seconds: How long a claimed job stays invisible to other workers
+            max_attempts: Attempts before a job is given up and left for inspection
+            retry_seconds: Base delay before a failed job is retried (doubles per attempt)
+            passages: Splits and embeds long memories; whole texts are embedded when None
+        """
+        self.service = service
+        self.workers = max(0, workers)
+        self.batch_size = max(1, batch_size)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.passages = passages
+
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stats = {"batches": 0, "completed": 0, "failed": 0, "stale": 0, "errors": 0}
+
+    def notify(self):
+        """Wake idle workers because new jobs were queued"""
+        self._wakeup.set()
+
+    async def start(self):
+        """Start the worker tasks"""
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._run()))
+
+    async def stop(self):
+        """Stop the worker tasks; claimed jobs become due again when their lease ends"""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks = []
+
+    async def _run(self):
+        """Process batches until the queue is empty, then wait for work"""
+        while True:
+            try:
+                if await self.process_batch() == 0:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["errors"] += 1
+                logger.error(f"Embedding worker error: {e}")
+                await asyncio.sleep(self.poll_interval)
+
+    async def process_batch(self) -> int:
+        """
+        Claim, embed and complete one batch of jobs
+
+        Returns:
+            Number of jobs claimed (0 when nothing was due)
+        """
+        if self.service.degradation_manager.current_level >= DegradationLevel.READONLY:
+            return 0
+
+        backend = self.service.backend
+        jobs = await backend.claim_embedding_jobs(
+            self.batch_size, lease_seconds=self.lease_seconds, max_attempts=self.max_attempts
+        )
+        if not jobs:
+            return 0
+
+        embedded = await asyncio.gather(*(self._embed(job["content"]) for job in jobs))
+        done = []
+        failed = []
+        chunks = {}
+        for job, (embedding, rows) in zip(jobs, embedded):
+            if embedding is None:
+                failed.append(job["memory_id"])
+            else:
+                done.append((job["memory_id"], job["version"], embedding))
+                chunks[job["memory_id"]] = rows
+
+        try:
+            updated = await backend.complete_embedding_jobs(
+                self.service.embedding_model,
+                done,
+                chunks=chunks if self.passages is not None else None,
+            )
+        except Exception as e:
+            if not is_embedding_model_mismatch(e):
+                raise
+            # Another process switched the model; retry the jobs with it right away
+            await self.service.refresh_embedding_model()
+            await backend.fail_embedding_jobs(
+                [job["memory_id"] for job in jobs], "Embedding model switched", retry_seconds=0
+            )
+            self._stats["stale"] += len(jobs)
+            return len(jobs)
+        if updated:
+            # New vectors change vector and hybrid results
+            self.service.search_cache.invalidate()
+        if failed:
+            await backend.fail_embedding_jobs(
+                failed,
+                "Embedding generation failed",
+                retry_seconds=self.retry_seconds,
+                max_attempts=self.max_attempts,
+            )
+
+        self._stats["batches"] += 1
+        self._stats["completed"] += updated
+        self._stats["stale"] += len(done) - updated
+        self._stats["failed"] += len(failed)
+        logger.debug(f"Embedded {updated}/{len(jobs)} queued memories")
+        return len(jobs)
+
+    async def _embed(self, content: str) -> Tuple[Optional[List[float]], List[ChunkRow]]:
+        """Embed one text and its passages, reporting failures as (None, [])"""
+        try:
+            if self.passages is not None:
+                return await self.passages.embed(content)
+            return await self.service._generate_embedding(content), []
+        except Exception as e:
+            logger.warning(f"Queued embedding failed: {e}")
+            return None, []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker counters"""
+        return {
+            **self._stats,
+            "workers": len([task for task in self._tasks if not task.done()]),
+            "batch_size": self.batch_size,
+        }
@@ -15,7 +15,7 @@ import aiohttp
 import chardet
 from PIL import Image
 
-from app.services.memory_service import MemoryService
+from app.factory import get_service_registry
 
 logger = logging.getLogger(__name__)
 
@@ -77,7 +77,7 @@ class GoogleDriveEnhanced:
         self.redirect_uri = os.getenv(
             "GOOGLE_REDIRECT_URI", "http://localhost:8001/api/v1/gdrive/callback"
         )
-        self.memory_service = MemoryService()
+        self.memory_service = get_service_registry().memory_service
 
         # Store tokens in memory for single user
         self.tokens = {}
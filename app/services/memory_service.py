@@ -3,8 +3,9 @@ Memory Service - PostgreSQL Only Implementation
 Single-user-per-container with PostgreSQL + pgvector
 """
 
+import asyncio
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from app.services.memory_service_postgres import MemoryServicePostgres
 from app.utils.logging_config import get_logger
@@ -30,13 +31,23 @@ class MemoryService:
             connection_string=db_url, enable_embeddings=True  # Always true - we have OpenAI key
         )
         self._initialized = False
+        self._init_lock = asyncio.Lock()
 
     async def initialize(self):
-        """Initialize the PostgreSQL connection"""
-        if not self._initialized:
-            await self.service.initialize()
-            self._initialized = True
-            logger.info("Memory service initialized with PostgreSQL")
+        """Initialize the PostgreSQL connection (once, even under concurrent callers)"""
+        if self._initialized:
+            return
+        async with self._init_lock:
+            if not self._initialized:
+                await self.service.initialize()
+                self._initialized = True
+                logger.info("Memory service initialized with PostgreSQL")
+
+    async def close(self):
+        """Close the PostgreSQL connection pool"""
+        if self._initialized:
+            await self.service.close()
+            self._initialized = False
 
     async def create_memory(
         self,
@@ -58,10 +69,24 @@ class MemoryService:
             generate_embedding=generate_embedding,
         )
 
-    async def get_memory(self, memory_id: str) -> Optional[Dict[str, Any]]:
+    async def create_memories(
+        self, memories: List[Dict[str, Any]], generate_embeddings: bool = False
+    ) -> Dict[str, Any]:
+        """Bulk-create memories"""
+        await self.initialize()
+        return await self.service.create_memories(
+            memories=memories, generate_embeddings=generate_embeddings
+        )
+
+    async def get_memory(self, memory_id: str, track: bool = True) -> Optional[Dict[str, Any]]:
         """Get a memory by ID"""
         await self.initialize()
-        return await self.service.get_memory(memory_id)
+        return await self.service.get_memory(memory_id, track=track)
+
+    async def get_memories(self, memory_ids: List[str], track: bool = True) -> List[Dict[str, Any]]:
+        """Get many memories by ID in one query"""
+        await self.initialize()
+        return await self.service.get_memories(memory_ids, track=track)
 
     async def update_memory(
         self,
@@ -88,32 +113,104 @@ class MemoryService:
         await self.initialize()
         return await self.service.delete_memory(memory_id)
 
+    async def delete_memories(self, memory_ids: List[str]) -> List[str]:
+        """Delete many memories"""
+        await self.initialize()
+        return await self.service.delete_memories(memory_ids)
+
+    async def add_tags(self, memory_ids: List[str], tags: List[str]) -> List[str]:
+        """Merge tags into many memories"""
+        await self.initialize()
+        return await self.service.add_tags(memory_ids, tags)
+
     async def list_memories(
         self,
         limit: int = 20,
         offset: int = 0,
         memory_type: Optional[str] = None,
         tags: Optional[List[str]] = None,
+        min_importance: Optional[float] = None,
+        projection: str = "full",
     ) -> List[Dict[str, Any]]:
         """List memories with filtering"""
         await self.initialize()
         return await self.service.list_memories(
-            limit=limit, offset=offset, memory_type=memory_type, tags=tags
+            limit=limit,
+            offset=offset,
+            memory_type=memory_type,
+            tags=tags,
+            min_importance=min_importance,
+            projection=projection,
+        )
+
+    async def iterate_memories(
+        self,
+        batch_size: int = 1000,
+        memory_type: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        min_importance: Optional[float] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream all matching memories in batches"""
+        await self.initialize()
+        async for batch in self.service.iterate_memories(
+            batch_size=batch_size,
+            memory_type=memory_type,
+            tags=tags,
+            min_importance=min_importance,
+        ):
+            yield batch
+
+    async def list_memories_page(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        memory_type: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        min_importance: Optional[float] = None,
+        exact_total: bool = False,
+        projection: str = "full",
+    ) -> Dict[str, Any]:
+        """List one page of memories with keyset pagination and a total"""
+        await self.initialize()
+        return await self.service.list_memories_page(
+            limit=limit,
+            cursor=cursor,
+            offset=offset,
+            memory_type=memory_type,
+            tags=tags,
+            min_importance=min_importance,
+            exact_total=exact_total,
+            projection=projection,
         )
 
     async def search_memories(
-        self, query: str, limit: int = 10, search_type: str = "text"
+        self,
+        query: str,
+        limit: int = 10,
+        search_type: str = "text",
+        recall: Optional[str] = None,
+        projection: str = "full",
     ) -> List[Dict[str, Any]]:
-        """Search memories"""
+        """
+        Search memories (``recall`` tunes ANN accuracy for semantic/hybrid,
+        ``projection`` picks 'summary', 'full' or 'with_embedding' rows)
+        """
         await self.initialize()
         if search_type == "semantic":
-            return await self.service.semantic_search(query, limit)
+            return await self.service.semantic_search(
+                query, limit, recall=recall, projection=projection
+            )
         elif search_type == "hybrid":
             return await self.service.search_memories(
-                query=query, limit=limit, search_type="hybrid"
+                query=query,
+                limit=limit,
+                search_type="hybrid",
+                recall=recall,
+                projection=projection,
             )
         else:
-            return await self.service.keyword_search(query, limit)
+            return await self.service.keyword_search(query, limit, projection=projection)
 
     async def get_statistics(self) -> Dict[str, Any]:
         """Get memory statistics"""
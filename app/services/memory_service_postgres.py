@@ -3,13 +3,31 @@ Enhanced Memory Service with PostgreSQL + pgvector
 Provides unified memory management with vector search, full-text search, and relationships
 """
 
+import asyncio
+import functools
 import os
 import uuid
+from contextlib import aclosing
 from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
 
+from app.config import Config
 from app.core.degradation import DegradationLevel, get_degradation_manager
-from app.storage.postgres_unified import PostgresUnifiedBackend
+from app.models.synthesis.consolidation_models import ConsolidationRequest, ConsolidationResult
+from app.services.consolidation_engine import ConsolidationEngine
+from app.services.degraded_search import DegradedSearchIndex
+from app.services.embedding_backfill import EmbeddingBackfill
+from app.services.embedding_batcher import EmbeddingBatcher
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embedding_migration import EmbeddingMigration
+from app.services.embedding_worker import EmbeddingWorker
+from app.services.passages import ChunkRow, PassageEmbedder
+from app.services.search_cache import QueryEmbeddingCache, SearchResultCache, copy_results
+from app.storage.postgres_unified import (
+    PostgresUnifiedBackend,
+    encode_cursor,
+    is_embedding_model_mismatch,
+)
 from app.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -26,6 +44,8 @@ class MemoryServicePostgres:
         enable_embeddings: bool = True,
         embedding_batch_size: int = 10,
         embedding_model: str = "text-embedding-ada-002",
+        graph_limits: Optional[Dict[str, int]] = None,
+        async_embeddings: Optional[bool] = None,
     ):
         """
         Initialize memory service with PostgreSQL backend
@@ -33,18 +53,92 @@ class MemoryServicePostgres:
         Args:
             connection_string: PostgreSQL connection string
             enable_embeddings: Whether to generate embeddings for new memories
-            embedding_batch_size: Batch size for embedding generation
+            embedding_batch_size: Most texts sent to the embedding model per request
             embedding_model: Local embedding model to use (Nomic/CLIP)
+            graph_limits: Overrides for max_depth, max_fanout, max_nodes and
+                timeout_ms of knowledge graph traversal (defaults from Config)
+            async_embeddings: Queue embeddings for background workers instead of
+                embedding inside create/update (defaults to Config.ASYNC_EMBEDDINGS)
         """
-        self.backend = PostgresUnifiedBackend(connection_string)
+        quantization = Config.VECTOR_QUANTIZATION
+        self.backend = PostgresUnifiedBackend(
+            connection_string,
+            quantization=None if quantization == "none" else quantization,
+            rerank_factor=Config.VECTOR_RERANK_FACTOR,
+            search_history_flush_interval=Config.SEARCH_HISTORY_FLUSH_INTERVAL,
+            search_history_buffer_size=Config.SEARCH_HISTORY_BUFFER_SIZE,
+            chunk_search=Config.CHUNKING_ENABLED,
+            chunk_search_factor=Config.CHUNK_SEARCH_FACTOR,
+        )
         self.degradation_manager = get_degradation_manager()
         self.enable_embeddings = enable_embeddings
         self.embedding_batch_size = embedding_batch_size
         self.embedding_model = embedding_model
+        self.async_embeddings = (
+            Config.ASYNC_EMBEDDINGS if async_embeddings is None else async_embeddings
+        )
+        self.graph_limits = {
+            "max_depth": Config.GRAPH_MAX_DEPTH,
+            "max_fanout": Config.GRAPH_MAX_FANOUT,
+            "max_nodes": Config.GRAPH_MAX_NODES,
+            "timeout_ms": Config.GRAPH_TIMEOUT_MS,
+            **(graph_limits or {}),
+        }
 
-        # Local embedding client (lazy loaded)
+        # Local embedding client and request batcher (lazy loaded); _text_model
+        # overrides the client's model once a migration has switched models
         self._local_client = None
-        self._embedding_queue = []
+        self._text_model: Optional[str] = None
+        self._embedding_batcher: Optional[EmbeddingBatcher] = None
+        self._embedding_cache: Optional[EmbeddingCache] = None
+
+        # Long memories are embedded as overlapping passages (None embeds them whole)
+        self.passage_embedder: Optional[PassageEmbedder] = None
+        if Config.CHUNKING_ENABLED:
+            self.passage_embedder = PassageEmbedder(
+                lambda text: self._generate_embedding(text),
+                max_tokens=Config.CHUNK_MAX_TOKENS,
+                overlap_tokens=Config.CHUNK_OVERLAP_TOKENS,
+                concurrency=Config.CHUNK_EMBED_CONCURRENCY,
+            )
+
+        # Repeated searches: query embeddings by text, results until the next write
+        self.query_embedding_cache = QueryEmbeddingCache(
+            max_entries=Config.QUERY_EMBEDDING_CACHE_SIZE,
+            ttl_seconds=Config.QUERY_EMBEDDING_CACHE_TTL,
+        )
+        self.search_cache = SearchResultCache(
+            max_entries=Config.SEARCH_CACHE_SIZE, ttl_seconds=Config.SEARCH_CACHE_TTL
+        )
+        # BM25 index answering searches while PostgreSQL or embeddings are unavailable
+        self.text_index = DegradedSearchIndex(
+            self.backend,
+            enabled=Config.TEXT_INDEX_ENABLED,
+            snapshot_path=Config.TEXT_INDEX_SNAPSHOT_PATH,
+        )
+        self.embedding_backfill = EmbeddingBackfill(
+            self,
+            batch_size=Config.BACKFILL_BATCH_SIZE,
+            concurrency=Config.BACKFILL_CONCURRENCY,
+            rate_limit=Config.BACKFILL_RATE_LIMIT,
+            passages=self.passage_embedder,
+        )
+        self.embedding_worker = EmbeddingWorker(
+            self,
+            workers=Config.EMBEDDING_WORKERS,
+            batch_size=Config.EMBEDDING_JOB_BATCH_SIZE,
+            poll_interval=Config.EMBEDDING_JOB_POLL_INTERVAL,
+            lease_seconds=Config.EMBEDDING_JOB_LEASE_SECONDS,
+            max_attempts=Config.EMBEDDING_JOB_MAX_ATTEMPTS,
+            passages=self.passage_embedder,
+        )
+        self.embedding_migration = EmbeddingMigration(
+            self,
+            batch_size=Config.EMBEDDING_MIGRATION_BATCH_SIZE,
+            concurrency=Config.EMBEDDING_MIGRATION_CONCURRENCY,
+            rate_limit=Config.EMBEDDING_MIGRATION_RATE_LIMIT,
+            lock_timeout=Config.EMBEDDING_MIGRATION_LOCK_TIMEOUT,
+        )
 
         logger.info("Memory service initialized with PostgreSQL backend")
 
@@ -53,11 +147,24 @@ class MemoryServicePostgres:
         await self.backend.initialize()
         logger.info("PostgreSQL backend initialized")
 
+        # Stored vectors may come from a model another process migrated to
+        await self.refresh_embedding_model()
+
+        if self.async_embeddings and self.enable_embeddings:
+            await self.embedding_worker.start()
+        self.text_index.start()
+
     async def close(self):
         """Close backend connections"""
-        # Process any pending embeddings
-        if self._embedding_queue:
-            await self._process_embedding_queue()
+        # Checkpoint and stop a running backfill or migration before the pool goes away
+        await self.embedding_backfill.stop()
+        await self.embedding_migration.stop()
+        await self.embedding_worker.stop()
+        await self.text_index.stop()
+
+        # Finish any pending embedding batches
+        if self._embedding_batcher:
+            await self._embedding_batcher.close()
 
         await self.backend.close()
         logger.info("Memory service closed")
@@ -82,7 +189,8 @@ class MemoryServicePostgres:
             importance_score: Importance (0-1)
             tags: List of tags
             metadata: Additional metadata
-            generate_embedding: Whether to generate embedding
+            generate_embedding: Whether to generate embedding (queued for the
+                embedding workers when async embeddings are enabled)
 
         Returns:
             Created memory dictionary
@@ -104,23 +212,38 @@ class MemoryServicePostgres:
             "updated_at": datetime.utcnow().isoformat(),
         }
 
-        # Generate embedding if enabled
+        # Generate embedding if enabled, or queue it in the same transaction as the row
         embedding = None
-        if generate_embedding and self.enable_embeddings:
+        chunks = None
+        enqueue = generate_embedding and self.enable_embeddings and self.async_embeddings
+        if generate_embedding and self.enable_embeddings and not enqueue:
             if self.degradation_manager.is_feature_available("ai_features"):
-                embedding = await self._generate_embedding(content)
+                embedding, chunks = await self._embed_content(content)
                 if embedding:
                     memory["embedding_model"] = self.embedding_model
 
         # Store in PostgreSQL
         try:
-            created_memory = await self.backend.create_memory(memory, embedding)
+            try:
+                created_memory = await self.backend.create_memory(
+                    memory, embedding, enqueue_embedding=enqueue, chunks=chunks
+                )
+            except Exception as e:
+                if embedding is None or not is_embedding_model_mismatch(e):
+                    raise
+                # Another process switched the model; embed again with it
+                embedding, chunks = await self._embed_with_switched_model(content)
+                memory["embedding_model"] = self.embedding_model
+                created_memory = await self.backend.create_memory(
+                    memory, embedding, chunks=chunks
+                )
             logger.info(f"Created memory {created_memory['id'][:8]}...")
+            self.search_cache.invalidate(created_memory.get("container_id", "default"))
+            self.text_index.add(created_memory)
+            if enqueue:
+                self.embedding_worker.notify()
 
-            # Auto-detect duplicates if we have embeddings
-            if embedding and self.degradation_manager.is_feature_available("deduplication"):
-                await self._check_for_duplicates(created_memory["id"], embedding)
-
+            # "similar" edges are discovered in batches by sweep_relationships
             return created_memory
 
         except Exception as e:
@@ -131,14 +254,119 @@ class MemoryServicePostgres:
                 pass  # degradation_manager.report_failure not implemented yet
             raise
 
-    async def get_memory(self, memory_id: str) -> Optional[Dict[str, Any]]:
-        """Get a memory by ID"""
+    async def create_memories(
+        self,
+        memories: List[Dict[str, Any]],
+        generate_embeddings: bool = False,
+        batch_size: int = 1000,
+    ) -> Dict[str, Any]:
+        """
+        Bulk-create memories through the backend COPY path
+
+        Args:
+            memories: Memory dictionaries (content, memory_type, importance_score,
+                tags, metadata)
+            generate_embeddings: Whether to embed each batch before inserting;
+                leave off for large imports and run a reindex afterwards
+            batch_size: Number of memories per COPY batch
+
+        Returns:
+            Dictionary with inserted/skipped counts and the new memory ids
+        """
+        if self.degradation_manager.current_level >= DegradationLevel.READONLY:
+            logger.warning("System in read-only mode, cannot create memories")
+            return {"inserted": 0, "skipped": len(memories), "ids": []}
+
+        results = {"inserted": 0, "skipped": 0, "ids": []}
+        embed = (
+            generate_embeddings
+            and self.enable_embeddings
+            and self.degradation_manager.is_feature_available("ai_features")
+        )
+        enqueue = embed and self.async_embeddings
+
+        for start in range(0, len(memories), batch_size):
+            batch = [
+                {
+                    "id": memory.get("id") or str(uuid.uuid4()),
+                    "content": memory["content"],
+                    "memory_type": memory.get("memory_type", "generic"),
+                    "importance_score": memory.get("importance_score", 0.5),
+                    "tags": memory.get("tags") or [],
+                    "metadata": memory.get("metadata") or {},
+                    "embedding_model": self.embedding_model,
+                }
+                for memory in memories[start : start + batch_size]
+            ]
+
+            embeddings = None
+            chunks = None
+            if embed and not enqueue:
+                embedded = await asyncio.gather(
+                    *(self._embed_content(memory["content"]) for memory in batch)
+                )
+                embeddings = [embedding for embedding, _ in embedded]
+                if self.passage_embedder is not None:
+                    chunks = [memory_chunks for _, memory_chunks in embedded]
+
+            try:
+                try:
+                    batch_result = await self.backend.create_memories(
+                        batch, embeddings, enqueue_embeddings=enqueue, chunks=chunks
+                    )
+                except Exception as e:
+                    if embeddings is None or not is_embedding_model_mismatch(e):
+                        raise
+                    # Another process switched the model; embed the batch again with it
+                    await self.refresh_embedding_model()
+                    embedded = await asyncio.gather(
+                        *(self._embed_content(memory["content"]) for memory in batch)
+                    )
+                    embeddings = [embedding for embedding, _ in embedded]
+                    if self.passage_embedder is not None:
+                        chunks = [memory_chunks for _, memory_chunks in embedded]
+                    for memory in batch:
+                        memory["embedding_model"] = self.embedding_model
+                    batch_result = await self.backend.create_memories(
+                        batch, embeddings, chunks=chunks
+                    )
+            except Exception as e:
+                logger.error(f"Failed to bulk create memories: {e}")
+                raise
+
+            if batch_result["inserted"]:
+                self.search_cache.invalidate()
+                inserted = set(batch_result["ids"])
+                for memory in batch:
+                    if memory["id"] in inserted:
+                        self.text_index.add(memory)
+            results["inserted"] += batch_result["inserted"]
+            results["skipped"] += batch_result["skipped"]
+            results["ids"].extend(batch_result["ids"])
+
+        if enqueue and results["inserted"]:
+            self.embedding_worker.notify()
+        logger.info(f"Bulk created {results['inserted']} memories")
+        return results
+
+    async def get_memory(self, memory_id: str, track: bool = True) -> Optional[Dict[str, Any]]:
+        """Get a memory by ID (``track=False`` for internal reads that are not accesses)"""
         try:
-            return await self.backend.get_memory(memory_id)
+            return await self.backend.get_memory(memory_id, track=track)
         except Exception as e:
             logger.error(f"Failed to get memory {memory_id}: {e}")
             return None
 
+    async def get_memories(
+        self, memory_ids: List[str], track: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Get many memories in one query, in the order of ``memory_ids``"""
+        try:
+            return await self.backend.get_memories(memory_ids, track=track)
+        except Exception as e:
+            logger.error(f"Failed to get {len(memory_ids)} memories: {e}")
+            return []
+
     async def update_memory(
         self,
         memory_id: str,
@@ -165,14 +393,43 @@ class MemoryServicePostgres:
         if metadata is not None:
             updates["metadata"] = metadata
 
-        # Generate new embedding if content changed
+        # Generate new embedding if content changed (or queue it for the workers)
         new_embedding = None
-        if regenerate_embedding or (content and self.enable_embeddings):
+        new_chunks = None
+        reembed = regenerate_embedding or (content and self.enable_embeddings)
+        enqueue = bool(reembed) and self.enable_embeddings and self.async_embeddings
+        if reembed and not enqueue:
             if self.degradation_manager.is_feature_available("ai_features"):
-                new_embedding = await self._generate_embedding(content or "")
+                new_embedding, new_chunks = await self._embed_content(content or "")
 
         try:
-            return await self.backend.update_memory(memory_id, updates, new_embedding)
+            try:
+                updated = await self.backend.update_memory(
+                    memory_id,
+                    updates,
+                    new_embedding,
+                    enqueue_embedding=enqueue,
+                    new_chunks=new_chunks,
+                    embedding_model=self.embedding_model,
+                )
+            except Exception as e:
+                if new_embedding is None or not is_embedding_model_mismatch(e):
+                    raise
+                # Another process switched the model; embed again with it
+                new_embedding, new_chunks = await self._embed_with_switched_model(content or "")
+                updated = await self.backend.update_memory(
+                    memory_id,
+                    updates,
+                    new_embedding,
+                    new_chunks=new_chunks,
+                    embedding_model=self.embedding_model,
+                )
+            if updated:
+                self.search_cache.invalidate(updated.get("container_id", "default"))
+                self.text_index.add(updated)
+            if enqueue and updated:
+                self.embedding_worker.notify()
+            return updated
         except Exception as e:
             logger.error(f"Failed to update memory {memory_id}: {e}")
             return None
@@ -186,11 +443,49 @@ class MemoryServicePostgres:
             return False
 
         try:
-            return await self.backend.delete_memory(memory_id, soft)
+            deleted = await self.backend.delete_memory(memory_id, soft)
+            if deleted:
+                self.search_cache.invalidate()
+                self.text_index.remove([memory_id])
+            return deleted
         except Exception as e:
             logger.error(f"Failed to delete memory {memory_id}: {e}")
             return False
 
+    async def delete_memories(self, memory_ids: List[str], soft: bool = True) -> List[str]:
+        """Delete many memories in one statement, returning the deleted IDs"""
+
+        if self.degradation_manager.current_level >= DegradationLevel.READONLY:
+            logger.warning("System in read-only mode, cannot delete memories")
+            return []
+
+        try:
+            deleted = await self.backend.delete_memories(memory_ids, soft)
+            if deleted:
+                self.search_cache.invalidate()
+                self.text_index.remove(deleted)
+            return deleted
+        except Exception as e:
+            logger.error(f"Failed to delete {len(memory_ids)} memories: {e}")
+            return []
+
+    async def add_tags(self, memory_ids: List[str], tags: List[str]) -> List[str]:
+        """Merge tags into many memories in one statement, returning the updated IDs"""
+
+        if self.degradation_manager.current_level >= DegradationLevel.READONLY:
+            logger.warning("System in read-only mode, cannot tag memories")
+            return []
+
+        try:
+            tagged = await self.backend.add_tags(memory_ids, tags)
+            if tagged:
+                self.search_cache.invalidate()
+                self.text_index.add_tags(tagged, tags)
+            return tagged
+        except Exception as e:
+            logger.error(f"Failed to tag {len(memory_ids)} memories: {e}")
+            return []
+
     async def list_memories(
         self,
         limit: int = 20,
@@ -198,8 +493,10 @@ class MemoryServicePostgres:
         memory_type: Optional[str] = None,
         tags: Optional[List[str]] = None,
         min_importance: Optional[float] = None,
+        after: Optional[str] = None,
+        projection: str = "full",
     ) -> List[Dict[str, Any]]:
-        """List memories with filtering"""
+        """List memories with filtering (``projection='summary'`` for content previews)"""
         try:
             return await self.backend.list_memories(
                 limit=limit,
@@ -207,11 +504,111 @@ class MemoryServicePostgres:
                 memory_type=memory_type,
                 tags=tags,
                 min_importance=min_importance,
+                after=after,
+                projection=projection,
             )
         except Exception as e:
             logger.error(f"Failed to list memories: {e}")
             return []
 
+    async def iterate_memories(
+        self,
+        batch_size: int = 1000,
+        memory_type: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        min_importance: Optional[float] = None,
+        has_embedding: Optional[bool] = None,
+        columns: Optional[Sequence[str]] = None,
+        projection: str = "full",
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream all matching memories in batches for whole-corpus scans
+
+        Args:
+            batch_size: Memories per batch
+            memory_type: Filter by memory type
+            tags: Filter by any of these tags
+            min_importance: Minimum importance score
+            has_embedding: Only memories with (True) or without (False) embeddings
+            columns: Columns to fetch; memories in ``projection`` when omitted
+            projection: Projection profile ('summary', 'full' or 'with_embedding')
+
+        Yields:
+            Lists of memories, newest first
+
+        Raises:
+            Exception: Backend errors propagate, so a consumer such as a
+                streaming export aborts instead of ending early as if complete
+        """
+        filters = {
+            "memory_type": memory_type,
+            "tags": tags,
+            "min_importance": min_importance,
+            "has_embedding": has_embedding,
+        }
+
+        try:
+            async with aclosing(
+                self.backend.iterate_memories(
+                    filters=filters, batch_size=batch_size, columns=columns, projection=projection
+                )
+            ) as batches:
+                async for batch in batches:
+                    yield batch
+        except Exception as e:
+            logger.error(f"Failed to iterate memories: {e}")
+            raise
+
+    async def list_memories_page(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        offset: int = 0,
+        memory_type: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        min_importance: Optional[float] = None,
+        exact_total: bool = False,
+        projection: str = "full",
+    ) -> Dict[str, Any]:
+        """
+        List one page of memories with keyset pagination and a total
+
+        Args:
+            limit: Page size
+            cursor: Opaque cursor from a previous page's ``next_cursor``
+            offset: Positional offset (only used without a cursor)
+            memory_type: Filter by memory type
+            tags: Filter by any of these tags
+            min_importance: Minimum importance score
+            exact_total: Count exactly instead of using the planner estimate
+            projection: 'summary' (content preview), 'full' or 'with_embedding'
+
+        Returns:
+            Dictionary with memories, next_cursor, total and total_is_estimate
+
+        Raises:
+            ValueError: If the cursor or projection is malformed
+        """
+        filters = {"memory_type": memory_type, "tags": tags, "min_importance": min_importance}
+
+        # Fetch one extra row to know whether another page exists
+        rows = await self.backend.list_memories(
+            limit=limit + 1, offset=offset, after=cursor, projection=projection, **filters
+        )
+        memories = rows[:limit]
+        next_cursor = encode_cursor(memories[-1]) if len(rows) > limit else None
+
+        total, total_is_estimate = await self.backend.count_memories(
+            exact=exact_total, **filters
+        )
+
+        return {
+            "memories": memories,
+            "next_cursor": next_cursor,
+            "total": total,
+            "total_is_estimate": total_is_estimate,
+        }
+
     # ==================== Search Operations ====================
 
     async def search_memories(
@@ -221,6 +618,8 @@ class MemoryServicePostgres:
         search_type: str = "hybrid",
         min_score: float = 0.0,
         filters: Optional[Dict[str, Any]] = None,
+        recall: Optional[str] = None,
+        projection: str = "full",
     ) -> List[Dict[str, Any]]:
         """
         Search memories using various strategies
@@ -231,10 +630,19 @@ class MemoryServicePostgres:
             search_type: 'vector', 'text', or 'hybrid'
             min_score: Minimum score threshold
             filters: Additional filters (tags, type, etc.)
+            recall: ANN accuracy hint ('fast', 'balanced', 'high' or 'exact');
+                picked from the collection size when None
+            projection: 'summary' (content preview), 'full' or 'with_embedding'
 
         Returns:
-            List of matching memories with scores
+            List of matching memories with scores (repeats are served from the
+            result cache until the next write). While PostgreSQL is degraded,
+            or embeddings are unavailable for vector/hybrid searches, results
+            come from the in-process BM25 index in the summary projection.
         """
+        if self._use_text_index(search_type):
+            return self.text_index.search(query, limit)
+
         # Check if vector search is available
         if search_type in [
             "vector",
@@ -243,19 +651,40 @@ class MemoryServicePostgres:
             logger.warning("Semantic search unavailable, falling back to text search")
             search_type = "text"
 
+        cache_key = self.search_cache.make_key(
+            query,
+            search_type,
+            limit,
+            filters,
+            min_score=min_score,
+            recall=recall,
+            projection=projection,
+        )
+        cached = self.search_cache.get(cache_key)
+        if cached is not None:
+            return copy_results(cached)
+        # Captured before searching, so a write that lands meanwhile discards the result
+        version = self.search_cache.version()
+
         try:
             # Generate embedding for vector/hybrid search
             embedding = None
             if search_type in ["vector", "hybrid"] and self.enable_embeddings:
-                embedding = await self._generate_embedding(query)
+                embedding = await self._generate_query_embedding(query)
 
             # Perform search based on type
             if search_type == "vector" and embedding:
                 results = await self.backend.vector_search(
-                    embedding=embedding, limit=limit, min_similarity=min_score
+                    embedding=embedding,
+                    limit=limit,
+                    min_similarity=min_score,
+                    recall=recall,
+                    projection=projection,
                 )
             elif search_type == "text":
-                results = await self.backend.text_search(query=query, limit=limit)
+                results = await self.backend.text_search(
+                    query=query, limit=limit, projection=projection
+                )
             else:  # hybrid
                 results = await self.backend.hybrid_search(
                     query=query,
@@ -263,12 +692,14 @@ class MemoryServicePostgres:
                     limit=limit,
                     vector_weight=0.5,  # Default weight
                     min_score=min_score,
+                    recall=recall,
+                    projection=projection,
                 )
 
-            # Record search for learning
+            # Record search for learning (buffered, written in batches)
             if results and self.degradation_manager.is_feature_available("analytics"):
                 selected_ids = [r["id"] for r in results[:3]]  # Top 3 as "selected"
-                await self.backend.record_search(
+                self.backend.record_search(
                     query=query,
                     embedding=embedding,
                     results_count=len(results),
@@ -277,6 +708,7 @@ class MemoryServicePostgres:
                     metadata=filters,
                 )
 
+            self.search_cache.put(cache_key, copy_results(results), version)
             return results
 
         except Exception as e:
@@ -285,16 +717,95 @@ class MemoryServicePostgres:
             return await self._fallback_search(query, limit)
 
     async def semantic_search(
-        self, query: str, limit: int = 10, min_similarity: float = 0.7
+        self,
+        query: str,
+        limit: int = 10,
+        min_similarity: float = 0.7,
+        recall: Optional[str] = None,
+        projection: str = "full",
     ) -> List[Dict[str, Any]]:
         """Pure semantic search using vector similarity"""
         return await self.search_memories(
-            query=query, limit=limit, search_type="vector", min_score=min_similarity
+            query=query,
+            limit=limit,
+            search_type="vector",
+            min_score=min_similarity,
+            recall=recall,
+            projection=projection,
         )
 
-    async def keyword_search(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    async def keyword_search(
+        self, query: str, limit: int = 10, projection: str = "full"
+    ) -> List[Dict[str, Any]]:
         """Pure keyword search using full-text search"""
-        return await self.search_memories(query=query, limit=limit, search_type="text")
+        return await self.search_memories(
+            query=query, limit=limit, search_type="text", projection=projection
+        )
+
+    # ==================== Vector Index Operations ====================
+
+    async def create_vector_index(
+        self,
+        method: str = "hnsw",
+        m: int = 16,
+        ef_construction: int = 64,
+        lists: Optional[int] = None,
+        rebuild: bool = False,
+    ) -> Dict[str, Any]:
+        """Create or rebuild the ANN index used by vector and hybrid search"""
+
+        if self.degradation_manager.current_level >= DegradationLevel.READONLY:
+            raise RuntimeError("System in read-only mode, cannot build vector index")
+
+        status = await self.backend.create_vector_index(
+            method=method, m=m, ef_construction=ef_construction, lists=lists, rebuild=rebuild
+        )
+        if self.passage_embedder is not None:
+            # Passage search needs its own index to stay off sequential scans
+            status = await self.backend.create_chunk_index(
+                method=method, m=m, ef_construction=ef_construction, lists=lists
+            )
+        return status
+
+    async def get_vector_index_status(self) -> Dict[str, Any]:
+        """Get ANN index state, size and build progress"""
+        try:
+            return await self.backend.get_vector_index_status()
+        except Exception as e:
+            logger.error(f"Failed to get vector index status: {e}")
+            return {"error": str(e)}
+
+    async def enable_quantization(
+        self, mode: Optional[str] = None, batch_size: int = 5000
+    ) -> Dict[str, Any]:
+        """Add, backfill and index the quantized embedding column"""
+
+        if self.degradation_manager.current_level >= DegradationLevel.READONLY:
+            raise RuntimeError("System in read-only mode, cannot enable quantization")
+
+        return await self.backend.enable_quantization(mode=mode, batch_size=batch_size)
+
+    async def check_quantized_recall(self, sample_size: int = 20, k: int = 10) -> Dict[str, Any]:
+        """
+        Measure quantized search recall@k against the configured tolerance
+
+        ``within_tolerance`` is None when no embedded memory was sampled,
+        so recall is unknown.
+        """
+        result = await self.backend.measure_quantized_recall(sample_size=sample_size, k=k)
+
+        tolerance = Config.VECTOR_RECALL_TOLERANCE
+        result["tolerance"] = tolerance
+        if result["recall"] is None:
+            result["within_tolerance"] = None
+        else:
+            result["within_tolerance"] = result["recall"] >= 1 - tolerance
+        if result["within_tolerance"] is False:
+            logger.warning(
+                f"Quantized recall@{k} {result['recall']:.3f} is below 1 - {tolerance}; "
+                "raise VECTOR_RERANK_FACTOR or use a finer quantization"
+            )
+        return result
 
     # ==================== Relationship Operations ====================
 
@@ -337,52 +848,39 @@ class MemoryServicePostgres:
             return []
 
     async def build_knowledge_graph(
-        self, center_memory_id: str, depth: int = 2, min_strength: float = 0.5
+        self,
+        center_memory_id: str,
+        depth: int = 2,
+        min_strength: float = 0.5,
+        max_nodes: Optional[int] = None,
+        projection: str = "summary",
     ) -> Dict[str, Any]:
-        """Build a knowledge graph around a memory"""
-        graph = {"nodes": [], "edges": [], "center": center_memory_id}
-
-        visited = set()
-        queue = [(center_memory_id, 0)]
-
-        while queue:
-            memory_id, current_depth = queue.pop(0)
-
-            if memory_id in visited or current_depth > depth:
-                continue
-
-            visited.add(memory_id)
-
-            # Get memory details
-            memory = await self.get_memory(memory_id)
-            if memory:
-                graph["nodes"].append(
-                    {
-                        "id": memory_id,
-                        "content": memory["content"][:100],  # Truncate for graph
-                        "type": memory["memory_type"],
-                        "depth": current_depth,
-                    }
-                )
-
-                # Get related memories
-                related = await self.get_related_memories(
-                    memory_id=memory_id, min_strength=min_strength
-                )
+        """
+        Build a knowledge graph around a memory
 
-                for rel_memory in related:
-                    graph["edges"].append(
-                        {
-                            "source": memory_id,
-                            "target": rel_memory["id"],
-                            "type": rel_memory["relationship_type"],
-                            "strength": rel_memory["relationship_strength"],
-                        }
-                    )
+        The traversal runs as a single recursive query; depth, fan-out per
+        node, node count and statement timeout are capped by ``graph_limits``.
+        Node content is truncated unless ``projection`` is 'full'.
+        """
+        limits = self.graph_limits
+        graph = {"nodes": [], "edges": [], "center": center_memory_id, "truncated": False}
 
-                    if current_depth < depth:
-                        queue.append((rel_memory["id"], current_depth + 1))
+        try:
+            result = await self.backend.get_knowledge_graph(
+                center_memory_id=center_memory_id,
+                depth=min(depth, limits["max_depth"]),
+                min_strength=min_strength,
+                max_fanout=limits["max_fanout"],
+                max_nodes=min(max_nodes or limits["max_nodes"], limits["max_nodes"]),
+                timeout_ms=limits["timeout_ms"],
+                projection=projection,
+            )
+        except Exception as e:
+            logger.error(f"Failed to build knowledge graph for {center_memory_id}: {e}")
+            return graph
 
+        if result:
+            graph.update(result)
         return graph
 
     # ==================== Consolidation Operations ====================
@@ -399,11 +897,7 @@ class MemoryServicePostgres:
             raise ValueError("At least 2 memories required for consolidation")
 
         # Get source memories
-        source_memories = []
-        for memory_id in source_ids:
-            memory = await self.get_memory(memory_id)
-            if memory:
-                source_memories.append(memory)
+        source_memories = await self.get_memories(source_ids, track=False)
 
         if len(source_memories) < 2:
             raise ValueError("Could not find enough valid memories")
@@ -423,48 +917,201 @@ class MemoryServicePostgres:
         }
 
         try:
-            return await self.backend.consolidate_memories(
+            consolidated = await self.backend.consolidate_memories(
                 source_ids=source_ids,
                 consolidated_content=consolidated_content,
                 consolidation_type=consolidation_type,
                 metadata=metadata,
             )
+            self.search_cache.invalidate()
+            if consolidation_type == "merge":
+                self.text_index.remove(source_ids)
+            self.text_index.add(consolidated)
+            return consolidated
         except Exception as e:
             logger.error(f"Failed to consolidate memories: {e}")
             raise
 
     async def find_duplicate_memories(
-        self, similarity_threshold: float = 0.95
+        self, similarity_threshold: float = 0.95, limit: int = 100
     ) -> List[Tuple[str, str, float]]:
-        """Find potential duplicate memories"""
+        """Find potential duplicate memories from the candidate table"""
         try:
-            return await self.backend.find_duplicates(similarity_threshold)
+            return await self.backend.find_duplicates(similarity_threshold, limit)
         except Exception as e:
             logger.error(f"Failed to find duplicates: {e}")
             return []
 
+    async def count_duplicate_memories(self, similarity_threshold: float = 0.95) -> int:
+        """Count candidate duplicate pairs at or above a threshold"""
+        try:
+            return await self.backend.count_duplicates(similarity_threshold)
+        except Exception as e:
+            logger.error(f"Failed to count duplicates: {e}")
+            return 0
+
+    async def sweep_duplicates(self) -> Dict[str, Any]:
+        """Refresh duplicate candidates for memories changed since the last sweep"""
+        if self.degradation_manager.current_level >= DegradationLevel.READONLY:
+            logger.warning("System in read-only mode, skipping duplicate sweep")
+            return {"processed": 0, "pairs": 0}
+
+        try:
+            return await self.backend.sweep_duplicate_candidates(
+                neighbors=Config.DUPLICATE_NEIGHBORS,
+                min_similarity=Config.DUPLICATE_MIN_SIMILARITY,
+            )
+        except Exception as e:
+            logger.error(f"Duplicate sweep failed: {e}")
+            return {"processed": 0, "pairs": 0, "error": str(e)}
+
+    async def sweep_relationships(self) -> Dict[str, Any]:
+        """Link memories embedded since the last sweep to their near-duplicates"""
+        if self.degradation_manager.current_level >= DegradationLevel.READONLY:
+            logger.warning("System in read-only mode, skipping relationship sweep")
+            return {"processed": 0, "edges": 0}
+        if not self.degradation_manager.is_feature_available("deduplication"):
+            return {"processed": 0, "edges": 0}
+
+        try:
+            return await self.backend.sweep_similar_relationships(
+                neighbors=Config.RELATIONSHIP_NEIGHBORS,
+                min_similarity=Config.RELATIONSHIP_MIN_SIMILARITY,
+            )
+        except Exception as e:
+            logger.error(f"Relationship sweep failed: {e}")
+            return {"processed": 0, "edges": 0, "error": str(e)}
+
+    async def consolidate_duplicates(self, request: ConsolidationRequest) -> ConsolidationResult:
+        """
+        Cluster duplicate pairs and merge each cluster in its own transaction
+
+        Args:
+            request: Threshold, merge strategy, optional memory scope and dry-run flag
+
+        Returns:
+            ConsolidationResult with the duplicate groups, counts and timings
+
+        Raises:
+            RuntimeError: If the service is read-only and the request would merge
+        """
+        if (
+            not request.dry_run
+            and self.degradation_manager.current_level >= DegradationLevel.READONLY
+        ):
+            raise RuntimeError("Service is in read-only mode")
+
+        result = await self._consolidation_engine().consolidate(request)
+        await self._after_consolidation(result)
+        return result
+
     async def auto_consolidate_duplicates(
-        self, similarity_threshold: float = 0.95, dry_run: bool = True
+        self, similarity_threshold: float = 0.95, dry_run: bool = True, limit: int = 100
     ) -> Dict[str, Any]:
-        """Automatically consolidate duplicate memories"""
+        """
+        Automatically consolidate duplicate memories (clusters from up to ``limit`` pairs)
 
-        duplicates = await self.find_duplicate_memories(similarity_threshold)
+        Duplicate pairs are clustered and each cluster is merged into the
+        survivor picked by the default strategy, so no new memory is created.
+        ``found`` counts duplicate groups rather than pairs, ``consolidated``
+        the merged groups and ``deleted`` the duplicates soft-deleted.
+        """
+        if not dry_run and self.degradation_manager.current_level >= DegradationLevel.READONLY:
+            raise RuntimeError("Service is in read-only mode")
 
-        results = {"found": len(duplicates), "consolidated": 0, "errors": 0, "dry_run": dry_run}
+        result = await self._consolidation_engine(max_pairs=limit).consolidate(
+            ConsolidationRequest(
+                similarity_threshold=similarity_threshold, auto_merge=True, dry_run=dry_run
+            )
+        )
+        await self._after_consolidation(result)
+        return {
+            "found": len(result.duplicate_groups),
+            "consolidated": result.memories_merged,
+            "deleted": result.memories_deleted,
+            "errors": result.errors,
+            "dry_run": dry_run,
+            "groups": [group.model_dump() for group in result.duplicate_groups],
+            "execution_time_ms": result.execution_time_ms,
+            "timings": result.timings,
+        }
 
-        if not dry_run:
-            for memory1_id, memory2_id, similarity in duplicates:
-                try:
-                    await self.consolidate_memories(
-                        source_ids=[memory1_id, memory2_id], consolidation_type="merge"
-                    )
-                    results["consolidated"] += 1
-                except Exception as e:
-                    logger.error(f"Failed to consolidate {memory1_id} and {memory2_id}: {e}")
-                    results["errors"] += 1
+    # ==================== Maintenance Operations ====================
+
+    async def run_maintenance(self) -> Dict[str, Any]:
+        """
+        Purge expired soft-deleted memories and search history and trim the
+        embedding cache, then VACUUM and REINDEX what is bloated
+
+        Thresholds come from Config: tables whose dead-tuple ratio reaches
+        MAINTENANCE_VACUUM_DEAD_RATIO are vacuumed, and the vector indexes are
+        rebuilt once the memories table reaches MAINTENANCE_REINDEX_DEAD_RATIO.
+        """
+        results = {
+            "purged": None,
+            "search_history_purged": 0,
+            "cache_evicted": 0,
+            "vacuumed": [],
+            "reindexed": [],
+        }
+
+        if self.degradation_manager.current_level >= DegradationLevel.READONLY:
+            logger.warning("System in read-only mode, skipping maintenance")
+            return results
+
+        try:
+            results["purged"] = await self.backend.purge_deleted_memories(
+                retention_days=Config.SOFT_DELETE_RETENTION_DAYS,
+                batch_size=Config.MAINTENANCE_PURGE_BATCH_SIZE,
+            )
+            if Config.SEARCH_HISTORY_RETENTION_DAYS > 0:
+                results["search_history_purged"] = await self.backend.purge_search_history(
+                    retention_days=Config.SEARCH_HISTORY_RETENTION_DAYS
+                )
+            results["cache_evicted"] = await self.backend.evict_embedding_cache(
+                Config.EMBEDDING_CACHE_MAX_ROWS
+            )
+
+            health = await self.backend.get_table_health()
+            bloated = [
+                name
+                for name, stats in health["tables"].items()
+                if stats["dead_tuples"] >= Config.MAINTENANCE_MIN_DEAD_TUPLES
+                and stats["dead_ratio"] >= Config.MAINTENANCE_VACUUM_DEAD_RATIO
+            ]
+            memories = health["tables"].get("memories")
+
+            # Rebuild before vacuuming, which would reset the dead-tuple count
+            if (
+                memories
+                and memories["dead_tuples"] >= Config.MAINTENANCE_MIN_DEAD_TUPLES
+                and memories["dead_ratio"] >= Config.MAINTENANCE_REINDEX_DEAD_RATIO
+            ):
+                results["reindexed"] = await self.backend.reindex_vector_indexes()
+            if bloated:
+                results["vacuumed"] = await self.backend.vacuum_tables(bloated)
+        except Exception as e:
+            logger.error(f"Maintenance failed: {e}")
+            results["error"] = str(e)
 
         return results
 
+    async def get_table_health(self) -> Dict[str, Any]:
+        """Get dead-tuple, vacuum and size metrics for the memory tables"""
+        try:
+            health = await self.backend.get_table_health()
+        except Exception as e:
+            logger.error(f"Failed to get table health: {e}")
+            return {"error": str(e)}
+
+        health["thresholds"] = {
+            "vacuum_dead_ratio": Config.MAINTENANCE_VACUUM_DEAD_RATIO,
+            "reindex_dead_ratio": Config.MAINTENANCE_REINDEX_DEAD_RATIO,
+            "min_dead_tuples": Config.MAINTENANCE_MIN_DEAD_TUPLES,
+            "retention_days": Config.SOFT_DELETE_RETENTION_DAYS,
+        }
+        return health
+
     # ==================== Analytics Operations ====================
 
     async def get_statistics(self) -> Dict[str, Any]:
@@ -474,6 +1121,15 @@ class MemoryServicePostgres:
             stats["degradation_level"] = self.degradation_manager.current_level.name
             stats["embeddings_enabled"] = self.enable_embeddings
             stats["embedding_model"] = self.embedding_model
+            stats["embedding_batches"] = self.get_embedding_stats()
+            stats["search_cache"] = self.get_search_cache_stats()
+            stats["text_index"] = self.text_index.get_stats()
+            if self.passage_embedder is not None:
+                stats["passages"] = {
+                    **await self.backend.get_chunk_stats(),
+                    **self.passage_embedder.get_stats(),
+                }
+            stats["search_history"] = self.backend.search_recorder.get_stats()
             return stats
         except Exception as e:
             logger.error(f"Failed to get statistics: {e}")
@@ -501,6 +1157,20 @@ class MemoryServicePostgres:
 
     # ==================== Embedding Operations ====================
 
+    async def _embed_content(
+        self, content: str
+    ) -> Tuple[Optional[List[float]], Optional[List[ChunkRow]]]:
+        """
+        Embed memory content, as passages when it is long
+
+        Returns:
+            (embedding, passage rows); rows are None when chunking is off and
+            empty for content that fits in one passage
+        """
+        if self.passage_embedder is None:
+            return await self._generate_embedding(content), None
+        return await self.passage_embedder.embed(content)
+
     async def _generate_embedding(self, text: str) -> Optional[List[float]]:
         """Generate embedding for text using local models"""
 
@@ -522,110 +1192,208 @@ class MemoryServicePostgres:
                 logger.error("Local embedding client not available")
                 return None
 
-        try:
-            # Add to queue for batching
-            self._embedding_queue.append(text)
-
-            # Process queue if it reaches batch size
-            if len(self._embedding_queue) >= self.embedding_batch_size:
-                return await self._process_embedding_queue()
-
-            # For single embedding, process immediately
-            embedding = await self._local_client.get_embedding(text)
-            if embedding:
-                return embedding
+        if self._embedding_batcher is None:
+            self._embedding_batcher = EmbeddingBatcher(
+                functools.partial(self._local_client.get_embeddings, model=self._text_model),
+                max_batch_size=self.embedding_batch_size,
+                max_wait_ms=Config.EMBEDDING_BATCH_WAIT_MS,
+            )
+            self._embedding_cache = EmbeddingCache(
+                self.backend,
+                model=self._text_model
+                or getattr(self._local_client, "text_embedding_model", self.embedding_model),
+                max_entries=Config.EMBEDDING_CACHE_SIZE,
+                persistent=Config.EMBEDDING_CACHE_PERSISTENT,
+            )
 
-            return response.data[0].embedding
+        # Repeated texts are served from the cache; misses share batched model requests
+        return await self._embedding_cache.get_or_compute(
+            text, lambda: self._embedding_batcher.embed(text)
+        )
 
-        except Exception as e:
-            logger.error(f"Failed to generate embedding: {e}")
-            return None
+    def _model_batcher(self, model: str) -> EmbeddingBatcher:
+        """
+        Embedding batcher for ``model``, independent of the one serving the live model
 
-    async def _process_embedding_queue(self) -> Optional[List[float]]:
-        """Process queued texts for embedding generation"""
+        Used by migrations to embed with the target model; the caller closes it.
+        """
+        from app.utils.local_embedding_client import get_local_client
 
-        if not self._embedding_queue:
-            return None
+        return EmbeddingBatcher(
+            functools.partial(get_local_client().get_embeddings, model=model),
+            max_batch_size=self.embedding_batch_size,
+            max_wait_ms=Config.EMBEDDING_BATCH_WAIT_MS,
+        )
 
+    async def _use_embedding_model(self, model: str):
+        """Embed queries and new memories with ``model`` from now on"""
+        if model == self.embedding_model and model == self._text_model:
+            return
+
+        batcher, self._embedding_batcher = self._embedding_batcher, None
+        self._embedding_cache = None
+        if batcher is not None:
+            await batcher.close()
+
+        self.embedding_model = model
+        self._text_model = model
+        # Vectors from the previous model are not comparable with the new ones
+        self.query_embedding_cache.clear()
+        self.search_cache.clear()
+        # The switch dropped the quantized columns; search must not read them
         try:
-            # Batch generate embeddings
-            # Generate embeddings for all texts in queue
-            embeddings = []
-            for txt in self._embedding_queue:
-                emb = await self._local_client.get_embedding(txt)
-                if emb:
-                    embeddings.append(emb)
-
-            embeddings = [item.embedding for item in response.data]
-
-            # Clear queue and return last embedding
-            self._embedding_queue.clear()
-            return embeddings[-1] if embeddings else None
-
+            await self.backend._refresh_quantization_state()
         except Exception as e:
-            logger.error(f"Failed to process embedding queue: {e}")
-            self._embedding_queue.clear()
-            return None
+            self.backend.quantization_ready = False
+            logger.warning(f"Failed to refresh quantization state: {e}")
+        logger.info(f"Embedding model switched to {model}")
+
+    async def _generate_query_embedding(self, query: str) -> Optional[List[float]]:
+        """Embed a search query, reusing embeddings of recently seen queries"""
+        embedding = self.query_embedding_cache.get(query)
+        if embedding is None:
+            embedding = await self._generate_embedding(query)
+            if embedding is not None:
+                self.query_embedding_cache.put(query, embedding)
+        return embedding
+
+    def get_search_cache_stats(self) -> Dict[str, Any]:
+        """Get query-embedding and search-result cache hit/miss metrics"""
+        return {
+            "query_embeddings": self.query_embedding_cache.get_stats(),
+            "results": self.search_cache.get_stats(),
+        }
+
+    def get_embedding_stats(self) -> Dict[str, Any]:
+        """Get embedding batch-size, wait-time and cache hit/miss metrics"""
+        if self._embedding_batcher is None:
+            return {"requests": 0, "batches": 0}
+        return {**self._embedding_batcher.get_stats(), "cache": self._embedding_cache.get_stats()}
 
     async def generate_embeddings_for_all(
         self, batch_size: int = 20, max_memories: int = 1000
     ) -> Dict[str, Any]:
-        """Generate embeddings for all memories without them"""
+        """
+        Embed up to ``max_memories`` memories that lack a current embedding
 
-        results = {"processed": 0, "success": 0, "errors": 0, "skipped": 0}
+        Runs the resumable backfill in the foreground, so repeated calls
+        continue where the previous one stopped.
 
-        # Get memories without embeddings
-        memories = await self.backend.list_memories(limit=max_memories)
+        Raises:
+            RuntimeError: If a backfill is already running
+        """
+        return await self.embedding_backfill.run(
+            max_memories=max_memories, batch_size=batch_size
+        )
 
-        for memory in memories:
-            if memory.get("has_embedding"):
-                results["skipped"] += 1
-                continue
+    async def start_embedding_backfill(self, reset: bool = False) -> Dict[str, Any]:
+        """
+        Start (or resume) the background embedding backfill
 
-            results["processed"] += 1
+        Args:
+            reset: Start over from the oldest memory instead of the checkpoint
 
-            # Generate embedding
-            embedding = await self._generate_embedding(memory["content"])
+        Returns:
+            Backfill progress
 
-            if embedding:
-                # Update memory with embedding
-                await self.backend.update_memory(memory["id"], {}, new_embedding=embedding)
-                results["success"] += 1
-            else:
-                results["errors"] += 1
+        Raises:
+            RuntimeError: If the service is read-only or embeddings are disabled
+        """
+        if self.degradation_manager.current_level >= DegradationLevel.READONLY:
+            raise RuntimeError("Service is in read-only mode")
+        if not self.enable_embeddings:
+            raise RuntimeError("Embeddings are disabled")
+        return await self.embedding_backfill.start(reset=reset)
 
-            # Log progress
-            if results["processed"] % 10 == 0:
-                logger.info(f"Processed {results['processed']} memories")
+    async def stop_embedding_backfill(self) -> Dict[str, Any]:
+        """Stop the background embedding backfill; it resumes from its checkpoint"""
+        return await self.embedding_backfill.stop()
 
-        return results
+    async def start_embedding_migration(self, target_model: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Start re-embedding every memory with ``target_model`` (or resume the
+        unfinished migration when None)
 
-    # ==================== Helper Methods ====================
+        Search keeps using the current vectors until the new ones cover
+        every memory, then switches over atomically.
 
-    async def _check_for_duplicates(self, memory_id: str, embedding: List[float]):
-        """Check if a new memory is duplicate of existing ones"""
+        Returns:
+            Migration progress
 
-        # Search for similar memories
-        similar = await self.backend.vector_search(
-            embedding=embedding, limit=5, min_similarity=0.95
-        )
+        Raises:
+            RuntimeError: If the service is read-only, embeddings are disabled
+                or a migration to another model is in progress
+        """
+        if self.degradation_manager.current_level >= DegradationLevel.READONLY:
+            raise RuntimeError("Service is in read-only mode")
+        if not self.enable_embeddings:
+            raise RuntimeError("Embeddings are disabled")
+        return await self.embedding_migration.start(target_model)
 
-        # Filter out self
-        similar = [m for m in similar if m["id"] != memory_id]
+    async def stop_embedding_migration(self) -> Dict[str, Any]:
+        """Stop filling the migration; it resumes from its checkpoint"""
+        return await self.embedding_migration.stop()
 
-        if similar:
-            logger.warning(
-                f"Found {len(similar)} potential duplicates for memory {memory_id[:8]}..."
+    async def cancel_embedding_migration(self) -> Dict[str, Any]:
+        """Abandon the migration and drop the vectors it has written"""
+        return await self.embedding_migration.cancel()
+
+    async def get_embedding_migration_status(self) -> Dict[str, Any]:
+        """Get migration progress (coverage, percent, throughput and ETA)"""
+        try:
+            return await self.embedding_migration.get_status()
+        except Exception as e:
+            logger.error(f"Failed to read embedding migration status: {e}")
+            return {"error": str(e)}
+
+    async def _embed_with_switched_model(
+        self, content: str
+    ) -> Tuple[Optional[List[float]], Optional[List[ChunkRow]]]:
+        """Adopt the model a write was rejected for and embed ``content`` with it"""
+        await self.refresh_embedding_model()
+        return await self._embed_content(content)
+
+    async def refresh_embedding_model(self) -> str:
+        """
+        Adopt the model of the last switched migration, which may have run in
+        another process
+
+        Returns:
+            The embedding model now in use
+        """
+        try:
+            model = await self.backend.get_switched_embedding_model()
+        except Exception as e:
+            logger.warning(f"Failed to read the migrated embedding model: {e}")
+            return self.embedding_model
+        if model and model != self.embedding_model:
+            await self._use_embedding_model(model)
+        return self.embedding_model
+
+    async def get_embedding_job_status(self) -> Dict[str, Any]:
+        """Get queued embedding job counts and this process's worker counters"""
+        try:
+            jobs = await self.backend.get_embedding_job_stats(
+                max_attempts=self.embedding_worker.max_attempts
             )
+        except Exception as e:
+            logger.error(f"Failed to read embedding job status: {e}")
+            return {"error": str(e)}
+        return {
+            "async_embeddings": self.async_embeddings,
+            "jobs": jobs,
+            "workers": self.embedding_worker.get_stats(),
+        }
 
-            # Create relationships to mark as similar
-            for sim_memory in similar:
-                await self.backend.create_relationship(
-                    source_id=memory_id,
-                    target_id=sim_memory["id"],
-                    relationship_type="similar",
-                    strength=sim_memory["similarity"],
-                )
+    async def get_embedding_backfill_status(self) -> Dict[str, Any]:
+        """Get embedding backfill progress (checkpoint, remaining, rate limit)"""
+        try:
+            return await self.embedding_backfill.get_status()
+        except Exception as e:
+            logger.error(f"Failed to read embedding backfill status: {e}")
+            return {"error": str(e)}
+
+    # ==================== Helper Methods ====================
 
     async def _generate_consolidation_summary(self, memories: List[Dict[str, Any]]) -> str:
         """Generate a summary for consolidating memories"""
@@ -641,20 +1409,102 @@ class MemoryServicePostgres:
 
         return summary
 
-    async def _fallback_search(self, query: str, limit: int) -> List[Dict[str, Any]]:
-        """Simple fallback search when advanced search fails"""
+    def _use_text_index(self, search_type: str) -> bool:
+        """Whether a search should be answered by the in-process BM25 index"""
+        if not self.text_index.ready:
+            return False
+        available = self.degradation_manager.is_feature_available
+        if not available("persistence"):
+            return True
+        return search_type in ("vector", "hybrid") and not (
+            available("semantic_search") and available("ai_features")
+        )
 
+    async def refresh_text_index(self) -> Dict[str, Any]:
+        """Catch the BM25 index up with writes made by other processes"""
+        if not self.text_index.ready:
+            return {"indexed": 0, "removed": 0}
         try:
-            # Get all memories and do simple string matching
-            memories = await self.backend.list_memories(limit=100)
+            return await self.text_index.refresh()
+        except Exception as e:
+            logger.error(f"Text index refresh failed: {e}")
+            return {"indexed": 0, "removed": 0, "error": str(e)}
+
+    def _consolidation_engine(self, max_pairs: int = 1000) -> ConsolidationEngine:
+        """Engine that queues embeddings for merged content only when workers embed them"""
+        return ConsolidationEngine(
+            self.backend,
+            max_pairs=max_pairs,
+            enqueue_embeddings=self.enable_embeddings and self.async_embeddings,
+        )
+
+    async def _after_consolidation(self, result: ConsolidationResult):
+        """Refresh caches, the text index and merged-content embeddings after merges"""
+        if not result.memories_merged:
+            return
+
+        self.search_cache.invalidate()
+        memory_ids = [
+            memory_id for group in result.duplicate_groups for memory_id in group.memory_ids
+        ]
+        try:
+            await self.text_index.reindex(memory_ids)
+        except Exception as e:
+            logger.warning(f"Text index update after consolidation failed: {e}")
+
+        if (
+            self.enable_embeddings
+            and not self.async_embeddings
+            and self.degradation_manager.is_feature_available("ai_features")
+        ):
+            for group in result.duplicate_groups:
+                if group.metadata.get("content_merged"):
+                    await self._reembed_memory(group.metadata["kept"])
+
+    async def _reembed_memory(self, memory_id: str):
+        """Embed a memory's current content in place (failures are logged)"""
+        try:
+            memory = await self.backend.get_memory(memory_id, track=False)
+            if memory is None:
+                return
+            embedding, chunks = await self._embed_content(memory["content"])
+            if embedding is not None:
+                await self.backend.update_memory(
+                    memory_id,
+                    {},
+                    embedding,
+                    new_chunks=chunks,
+                    embedding_model=self.embedding_model,
+                )
+        except Exception as e:
+            logger.warning(f"Failed to re-embed memory {memory_id}: {e}")
 
+    async def _fallback_search(self, query: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Simple fallback search when advanced search fails
+
+        Uses the BM25 text index once it is ready. Before that, the newest
+        ``FALLBACK_SEARCH_MAX_SCAN`` memories are substring-matched, so a
+        degraded search never scans the whole corpus in Python.
+        """
+
+        if self.text_index.ready:
+            return self.text_index.search(query, limit)
+
+        try:
             query_lower = query.lower()
             results = []
-
-            for memory in memories:
-                if query_lower in memory.get("content", "").lower():
-                    results.append(memory)
-                    if len(results) >= limit:
+            scanned = 0
+
+            async with aclosing(self.backend.iterate_memories(batch_size=500)) as batches:
+                async for batch in batches:
+                    for memory in batch:
+                        if query_lower in memory.get("content", "").lower():
+                            results.append(memory)
+                            if len(results) >= limit:
+                                return results
+                    scanned += len(batch)
+                    if scanned >= Config.FALLBACK_SEARCH_MAX_SCAN:
                         break
 
             return results
@@ -0,0 +1,147 @@
+"""
+Passage chunking for long memories
+Splits content into overlapping token-bounded passages and embeds them in parallel
+"""
+
+import asyncio
+import re
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Words and single punctuation marks; close enough to model tokens to bound input size
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+# Stored per passage: (chunk_index, start_char, end_char, embedding)
+ChunkRow = Tuple[int, int, int, Sequence[float]]
+
+
+class Passage(NamedTuple):
+    """One window of a memory's content; ``start``/``end`` are character offsets"""
+
+    index: int
+    start: int
+    end: int
+    text: str
+
+
+def split_passages(text: str, max_tokens: int = 256, overlap_tokens: int = 32) -> List[Passage]:
+    """
+    Split ``text`` into overlapping windows of at most ``max_tokens`` tokens
+
+    Consecutive passages share ``overlap_tokens`` tokens so a sentence cut at
+    a boundary is whole in one of them. Passages keep the original text
+    between their first and last token.
+
+    Returns:
+        Passages in order; empty when the text fits in a single window
+    """
+    max_tokens = max(1, max_tokens)
+    step = max(1, max_tokens - max(0, overlap_tokens))
+    spans = [match.span() for match in _TOKEN_RE.finditer(text)]
+    if len(spans) <= max_tokens:
+        return []
+
+    passages = []
+    first = 0
+    while True:
+        last = min(first + max_tokens, len(spans)) - 1
+        start, end = spans[first][0], spans[last][1]
+        passages.append(Passage(len(passages), start, end, text[start:end]))
+        if last == len(spans) - 1:
+            return passages
+        first += step
+
+
+def mean_embedding(embeddings: Sequence[Sequence[float]]) -> List[float]:
+    """Unit-length mean of passage embeddings, used as the memory-level vector"""
+    mean = np.asarray(embeddings, dtype=np.float32).mean(axis=0)
+    norm = float(np.linalg.norm(mean))
+    return (mean / norm if norm else mean).tolist()
+
+
+class PassageEmbedder:
+    """
+    Embeds memory content, passage by passage when it is long
+
+    Short content is embedded whole, as before. Long content is split with
+    ``split_passages`` and every passage is embedded concurrently, so the
+    embedding batcher can pack them into multi-input model calls instead of
+    sending one huge input. The memory-level vector is the normalized mean
+    of the passage vectors. At most ``concurrency`` passages are in flight
+    across all memories, so a burst of long documents cannot flood the model.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[str], Awaitable[Optional[List[float]]]],
+        max_tokens: int = 256,
+        overlap_tokens: int = 32,
+        concurrency: int = 16,
+    ):
+        """
+        Initialize the embedder
+
+        Args:
+            embed: Coroutine embedding one text (None on failure)
+            max_tokens: Most tokens per passage
+            overlap_tokens: Tokens shared by consecutive passages
+            concurrency: Passage embeddings in flight at once
+        """
+        self.embed_text = embed
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+        self.concurrency = max(1, concurrency)
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._stats = {"chunked": 0, "passages": 0, "failed": 0}
+
+    def split(self, text: str) -> List[Passage]:
+        """Passages of ``text`` with the configured window (empty when it is short)"""
+        return split_passages(text, self.max_tokens, self.overlap_tokens)
+
+    async def embed(self, text: str) -> Tuple[Optional[List[float]], List[ChunkRow]]:
+        """
+        Embed ``text`` and its passages
+
+        Returns:
+            (memory embedding, chunk rows); the embedding is None if any
+            passage failed, so the memory is retried as a whole
+        """
+        passages = self.split(text)
+        if not passages:
+            return await self.embed_text(text), []
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def embed_passage(passage: Passage) -> Optional[List[float]]:
+            async with self._semaphore:
+                return await self.embed_text(passage.text)
+
+        embeddings = await asyncio.gather(*(embed_passage(passage) for passage in passages))
+        if any(embedding is None for embedding in embeddings):
+            self._stats["failed"] += 1
+            logger.warning(f"Embedding failed for some of {len(passages)} passages")
+            return None, []
+
+        self._stats["chunked"] += 1
+        self._stats["passages"] += len(passages)
+        rows = [
+            (passage.index, passage.start, passage.end, embedding)
+            for passage, embedding in zip(passages, embeddings)
+        ]
+        return mean_embedding(embeddings), rows
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get chunking settings and counters"""
+        return {
+            **self._stats,
+            "max_tokens": self.max_tokens,
+            "overlap_tokens": self.overlap_tokens,
+            "concurrency": self.concurrency,
+        }
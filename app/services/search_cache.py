@@ -0,0 +1,208 @@
+"""
+Search caches
+Bounded TTL/LRU caches of query embeddings and of search results; results are
+invalidated by per-container write versions
+"""
+
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from app.services.embedding_cache import normalize_text
+
+
+class QueryEmbeddingCache:
+    """
+    In-process TTL/LRU cache of query embeddings keyed by normalized query text
+
+    Sits in front of the content-hash embedding cache so repeated queries skip
+    hashing, the embedding_cache table and the model. Embeddings do not depend
+    on stored memories, so writes never invalidate it; the TTL only bounds how
+    long a model swap in LM Studio can go unnoticed.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 600.0):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: LRU capacity (0 disables caching)
+            ttl_seconds: Longest an embedding is served
+        """
+        self.max_entries = max(0, max_entries)
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[str, Tuple[float, List[float]]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def get(self, query: str) -> Optional[List[float]]:
+        """Return the cached embedding for ``query`` if it has not expired"""
+        if self.max_entries == 0:
+            return None
+
+        key = normalize_text(query)
+        entry = self._entries.get(key)
+        if entry is not None and time.monotonic() >= entry[0]:
+            del self._entries[key]
+            self._stats["expired"] += 1
+            entry = None
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry[1]
+
+    def put(self, query: str, embedding: List[float]) -> None:
+        """Store the embedding for ``query``"""
+        if self.max_entries == 0:
+            return
+
+        key = normalize_text(query)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss, expiry and eviction counters"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+class SearchResultCache:
+    """
+    In-process cache of search results keyed by the full search request
+
+    Every entry remembers the write version of the container it searched (and
+    the global epoch) when the search started. Writes bump those versions, so a
+    result computed before a write is never served after it, even if it was
+    stored later. The TTL bounds staleness from writes this process does not
+    see (other processes, access counters, background jobs).
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 30.0):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: LRU capacity (0 disables caching)
+            ttl_seconds: Longest an entry is served
+        """
+        self.max_entries = max(0, max_entries)
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: "OrderedDict[Hashable, Tuple[float, Tuple[int, int], Any]]" = OrderedDict()
+        self._epoch = 0
+        self._versions: Dict[str, int] = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "expired": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    @staticmethod
+    def make_key(
+        query: str,
+        search_type: str,
+        limit: int,
+        filters: Optional[Dict[str, Any]] = None,
+        **options: Any,
+    ) -> Hashable:
+        """Build a cache key from the normalized query and every option that shapes results"""
+        return (
+            normalize_text(query),
+            search_type,
+            limit,
+            json.dumps(filters or {}, sort_keys=True, default=str),
+            tuple(sorted(options.items())),
+        )
+
+    def version(self, container_id: str = "default") -> Tuple[int, int]:
+        """Current (epoch, container version); capture it before running a search"""
+        return self._epoch, self._versions.get(container_id, 0)
+
+    def get(self, key: Hashable, container_id: str = "default") -> Optional[Any]:
+        """Return the cached value if it is fresh and no write happened since it was computed"""
+        if not self.enabled:
+            return None
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+
+        expires_at, version, value = entry
+        if version != self.version(container_id):
+            del self._entries[key]
+            self._stats["stale"] += 1
+            self._stats["misses"] += 1
+            return None
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return value
+
+    def put(self, key: Hashable, value: Any, version: Tuple[int, int]) -> None:
+        """Store a value computed at ``version``; dropped at once if a write raced it"""
+        if not self.enabled:
+            return
+
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, version, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def invalidate(self, container_id: Optional[str] = None) -> None:
+        """Record a write to ``container_id`` (or to unknown containers when None)"""
+        if container_id is None:
+            self._epoch += 1
+        else:
+            self._versions[container_id] = self._versions.get(container_id, 0) + 1
+        self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        """Drop all entries"""
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss, staleness and eviction counters"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+def copy_results(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Shallow-copy result rows so callers cannot mutate cached entries"""
+    return [dict(result) for result in results]
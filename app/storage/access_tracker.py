@@ -0,0 +1,130 @@
+"""
+Write-behind access tracking for memories
+Aggregates read hits in process and applies them in one set-based UPDATE
+"""
+
+import asyncio
+import uuid
+from collections import Counter
+from typing import Any, Dict, Optional
+
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class AccessTracker:
+    """
+    Buffers per-memory access counts and flushes them periodically
+
+    Reads call ``record`` instead of issuing an UPDATE, so a GET no longer
+    takes a row lock on popular memories. Hits are flushed every
+    ``flush_interval`` seconds, as soon as ``flush_threshold`` distinct
+    memories are pending, and once more on shutdown.
+    """
+
+    def __init__(self, backend, flush_interval: float = 5.0, flush_threshold: int = 1000):
+        """
+        Initialize the tracker
+
+        Args:
+            backend: PostgresUnifiedBackend used to acquire connections
+            flush_interval: Seconds between periodic flushes
+            flush_threshold: Distinct pending memories that trigger an early flush
+        """
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+
+        self._pending: Counter = Counter()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._threshold_task: Optional[asyncio.Task] = None
+        self._stats = {"recorded": 0, "flushed": 0, "flushes": 0, "errors": 0}
+
+    def record(self, memory_id: uuid.UUID):
+        """Record one access to a memory (never blocks on the database)"""
+        self._pending[memory_id] += 1
+        self._stats["recorded"] += 1
+
+        if len(self._pending) >= self.flush_threshold and (
+            self._threshold_task is None or self._threshold_task.done()
+        ):
+            self._threshold_task = asyncio.create_task(self.flush())
+
+    async def flush(self) -> int:
+        """
+        Apply all pending hits in a single UPDATE ... FROM unnest(...)
+
+        Returns:
+            Number of memories updated
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, Counter()
+            # Sorted ids give concurrent flushers a consistent lock order
+            ids = sorted(pending)
+            hits = [pending[memory_id] for memory_id in ids]
+
+            try:
+                # Counter updates must not pin reads to the primary
+                async with self.backend.acquire(mark_write=False) as conn:
+                    status = await conn.execute(
+                        """
+                        UPDATE memories AS m
+                        SET access_count = m.access_count + a.hits,
+                            last_accessed_at = NOW()
+                        FROM unnest($1::uuid[], $2::int[]) AS a(id, hits)
+                        WHERE m.id = a.id
+                    """,
+                        ids,
+                        hits,
+                    )
+            except Exception as e:
+                # Put the hits back so they are retried on the next flush
+                self._pending.update(pending)
+                self._stats["errors"] += 1
+                logger.error(f"Failed to flush memory access counts: {e}")
+                return 0
+
+            updated = int(status.split()[-1])
+            self._stats["flushed"] += sum(hits)
+            self._stats["flushes"] += 1
+            logger.debug(f"Flushed access counts for {updated} memories")
+            return updated
+
+    async def start(self):
+        """Start the periodic flush task"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic flush task and flush what is left"""
+        for task in (self._task, self._threshold_task):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._threshold_task = None
+
+        await self.flush()
+
+    async def _run(self):
+        """Periodically flush pending access counts"""
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Access tracker error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tracker counters"""
+        return {**self._stats, "pending": len(self._pending)}
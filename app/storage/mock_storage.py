@@ -5,11 +5,14 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 
+from app.storage.text_index import BM25Index
+
 class MockStorage:
     """In-memory storage with JSON persistence for development"""
     
     def __init__(self, persist_path: str = "data/mock_memories.json"):
         self.memories: Dict[str, Dict] = {}
+        self.text_index = BM25Index()
         self.persist_path = Path(persist_path)
         self.persist_path.parent.mkdir(parents=True, exist_ok=True)
         self._load_from_disk()
@@ -30,6 +33,8 @@ class MockStorage:
                 with open(self.persist_path, 'r') as f:
                     data = json.load(f)
                     self.memories = {item['id']: item for item in data}
+                for memory in self.memories.values():
+                    self.text_index.add(memory['id'], memory.get('content', ''))
                 print(f"📂 Loaded {len(self.memories)} memories from {self.persist_path}")
             except Exception as e:
                 print(f"⚠️ Could not load memories: {e}")
@@ -60,6 +65,7 @@ class MockStorage:
             "embedding": data.get("embedding", [0.0] * 1536)  # Mock embedding
         }
         self.memories[memory_id] = memory
+        self.text_index.add(memory_id, memory["content"])
         self._save_to_disk()
         return memory
     
@@ -74,6 +80,8 @@ class MockStorage:
             memory.update(data)
             memory["updated_at"] = datetime.utcnow().isoformat()
             self.memories[memory_id] = memory
+            if "content" in data:
+                self.text_index.add(memory_id, memory.get("content", ""))
             self._save_to_disk()
             return memory
         return None
@@ -82,6 +90,7 @@ class MockStorage:
         """Delete a memory"""
         if memory_id in self.memories:
             del self.memories[memory_id]
+            self.text_index.remove(memory_id)
             self._save_to_disk()
             return True
         return False
@@ -93,18 +102,11 @@ class MockStorage:
         return memories[offset:offset + limit]
     
     async def search_memories(self, query: str, limit: int = 10) -> List[Dict]:
-        """Simple text search in memories"""
-        results = []
-        query_lower = query.lower()
-        
-        for memory in self.memories.values():
-            content_lower = memory.get("content", "").lower()
-            if query_lower in content_lower:
-                results.append(memory)
-        
-        # Sort by relevance (simple: how many times query appears)
-        results.sort(key=lambda x: x.get("content", "").lower().count(query_lower), reverse=True)
-        return results[:limit]
+        """BM25 text search over the in-memory inverted index"""
+        return [
+            {**self.memories[memory_id], "score": score}
+            for memory_id, score in self.text_index.search(query, limit)
+        ]
     
     async def get_statistics(self) -> Dict:
         """Get storage statistics"""
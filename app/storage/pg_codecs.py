@@ -0,0 +1,100 @@
+"""
+Binary asyncpg type codecs for pgvector and JSONB
+Registered per connection from the pool ``init`` hook so vectors travel as
+packed float32 and JSONB is (de)serialized by orjson when available
+"""
+
+import json
+import struct
+from typing import Any, Union
+
+import asyncpg
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional speedup
+    orjson = None
+
+# pgvector binary wire format: uint16 dim, uint16 unused, dim x float32 (big-endian)
+_VECTOR_HEADER = struct.Struct(">HH")
+_VECTOR_DTYPE = np.dtype(">f4")
+
+# JSONB binary wire format is a version byte followed by the JSON text
+_JSONB_VERSION = b"\x01"
+
+
+def encode_vector(value: Any) -> bytes:
+    """Encode a NumPy array or sequence of floats as a binary pgvector value"""
+    array = np.asarray(value, dtype=_VECTOR_DTYPE)
+    if array.ndim != 1:
+        raise ValueError(f"Expected a 1-D embedding, got shape {array.shape}")
+    return _VECTOR_HEADER.pack(array.shape[0], 0) + array.tobytes()
+
+
+def decode_vector(data: bytes) -> np.ndarray:
+    """Decode a binary pgvector value into a read-only NumPy view (no copy)"""
+    dim, _ = _VECTOR_HEADER.unpack_from(data)
+    return np.frombuffer(data, dtype=_VECTOR_DTYPE, count=dim, offset=_VECTOR_HEADER.size)
+
+
+def _json_default(value: Any) -> Any:
+    """Fallback serializer for values the JSON library does not handle"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def dumps_json(value: Any) -> bytes:
+    """Serialize a value to JSON bytes using the fastest available library"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_json_default)
+    return json.dumps(value, default=_json_default, separators=(",", ":")).encode()
+
+
+def loads_json(data: Union[bytes, memoryview, str]) -> Any:
+    """Deserialize JSON text or bytes using the fastest available library"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data if isinstance(data, str) else bytes(data))
+
+
+def encode_jsonb(value: Any) -> bytes:
+    """Encode a Python value as a binary JSONB value"""
+    return _JSONB_VERSION + dumps_json(value)
+
+
+def decode_jsonb(data: bytes) -> Any:
+    """Decode a binary JSONB value"""
+    return loads_json(memoryview(data)[1:])
+
+
+async def register_codecs(conn: asyncpg.Connection) -> None:
+    """
+    Register binary codecs on a connection (use as the pool ``init`` hook)
+
+    The vector codec is only registered when the pgvector type exists, so a
+    connection opened before ``CREATE EXTENSION vector`` still works; the pool
+    is expired after extensions are created so new connections pick it up.
+    """
+    await conn.set_type_codec(
+        "jsonb",
+        schema="pg_catalog",
+        encoder=encode_jsonb,
+        decoder=decode_jsonb,
+        format="binary",
+    )
+
+    vector_schema = await conn.fetchval(
+        "SELECT typnamespace::regnamespace::text FROM pg_type WHERE typname = 'vector'"
+    )
+    if vector_schema:
+        await conn.set_type_codec(
+            "vector",
+            schema=vector_schema,
+            encoder=encode_vector,
+            decoder=decode_vector,
+            format="binary",
+        )
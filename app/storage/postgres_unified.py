@@ -3,19 +3,407 @@ PostgreSQL Unified Storage Backend with pgvector
 Provides vector search, full-text search, and JSONB storage in a single database
 """
 
-import json
+import base64
 import os
+import re
+import time
 import uuid
 from contextlib import asynccontextmanager
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 import asyncpg
+import numpy as np
 
+from app.storage.access_tracker import AccessTracker
+from app.storage.pg_codecs import dumps_json, loads_json, register_codecs
+from app.storage.search_recorder import SearchHistoryRecorder
 from app.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Embeddings may be passed as NumPy arrays or plain float sequences; the binary
+# pgvector codec registered in pg_codecs handles both
+Embedding = Union[np.ndarray, Sequence[float]]
+
+# Passages of one memory as (chunk_index, start_char, end_char, embedding)
+ChunkRows = Sequence[Tuple[int, int, int, Embedding]]
+
+# Columns written by the bulk COPY path, in staging-table order
+_BULK_INSERT_COLUMNS = (
+    "id",
+    "content",
+    "memory_type",
+    "importance_score",
+    "tags",
+    "metadata",
+    "embedding",
+    "embedding_model",
+    "embedding_generated_at",
+    "container_id",
+)
+
+# Projection profiles for memory reads. "summary" returns a content preview and
+# never the vector, "full" returns the whole content, "with_embedding" adds the
+# vector. Anything but "with_embedding" only reports whether a vector exists.
+PROJECTIONS = ("summary", "full", "with_embedding")
+SUMMARY_CONTENT_CHARS = 200
+# Route validation pattern for ``fields`` parameters
+FIELDS_PATTERN = f"^({'|'.join(PROJECTIONS)})$"
+_PROJECTION_COLUMNS = (
+    "id",
+    "memory_type",
+    "importance_score",
+    "tags",
+    "metadata",
+    "access_count",
+    "created_at",
+    "updated_at",
+    "last_accessed_at",
+    "container_id",
+    "version",
+    "embedding_model",
+    "embedding_generated_at",
+)
+
+# Memory fields of hybrid_search results (scores are added per result)
+_HYBRID_RESULT_FIELDS = (
+    "id",
+    "content",
+    "content_length",
+    "memory_type",
+    "importance_score",
+    "tags",
+    "metadata",
+    "created_at",
+    "embedding",
+)
+
+# Filters and columns accepted by iterate_memories
+_ITERATE_FILTERS = ("memory_type", "tags", "min_importance", "has_embedding")
+_ITERATE_COLUMNS = frozenset(
+    (
+        *_BULK_INSERT_COLUMNS,
+        "access_count",
+        "last_accessed_at",
+        "created_at",
+        "updated_at",
+        "version",
+    )
+)
+
+
+# Idempotent DDL applied at startup. Indexes are built CONCURRENTLY so a first
+# start against a populated database does not block writes.
+_SCHEMA_STATEMENTS = (
+    # Keyset pagination on (created_at, id) for list_memories
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memories_container_created_id
+    ON memories (container_id, created_at DESC, id DESC)
+    WHERE deleted_at IS NULL
+    """,
+    # One index per edge direction so graph traversal never needs an OR join
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memory_relationships_source_strength
+    ON memory_relationships (source_memory_id, strength DESC)
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memory_relationships_target_strength
+    ON memory_relationships (target_memory_id, strength DESC)
+    """,
+    # Progress markers for incremental background jobs
+    """
+    CREATE TABLE IF NOT EXISTS maintenance_watermarks (
+        job TEXT PRIMARY KEY,
+        watermark TIMESTAMPTZ NOT NULL,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+    """,
+    # Near-duplicate pairs found by ANN sweeps (memory1_id < memory2_id)
+    """
+    CREATE TABLE IF NOT EXISTS memory_duplicate_candidates (
+        memory1_id UUID NOT NULL REFERENCES memories(id) ON DELETE CASCADE,
+        memory2_id UUID NOT NULL REFERENCES memories(id) ON DELETE CASCADE,
+        similarity REAL NOT NULL,
+        detected_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (memory1_id, memory2_id),
+        CHECK (memory1_id < memory2_id)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_duplicate_candidates_memory2
+    ON memory_duplicate_candidates (memory2_id)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_duplicate_candidates_similarity
+    ON memory_duplicate_candidates (similarity DESC)
+    """,
+    # Changed-since-watermark scans for incremental sweeps
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memories_updated_id
+    ON memories (updated_at, id)
+    WHERE deleted_at IS NULL
+    """,
+    # Oldest-first lookup of soft-deleted rows for the retention purge
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memories_deleted_at
+    ON memories (deleted_at)
+    WHERE deleted_at IS NOT NULL
+    """,
+    # Embeddings keyed by model and sha256 of the normalized text
+    """
+    CREATE TABLE IF NOT EXISTS embedding_cache (
+        model TEXT NOT NULL,
+        content_hash BYTEA NOT NULL,
+        embedding vector NOT NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        last_used_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (model, content_hash)
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_embedding_cache_last_used
+    ON embedding_cache (last_used_at)
+    """,
+    # Oldest-first keyset walk for the embedding backfill
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memories_created_id
+    ON memories (created_at, id)
+    WHERE deleted_at IS NULL
+    """,
+    # Transactional outbox of memories waiting for an embedding. One row per
+    # memory; version is the memory version whose content must be embedded.
+    # Jobs out of attempts are kept for inspection with available_at set to
+    # 'infinity' and no longer count as pending.
+    """
+    CREATE TABLE IF NOT EXISTS embedding_jobs (
+        memory_id UUID PRIMARY KEY REFERENCES memories(id) ON DELETE CASCADE,
+        version INTEGER NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        last_error TEXT,
+        available_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_embedding_jobs_available
+    ON embedding_jobs (available_at)
+    """,
+    # One resumable backfill checkpoint per target embedding model
+    """
+    CREATE TABLE IF NOT EXISTS embedding_backfill_jobs (
+        model TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        cursor_created_at TIMESTAMPTZ,
+        cursor_id UUID,
+        total BIGINT NOT NULL DEFAULT 0,
+        processed BIGINT NOT NULL DEFAULT 0,
+        embedded BIGINT NOT NULL DEFAULT 0,
+        failed BIGINT NOT NULL DEFAULT 0,
+        last_error TEXT,
+        started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        finished_at TIMESTAMPTZ
+    )
+    """,
+    # Search telemetry, written in batches by SearchHistoryRecorder
+    """
+    CREATE TABLE IF NOT EXISTS search_history (
+        id BIGSERIAL PRIMARY KEY,
+        query TEXT NOT NULL,
+        query_embedding vector,
+        results_count INTEGER NOT NULL DEFAULT 0,
+        selected_memory_ids UUID[] NOT NULL DEFAULT '{}',
+        search_type TEXT,
+        metadata JSONB NOT NULL DEFAULT '{}',
+        container_id TEXT NOT NULL DEFAULT 'default',
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    )
+    """,
+    # Oldest-first batches for the search history retention purge
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_search_history_created_at
+    ON search_history (created_at)
+    """,
+    # Passage embeddings of long memories; the text is the memory content
+    # between start_char and end_char. The ANN index is built by
+    # create_chunk_index once the vector dimension is known.
+    """
+    CREATE TABLE IF NOT EXISTS memory_chunks (
+        memory_id UUID NOT NULL REFERENCES memories(id) ON DELETE CASCADE,
+        chunk_index INTEGER NOT NULL,
+        start_char INTEGER NOT NULL,
+        end_char INTEGER NOT NULL,
+        embedding vector NOT NULL,
+        created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        PRIMARY KEY (memory_id, chunk_index)
+    )
+    """,
+    # One row per re-embedding migration; at most one is filling at a time
+    """
+    CREATE TABLE IF NOT EXISTS embedding_migrations (
+        target_model TEXT PRIMARY KEY,
+        source_model TEXT,
+        status TEXT NOT NULL,
+        dimensions INTEGER NOT NULL,
+        cursor_created_at TIMESTAMPTZ,
+        cursor_id UUID,
+        embedded BIGINT NOT NULL DEFAULT 0,
+        failed BIGINT NOT NULL DEFAULT 0,
+        last_error TEXT,
+        started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+        switched_at TIMESTAMPTZ
+    )
+    """,
+)
+
+# Tables covered by health reporting and VACUUM in the maintenance job
+MAINTAINED_TABLES = (
+    "memories",
+    "memory_relationships",
+    "memory_duplicate_candidates",
+    "embedding_cache",
+    "search_history",
+    "memory_chunks",
+)
+
+
+# Survivor selection for merge_duplicate_group (values of MergeStrategy)
+MERGE_STRATEGIES = ("keep_newest", "keep_oldest", "keep_highest_importance", "merge_content")
+
+# Name of the ANN index managed by create_vector_index
+VECTOR_INDEX_NAME = "idx_memories_embedding_ann"
+
+# Name of the passage ANN index managed by create_chunk_index
+CHUNK_INDEX_NAME = "idx_memory_chunks_embedding_ann"
+
+# Embedding columns of memories and their shadow copies filled by a migration
+MIGRATION_COLUMNS = (
+    ("embedding", "embedding_next"),
+    ("embedding_model", "embedding_next_model"),
+    ("embedding_generated_at", "embedding_next_generated_at"),
+)
+
+# Migrations still filling their shadow column (at most one at a time)
+ACTIVE_MIGRATION_STATUSES = ("running", "paused", "failed")
+
+# Advisory lock key held by the process filling a migration
+EMBEDDING_MIGRATION_LOCK_KEY = 725_025
+
+# SQLSTATE of the switch's guard rejecting a vector from another model
+EMBEDDING_MODEL_MISMATCH = "SB001"
+
+# pgvector search-accuracy settings per recall hint. "exact" is handled
+# separately: it disables index scans so the ORDER BY is an exact KNN scan.
+RECALL_PROFILES: Dict[str, Dict[str, int]] = {
+    "fast": {"hnsw.ef_search": 40, "ivfflat.probes": 1},
+    "balanced": {"hnsw.ef_search": 100, "ivfflat.probes": 10},
+    "high": {"hnsw.ef_search": 400, "ivfflat.probes": 40},
+}
+RECALL_HINTS = (*RECALL_PROFILES, "exact")
+# Largest hnsw.ef_search pgvector accepts
+HNSW_MAX_EF_SEARCH = 1000
+# Route validation pattern for ``recall`` parameters
+RECALL_PATTERN = f"^({'|'.join(RECALL_HINTS)})$"
+
+# Optional quantized first-stage columns. Each mode has its own column,
+# HNSW index and distance operator; "{vector}" is replaced by a vector
+# expression. halfvec halves index memory, binary cuts it 32x.
+QUANTIZATION_MODES: Dict[str, Dict[str, str]] = {
+    "halfvec": {
+        "column": "embedding_half",
+        "type": "halfvec({dims})",
+        "quantize": "{vector}::halfvec",
+        "opclass": "halfvec_cosine_ops",
+        "operator": "<=>",
+    },
+    "binary": {
+        "column": "embedding_bits",
+        "type": "bit({dims})",
+        "quantize": "binary_quantize({vector})",
+        "opclass": "bit_hamming_ops",
+        "operator": "<~>",
+    },
+}
+
+
+def is_embedding_model_mismatch(error: BaseException) -> bool:
+    """Whether ``error`` is the guard rejecting a vector from a model other than the switched one"""
+    return getattr(error, "sqlstate", None) == EMBEDDING_MODEL_MISMATCH
+
+
+def projection_sql(
+    projection: str = "full", alias: str = "", content_chars: int = SUMMARY_CONTENT_CHARS
+) -> str:
+    """
+    Build the SELECT list for a projection profile
+
+    Args:
+        projection: One of PROJECTIONS
+        alias: Table alias to qualify columns with
+        content_chars: Preview length for the summary profile
+
+    Raises:
+        ValueError: If the projection is unknown
+    """
+    if projection not in PROJECTIONS:
+        raise ValueError(f"Unknown projection {projection!r}; expected one of {PROJECTIONS}")
+
+    prefix = f"{alias}." if alias else ""
+    columns = [f"{prefix}{column}" for column in _PROJECTION_COLUMNS]
+    columns.append(f"{prefix}embedding IS NOT NULL AS has_embedding")
+    columns.append(
+        "EXISTS (SELECT 1 FROM embedding_jobs j "
+        f"WHERE j.memory_id = {alias or 'memories'}.id "
+        "AND j.available_at < 'infinity') AS embedding_pending"
+    )
+
+    if projection == "summary":
+        columns.append(f"left({prefix}content, {int(content_chars)}) AS content")
+        columns.append(f"length({prefix}content) AS content_length")
+    else:
+        columns.append(f"{prefix}content")
+
+    if projection == "with_embedding":
+        columns.append(f"{prefix}embedding")
+
+    return ", ".join(columns)
+
+
+def _record_to_plain_dict(row: asyncpg.Record) -> Dict[str, Any]:
+    """Convert a projected row to a dict, with UUIDs as strings"""
+    return {
+        key: str(value) if isinstance(value, uuid.UUID) else value for key, value in row.items()
+    }
+
+
+def encode_cursor(memory: Dict[str, Any]) -> str:
+    """Build an opaque keyset cursor from the last memory of a page"""
+    payload = dumps_json([memory["created_at"], memory["id"]])
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Decode a keyset cursor into its (created_at, id) position"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, memory_id = loads_json(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), uuid.UUID(memory_id)
+    except Exception as e:
+        raise ValueError(f"Invalid pagination cursor: {cursor!r}") from e
+
 
 class PostgresUnifiedBackend:
     """
@@ -27,6 +415,18 @@ class PostgresUnifiedBackend:
         connection_string: Optional[str] = None,
         pool_size: int = 20,
         max_inactive_connection_lifetime: float = 300.0,
+        access_flush_interval: float = 5.0,
+        access_flush_threshold: int = 1000,
+        read_connection_string: Optional[str] = None,
+        read_pool_size: Optional[int] = None,
+        read_your_writes_window: float = 2.0,
+        exact_scan_threshold: int = 10000,
+        quantization: Optional[str] = None,
+        rerank_factor: int = 4,
+        search_history_flush_interval: float = 5.0,
+        search_history_buffer_size: int = 10000,
+        chunk_search: bool = False,
+        chunk_search_factor: int = 4,
     ):
         """
         Initialize PostgreSQL backend with connection pooling
@@ -35,13 +435,60 @@ class PostgresUnifiedBackend:
             connection_string: PostgreSQL connection string
             pool_size: Maximum number of connections in pool
             max_inactive_connection_lifetime: Max idle time for connections
+            access_flush_interval: Seconds between write-behind access count flushes
+            access_flush_threshold: Pending memories that trigger an early flush
+            read_connection_string: Replica DSN for read-only queries
+                (``DATABASE_READ_URL``); reads use the primary when unset
+            read_pool_size: Maximum connections in the read pool (defaults to pool_size)
+            read_your_writes_window: Seconds after a write during which reads
+                stay on the primary so they see that write
+            exact_scan_threshold: Below this many memories, searches without a
+                recall hint use an exact scan instead of the ANN index
+            quantization: 'halfvec' or 'binary' to retrieve vector search
+                candidates from a quantized column; None searches full vectors
+            rerank_factor: Candidates fetched per requested result before the
+                exact re-rank against full vectors
+            search_history_flush_interval: Seconds between batched search_history writes
+            search_history_buffer_size: Searches buffered before new ones are dropped
+            chunk_search: Also match memories by their best passage in
+                memory_chunks during vector and hybrid search
+            chunk_search_factor: Passage hits fetched per requested result,
+                since several passages of one memory can match
         """
+        if quantization is not None and quantization not in QUANTIZATION_MODES:
+            raise ValueError(
+                f"Unknown quantization {quantization!r}, "
+                f"expected one of {tuple(QUANTIZATION_MODES)}"
+            )
+
         self.connection_string = connection_string or os.getenv(
             "DATABASE_URL", "postgresql://localhost/second_brain"
         )
+        self.read_connection_string = read_connection_string or os.getenv("DATABASE_READ_URL")
         self.pool_size = pool_size
+        self.read_pool_size = read_pool_size or pool_size
         self.max_inactive_lifetime = max_inactive_connection_lifetime
+        self.read_your_writes_window = read_your_writes_window
         self.pool: Optional[asyncpg.Pool] = None
+        self.read_pool: Optional[asyncpg.Pool] = None
+        self._last_write_at = float("-inf")
+        self.exact_scan_threshold = exact_scan_threshold
+        self._row_estimate = 0
+        self._row_estimate_at = float("-inf")
+        self.quantization = quantization
+        self.rerank_factor = max(rerank_factor, 1)
+        self.chunk_search = chunk_search
+        self.chunk_search_factor = max(chunk_search_factor, 1)
+        # Quantized search is only used once its column is backfilled and indexed
+        self.quantization_ready = False
+        self.access_tracker = AccessTracker(
+            self, flush_interval=access_flush_interval, flush_threshold=access_flush_threshold
+        )
+        self.search_recorder = SearchHistoryRecorder(
+            self,
+            flush_interval=search_history_flush_interval,
+            max_buffer=search_history_buffer_size,
+        )
 
     async def initialize(self):
         """Initialize connection pool and ensure schema exists"""
@@ -52,9 +499,11 @@ class PostgresUnifiedBackend:
                 max_size=self.pool_size,
                 max_inactive_connection_lifetime=self.max_inactive_lifetime,
                 command_timeout=60,
+                init=register_codecs,
             )
 
             # Ensure extensions are installed
+            created_extension = False
             async with self.pool.acquire() as conn:
                 # Check if extensions exist first
                 for ext in ["uuid-ossp", "vector", "pg_trgm"]:
@@ -66,31 +515,98 @@ class PostgresUnifiedBackend:
                         ext_name = ext if ext != "vector" else "vector"
                         try:
                             await conn.execute(f'CREATE EXTENSION IF NOT EXISTS "{ext_name}"')
+                            created_extension = True
                         except Exception as e:
                             logger.warning(f"Could not create extension {ext_name}: {e}")
 
+            # Connections opened before pgvector existed lack the vector codec
+            if created_extension:
+                await self.pool.expire_connections()
+
+            await self._ensure_schema()
+            await self._refresh_quantization_state()
+
+            read_dsn = self.read_connection_string
+            if read_dsn and read_dsn != self.connection_string:
+                self.read_pool = await asyncpg.create_pool(
+                    read_dsn,
+                    min_size=2,
+                    max_size=self.read_pool_size,
+                    max_inactive_connection_lifetime=self.max_inactive_lifetime,
+                    command_timeout=60,
+                    init=register_codecs,
+                )
+                logger.info("Read queries routed to a separate read pool")
+            else:
+                self.read_pool = self.pool
+
+            await self.access_tracker.start()
+            await self.search_recorder.start()
+
             logger.info("PostgreSQL unified backend initialized successfully")
 
         except Exception as e:
             logger.error(f"Failed to initialize PostgreSQL backend: {e}")
             raise
 
+    async def _ensure_schema(self):
+        """Create supporting tables and indexes this backend relies on"""
+        async with self.pool.acquire() as conn:
+            for statement in _SCHEMA_STATEMENTS:
+                try:
+                    await conn.execute(statement)
+                except Exception as e:
+                    logger.warning(f"Could not apply schema statement: {e}")
+
     async def close(self):
-        """Close connection pool"""
+        """Close connection pools"""
         if self.pool:
+            await self.access_tracker.stop()
+            await self.search_recorder.stop()
+            if self.read_pool is not None and self.read_pool is not self.pool:
+                await self.read_pool.close()
             await self.pool.close()
             logger.info("PostgreSQL connection pool closed")
 
     @asynccontextmanager
-    async def acquire(self):
-        """Acquire a connection from the pool"""
+    async def acquire(self, mark_write: bool = True):
+        """
+        Acquire a connection from the primary pool
+
+        Args:
+            mark_write: Start the read-your-writes window so following reads
+                stay on the primary; background writers that no reader waits
+                on (access tracking) pass False
+        """
         async with self.pool.acquire() as conn:
             yield conn
+        if mark_write:
+            self._last_write_at = time.monotonic()
+
+    @asynccontextmanager
+    async def acquire_read(self):
+        """
+        Acquire a connection for a read-only query
+
+        Uses the read pool unless this process wrote within the
+        read-your-writes window, in which case the replica may lag behind
+        and the primary is used instead.
+        """
+        pool = self.read_pool or self.pool
+        if time.monotonic() - self._last_write_at < self.read_your_writes_window:
+            pool = self.pool
+
+        async with pool.acquire() as conn:
+            yield conn
 
     # ==================== Memory CRUD Operations ====================
 
     async def create_memory(
-        self, memory: Dict[str, Any], embedding: Optional[List[float]] = None
+        self,
+        memory: Dict[str, Any],
+        embedding: Optional[Embedding] = None,
+        enqueue_embedding: bool = False,
+        chunks: Optional[ChunkRows] = None,
     ) -> Dict[str, Any]:
         """
         Create a new memory with optional embedding
@@ -98,6 +614,10 @@ class PostgresUnifiedBackend:
         Args:
             memory: Memory data dictionary
             embedding: Optional vector embedding
+            enqueue_embedding: Queue an embedding job in the same transaction
+                instead of passing ``embedding``
+            chunks: Passage embeddings of a long memory, stored in the same
+                transaction
 
         Returns:
             Created memory with ID
@@ -116,54 +636,236 @@ class PostgresUnifiedBackend:
         """
 
         async with self.acquire() as conn:
-            # Convert embedding to pgvector format if provided
-            embedding_vector = None
             embedding_model = None
             embedding_generated_at = None
 
-            if embedding:
-                # Convert embedding to PostgreSQL vector format
-                embedding_vector = self._format_vector(embedding)
+            if embedding is not None:
                 embedding_model = memory.get("embedding_model", "text-embedding-ada-002")
                 embedding_generated_at = datetime.utcnow()
 
-            row = await conn.fetchrow(
-                query,
-                uuid.UUID(memory_id),
-                memory["content"],
-                memory.get("memory_type", "generic"),
-                memory.get("importance_score", 0.5),
-                memory.get("tags", []),
-                json.dumps(memory.get("metadata", {})),
-                embedding_vector,
-                embedding_model,
-                embedding_generated_at,
-                memory.get("container_id", "default"),
-            )
-
-            return self._row_to_dict(row)
-
-    async def get_memory(self, memory_id: str) -> Optional[Dict[str, Any]]:
-        """Get a memory by ID"""
-        query = """
-            SELECT * FROM memories 
-            WHERE id = $1 AND deleted_at IS NULL
+            async with conn.transaction():
+                row = await conn.fetchrow(
+                    query,
+                    uuid.UUID(memory_id),
+                    memory["content"],
+                    memory.get("memory_type", "generic"),
+                    memory.get("importance_score", 0.5),
+                    memory.get("tags", []),
+                    memory.get("metadata", {}),
+                    embedding,
+                    embedding_model,
+                    embedding_generated_at,
+                    memory.get("container_id", "default"),
+                )
+                if enqueue_embedding:
+                    await self._enqueue_embedding_jobs(conn, [row["id"]])
+                if chunks:
+                    await self._replace_chunks(conn, {row["id"]: chunks})
+
+            result = self._row_to_dict(row)
+            result["embedding_pending"] = enqueue_embedding
+            return result
+
+    async def create_memories(
+        self,
+        memories: List[Dict[str, Any]],
+        embeddings: Optional[List[Optional[Embedding]]] = None,
+        return_ids: bool = True,
+        enqueue_embeddings: bool = False,
+        chunks: Optional[List[Optional[ChunkRows]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Bulk-create memories with a single COPY and one set-based INSERT
+
+        Rows are streamed into a transaction-scoped staging table with binary
+        COPY, then moved into ``memories`` with ``INSERT ... SELECT``. Rows whose
+        id already exists are skipped, which makes re-imports idempotent.
+
+        Args:
+            memories: Memory data dictionaries (same shape as create_memory)
+            embeddings: Optional embeddings aligned with ``memories``
+            return_ids: Whether to return the ids of the inserted rows
+            enqueue_embeddings: Queue an embedding job for every inserted row
+                that has no embedding, in the same transaction
+            chunks: Optional passage embeddings aligned with ``memories``;
+                stored for inserted rows only
+
+        Returns:
+            Dictionary with inserted/skipped counts and optionally the new ids
         """
+        if not memories:
+            return {"inserted": 0, "skipped": 0, "ids": []}
+
+        if embeddings is not None and len(embeddings) != len(memories):
+            raise ValueError("embeddings must be aligned with memories")
+        if chunks is not None and len(chunks) != len(memories):
+            raise ValueError("chunks must be aligned with memories")
+
+        now = datetime.utcnow()
+        records = []
+        for index, memory in enumerate(memories):
+            embedding = embeddings[index] if embeddings is not None else None
+            has_embedding = embedding is not None
+            records.append(
+                (
+                    uuid.UUID(str(memory["id"])) if memory.get("id") else uuid.uuid4(),
+                    memory["content"],
+                    memory.get("memory_type", "generic"),
+                    memory.get("importance_score", 0.5),
+                    memory.get("tags", []),
+                    memory.get("metadata", {}),
+                    embedding,
+                    (
+                        memory.get("embedding_model", "text-embedding-ada-002")
+                        if has_embedding
+                        else None
+                    ),
+                    now if has_embedding else None,
+                    memory.get("container_id", "default"),
+                )
+            )
+
+        columns = list(_BULK_INSERT_COLUMNS)
+        column_list = ", ".join(columns)
 
         async with self.acquire() as conn:
-            row = await conn.fetchrow(query, uuid.UUID(memory_id))
+            async with conn.transaction():
+                await conn.execute(
+                    f"""
+                    CREATE TEMP TABLE memories_staging ON COMMIT DROP AS
+                    SELECT {column_list} FROM memories WITH NO DATA
+                """
+                )
+                await conn.copy_records_to_table(
+                    "memories_staging", records=records, columns=columns
+                )
 
-            if row:
-                # Track access
-                await conn.execute("SELECT track_memory_access($1)", uuid.UUID(memory_id))
-                return self._row_to_dict(row)
+                insert_sql = f"""
+                    INSERT INTO memories ({column_list})
+                    SELECT {column_list} FROM memories_staging
+                    ON CONFLICT (id) DO NOTHING
+                """
+                if return_ids or chunks is not None:
+                    rows = await conn.fetch(insert_sql + " RETURNING id")
+                    inserted_ids = {row["id"] for row in rows}
+                    ids = [str(row["id"]) for row in rows] if return_ids else []
+                    inserted = len(rows)
+                else:
+                    status = await conn.execute(insert_sql)
+                    ids = []
+                    inserted = int(status.split()[-1])
+
+                if enqueue_embeddings:
+                    await conn.execute(
+                        """
+                        INSERT INTO embedding_jobs (memory_id, version)
+                        SELECT m.id, m.version
+                        FROM memories_staging s
+                        JOIN memories m ON m.id = s.id
+                        WHERE m.embedding IS NULL
+                        ON CONFLICT (memory_id) DO NOTHING
+                    """
+                    )
+
+                if chunks is not None:
+                    # Rows skipped as already present keep their passages
+                    await self._replace_chunks(
+                        conn,
+                        {
+                            record[0]: memory_chunks
+                            for record, memory_chunks in zip(records, chunks)
+                            if memory_chunks and record[0] in inserted_ids
+                        },
+                    )
+
+        logger.info(f"Bulk inserted {inserted}/{len(records)} memories")
+        return {"inserted": inserted, "skipped": len(records) - inserted, "ids": ids}
+
+    async def get_memory(
+        self, memory_id: str, track: bool = True, projection: str = "full"
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get a memory by ID
+
+        Args:
+            memory_id: Memory ID
+            track: Count this read as an access (buffered, flushed write-behind);
+                internal callers re-reading a memory should pass False
+            projection: Projection profile (see PROJECTIONS)
+        """
+        query = f"""
+            SELECT {projection_sql(projection)} FROM memories
+            WHERE id = $1 AND deleted_at IS NULL
+        """
+
+        async with self.acquire_read() as conn:
+            row = await conn.fetchrow(query, uuid.UUID(memory_id))
 
+        if not row:
             return None
 
+        if track:
+            self.access_tracker.record(row["id"])
+        return self._row_to_dict(row, include_embedding=projection == "with_embedding")
+
+    async def get_memories(
+        self, memory_ids: Sequence[str], track: bool = True, projection: str = "full"
+    ) -> List[Dict[str, Any]]:
+        """
+        Get many memories in one round trip
+
+        Args:
+            memory_ids: Memory IDs; duplicates are collapsed
+            track: Count these reads as accesses
+            projection: Projection profile (see PROJECTIONS)
+
+        Returns:
+            Found memories in the order of ``memory_ids``; missing or deleted
+            ids are left out
+        """
+        ids = list(dict.fromkeys(uuid.UUID(str(memory_id)) for memory_id in memory_ids))
+        if not ids:
+            return []
+
+        query = f"""
+            SELECT {projection_sql(projection)} FROM memories
+            WHERE id = ANY($1::uuid[]) AND deleted_at IS NULL
+        """
+
+        async with self.acquire_read() as conn:
+            rows = await conn.fetch(query, ids)
+
+        by_id = {row["id"]: row for row in rows}
+        memories = []
+        for memory_id in ids:
+            row = by_id.get(memory_id)
+            if row is None:
+                continue
+            if track:
+                self.access_tracker.record(memory_id)
+            memories.append(
+                self._row_to_dict(row, include_embedding=projection == "with_embedding")
+            )
+        return memories
+
     async def update_memory(
-        self, memory_id: str, updates: Dict[str, Any], new_embedding: Optional[List[float]] = None
+        self,
+        memory_id: str,
+        updates: Dict[str, Any],
+        new_embedding: Optional[Embedding] = None,
+        enqueue_embedding: bool = False,
+        new_chunks: Optional[ChunkRows] = None,
+        embedding_model: Optional[str] = None,
     ) -> Optional[Dict[str, Any]]:
-        """Update a memory with optional new embedding"""
+        """
+        Update a memory with optional new embedding
+
+        With ``enqueue_embedding`` an embedding job for the updated version is
+        queued in the same transaction, superseding any job still pending.
+        ``new_chunks`` replaces the stored passages together with
+        ``new_embedding`` (an empty list removes them). ``embedding_model``
+        labels ``new_embedding``.
+        """
 
         # Build dynamic update query
         set_clauses = []
@@ -188,35 +890,52 @@ class PostgresUnifiedBackend:
         if "metadata" in updates:
             param_count += 1
             set_clauses.append(f"metadata = ${param_count}::jsonb")
-            params.append(json.dumps(updates["metadata"]))
+            params.append(updates["metadata"])
 
-        if new_embedding:
+        if new_embedding is not None:
             param_count += 1
             set_clauses.append(f"embedding = ${param_count}::vector")
-            # Convert embedding to PostgreSQL vector format
-            embedding_vector = self._format_vector(new_embedding)
-            params.append(embedding_vector)
+            params.append(new_embedding)
 
             param_count += 1
             set_clauses.append(f"embedding_generated_at = ${param_count}")
             params.append(datetime.utcnow())
 
-        if not set_clauses:
-            return await self.get_memory(memory_id)
+            if embedding_model is not None:
+                param_count += 1
+                set_clauses.append(f"embedding_model = ${param_count}")
+                params.append(embedding_model)
 
-        # Increment version
-        set_clauses.append("version = version + 1")
+        if not set_clauses and not enqueue_embedding:
+            return await self.get_memory(memory_id, track=False)
 
-        query = f"""
-            UPDATE memories 
-            SET {', '.join(set_clauses)}
-            WHERE id = $1 AND deleted_at IS NULL
-            RETURNING *
-        """
+        if set_clauses:
+            # Increment version; updated_at feeds the incremental sweeps
+            set_clauses.append("version = version + 1")
+            set_clauses.append("updated_at = NOW()")
+
+            query = f"""
+                UPDATE memories 
+                SET {', '.join(set_clauses)}
+                WHERE id = $1 AND deleted_at IS NULL
+                RETURNING *
+            """
+        else:
+            query = "SELECT * FROM memories WHERE id = $1 AND deleted_at IS NULL FOR UPDATE"
 
         async with self.acquire() as conn:
-            row = await conn.fetchrow(query, *params)
-            return self._row_to_dict(row) if row else None
+            async with conn.transaction():
+                row = await conn.fetchrow(query, *params)
+                if row and enqueue_embedding:
+                    await self._enqueue_embedding_jobs(conn, [row["id"]])
+                if row and new_embedding is not None and new_chunks is not None:
+                    await self._replace_chunks(conn, {row["id"]: new_chunks})
+            if not row:
+                return None
+            result = self._row_to_dict(row)
+            if enqueue_embedding:
+                result["embedding_pending"] = True
+            return result
 
     async def delete_memory(self, memory_id: str, soft: bool = True) -> bool:
         """Delete a memory (soft delete by default)"""
@@ -239,6 +958,63 @@ class PostgresUnifiedBackend:
             result = await conn.fetchrow(query, uuid.UUID(memory_id))
             return result is not None
 
+    async def delete_memories(self, memory_ids: Sequence[str], soft: bool = True) -> List[str]:
+        """
+        Delete many memories in one statement (soft delete by default)
+
+        Returns:
+            IDs that were actually deleted
+        """
+        ids = [uuid.UUID(str(memory_id)) for memory_id in memory_ids]
+        if not ids:
+            return []
+
+        if soft:
+            query = """
+                UPDATE memories
+                SET deleted_at = NOW()
+                WHERE id = ANY($1::uuid[]) AND deleted_at IS NULL
+                RETURNING id
+            """
+        else:
+            query = """
+                DELETE FROM memories
+                WHERE id = ANY($1::uuid[])
+                RETURNING id
+            """
+
+        async with self.acquire() as conn:
+            rows = await conn.fetch(query, ids)
+            return [str(row["id"]) for row in rows]
+
+    async def add_tags(self, memory_ids: Sequence[str], tags: List[str]) -> List[str]:
+        """
+        Merge tags into many memories in one statement
+
+        Existing tags are kept and duplicates removed, so the result matches
+        a per-memory read-modify-write without the round trips.
+
+        Returns:
+            IDs of the memories that were updated
+        """
+        ids = [uuid.UUID(str(memory_id)) for memory_id in memory_ids]
+        if not ids:
+            return []
+
+        query = """
+            UPDATE memories
+            SET tags = ARRAY(
+                    SELECT DISTINCT t FROM unnest(COALESCE(tags, '{}') || $2::text[]) AS t
+                ),
+                version = version + 1
+            WHERE id = ANY($1::uuid[]) AND deleted_at IS NULL
+            RETURNING id
+        """
+
+        async with self.acquire() as conn:
+            rows = await conn.fetch(query, ids, list(tags))
+            return [str(row["id"]) for row in rows]
+
     async def list_memories(
         self,
         limit: int = 20,
@@ -247,304 +1023,3108 @@ class PostgresUnifiedBackend:
         tags: Optional[List[str]] = None,
         min_importance: Optional[float] = None,
         container_id: str = "default",
+        after: Optional[str] = None,
+        projection: str = "full",
     ) -> List[Dict[str, Any]]:
-        """List memories with filtering"""
-
-        where_clauses = ["deleted_at IS NULL", "container_id = $1"]
-        params = [container_id]
-        param_count = 1
-
-        if memory_type:
-            param_count += 1
-            where_clauses.append(f"memory_type = ${param_count}")
-            params.append(memory_type)
+        """
+        List memories with filtering, newest first
 
-        if tags:
-            param_count += 1
-            where_clauses.append(f"tags && ${param_count}")
-            params.append(tags)
+        Pass ``after`` (a cursor from encode_cursor) for keyset pagination on
+        ``(created_at, id)``; deep pages then cost the same as the first page.
+        ``offset`` is kept for callers that still page by position. The list
+        routes pass the ``summary`` projection (content preview, no vector).
+        """
+        where_clauses, params = self._memory_filters(
+            container_id, memory_type, tags, min_importance
+        )
 
-        if min_importance is not None:
-            param_count += 1
-            where_clauses.append(f"importance_score >= ${param_count}")
-            params.append(min_importance)
+        if after:
+            cursor_created_at, cursor_id = decode_cursor(after)
+            params.extend([cursor_created_at, cursor_id])
+            where_clauses.append(f"(created_at, id) < (${len(params) - 1}, ${len(params)})")
+            offset = 0
 
-        param_count += 1
-        limit_param = param_count
         params.append(limit)
-
-        param_count += 1
-        offset_param = param_count
+        limit_param = len(params)
         params.append(offset)
+        offset_param = len(params)
 
         query = f"""
-            SELECT * FROM memories
+            SELECT {projection_sql(projection)} FROM memories
             WHERE {' AND '.join(where_clauses)}
-            ORDER BY created_at DESC
+            ORDER BY created_at DESC, id DESC
             LIMIT ${limit_param} OFFSET ${offset_param}
         """
 
-        async with self.acquire() as conn:
+        include_embedding = projection == "with_embedding"
+        async with self.acquire_read() as conn:
             rows = await conn.fetch(query, *params)
-            return [self._row_to_dict(row) for row in rows]
+            return [self._row_to_dict(row, include_embedding=include_embedding) for row in rows]
 
-    # ==================== Search Operations ====================
-
-    async def vector_search(
+    async def count_memories(
         self,
-        embedding: List[float],
-        limit: int = 10,
-        min_similarity: float = 0.0,
+        memory_type: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        min_importance: Optional[float] = None,
         container_id: str = "default",
-    ) -> List[Dict[str, Any]]:
-        """Pure vector similarity search"""
+        exact: bool = False,
+        exact_threshold: int = 10000,
+    ) -> Tuple[int, bool]:
+        """
+        Count memories matching the list filters
 
-        query = """
-            SELECT 
-                *,
-                1 - (embedding <=> $1::vector) AS similarity
-            FROM memories
-            WHERE deleted_at IS NULL
-                AND container_id = $2
-                AND embedding IS NOT NULL
-                AND 1 - (embedding <=> $1::vector) >= $3
-            ORDER BY embedding <=> $1::vector
-            LIMIT $4
+        Unless ``exact`` is requested, the planner's row estimate is used and
+        only replaced by a real COUNT(*) when it is below ``exact_threshold``
+        (where counting is cheap anyway).
+
+        Returns:
+            Tuple of (count, is_estimate)
         """
+        where_clauses, params = self._memory_filters(
+            container_id, memory_type, tags, min_importance
+        )
+        where_sql = " AND ".join(where_clauses)
 
-        async with self.acquire() as conn:
-            rows = await conn.fetch(
-                query, self._format_vector(embedding), container_id, min_similarity, limit
+        async with self.acquire_read() as conn:
+            if not exact:
+                plan = await conn.fetchval(
+                    f"EXPLAIN (FORMAT JSON) SELECT 1 FROM memories WHERE {where_sql}", *params
+                )
+                if isinstance(plan, str):
+                    plan = loads_json(plan)
+                estimate = int(plan[0]["Plan"]["Plan Rows"])
+                if estimate >= exact_threshold:
+                    return estimate, True
+
+            count = await conn.fetchval(
+                f"SELECT COUNT(*) FROM memories WHERE {where_sql}", *params
             )
+            return count, False
 
-            results = []
-            for row in rows:
-                memory = self._row_to_dict(row)
-                memory["similarity"] = float(row["similarity"])
-                results.append(memory)
+    async def iterate_memories(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        batch_size: int = 1000,
+        columns: Optional[Sequence[str]] = None,
+        container_id: str = "default",
+        projection: str = "full",
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream every matching memory in batches through a server-side cursor
 
-            return results
+        The scan runs in one REPEATABLE READ read-only transaction, so it sees a
+        consistent snapshot while only ``batch_size`` rows are held in memory.
+        The connection stays checked out until the generator is exhausted or
+        closed; callers that stop early should wrap it in
+        ``contextlib.aclosing``.
 
-    async def text_search(
-        self, query: str, limit: int = 10, container_id: str = "default"
-    ) -> List[Dict[str, Any]]:
-        """Full-text search using PostgreSQL FTS"""
+        Args:
+            filters: Optional memory_type, tags, min_importance and has_embedding
+            batch_size: Rows fetched per round trip
+            columns: Columns to select; memory dicts in ``projection`` when omitted
+            container_id: Container to scan
+            projection: Projection profile used without ``columns``
 
-        query_sql = """
-            SELECT 
-                *,
-                ts_rank(content_tsvector, plainto_tsquery('english', $1)) AS rank
-            FROM memories
-            WHERE deleted_at IS NULL
-                AND container_id = $2
-                AND content_tsvector @@ plainto_tsquery('english', $1)
-            ORDER BY rank DESC
-            LIMIT $3
+        Yields:
+            Lists of at most ``batch_size`` memories, newest first
         """
+        filters = dict(filters or {})
+        unknown = set(filters) - set(_ITERATE_FILTERS)
+        if unknown:
+            raise ValueError(f"Unknown memory filters: {', '.join(sorted(unknown))}")
 
-        async with self.acquire() as conn:
-            rows = await conn.fetch(query_sql, query, container_id, limit)
+        if columns:
+            invalid = [column for column in columns if column not in _ITERATE_COLUMNS]
+            if invalid:
+                raise ValueError(f"Unknown memory columns: {', '.join(invalid)}")
+            select_sql = ", ".join(columns)
+        else:
+            select_sql = projection_sql(projection)
+        include_embedding = projection == "with_embedding"
 
-            results = []
-            for row in rows:
-                memory = self._row_to_dict(row)
-                memory["text_rank"] = float(row["rank"])
+        where_clauses, params = self._memory_filters(container_id, **filters)
+        query = f"""
+            SELECT {select_sql} FROM memories
+            WHERE {' AND '.join(where_clauses)}
+            ORDER BY created_at DESC, id DESC
+        """
+
+        async with self.acquire_read() as conn:
+            async with conn.transaction(isolation="repeatable_read", readonly=True):
+                cursor = await conn.cursor(query, *params)
+                while True:
+                    rows = await cursor.fetch(batch_size)
+                    if not rows:
+                        break
+                    if columns:
+                        yield [_record_to_plain_dict(row) for row in rows]
+                    else:
+                        yield [
+                            self._row_to_dict(row, include_embedding=include_embedding)
+                            for row in rows
+                        ]
+                    if len(rows) < batch_size:
+                        break
+
+    def _memory_filters(
+        self,
+        container_id: str,
+        memory_type: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        min_importance: Optional[float] = None,
+        has_embedding: Optional[bool] = None,
+    ) -> Tuple[List[str], List[Any]]:
+        """Build the shared WHERE clauses and parameters for list/count queries"""
+        where_clauses = ["deleted_at IS NULL", "container_id = $1"]
+        params: List[Any] = [container_id]
+
+        if memory_type:
+            params.append(memory_type)
+            where_clauses.append(f"memory_type = ${len(params)}")
+
+        if tags:
+            params.append(tags)
+            where_clauses.append(f"tags && ${len(params)}")
+
+        if min_importance is not None:
+            params.append(min_importance)
+            where_clauses.append(f"importance_score >= ${len(params)}")
+
+        if has_embedding is not None:
+            where_clauses.append(
+                "embedding IS NOT NULL" if has_embedding else "embedding IS NULL"
+            )
+
+        return where_clauses, params
+
+    # ==================== Search Operations ====================
+
+    async def vector_search(
+        self,
+        embedding: Embedding,
+        limit: int = 10,
+        min_similarity: float = 0.0,
+        container_id: str = "default",
+        recall: Optional[str] = None,
+        projection: str = "full",
+    ) -> List[Dict[str, Any]]:
+        """
+        Pure vector similarity search
+
+        With quantization enabled, candidates come from the quantized index
+        and are re-ranked exactly against the full-precision vectors. With
+        chunk search, a memory whose best passage is closer than its
+        memory-level vector takes the passage similarity and reports the
+        passage offsets under ``passage``.
+
+        Args:
+            recall: Accuracy hint (see RECALL_HINTS); chosen automatically when None
+            projection: Projection profile (see PROJECTIONS)
+        """
+        select_sql = projection_sql(projection)
+        quantized = self.quantization is not None and self.quantization_ready
+        candidates = limit * self.rerank_factor if quantized else limit
+        if self.chunk_search:
+            candidates = max(candidates, limit * self.chunk_search_factor)
+
+        async with self._search_connection(recall, candidates=candidates) as (conn, recall):
+            if quantized and recall != "exact":
+                mode = QUANTIZATION_MODES[self.quantization]
+                quantized_query = mode["quantize"].format(vector="$1::vector")
+                query = f"""
+                    WITH candidates AS (
+                        SELECT id
+                        FROM memories
+                        WHERE deleted_at IS NULL
+                            AND container_id = $2
+                            AND {mode["column"]} IS NOT NULL
+                        ORDER BY {mode["column"]} {mode["operator"]} {quantized_query}
+                        LIMIT $5
+                    )
+                    SELECT
+                        {projection_sql(projection, "m")},
+                        1 - (m.embedding <=> $1::vector) AS similarity
+                    FROM candidates c
+                    JOIN memories m ON m.id = c.id
+                    WHERE 1 - (m.embedding <=> $1::vector) >= $3
+                    ORDER BY m.embedding <=> $1::vector
+                    LIMIT $4
+                """
+                params = (embedding, container_id, min_similarity, limit, candidates)
+            else:
+                query = f"""
+                    SELECT
+                        {select_sql},
+                        1 - (embedding <=> $1::vector) AS similarity
+                    FROM memories
+                    WHERE deleted_at IS NULL
+                        AND container_id = $2
+                        AND embedding IS NOT NULL
+                        AND 1 - (embedding <=> $1::vector) >= $3
+                    ORDER BY embedding <=> $1::vector
+                    LIMIT $4
+                """
+                params = (embedding, container_id, min_similarity, limit)
+
+            rows = await conn.fetch(query, *params)
+
+            results = []
+            for row in rows:
+                memory = self._row_to_dict(row, include_embedding=projection == "with_embedding")
+                memory["similarity"] = float(row["similarity"])
+                results.append(memory)
+
+            if not self.chunk_search:
+                return results
+
+            best = {memory["id"]: memory for memory in results}
+            for row in await self._search_chunks(
+                conn, embedding, limit, min_similarity, container_id, projection
+            ):
+                memory = self._row_to_dict(row, include_embedding=projection == "with_embedding")
+                memory["similarity"] = float(row["similarity"])
+                memory["passage"] = {"start": row["passage_start"], "end": row["passage_end"]}
+                current = best.get(memory["id"])
+                if current is None or memory["similarity"] > current["similarity"]:
+                    best[memory["id"]] = memory
+
+            return sorted(best.values(), key=lambda m: m["similarity"], reverse=True)[:limit]
+
+    async def text_search(
+        self,
+        query: str,
+        limit: int = 10,
+        container_id: str = "default",
+        projection: str = "full",
+    ) -> List[Dict[str, Any]]:
+        """Full-text search using PostgreSQL FTS"""
+
+        query_sql = f"""
+            SELECT
+                {projection_sql(projection)},
+                ts_rank(content_tsvector, plainto_tsquery('english', $1)) AS rank
+            FROM memories
+            WHERE deleted_at IS NULL
+                AND container_id = $2
+                AND content_tsvector @@ plainto_tsquery('english', $1)
+            ORDER BY rank DESC
+            LIMIT $3
+        """
+
+        async with self.acquire_read() as conn:
+            rows = await conn.fetch(query_sql, query, container_id, limit)
+
+            results = []
+            for row in rows:
+                memory = self._row_to_dict(row, include_embedding=projection == "with_embedding")
+                memory["text_rank"] = float(row["rank"])
+                results.append(memory)
+
+            return results
+
+    async def hybrid_search(
+        self,
+        query: str,
+        embedding: Optional[Embedding] = None,
+        limit: int = 10,
+        vector_weight: float = 0.5,
+        min_score: float = 0.0,
+        container_id: str = "default",
+        recall: Optional[str] = None,
+        projection: str = "full",
+    ) -> List[Dict[str, Any]]:
+        """
+        Hybrid search combining vector and text search
+
+        The hybrid_search() SQL function returns full content, so projections
+        are applied on top of its result rows. With chunk search, memories
+        whose best passage beats their memory-level similarity are re-scored
+        with it, assuming the function's linear combination
+        ``vector_weight * similarity + (1 - vector_weight) * text_rank``.
+
+        Args:
+            recall: Accuracy hint for the vector part (see RECALL_HINTS)
+            projection: Projection profile (see PROJECTIONS)
+        """
+
+        if embedding is None:
+            # Fall back to text-only search
+            return await self.text_search(query, limit, container_id, projection=projection)
+
+        if projection not in PROJECTIONS:
+            raise ValueError(f"Unknown projection {projection!r}; expected one of {PROJECTIONS}")
+
+        if projection == "summary":
+            content_sql = (
+                f"left(h.content, {SUMMARY_CONTENT_CHARS}) AS content, "
+                "length(h.content) AS content_length"
+            )
+        else:
+            content_sql = "h.content"
+        embedding_sql, join_sql = "", ""
+        if projection == "with_embedding":
+            embedding_sql = ", m.embedding"
+            join_sql = "JOIN memories m ON m.id = h.id"
+
+        query_sql = f"""
+            SELECT
+                h.id, {content_sql}, h.memory_type, h.importance_score, h.tags,
+                h.metadata, h.created_at, h.similarity_score, h.text_rank,
+                h.combined_score{embedding_sql}
+            FROM hybrid_search($1, $2::vector, $3, $4, $5) h
+            {join_sql}
+            ORDER BY h.combined_score DESC
+        """
+
+        candidates = limit * self.chunk_search_factor if self.chunk_search else limit
+        async with self._search_connection(recall, candidates=candidates) as (conn, _):
+            rows = await conn.fetch(query_sql, query, embedding, limit, vector_weight, min_score)
+
+            results = []
+            for row in rows:
+                memory = {
+                    "id": str(row["id"]),
+                    "content": row["content"],
+                    "memory_type": row["memory_type"],
+                    "importance_score": float(row["importance_score"]),
+                    "tags": row["tags"],
+                    "metadata": row["metadata"],
+                    "created_at": row["created_at"].isoformat(),
+                    "similarity_score": float(row["similarity_score"]),
+                    "text_rank": float(row["text_rank"]),
+                    "combined_score": float(row["combined_score"]),
+                }
+                if row.get("content_length") is not None:
+                    memory["content_length"] = row["content_length"]
+                if projection == "with_embedding" and row["embedding"] is not None:
+                    memory["embedding"] = row["embedding"].tolist()
                 results.append(memory)
 
-            return results
+            if not self.chunk_search:
+                return results
+
+            by_id = {memory["id"]: memory for memory in results}
+            for row in await self._search_chunks(
+                conn,
+                embedding,
+                limit,
+                container_id=container_id,
+                projection=projection,
+                query=query,
+            ):
+                similarity = float(row["similarity"])
+                passage = {"start": row["passage_start"], "end": row["passage_end"]}
+                memory = by_id.get(str(row["id"]))
+                if memory is not None:
+                    if similarity > memory["similarity_score"]:
+                        memory["combined_score"] += vector_weight * (
+                            similarity - memory["similarity_score"]
+                        )
+                        memory["similarity_score"] = similarity
+                        memory["passage"] = passage
+                    continue
+
+                text_rank = float(row["text_rank"])
+                combined = vector_weight * similarity + (1 - vector_weight) * text_rank
+                if combined < min_score:
+                    continue
+                found = self._row_to_dict(row, include_embedding=projection == "with_embedding")
+                memory = {key: found[key] for key in _HYBRID_RESULT_FIELDS if key in found}
+                memory.update(
+                    similarity_score=similarity,
+                    text_rank=text_rank,
+                    combined_score=combined,
+                    passage=passage,
+                )
+                by_id[memory["id"]] = memory
+
+            return sorted(by_id.values(), key=lambda m: m["combined_score"], reverse=True)[:limit]
+
+    @asynccontextmanager
+    async def _search_connection(self, recall: Optional[str] = None, candidates: int = 0):
+        """
+        Read connection in a transaction with ANN search settings applied
+
+        The settings are SET LOCAL, so they end with the transaction and never
+        leak to other users of the pooled connection. HNSW returns at most
+        ef_search rows, so ef_search is raised to ``candidates`` if needed
+        (up to HNSW_MAX_EF_SEARCH).
+
+        Yields:
+            Tuple of (connection, resolved recall hint)
+        """
+        if recall is not None and recall not in RECALL_HINTS:
+            raise ValueError(f"Unknown recall hint {recall!r}, expected one of {RECALL_HINTS}")
+
+        async with self.acquire_read() as conn:
+            async with conn.transaction(readonly=True):
+                if recall is None:
+                    small = await self._estimate_rows(conn) < self.exact_scan_threshold
+                    recall = "exact" if small else "balanced"
+
+                if recall == "exact":
+                    await conn.execute("SET LOCAL enable_indexscan = off")
+                else:
+                    profile = RECALL_PROFILES[recall]
+                    await conn.execute(
+                        """
+                        SELECT set_config('hnsw.ef_search', $1, true),
+                               set_config('ivfflat.probes', $2, true)
+                    """,
+                        str(min(max(profile["hnsw.ef_search"], candidates), HNSW_MAX_EF_SEARCH)),
+                        str(profile["ivfflat.probes"]),
+                    )
+                yield conn, recall
+
+    async def _estimate_rows(self, conn: asyncpg.Connection, max_age: float = 300.0) -> int:
+        """Planner row estimate for memories, cached for ``max_age`` seconds"""
+        now = time.monotonic()
+        if now - self._row_estimate_at > max_age:
+            estimate = await conn.fetchval(
+                "SELECT reltuples FROM pg_class WHERE oid = 'memories'::regclass"
+            )
+            # reltuples is -1 until the table has been analyzed
+            self._row_estimate = max(int(estimate or 0), 0)
+            self._row_estimate_at = now
+        return self._row_estimate
+
+    # ==================== Vector Index Management ====================
+
+    async def create_vector_index(
+        self,
+        method: str = "hnsw",
+        m: int = 16,
+        ef_construction: int = 64,
+        lists: Optional[int] = None,
+        rebuild: bool = False,
+        maintenance_work_mem: Optional[str] = None,
+        timeout: float = 3600.0,
+    ) -> Dict[str, Any]:
+        """
+        Create or rebuild the ANN index on memories.embedding (cosine distance)
+
+        Indexes are built CONCURRENTLY. A rebuild builds a replacement next
+        to the live index and swaps it in, so searches keep using the old
+        index until the new one is ready.
+
+        Args:
+            method: 'hnsw' or 'ivfflat'
+            m: HNSW max connections per layer
+            ef_construction: HNSW candidate list size during build
+            lists: IVFFlat list count; derived from the row count when None
+            rebuild: Replace the index even if a valid one exists
+            maintenance_work_mem: Build memory for this session, e.g. '1GB'
+            timeout: Client-side timeout for the build in seconds
+
+        Returns:
+            Status of the managed index (see get_vector_index_status)
+        """
+        if method == "hnsw":
+            options = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+        elif method == "ivfflat":
+            if lists is None:
+                async with self.acquire_read() as conn:
+                    rows = await self._estimate_rows(conn, max_age=0)
+                # pgvector guidance: rows / 1000 up to 1M rows, sqrt(rows) above
+                lists = rows // 1000 if rows <= 1_000_000 else int(rows**0.5)
+            options = f"lists = {max(int(lists), 10)}"
+        else:
+            raise ValueError(f"Unknown vector index method {method!r}, expected hnsw or ivfflat")
+
+        current = {
+            index["name"]: index for index in (await self.get_vector_index_status())["indexes"]
+        }.get(VECTOR_INDEX_NAME)
+        if current and current["valid"] and not rebuild:
+            return await self.get_vector_index_status()
+
+        replacing = bool(current and current["valid"])
+        build_name = f"{VECTOR_INDEX_NAME}_new" if replacing else VECTOR_INDEX_NAME
+
+        # CREATE/DROP INDEX CONCURRENTLY cannot run inside a transaction block
+        async with self.acquire() as conn:
+            if maintenance_work_mem:
+                await conn.execute(
+                    "SELECT set_config('maintenance_work_mem', $1, false)", maintenance_work_mem
+                )
+
+            # Leftovers of an interrupted build are invalid and must be dropped
+            await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {VECTOR_INDEX_NAME}_new")
+            if current and not current["valid"]:
+                await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {VECTOR_INDEX_NAME}")
+
+            logger.info(f"Building {method} vector index {build_name} ({options})")
+            await conn.execute(
+                f"""
+                CREATE INDEX CONCURRENTLY {build_name}
+                ON memories USING {method} (embedding vector_cosine_ops)
+                WITH ({options})
+                WHERE deleted_at IS NULL
+            """,
+                timeout=timeout,
+            )
+
+            if replacing:
+                async with conn.transaction():
+                    await conn.execute(f"DROP INDEX {VECTOR_INDEX_NAME}")
+                    await conn.execute(f"ALTER INDEX {build_name} RENAME TO {VECTOR_INDEX_NAME}")
+
+        return await self.get_vector_index_status()
+
+    async def get_vector_index_status(self) -> Dict[str, Any]:
+        """
+        Report ANN indexes on memories and the passage tables with their
+        size, validity and build progress
+
+        Returns:
+            Dict with ``indexes``, ``build_progress`` (None when idle), the
+            table ``row_estimate`` and the recall used when no hint is given
+        """
+        async with self.acquire_read() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT
+                    i.relname AS name,
+                    t.relname AS table_name,
+                    am.amname AS method,
+                    ix.indisvalid AS valid,
+                    pg_relation_size(i.oid) AS size_bytes,
+                    pg_size_pretty(pg_relation_size(i.oid)) AS size,
+                    pg_get_indexdef(i.oid) AS definition
+                FROM pg_index ix
+                JOIN pg_class i ON i.oid = ix.indexrelid
+                JOIN pg_class t ON t.oid = ix.indrelid
+                JOIN pg_am am ON am.oid = i.relam
+                WHERE ix.indrelid IN (
+                    'memories'::regclass,
+                    to_regclass('memory_chunks'),
+                    to_regclass('memory_chunks_next')
+                )
+                    AND am.amname IN ('hnsw', 'ivfflat')
+                ORDER BY i.relname
+            """
+            )
+            progress = await conn.fetchrow(
+                """
+                SELECT phase, blocks_done, blocks_total, tuples_done, tuples_total
+                FROM pg_stat_progress_create_index
+                WHERE relid IN (
+                    'memories'::regclass,
+                    to_regclass('memory_chunks'),
+                    to_regclass('memory_chunks_next')
+                )
+            """
+            )
+            row_estimate = await self._estimate_rows(conn, max_age=0)
+
+        return {
+            "indexes": [dict(row) for row in rows],
+            "build_progress": dict(progress) if progress else None,
+            "row_estimate": row_estimate,
+            "exact_scan_threshold": self.exact_scan_threshold,
+            "default_recall": "exact" if row_estimate < self.exact_scan_threshold else "balanced",
+            "quantization": {"mode": self.quantization, "ready": self.quantization_ready},
+        }
+
+    # ==================== Vector Quantization ====================
+
+    async def _refresh_quantization_state(self):
+        """Mark quantized search ready when its index exists and is valid"""
+        self.quantization_ready = False
+        if self.quantization is None:
+            return
+
+        column = QUANTIZATION_MODES[self.quantization]["column"]
+        async with self.acquire_read() as conn:
+            self.quantization_ready = bool(
+                await conn.fetchval(
+                    """
+                    SELECT ix.indisvalid
+                    FROM pg_index ix
+                    JOIN pg_class i ON i.oid = ix.indexrelid
+                    WHERE i.relname = $1
+                """,
+                    f"idx_memories_{column}",
+                )
+            )
+
+        if not self.quantization_ready:
+            logger.warning(
+                f"{self.quantization} quantization configured but not built; "
+                "vector search uses full vectors until enable_quantization completes"
+            )
+
+    async def _embedding_dimensions(self, conn: asyncpg.Connection) -> int:
+        """Dimension of memories.embedding from its type modifier or a stored row"""
+        dims = await conn.fetchval(
+            """
+            SELECT atttypmod FROM pg_attribute
+            WHERE attrelid = 'memories'::regclass AND attname = 'embedding'
+        """
+        )
+        if dims and dims > 0:
+            return dims
+
+        dims = await conn.fetchval(
+            "SELECT vector_dims(embedding) FROM memories WHERE embedding IS NOT NULL LIMIT 1"
+        )
+        if not dims:
+            raise ValueError("Cannot determine embedding dimensions; pass dimensions explicitly")
+        return dims
+
+    async def enable_quantization(
+        self,
+        mode: Optional[str] = None,
+        dimensions: Optional[int] = None,
+        batch_size: int = 5000,
+        m: int = 16,
+        ef_construction: int = 64,
+        timeout: float = 3600.0,
+    ) -> Dict[str, Any]:
+        """
+        Add, backfill and index a quantized embedding column (online)
+
+        Steps, each safe to re-run after an interruption:
+        1. add the nullable column (metadata-only, no table rewrite)
+        2. install a trigger that keeps it in sync with ``embedding``
+        3. backfill existing rows in keyset batches
+        4. build its HNSW index CONCURRENTLY
+
+        Args:
+            mode: 'halfvec' or 'binary' (defaults to the configured mode)
+            dimensions: Embedding dimension; detected when None
+            batch_size: Rows updated per backfill batch
+            m: HNSW max connections per layer
+            ef_construction: HNSW candidate list size during build
+            timeout: Client-side timeout for the index build in seconds
+
+        Returns:
+            Dict with the mode, rows backfilled and vector index status
+        """
+        mode = mode or self.quantization
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(
+                f"Unknown quantization {mode!r}, expected one of {tuple(QUANTIZATION_MODES)}"
+            )
+        spec = QUANTIZATION_MODES[mode]
+        column = spec["column"]
+
+        async with self.acquire() as conn:
+            dims = dimensions or await self._embedding_dimensions(conn)
+            column_type = spec["type"].format(dims=int(dims))
+
+            await conn.execute(
+                f"ALTER TABLE memories ADD COLUMN IF NOT EXISTS {column} {column_type}"
+            )
+            await conn.execute(
+                f"""
+                CREATE OR REPLACE FUNCTION memories_sync_{column}() RETURNS trigger AS $$
+                BEGIN
+                    NEW.{column} := {spec["quantize"].format(vector="NEW.embedding")};
+                    RETURN NEW;
+                END;
+                $$ LANGUAGE plpgsql
+            """
+            )
+            await conn.execute(
+                f"""
+                CREATE OR REPLACE TRIGGER trg_memories_sync_{column}
+                BEFORE INSERT OR UPDATE OF embedding ON memories
+                FOR EACH ROW EXECUTE FUNCTION memories_sync_{column}()
+            """
+            )
+
+        backfilled = await self._backfill_quantized(mode, batch_size)
+
+        async with self.acquire() as conn:
+            logger.info(f"Building {mode} quantized index on memories.{column}")
+            await conn.execute(
+                f"""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memories_{column}
+                ON memories USING hnsw ({column} {spec["opclass"]})
+                WITH (m = {int(m)}, ef_construction = {int(ef_construction)})
+                WHERE deleted_at IS NULL
+            """,
+                timeout=timeout,
+            )
+
+        if mode == self.quantization:
+            await self._refresh_quantization_state()
+
+        return {
+            "mode": mode,
+            "dimensions": dims,
+            "backfilled": backfilled,
+            "ready": self.quantization_ready,
+            "index": await self.get_vector_index_status(),
+        }
+
+    async def _backfill_quantized(self, mode: str, batch_size: int = 5000) -> int:
+        """
+        Fill the quantized column for rows written before the trigger existed
+
+        Walks the table in id order so every batch is an index range scan,
+        committing per batch to keep row locks and WAL bursts short.
+        """
+        spec = QUANTIZATION_MODES[mode]
+        column = spec["column"]
+        query = f"""
+            WITH batch AS (
+                SELECT id FROM memories
+                WHERE id > $1 AND embedding IS NOT NULL
+                ORDER BY id
+                LIMIT $2
+            ),
+            updated AS (
+                UPDATE memories m
+                SET {column} = {spec["quantize"].format(vector="m.embedding")}
+                FROM batch
+                WHERE m.id = batch.id AND m.{column} IS NULL
+                RETURNING m.id
+            )
+            SELECT
+                (SELECT id FROM batch ORDER BY id DESC LIMIT 1) AS last_id,
+                (SELECT COUNT(*) FROM updated) AS updated
+        """
+
+        last_id = uuid.UUID(int=0)
+        total = 0
+        while True:
+            async with self.acquire() as conn:
+                row = await conn.fetchrow(query, last_id, batch_size)
+            if row["last_id"] is None:
+                break
+            last_id = row["last_id"]
+            total += row["updated"]
+            logger.debug(f"Quantized backfill ({mode}): {total} rows so far")
+
+        logger.info(f"Quantized backfill ({mode}) updated {total} rows")
+        return total
+
+    async def measure_quantized_recall(
+        self, sample_size: int = 20, k: int = 10, container_id: str = "default"
+    ) -> Dict[str, Any]:
+        """
+        Estimate recall@k of quantized search against an exact scan
+
+        Uses stored embeddings of sampled memories as queries and compares
+        the quantized (re-ranked) top-k with the exact top-k.
+
+        Returns:
+            Dict with mean ``recall``, ``queries`` evaluated and ``rerank_factor``
+        """
+        if self.quantization is None or not self.quantization_ready:
+            raise RuntimeError("Quantized search is not enabled")
+
+        async with self.acquire_read() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT embedding FROM memories TABLESAMPLE SYSTEM (1)
+                WHERE deleted_at IS NULL AND container_id = $1 AND embedding IS NOT NULL
+                LIMIT $2
+            """,
+                container_id,
+                sample_size,
+            )
+
+        recalls = []
+        for row in rows:
+            exact = await self.vector_search(
+                row["embedding"], limit=k, container_id=container_id, recall="exact"
+            )
+            approx = await self.vector_search(
+                row["embedding"], limit=k, container_id=container_id, recall="high"
+            )
+            if exact:
+                expected = {m["id"] for m in exact}
+                recalls.append(len(expected & {m["id"] for m in approx}) / len(expected))
+
+        return {
+            "mode": self.quantization,
+            "recall": sum(recalls) / len(recalls) if recalls else None,
+            "queries": len(recalls),
+            "k": k,
+            "rerank_factor": self.rerank_factor,
+        }
+
+    # ==================== Passage Chunks ====================
+
+    async def _replace_chunks(
+        self,
+        conn: asyncpg.Connection,
+        chunks: Dict[uuid.UUID, ChunkRows],
+        table: str = "memory_chunks",
+    ):
+        """
+        Replace the stored passages of every memory in ``chunks``
+
+        Must run in the caller's transaction, after the memory rows were
+        written. A memory mapped to no rows just loses its passages.
+        ``table`` is memory_chunks_next while a migration fills its shadow.
+        """
+        if not chunks:
+            return
+
+        await conn.execute(f"DELETE FROM {table} WHERE memory_id = ANY($1::uuid[])", list(chunks))
+        records = [
+            (memory_id, chunk_index, start_char, end_char, embedding)
+            for memory_id, rows in chunks.items()
+            for chunk_index, start_char, end_char, embedding in rows
+        ]
+        if records:
+            await conn.copy_records_to_table(
+                table,
+                records=records,
+                columns=["memory_id", "chunk_index", "start_char", "end_char", "embedding"],
+            )
+
+    async def create_chunk_index(
+        self,
+        method: str = "hnsw",
+        m: int = 16,
+        ef_construction: int = 64,
+        lists: Optional[int] = None,
+        dimensions: Optional[int] = None,
+        timeout: float = 3600.0,
+    ) -> Dict[str, Any]:
+        """
+        Build the ANN index on memory_chunks.embedding (cosine distance)
+
+        pgvector only indexes vectors of a fixed dimension, so an untyped
+        column is first given the dimension of memories.embedding. That
+        ALTER rewrites memory_chunks under an exclusive lock; run this once,
+        early, while the table is small. The index itself is built
+        CONCURRENTLY and an existing one is kept.
+
+        Args:
+            method: 'hnsw' or 'ivfflat'
+            m: HNSW max connections per layer
+            ef_construction: HNSW candidate list size during build
+            lists: IVFFlat list count (defaults to rows / 1000, at least 10)
+            dimensions: Embedding dimension; detected when None
+            timeout: Client-side timeout for the build in seconds
+
+        Returns:
+            Status of the vector indexes (see get_vector_index_status)
+        """
+        if method not in ("hnsw", "ivfflat"):
+            raise ValueError(f"Unknown vector index method {method!r}, expected hnsw or ivfflat")
+
+        async with self.acquire() as conn:
+            typmod = await conn.fetchval(
+                """
+                SELECT atttypmod FROM pg_attribute
+                WHERE attrelid = 'memory_chunks'::regclass AND attname = 'embedding'
+            """
+            )
+            if not typmod or typmod <= 0:
+                dims = dimensions or await self._embedding_dimensions(conn)
+                await conn.execute(
+                    f"ALTER TABLE memory_chunks ALTER COLUMN embedding TYPE vector({int(dims)})"
+                )
+
+            if method == "hnsw":
+                options = f"m = {int(m)}, ef_construction = {int(ef_construction)}"
+            else:
+                if lists is None:
+                    rows = await conn.fetchval("SELECT COUNT(*) FROM memory_chunks")
+                    lists = rows // 1000
+                options = f"lists = {max(int(lists), 10)}"
+
+            logger.info(f"Building {method} passage index {CHUNK_INDEX_NAME} ({options})")
+            await conn.execute(
+                f"""
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS {CHUNK_INDEX_NAME}
+                ON memory_chunks USING {method} (embedding vector_cosine_ops)
+                WITH ({options})
+            """,
+                timeout=timeout,
+            )
+
+        return await self.get_vector_index_status()
+
+    async def _search_chunks(
+        self,
+        conn: asyncpg.Connection,
+        embedding: Embedding,
+        limit: int,
+        min_similarity: float = 0.0,
+        container_id: str = "default",
+        projection: str = "full",
+        query: Optional[str] = None,
+    ) -> List[asyncpg.Record]:
+        """
+        Memories ranked by their best-matching passage (max-sim)
+
+        The nearest ``limit * chunk_search_factor`` passages of live memories
+        in the container are taken from the passage index and collapsed to
+        one row per memory, so a long memory counts once with the similarity
+        of its closest passage.
+
+        Returns:
+            Projected memory rows with ``similarity``, the passage offsets
+            ``passage_start``/``passage_end`` and, when ``query`` is given,
+            the memory's ``text_rank``
+        """
+        params: List[Any] = [
+            embedding,
+            container_id,
+            min_similarity,
+            limit,
+            limit * self.chunk_search_factor,
+        ]
+        rank_sql = ""
+        if query is not None:
+            params.append(query)
+            rank_sql = ", ts_rank(m.content_tsvector, plainto_tsquery('english', $6)) AS text_rank"
+
+        return await conn.fetch(
+            f"""
+            WITH hits AS (
+                SELECT
+                    c.memory_id, c.start_char, c.end_char,
+                    c.embedding <=> $1::vector AS distance
+                FROM memory_chunks c
+                JOIN memories m ON m.id = c.memory_id
+                WHERE m.deleted_at IS NULL
+                    AND m.container_id = $2
+                ORDER BY c.embedding <=> $1::vector
+                LIMIT $5
+            ),
+            best AS (
+                SELECT DISTINCT ON (memory_id) memory_id, start_char, end_char, distance
+                FROM hits
+                ORDER BY memory_id, distance
+            )
+            SELECT
+                {projection_sql(projection, "m")},
+                1 - b.distance AS similarity,
+                b.start_char AS passage_start,
+                b.end_char AS passage_end{rank_sql}
+            FROM best b
+            JOIN memories m ON m.id = b.memory_id
+            WHERE 1 - b.distance >= $3
+            ORDER BY b.distance
+            LIMIT $4
+        """,
+            *params,
+        )
+
+    async def get_chunk_stats(self) -> Dict[str, Any]:
+        """Count stored passages and the memories they belong to"""
+        async with self.acquire_read() as conn:
+            row = await conn.fetchrow(
+                """
+                SELECT COUNT(*) AS chunks, COUNT(DISTINCT memory_id) AS chunked_memories
+                FROM memory_chunks
+            """
+            )
+        return {**dict(row), "search_enabled": self.chunk_search}
+
+    # ==================== Relationship Operations ====================
+
+    async def create_relationship(
+        self,
+        source_id: str,
+        target_id: str,
+        relationship_type: str,
+        strength: float = 0.5,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Create a relationship between memories"""
+
+        query = """
+            INSERT INTO memory_relationships (
+                source_memory_id, target_memory_id, 
+                relationship_type, strength, metadata
+            ) VALUES ($1, $2, $3, $4, $5::jsonb)
+            ON CONFLICT (source_memory_id, target_memory_id, relationship_type)
+            DO UPDATE SET 
+                strength = EXCLUDED.strength,
+                metadata = EXCLUDED.metadata
+            RETURNING *
+        """
+
+        async with self.acquire() as conn:
+            row = await conn.fetchrow(
+                query,
+                uuid.UUID(source_id),
+                uuid.UUID(target_id),
+                relationship_type,
+                strength,
+                metadata or {},
+            )
+
+            return {
+                "id": str(row["id"]),
+                "source_memory_id": str(row["source_memory_id"]),
+                "target_memory_id": str(row["target_memory_id"]),
+                "relationship_type": row["relationship_type"],
+                "strength": float(row["strength"]),
+                "metadata": row["metadata"],
+                "created_at": row["created_at"].isoformat(),
+            }
+
+    async def get_related_memories(
+        self, memory_id: str, relationship_type: Optional[str] = None, min_strength: float = 0.0
+    ) -> List[Dict[str, Any]]:
+        """Get memories related to a given memory"""
+
+        where_clauses = ["r.strength >= $2"]
+        params = [uuid.UUID(memory_id), min_strength]
+        param_count = 2
+
+        if relationship_type:
+            param_count += 1
+            where_clauses.append(f"r.relationship_type = ${param_count}")
+            params.append(relationship_type)
+
+        query = f"""
+            SELECT 
+                m.*,
+                r.relationship_type,
+                r.strength as relationship_strength
+            FROM memory_relationships r
+            JOIN memories m ON (
+                (r.source_memory_id = $1 AND m.id = r.target_memory_id)
+                OR
+                (r.target_memory_id = $1 AND m.id = r.source_memory_id)
+            )
+            WHERE m.deleted_at IS NULL
+                AND {' AND '.join(where_clauses)}
+            ORDER BY r.strength DESC
+        """
+
+        async with self.acquire_read() as conn:
+            rows = await conn.fetch(query, *params)
+
+            results = []
+            for row in rows:
+                memory = self._row_to_dict(row)
+                memory["relationship_type"] = row["relationship_type"]
+                memory["relationship_strength"] = float(row["relationship_strength"])
+                results.append(memory)
+
+            return results
+
+    async def get_knowledge_graph(
+        self,
+        center_memory_id: str,
+        depth: int = 2,
+        min_strength: float = 0.5,
+        max_fanout: int = 25,
+        max_nodes: int = 500,
+        timeout_ms: int = 2000,
+        content_chars: int = 100,
+        projection: str = "summary",
+    ) -> Dict[str, Any]:
+        """
+        Traverse the relationship graph around a memory in one recursive query
+
+        Each step follows at most ``max_fanout`` of a node's strongest edges in
+        either direction, skipping deleted memories and cycles on the current
+        path. Nodes keep their shallowest depth; edges are those between the
+        returned nodes.
+
+        Args:
+            center_memory_id: Memory the graph is centered on
+            depth: Maximum number of hops from the center
+            min_strength: Minimum relationship strength to follow
+            max_fanout: Edges followed per node per hop
+            max_nodes: Maximum nodes returned (closest first)
+            timeout_ms: Statement timeout for the traversal
+            content_chars: Content is truncated to this many characters
+            projection: "summary" (truncated content) or "full"
+
+        Returns:
+            Dict with ``nodes``, ``edges`` and ``truncated`` (node cap was hit)
+        """
+        if projection not in ("summary", "full"):
+            raise ValueError(f"Unsupported graph projection {projection!r}")
+        if projection == "full":
+            content_chars = None
+
+        query = """
+            WITH RECURSIVE walk(id, depth, path) AS (
+                SELECT m.id, 0, ARRAY[m.id]
+                FROM memories m
+                WHERE m.id = $1 AND m.deleted_at IS NULL
+
+                UNION ALL
+
+                SELECT nb.id, w.depth + 1, w.path || nb.id
+                FROM walk w
+                CROSS JOIN LATERAL (
+                    SELECT e.id
+                    FROM (
+                        SELECT r.target_memory_id AS id, r.strength
+                        FROM memory_relationships r
+                        WHERE r.source_memory_id = w.id AND r.strength >= $3
+                        UNION ALL
+                        SELECT r.source_memory_id, r.strength
+                        FROM memory_relationships r
+                        WHERE r.target_memory_id = w.id AND r.strength >= $3
+                    ) e
+                    JOIN memories m ON m.id = e.id AND m.deleted_at IS NULL
+                    ORDER BY e.strength DESC
+                    LIMIT $4
+                ) nb
+                WHERE w.depth < $2 AND NOT nb.id = ANY(w.path)
+            ),
+            reached AS (
+                SELECT id, MIN(depth) AS depth FROM walk GROUP BY id
+            ),
+            nodes AS (
+                SELECT id, depth FROM reached ORDER BY depth, id LIMIT $5
+            ),
+            edges AS (
+                SELECT r.source_memory_id, r.target_memory_id, r.relationship_type, r.strength
+                FROM memory_relationships r
+                JOIN nodes s ON s.id = r.source_memory_id
+                JOIN nodes t ON t.id = r.target_memory_id
+                WHERE r.strength >= $3
+                ORDER BY r.strength DESC
+                LIMIT $5 * $4
+            )
+            SELECT jsonb_build_object(
+                'nodes', COALESCE((
+                    SELECT jsonb_agg(jsonb_build_object(
+                        'id', m.id,
+                        'content', CASE
+                            WHEN $6::int IS NULL THEN m.content ELSE left(m.content, $6)
+                        END,
+                        'type', m.memory_type,
+                        'depth', n.depth
+                    ) ORDER BY n.depth, m.importance_score DESC)
+                    FROM nodes n JOIN memories m ON m.id = n.id
+                ), '[]'::jsonb),
+                'edges', COALESCE((
+                    SELECT jsonb_agg(jsonb_build_object(
+                        'source', e.source_memory_id,
+                        'target', e.target_memory_id,
+                        'type', e.relationship_type,
+                        'strength', e.strength
+                    ) ORDER BY e.strength DESC)
+                    FROM edges e
+                ), '[]'::jsonb),
+                'truncated', (SELECT COUNT(*) FROM reached) > $5
+            )
+        """
+
+        async with self.acquire_read() as conn:
+            async with conn.transaction(readonly=True):
+                # SET cannot take bind parameters; the value is coerced to int
+                await conn.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+                return await conn.fetchval(
+                    query,
+                    uuid.UUID(center_memory_id),
+                    depth,
+                    min_strength,
+                    max_fanout,
+                    max_nodes,
+                    content_chars,
+                )
+
+    # ==================== Consolidation Operations ====================
+
+    async def consolidate_memories(
+        self,
+        source_ids: List[str],
+        consolidated_content: str,
+        consolidation_type: str = "merge",
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Consolidate multiple memories into one
+
+        The new memory, the consolidation record and (for merges) the soft
+        deletes of the sources are written on one connection in one transaction.
+        """
+        source_uuids = [uuid.UUID(str(sid)) for sid in source_ids]
+
+        async with self.acquire() as conn:
+            async with conn.transaction():
+                # Create the consolidated memory
+                row = await conn.fetchrow(
+                    """
+                    INSERT INTO memories (
+                        id, content, memory_type, importance_score,
+                        tags, metadata, container_id
+                    ) VALUES ($1, $2, 'consolidated', 0.8, '{}', $3::jsonb, 'default')
+                    RETURNING *
+                """,
+                    uuid.uuid4(),
+                    consolidated_content,
+                    {
+                        "consolidation_type": consolidation_type,
+                        "source_count": len(source_ids),
+                        **(metadata or {}),
+                    },
+                )
+
+                # Record consolidation
+                await conn.execute(
+                    """
+                    INSERT INTO memory_consolidations (
+                        consolidated_memory_id, source_memory_ids,
+                        consolidation_type, metadata
+                    ) VALUES ($1, $2, $3, $4::jsonb)
+                """,
+                    row["id"],
+                    source_uuids,
+                    consolidation_type,
+                    metadata or {},
+                )
+
+                # Soft delete source memories if merging
+                if consolidation_type == "merge":
+                    await self._soft_delete_many(conn, source_uuids)
+
+                return self._row_to_dict(row)
+
+    async def merge_duplicate_group(
+        self,
+        memory_ids: Sequence[str],
+        strategy: str = "keep_highest_importance",
+        enqueue_embedding: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Merge one cluster of duplicates into a single surviving memory
+
+        Everything happens in one transaction on one connection: the cluster
+        is locked, the survivor picked by ``strategy`` absorbs the others'
+        tags, access counts and importance, and the rest are soft-deleted
+        with one UPDATE. With ``merge_content`` the survivor's content becomes
+        the distinct contents of the cluster and, with ``enqueue_embedding``,
+        a new embedding is queued; otherwise the caller re-embeds it.
+
+        Args:
+            memory_ids: Memories of the cluster
+            strategy: One of MERGE_STRATEGIES
+            enqueue_embedding: Queue an embedding job for merged content
+
+        Returns:
+            Dict with ``kept`` id, ``removed`` ids and ``content_merged``, or None
+            if fewer than two of the memories are still live
+        """
+        if strategy not in MERGE_STRATEGIES:
+            raise ValueError(f"Unknown merge strategy {strategy!r}; expected {MERGE_STRATEGIES}")
+
+        ids = [uuid.UUID(str(memory_id)) for memory_id in memory_ids]
+
+        async with self.acquire() as conn:
+            async with conn.transaction():
+                rows = await conn.fetch(
+                    """
+                    SELECT id, content, importance_score, tags, metadata,
+                        access_count, created_at
+                    FROM memories
+                    WHERE id = ANY($1::uuid[]) AND deleted_at IS NULL
+                    ORDER BY id
+                    FOR UPDATE
+                """,
+                    ids,
+                )
+                # Another merge got here first
+                if len(rows) < 2:
+                    return None
+
+                if strategy == "keep_newest":
+                    keep = max(rows, key=lambda r: (r["created_at"], r["id"]))
+                elif strategy == "keep_oldest":
+                    keep = min(rows, key=lambda r: (r["created_at"], r["id"]))
+                else:
+                    keep = max(
+                        rows,
+                        key=lambda r: (r["importance_score"], r["access_count"], r["created_at"]),
+                    )
+                removed = [row["id"] for row in rows if row["id"] != keep["id"]]
+
+                content = None
+                if strategy == "merge_content":
+                    contents = []
+                    for row in sorted(rows, key=lambda r: r["created_at"]):
+                        if row["content"] not in contents:
+                            contents.append(row["content"])
+                    content = "\n\n".join(contents)
+
+                tags = sorted({tag for row in rows for tag in (row["tags"] or [])})
+                metadata = {
+                    **(keep["metadata"] if isinstance(keep["metadata"], dict) else {}),
+                    "merged_from": [str(memory_id) for memory_id in removed],
+                    "merge_strategy": strategy,
+                }
+                await conn.execute(
+                    """
+                    UPDATE memories
+                    SET content = COALESCE($2, content),
+                        tags = $3,
+                        importance_score = $4,
+                        access_count = $5,
+                        metadata = $6::jsonb,
+                        version = version + 1,
+                        updated_at = NOW()
+                    WHERE id = $1
+                """,
+                    keep["id"],
+                    content,
+                    tags,
+                    max(row["importance_score"] for row in rows),
+                    sum(row["access_count"] or 0 for row in rows),
+                    metadata,
+                )
+                if enqueue_embedding and content is not None and content != keep["content"]:
+                    await self._enqueue_embedding_jobs(conn, [keep["id"]])
+
+                await self._soft_delete_many(conn, removed)
+                await conn.execute(
+                    """
+                    INSERT INTO memory_consolidations (
+                        consolidated_memory_id, source_memory_ids,
+                        consolidation_type, metadata
+                    ) VALUES ($1, $2, 'merge', $3::jsonb)
+                """,
+                    keep["id"],
+                    [row["id"] for row in rows],
+                    {"strategy": strategy},
+                )
+
+        return {
+            "kept": str(keep["id"]),
+            "removed": [str(memory_id) for memory_id in removed],
+            "content_merged": content is not None,
+        }
+
+    async def _soft_delete_many(self, conn: asyncpg.Connection, memory_ids: List[uuid.UUID]):
+        """Soft-delete memories on ``conn`` and drop their duplicate candidates"""
+        await conn.execute(
+            """
+            UPDATE memories
+            SET deleted_at = NOW(), updated_at = NOW(), version = version + 1
+            WHERE id = ANY($1::uuid[]) AND deleted_at IS NULL
+        """,
+            memory_ids,
+        )
+        await conn.execute(
+            """
+            DELETE FROM memory_duplicate_candidates
+            WHERE memory1_id = ANY($1::uuid[]) OR memory2_id = ANY($1::uuid[])
+        """,
+            memory_ids,
+        )
+
+    # ==================== Duplicate Detection ====================
+
+    async def find_duplicates(
+        self,
+        similarity_threshold: float = 0.95,
+        limit: int = 100,
+        memory_ids: Optional[Sequence[str]] = None,
+    ) -> List[Tuple[str, str, float]]:
+        """
+        List near-duplicate pairs, most similar first
+
+        Reads the candidate table maintained by sweep_duplicate_candidates,
+        so this is an index range scan rather than a pairwise comparison.
+        ``memory_ids`` restricts the result to pairs within that set.
+        """
+        params: List[Any] = [similarity_threshold, limit]
+        scope = ""
+        if memory_ids is not None:
+            params.append([uuid.UUID(str(memory_id)) for memory_id in memory_ids])
+            scope = "AND d.memory1_id = ANY($3::uuid[]) AND d.memory2_id = ANY($3::uuid[])"
+
+        query = f"""
+            SELECT d.memory1_id, d.memory2_id, d.similarity
+            FROM memory_duplicate_candidates d
+            JOIN memories a ON a.id = d.memory1_id AND a.deleted_at IS NULL
+            JOIN memories b ON b.id = d.memory2_id AND b.deleted_at IS NULL
+            WHERE d.similarity >= $1 {scope}
+            ORDER BY d.similarity DESC
+            LIMIT $2
+        """
+
+        async with self.acquire_read() as conn:
+            rows = await conn.fetch(query, *params)
+
+            return [
+                (str(row["memory1_id"]), str(row["memory2_id"]), float(row["similarity"]))
+                for row in rows
+            ]
+
+    async def count_duplicates(self, similarity_threshold: float = 0.95) -> int:
+        """Count near-duplicate pairs at or above a similarity threshold"""
+        query = """
+            SELECT COUNT(*)
+            FROM memory_duplicate_candidates d
+            JOIN memories a ON a.id = d.memory1_id AND a.deleted_at IS NULL
+            JOIN memories b ON b.id = d.memory2_id AND b.deleted_at IS NULL
+            WHERE d.similarity >= $1
+        """
+
+        async with self.acquire_read() as conn:
+            return await conn.fetchval(query, similarity_threshold)
+
+    async def refresh_duplicate_candidates(
+        self, memory_ids: Sequence[str], neighbors: int = 10, min_similarity: float = 0.8
+    ) -> int:
+        """
+        Recompute duplicate candidates for a set of memories
+
+        Each memory's pairs are replaced by its top ``neighbors`` ANN matches
+        at or above ``min_similarity`` within the same container.
+
+        Returns:
+            Number of candidate pairs written
+        """
+        ids = [uuid.UUID(str(memory_id)) for memory_id in memory_ids]
+        if not ids:
+            return 0
+
+        query = """
+            INSERT INTO memory_duplicate_candidates (memory1_id, memory2_id, similarity)
+            SELECT DISTINCT ON (pair.memory1_id, pair.memory2_id)
+                pair.memory1_id, pair.memory2_id, pair.similarity
+            FROM (
+                SELECT
+                    LEAST(c.id, n.id) AS memory1_id,
+                    GREATEST(c.id, n.id) AS memory2_id,
+                    n.similarity
+                FROM memories c
+                CROSS JOIN LATERAL (
+                    SELECT m.id, 1 - (m.embedding <=> c.embedding) AS similarity
+                    FROM memories m
+                    WHERE m.deleted_at IS NULL
+                        AND m.container_id = c.container_id
+                        AND m.embedding IS NOT NULL
+                        AND m.id <> c.id
+                    ORDER BY m.embedding <=> c.embedding
+                    LIMIT $2
+                ) n
+                WHERE c.id = ANY($1::uuid[])
+                    AND c.deleted_at IS NULL
+                    AND c.embedding IS NOT NULL
+                    AND n.similarity >= $3
+            ) pair
+            ORDER BY pair.memory1_id, pair.memory2_id, pair.similarity DESC
+            ON CONFLICT (memory1_id, memory2_id)
+            DO UPDATE SET similarity = EXCLUDED.similarity, detected_at = NOW()
+        """
+
+        async with self.acquire(mark_write=False) as conn:
+            async with conn.transaction():
+                profile = RECALL_PROFILES["balanced"]
+                await conn.execute(
+                    "SELECT set_config('hnsw.ef_search', $1, true)",
+                    str(min(max(profile["hnsw.ef_search"], neighbors), HNSW_MAX_EF_SEARCH)),
+                )
+                # Pairs of changed memories are rebuilt from scratch
+                await conn.execute(
+                    """
+                    DELETE FROM memory_duplicate_candidates
+                    WHERE memory1_id = ANY($1::uuid[]) OR memory2_id = ANY($1::uuid[])
+                """,
+                    ids,
+                )
+                status = await conn.execute(query, ids, neighbors, min_similarity)
+
+        return int(status.split()[-1])
+
+    async def sweep_duplicate_candidates(
+        self,
+        neighbors: int = 10,
+        min_similarity: float = 0.8,
+        batch_size: int = 500,
+        lag_seconds: float = 30.0,
+    ) -> Dict[str, Any]:
+        """
+        Refresh duplicate candidates for memories changed since the last sweep
+
+        Memories are read in (updated_at, id) order up to ``lag_seconds``
+        before now (see _sweep_changed_memories for what that misses).
+        Re-processing a memory is harmless, so an interrupted sweep simply
+        resumes from the previous watermark.
+
+        Returns:
+            Dict with ``processed`` memories, ``pairs`` written and the new ``watermark``
+        """
+        processed, pairs, until = await self._sweep_changed_memories(
+            "duplicate_candidates",
+            lambda ids: self.refresh_duplicate_candidates(
+                ids, neighbors=neighbors, min_similarity=min_similarity
+            ),
+            batch_size=batch_size,
+            lag_seconds=lag_seconds,
+        )
+
+        logger.info(f"Duplicate sweep processed {processed} memories, wrote {pairs} pairs")
+        return {"processed": processed, "pairs": pairs, "watermark": until.isoformat()}
+
+    async def discover_similar_relationships(
+        self, memory_ids: Sequence[str], neighbors: int = 5, min_similarity: float = 0.95
+    ) -> int:
+        """
+        Link a batch of memories to their nearest neighbours with "similar" edges
+
+        One LATERAL k-NN query finds the neighbours of the whole batch (on the
+        read pool), and one ``INSERT ... SELECT FROM unnest(...)`` upserts every
+        edge. Each pair gets a single edge, pointing from the lower to the
+        higher id unless an edge in the other direction already exists.
+
+        Returns:
+            Number of edges written
+        """
+        ids = [uuid.UUID(str(memory_id)) for memory_id in memory_ids]
+        if not ids:
+            return 0
+
+        knn_query = """
+            SELECT DISTINCT ON (LEAST(c.id, n.id), GREATEST(c.id, n.id))
+                LEAST(c.id, n.id) AS source_id,
+                GREATEST(c.id, n.id) AS target_id,
+                n.similarity
+            FROM memories c
+            CROSS JOIN LATERAL (
+                SELECT m.id, 1 - (m.embedding <=> c.embedding) AS similarity
+                FROM memories m
+                WHERE m.deleted_at IS NULL
+                    AND m.container_id = c.container_id
+                    AND m.embedding IS NOT NULL
+                    AND m.id <> c.id
+                ORDER BY m.embedding <=> c.embedding
+                LIMIT $2
+            ) n
+            WHERE c.id = ANY($1::uuid[])
+                AND c.deleted_at IS NULL
+                AND c.embedding IS NOT NULL
+                AND n.similarity >= $3
+                AND NOT EXISTS (
+                    SELECT 1 FROM memory_relationships r
+                    WHERE r.source_memory_id = GREATEST(c.id, n.id)
+                        AND r.target_memory_id = LEAST(c.id, n.id)
+                        AND r.relationship_type = 'similar'
+                )
+            ORDER BY LEAST(c.id, n.id), GREATEST(c.id, n.id), n.similarity DESC
+        """
+
+        async with self.acquire_read() as conn:
+            async with conn.transaction():
+                profile = RECALL_PROFILES["balanced"]
+                await conn.execute(
+                    "SELECT set_config('hnsw.ef_search', $1, true)",
+                    str(min(max(profile["hnsw.ef_search"], neighbors), HNSW_MAX_EF_SEARCH)),
+                )
+                edges = await conn.fetch(knn_query, ids, neighbors, min_similarity)
+
+        if not edges:
+            return 0
+
+        async with self.acquire() as conn:
+            status = await conn.execute(
+                """
+                INSERT INTO memory_relationships (
+                    source_memory_id, target_memory_id, relationship_type, strength
+                )
+                SELECT e.source_id, e.target_id, 'similar', e.strength
+                FROM unnest($1::uuid[], $2::uuid[], $3::real[]) AS e(source_id, target_id, strength)
+                ON CONFLICT (source_memory_id, target_memory_id, relationship_type)
+                DO UPDATE SET strength = EXCLUDED.strength
+            """,
+                [edge["source_id"] for edge in edges],
+                [edge["target_id"] for edge in edges],
+                [float(edge["similarity"]) for edge in edges],
+            )
+        return int(status.split()[-1])
+
+    async def sweep_similar_relationships(
+        self,
+        neighbors: int = 5,
+        min_similarity: float = 0.95,
+        batch_size: int = 500,
+        lag_seconds: float = 30.0,
+    ) -> Dict[str, Any]:
+        """
+        Discover "similar" edges for memories changed since the last sweep
+
+        Embedding writes bump ``updated_at``, so newly embedded memories are
+        picked up in the next sweep. Batches resume from the watermark like
+        the duplicate sweep.
+
+        Returns:
+            Dict with ``processed`` memories, ``edges`` written and the new ``watermark``
+        """
+        processed, edges, until = await self._sweep_changed_memories(
+            "similar_relationships",
+            lambda ids: self.discover_similar_relationships(
+                ids, neighbors=neighbors, min_similarity=min_similarity
+            ),
+            batch_size=batch_size,
+            lag_seconds=lag_seconds,
+        )
+
+        logger.info(f"Relationship sweep processed {processed} memories, wrote {edges} edges")
+        return {"processed": processed, "edges": edges, "watermark": until.isoformat()}
+
+    async def _sweep_changed_memories(
+        self,
+        job: str,
+        process: Callable[[List[uuid.UUID]], Awaitable[int]],
+        batch_size: int = 500,
+        lag_seconds: float = 30.0,
+    ) -> Tuple[int, int, datetime]:
+        """
+        Feed embedded memories changed since ``job``'s watermark to ``process`` in batches
+
+        Memories are read in (updated_at, id) order up to ``lag_seconds``
+        before now, so a transaction still in flight is picked up by the
+        next sweep only if it commits within ``lag_seconds`` of the
+        ``updated_at`` it wrote. A transaction that commits later lands
+        behind a watermark that has already passed it, and that memory is
+        not swept until it is written again. ``process`` must be
+        idempotent: an interrupted sweep resumes from the previous watermark.
+
+        The watermark and the changed rows are read on the primary: a
+        replica's NOW() and rows lag behind, and memories written in the gap
+        would fall behind the watermark and never be swept.
+
+        Returns:
+            (memories processed, sum of ``process`` results, new watermark)
+        """
+        async with self.acquire(mark_write=False) as conn:
+            since = await self._get_watermark(conn, job)
+            until = await conn.fetchval(
+                "SELECT NOW() - make_interval(secs => $1)", float(lag_seconds)
+            )
+
+        query = """
+            SELECT id, updated_at FROM memories
+            WHERE deleted_at IS NULL
+                AND embedding IS NOT NULL
+                AND updated_at <= $2::timestamptz
+                AND (updated_at, id) > ($1::timestamptz, $3)
+            ORDER BY updated_at, id
+            LIMIT $4
+        """
+
+        processed = 0
+        written = 0
+        cursor = (since, uuid.UUID(int=0))
+        while True:
+            async with self.acquire(mark_write=False) as conn:
+                rows = await conn.fetch(query, cursor[0], until, cursor[1], batch_size)
+            if not rows:
+                break
+
+            written += await process([row["id"] for row in rows])
+            processed += len(rows)
+            cursor = (rows[-1]["updated_at"], rows[-1]["id"])
+
+        if until > since:
+            async with self.acquire(mark_write=False) as conn:
+                await self._set_watermark(conn, job, until)
+
+        return processed, written, until
+
+    async def _get_watermark(self, conn: asyncpg.Connection, job: str) -> datetime:
+        """Last completed position of an incremental job (-infinity if never run)"""
+        watermark = await conn.fetchval(
+            "SELECT watermark FROM maintenance_watermarks WHERE job = $1", job
+        )
+        return watermark or datetime.min.replace(tzinfo=timezone.utc)
+
+    async def _set_watermark(self, conn: asyncpg.Connection, job: str, watermark: datetime):
+        """Record the position an incremental job has completed up to"""
+        await conn.execute(
+            """
+            INSERT INTO maintenance_watermarks (job, watermark)
+            VALUES ($1, $2)
+            ON CONFLICT (job) DO UPDATE SET watermark = EXCLUDED.watermark, updated_at = NOW()
+        """,
+            job,
+            watermark,
+        )
+
+    # ==================== Maintenance ====================
+
+    async def purge_deleted_memories(
+        self,
+        retention_days: float = 30,
+        batch_size: int = 500,
+        max_batches: Optional[int] = None,
+    ) -> Dict[str, int]:
+        """
+        Hard-delete memories that were soft-deleted more than ``retention_days`` ago
+
+        Each batch runs in its own short transaction and also removes the
+        relationships pointing at the purged memories, so row locks stay
+        brief and nothing is left referencing a missing memory.
+
+        Args:
+            retention_days: Grace period before a soft-deleted memory is purged
+            batch_size: Memories purged per transaction
+            max_batches: Stop after this many batches (None drains everything due)
+
+        Returns:
+            Dict with purged ``memories``, ``relationships`` and ``batches`` run
+        """
+        result = {"memories": 0, "relationships": 0, "batches": 0}
+
+        while max_batches is None or result["batches"] < max_batches:
+            async with self.acquire(mark_write=False) as conn:
+                async with conn.transaction():
+                    rows = await conn.fetch(
+                        """
+                        SELECT id FROM memories
+                        WHERE deleted_at < NOW() - make_interval(secs => $1)
+                        ORDER BY deleted_at
+                        LIMIT $2
+                        FOR UPDATE SKIP LOCKED
+                    """,
+                        float(retention_days) * 86400,
+                        batch_size,
+                    )
+                    ids = [row["id"] for row in rows]
+                    if ids:
+                        # One statement per direction keeps both on their own index
+                        for column in ("source_memory_id", "target_memory_id"):
+                            status = await conn.execute(
+                                f"""
+                                DELETE FROM memory_relationships
+                                WHERE {column} = ANY($1::uuid[])
+                            """,
+                                ids,
+                            )
+                            result["relationships"] += int(status.split()[-1])
+                        status = await conn.execute(
+                            "DELETE FROM memories WHERE id = ANY($1::uuid[])", ids
+                        )
+                        result["memories"] += int(status.split()[-1])
+
+            if not ids:
+                break
+            result["batches"] += 1
+            if len(ids) < batch_size:
+                break
+
+        if result["memories"]:
+            logger.info(
+                f"Purged {result['memories']} soft-deleted memories and "
+                f"{result['relationships']} relationships"
+            )
+        return result
+
+    async def purge_search_history(
+        self,
+        retention_days: float = 90,
+        batch_size: int = 5000,
+        max_batches: Optional[int] = None,
+    ) -> int:
+        """
+        Delete search_history rows older than ``retention_days``, oldest first
+
+        Each batch is its own short statement, so the purge never holds locks
+        on the whole backlog at once.
+
+        Returns:
+            Number of rows deleted
+        """
+        deleted = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            async with self.acquire(mark_write=False) as conn:
+                status = await conn.execute(
+                    """
+                    DELETE FROM search_history
+                    WHERE ctid = ANY(ARRAY(
+                        SELECT ctid FROM search_history
+                        WHERE created_at < NOW() - make_interval(secs => $1)
+                        ORDER BY created_at
+                        LIMIT $2
+                    ))
+                """,
+                    float(retention_days) * 86400,
+                    batch_size,
+                )
+            count = int(status.split()[-1])
+            deleted += count
+            batches += 1
+            if count < batch_size:
+                break
+
+        if deleted:
+            logger.info(f"Purged {deleted} search history rows older than {retention_days} days")
+        return deleted
+
+    async def get_table_health(self) -> Dict[str, Any]:
+        """
+        Report dead tuples, vacuum history and sizes for the maintained tables
+
+        ``dead_ratio`` is dead / (live + dead) tuples from the statistics
+        collector; it also drives VACUUM and REINDEX in the maintenance job,
+        since pgvector indexes keep dead entries until the table is vacuumed.
+
+        Read on the primary: a replica's statistics collector only counts
+        its own activity, so its dead tuples and vacuum times are not the
+        primary's.
+
+        Returns:
+            Dict with per-table stats, the soft-deleted backlog and vector index sizes
+        """
+        async with self.acquire(mark_write=False) as conn:
+            rows = await conn.fetch(
+                """
+                SELECT
+                    s.relname AS name,
+                    s.n_live_tup AS live_tuples,
+                    s.n_dead_tup AS dead_tuples,
+                    s.last_vacuum,
+                    s.last_autovacuum,
+                    s.last_analyze,
+                    s.last_autoanalyze,
+                    pg_table_size(s.relid) AS table_bytes,
+                    pg_indexes_size(s.relid) AS index_bytes
+                FROM pg_stat_user_tables s
+                WHERE s.relname = ANY($1::text[])
+                ORDER BY s.relname
+            """,
+                list(MAINTAINED_TABLES),
+            )
+            soft_deleted = await conn.fetchval(
+                "SELECT COUNT(*) FROM memories WHERE deleted_at IS NOT NULL"
+            )
+            oldest_deleted = await conn.fetchval(
+                "SELECT MIN(deleted_at) FROM memories WHERE deleted_at IS NOT NULL"
+            )
+            vector_indexes = await conn.fetch(
+                """
+                SELECT i.relname AS name, pg_relation_size(i.oid) AS size_bytes
+                FROM pg_index ix
+                JOIN pg_class i ON i.oid = ix.indexrelid
+                JOIN pg_am am ON am.oid = i.relam
+                WHERE ix.indrelid = 'memories'::regclass
+                    AND am.amname IN ('hnsw', 'ivfflat')
+                ORDER BY i.relname
+            """
+            )
+
+        tables = {}
+        for row in rows:
+            stats = dict(row)
+            name = stats.pop("name")
+            total = stats["live_tuples"] + stats["dead_tuples"]
+            stats["dead_ratio"] = round(stats["dead_tuples"] / total, 4) if total else 0.0
+            for key in ("last_vacuum", "last_autovacuum", "last_analyze", "last_autoanalyze"):
+                stats[key] = stats[key].isoformat() if stats[key] else None
+            tables[name] = stats
+
+        return {
+            "tables": tables,
+            "soft_deleted": soft_deleted,
+            "oldest_soft_deleted_at": oldest_deleted.isoformat() if oldest_deleted else None,
+            "vector_indexes": [dict(row) for row in vector_indexes],
+        }
+
+    async def vacuum_tables(
+        self, tables: Optional[Sequence[str]] = None, timeout: float = 3600.0
+    ) -> List[str]:
+        """
+        Run VACUUM (ANALYZE) on maintained tables
+
+        Args:
+            tables: Subset of MAINTAINED_TABLES; all of them when None
+            timeout: Client-side timeout per table in seconds
+
+        Returns:
+            Tables that were vacuumed
+        """
+        tables = list(tables or MAINTAINED_TABLES)
+        unknown = set(tables) - set(MAINTAINED_TABLES)
+        if unknown:
+            raise ValueError(f"Not a maintained table: {', '.join(sorted(unknown))}")
+
+        # VACUUM cannot run inside a transaction block
+        async with self.acquire(mark_write=False) as conn:
+            for table in tables:
+                logger.info(f"Vacuuming {table}")
+                await conn.execute(f"VACUUM (ANALYZE) {table}", timeout=timeout)
+        return tables
+
+    async def reindex_vector_indexes(self, timeout: float = 3600.0) -> List[str]:
+        """
+        Rebuild every valid ANN index on memories and memory_chunks with
+        REINDEX CONCURRENTLY
+
+        Searches keep using the old index while the replacement is built.
+
+        Returns:
+            Names of the rebuilt indexes
+        """
+        indexes = [
+            index["name"]
+            for index in (await self.get_vector_index_status())["indexes"]
+            if index["valid"]
+        ]
+
+        async with self.acquire(mark_write=False) as conn:
+            for name in indexes:
+                logger.info(f"Reindexing vector index {name}")
+                await conn.execute(f"REINDEX INDEX CONCURRENTLY {name}", timeout=timeout)
+        return indexes
+
+    # ==================== Embedding Cache ====================
+
+    async def get_cached_embeddings(
+        self, model: str, content_hashes: Sequence[bytes]
+    ) -> Dict[bytes, np.ndarray]:
+        """
+        Look up cached embeddings and mark them as used
+
+        ``last_used_at`` is only refreshed when it is more than an hour old,
+        so hot entries do not turn every lookup into a row update.
+
+        Returns:
+            Embeddings by content hash for the hashes that were cached
+        """
+        if not content_hashes:
+            return {}
+
+        query = """
+            WITH hit AS (
+                SELECT content_hash, embedding, last_used_at
+                FROM embedding_cache
+                WHERE model = $1 AND content_hash = ANY($2::bytea[])
+            ),
+            touched AS (
+                UPDATE embedding_cache c
+                SET last_used_at = NOW()
+                FROM hit
+                WHERE c.model = $1
+                    AND c.content_hash = hit.content_hash
+                    AND hit.last_used_at < NOW() - INTERVAL '1 hour'
+            )
+            SELECT content_hash, embedding FROM hit
+        """
+
+        # Touching entries must not pin this process's reads to the primary
+        async with self.acquire(mark_write=False) as conn:
+            rows = await conn.fetch(query, model, list(content_hashes))
+        return {bytes(row["content_hash"]): row["embedding"] for row in rows}
+
+    async def store_cached_embeddings(
+        self, model: str, entries: Sequence[Tuple[bytes, Embedding]]
+    ) -> None:
+        """Insert embeddings into the cache (existing entries are kept)"""
+        if not entries:
+            return
+
+        async with self.acquire(mark_write=False) as conn:
+            await conn.executemany(
+                """
+                INSERT INTO embedding_cache (model, content_hash, embedding)
+                VALUES ($1, $2, $3)
+                ON CONFLICT (model, content_hash) DO NOTHING
+            """,
+                [(model, content_hash, embedding) for content_hash, embedding in entries],
+            )
+
+    async def evict_embedding_cache(self, max_rows: int, batch_size: int = 5000) -> int:
+        """
+        Trim the embedding cache to ``max_rows``, least recently used first
+
+        Returns:
+            Number of evicted entries
+        """
+        evicted = 0
+        async with self.acquire(mark_write=False) as conn:
+            excess = await conn.fetchval("SELECT COUNT(*) FROM embedding_cache") - max_rows
+            while excess > 0:
+                status = await conn.execute(
+                    """
+                    DELETE FROM embedding_cache
+                    WHERE (model, content_hash) IN (
+                        SELECT model, content_hash FROM embedding_cache
+                        ORDER BY last_used_at
+                        LIMIT $1
+                    )
+                """,
+                    min(excess, batch_size),
+                )
+                deleted = int(status.split()[-1])
+                if not deleted:
+                    break
+                evicted += deleted
+                excess -= deleted
+
+        if evicted:
+            logger.info(f"Evicted {evicted} embedding cache entries")
+        return evicted
+
+    # ==================== Embedding Jobs ====================
+
+    async def _enqueue_embedding_jobs(self, conn: asyncpg.Connection, memory_ids: List[uuid.UUID]):
+        """
+        Queue embedding jobs for the current version of ``memory_ids``
+
+        Must run in the caller's transaction after the memory rows were
+        written, so the memory row is always locked before its job row.
+        """
+        await conn.execute(
+            """
+            INSERT INTO embedding_jobs (memory_id, version)
+            SELECT id, version FROM memories WHERE id = ANY($1::uuid[])
+            ON CONFLICT (memory_id) DO UPDATE SET
+                version = EXCLUDED.version,
+                attempts = 0,
+                last_error = NULL,
+                available_at = NOW()
+        """,
+            memory_ids,
+        )
+
+    async def claim_embedding_jobs(
+        self, batch_size: int = 32, lease_seconds: float = 300.0, max_attempts: int = 5
+    ) -> List[asyncpg.Record]:
+        """
+        Claim due embedding jobs for this worker
+
+        Jobs are locked with ``FOR UPDATE SKIP LOCKED`` so concurrent workers,
+        in this process or on other nodes, never claim the same job. A claim
+        is a lease: the job becomes due again after ``lease_seconds`` unless
+        it is completed or failed first, so a crashed worker loses nothing.
+        Due jobs out of attempts, e.g. whose last lease expired, are given up.
+        Like the other job writes, polling does not pin this process's reads
+        to the primary (no request waits on it).
+
+        Returns:
+            Records with memory_id, version and content of the claimed memories
+        """
+        async with self.acquire(mark_write=False) as conn:
+            return await conn.fetch(
+                """
+                WITH given_up AS (
+                    UPDATE embedding_jobs
+                    SET available_at = 'infinity',
+                        last_error = COALESCE(last_error, 'Lease expired')
+                    WHERE available_at <= NOW() AND attempts >= $3
+                ),
+                due AS (
+                    SELECT memory_id FROM embedding_jobs
+                    WHERE available_at <= NOW() AND attempts < $3
+                    ORDER BY available_at
+                    LIMIT $1
+                    FOR UPDATE SKIP LOCKED
+                ),
+                claimed AS (
+                    UPDATE embedding_jobs j
+                    SET attempts = j.attempts + 1,
+                        available_at = NOW() + make_interval(secs => $2)
+                    FROM due
+                    WHERE j.memory_id = due.memory_id
+                    RETURNING j.memory_id
+                )
+                SELECT m.id AS memory_id, m.version, m.content
+                FROM claimed
+                JOIN memories m ON m.id = claimed.memory_id
+            """,
+                batch_size,
+                float(lease_seconds),
+                max_attempts,
+            )
+
+    async def complete_embedding_jobs(
+        self,
+        model: str,
+        results: Sequence[Tuple[uuid.UUID, int, Embedding]],
+        chunks: Optional[Dict[uuid.UUID, ChunkRows]] = None,
+    ) -> int:
+        """
+        Write embeddings for claimed jobs and remove the jobs
+
+        A job is only completed, and its vector only written, if it was not
+        re-queued for a newer version of the memory in the meantime.
+
+        Args:
+            model: Embedding model that produced the vectors
+            results: (memory_id, version embedded, embedding) per job
+            chunks: Passages per memory; when given, the stored passages of
+                every updated memory are replaced (removed if it has none)
+
+        Returns:
+            Number of memories updated
+        """
+        if not results:
+            return 0
+
+        async with self.acquire(mark_write=False) as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    """
+                    CREATE TEMP TABLE embedding_job_staging ON COMMIT DROP AS
+                    SELECT id, version, embedding FROM memories WITH NO DATA
+                """
+                )
+                await conn.copy_records_to_table(
+                    "embedding_job_staging",
+                    records=list(results),
+                    columns=["id", "version", "embedding"],
+                )
+                # Same lock order as writers: memory rows first, then their jobs
+                await conn.execute(
+                    """
+                    SELECT m.id FROM memories m
+                    JOIN embedding_job_staging s ON s.id = m.id
+                    ORDER BY m.id
+                    FOR UPDATE OF m
+                """
+                )
+                update_sql = """
+                    WITH done AS (
+                        DELETE FROM embedding_jobs j
+                        USING embedding_job_staging s
+                        WHERE j.memory_id = s.id AND j.version <= s.version
+                        RETURNING j.memory_id
+                    )
+                    UPDATE memories m
+                    SET embedding = s.embedding,
+                        embedding_model = $1,
+                        embedding_generated_at = NOW(),
+                        updated_at = NOW()
+                    FROM embedding_job_staging s
+                    JOIN done ON done.memory_id = s.id
+                    WHERE m.id = s.id AND m.deleted_at IS NULL
+                """
+                if chunks is None:
+                    status = await conn.execute(update_sql, model)
+                    return int(status.split()[-1])
+
+                rows = await conn.fetch(update_sql + " RETURNING m.id", model)
+                await self._replace_chunks(
+                    conn, {row["id"]: chunks.get(row["id"], ()) for row in rows}
+                )
+        return len(rows)
+
+    async def fail_embedding_jobs(
+        self,
+        memory_ids: Sequence[uuid.UUID],
+        error: str,
+        retry_seconds: float = 30.0,
+        max_attempts: Optional[int] = None,
+    ) -> None:
+        """
+        Release failed jobs for a retry with exponential backoff (capped at an hour)
+
+        Jobs that used ``max_attempts`` are given up instead: they stay for
+        inspection but are never claimed or reported as pending again.
+        """
+        if not memory_ids:
+            return
+
+        async with self.acquire(mark_write=False) as conn:
+            await conn.execute(
+                """
+                UPDATE embedding_jobs
+                SET last_error = $2,
+                    available_at = CASE
+                        WHEN attempts >= $4 THEN 'infinity'
+                        ELSE NOW() + make_interval(
+                            secs => LEAST($3 * power(2, GREATEST(attempts - 1, 0)), 3600)
+                        )
+                    END
+                WHERE memory_id = ANY($1::uuid[])
+            """,
+                list(memory_ids),
+                error,
+                float(retry_seconds),
+                max_attempts,
+            )
+
+    async def get_embedding_job_stats(self, max_attempts: int = 5) -> Dict[str, Any]:
+        """Count queued, leased and given-up embedding jobs"""
+        async with self.acquire_read() as conn:
+            row = await conn.fetchrow(
+                """
+                SELECT
+                    COUNT(*) FILTER (WHERE attempts < $1 AND available_at <= NOW()) AS due,
+                    COUNT(*) FILTER (WHERE attempts < $1 AND available_at > NOW()) AS waiting,
+                    COUNT(*) FILTER (WHERE attempts >= $1) AS failed,
+                    MIN(created_at) AS oldest_created_at
+                FROM embedding_jobs
+            """,
+                max_attempts,
+            )
+        return dict(row)
+
+    # ==================== Embedding Backfill ====================
+
+    async def get_backfill_job(self, model: str) -> Optional[Dict[str, Any]]:
+        """Get the checkpoint of the embedding backfill for ``model``"""
+        async with self.acquire_read() as conn:
+            row = await conn.fetchrow(
+                "SELECT * FROM embedding_backfill_jobs WHERE model = $1", model
+            )
+        return _record_to_plain_dict(row) if row else None
+
+    async def start_backfill_job(self, model: str, reset: bool = False) -> Dict[str, Any]:
+        """
+        Mark the backfill for ``model`` as running
+
+        An interrupted job resumes from its checkpoint. A job that never ran,
+        already completed, or is ``reset`` starts over from the oldest memory
+        with a fresh count of the memories still to embed.
+
+        Returns:
+            The job checkpoint
+        """
+        async with self.acquire(mark_write=False) as conn:
+            async with conn.transaction():
+                job = await conn.fetchrow(
+                    "SELECT status FROM embedding_backfill_jobs WHERE model = $1 FOR UPDATE",
+                    model,
+                )
+                if job is None or reset or job["status"] == "completed":
+                    total = await conn.fetchval(
+                        """
+                        SELECT COUNT(*) FROM memories
+                        WHERE deleted_at IS NULL
+                            AND (embedding IS NULL OR embedding_model IS DISTINCT FROM $1)
+                    """,
+                        model,
+                    )
+                    row = await conn.fetchrow(
+                        """
+                        INSERT INTO embedding_backfill_jobs (model, status, total)
+                        VALUES ($1, 'running', $2)
+                        ON CONFLICT (model) DO UPDATE SET
+                            status = 'running',
+                            cursor_created_at = NULL,
+                            cursor_id = NULL,
+                            total = EXCLUDED.total,
+                            processed = 0,
+                            embedded = 0,
+                            failed = 0,
+                            last_error = NULL,
+                            started_at = NOW(),
+                            updated_at = NOW(),
+                            finished_at = NULL
+                        RETURNING *
+                    """,
+                        model,
+                        total,
+                    )
+                else:
+                    row = await conn.fetchrow(
+                        """
+                        UPDATE embedding_backfill_jobs
+                        SET status = 'running', last_error = NULL, updated_at = NOW()
+                        WHERE model = $1
+                        RETURNING *
+                    """,
+                        model,
+                    )
+        return _record_to_plain_dict(row)
+
+    async def set_backfill_status(
+        self, model: str, status: str, error: Optional[str] = None
+    ) -> None:
+        """Record a backfill state change (paused, failed or completed)"""
+        async with self.acquire(mark_write=False) as conn:
+            await conn.execute(
+                """
+                UPDATE embedding_backfill_jobs
+                SET status = $2,
+                    last_error = $3,
+                    updated_at = NOW(),
+                    finished_at = CASE WHEN $2 = 'completed' THEN NOW() END
+                WHERE model = $1
+            """,
+                model,
+                status,
+                error,
+            )
+
+    async def fetch_backfill_batch(
+        self,
+        model: str,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None,
+        batch_size: int = 100,
+    ) -> List[asyncpg.Record]:
+        """
+        Next keyset batch of memories without an embedding from ``model``
+
+        Args:
+            model: Target embedding model
+            after: (created_at, id) of the last memory of the previous batch
+            batch_size: Memories per batch
+
+        Returns:
+            Records with id, content, created_at and version, oldest first
+        """
+        params: List[Any] = [model, batch_size]
+        keyset = ""
+        if after is not None:
+            keyset = "AND (created_at, id) > ($3, $4)"
+            params.extend(after)
+
+        # Reads the primary: a lagging replica would hand out rows already embedded
+        async with self.acquire(mark_write=False) as conn:
+            return await conn.fetch(
+                f"""
+                SELECT id, content, created_at, version FROM memories
+                WHERE deleted_at IS NULL
+                    AND (embedding IS NULL OR embedding_model IS DISTINCT FROM $1)
+                    {keyset}
+                ORDER BY created_at, id
+                LIMIT $2
+            """,
+                *params,
+            )
+
+    async def apply_backfill_batch(
+        self,
+        model: str,
+        embeddings: Sequence[Tuple[uuid.UUID, int, Embedding]],
+        cursor: Tuple[datetime, uuid.UUID],
+        failed: int = 0,
+        chunks: Optional[Dict[uuid.UUID, ChunkRows]] = None,
+    ) -> int:
+        """
+        Write one batch of backfilled embeddings and advance the checkpoint
+
+        The vectors are COPY'd into a staging table and applied with a single
+        UPDATE ... FROM, in the same transaction as the checkpoint, so a crash
+        never loses or repeats a committed batch. Rows whose version changed
+        since they were read keep their newer state and are picked up again
+        by the next run.
+
+        Args:
+            model: Embedding model that produced the vectors
+            embeddings: (id, version read, embedding) per embedded memory
+            cursor: (created_at, id) of the last memory in the batch
+            failed: Memories in the batch that could not be embedded
+            chunks: Passages per memory, replacing the stored ones of every
+                updated memory (see complete_embedding_jobs)
+
+        Returns:
+            Number of memories updated
+        """
+        async with self.acquire(mark_write=False) as conn:
+            async with conn.transaction():
+                updated = 0
+                if embeddings:
+                    await conn.execute(
+                        """
+                        CREATE TEMP TABLE backfill_staging ON COMMIT DROP AS
+                        SELECT id, version, embedding FROM memories WITH NO DATA
+                    """
+                    )
+                    await conn.copy_records_to_table(
+                        "backfill_staging",
+                        records=list(embeddings),
+                        columns=["id", "version", "embedding"],
+                    )
+                    update_sql = """
+                        UPDATE memories m
+                        SET embedding = s.embedding,
+                            embedding_model = $1,
+                            embedding_generated_at = NOW(),
+                            updated_at = NOW()
+                        FROM backfill_staging s
+                        WHERE m.id = s.id AND m.version = s.version AND m.deleted_at IS NULL
+                    """
+                    if chunks is None:
+                        status = await conn.execute(update_sql, model)
+                        updated = int(status.split()[-1])
+                    else:
+                        rows = await conn.fetch(update_sql + " RETURNING m.id", model)
+                        await self._replace_chunks(
+                            conn, {row["id"]: chunks.get(row["id"], ()) for row in rows}
+                        )
+                        updated = len(rows)
+
+                await conn.execute(
+                    """
+                    UPDATE embedding_backfill_jobs
+                    SET cursor_created_at = $2,
+                        cursor_id = $3,
+                        processed = processed + $4,
+                        embedded = embedded + $5,
+                        failed = failed + $6,
+                        updated_at = NOW()
+                    WHERE model = $1
+                """,
+                    model,
+                    cursor[0],
+                    cursor[1],
+                    len(embeddings) + failed,
+                    updated,
+                    failed,
+                )
+        return updated
+
+    # ==================== Embedding Migration ====================
+
+    async def get_embedding_migration(
+        self, target_model: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Get a re-embedding migration (the latest one when ``target_model`` is None)
+
+        A migration that is still filling also reports its coverage: live
+        memories, memories that already have a shadow vector, and the rest.
+        """
+        async with self.acquire_read() as conn:
+            if target_model is None:
+                row = await conn.fetchrow(
+                    "SELECT * FROM embedding_migrations ORDER BY started_at DESC LIMIT 1"
+                )
+            else:
+                row = await conn.fetchrow(
+                    "SELECT * FROM embedding_migrations WHERE target_model = $1", target_model
+                )
+            if row is None:
+                return None
+
+            migration = _record_to_plain_dict(row)
+            if migration["status"] in ACTIVE_MIGRATION_STATUSES:
+                coverage = await conn.fetchrow(
+                    """
+                    SELECT
+                        COUNT(*) AS total,
+                        COUNT(*) FILTER (WHERE embedding_next IS NULL) AS remaining
+                    FROM memories
+                    WHERE deleted_at IS NULL
+                """
+                )
+                migration["total"] = coverage["total"]
+                migration["remaining"] = coverage["remaining"]
+                migration["covered"] = coverage["total"] - coverage["remaining"]
+        return migration
+
+    async def get_switched_embedding_model(self) -> Optional[str]:
+        """Target model of the last completed migration (the model of stored vectors)"""
+        async with self.acquire_read() as conn:
+            return await conn.fetchval(
+                """
+                SELECT target_model FROM embedding_migrations
+                WHERE status = 'switched'
+                ORDER BY switched_at DESC
+                LIMIT 1
+            """
+            )
+
+    async def start_embedding_migration(
+        self,
+        target_model: str,
+        dimensions: int,
+        source_model: Optional[str] = None,
+        lock_timeout: float = 2.0,
+    ) -> Dict[str, Any]:
+        """
+        Prepare (or resume) a migration of every memory to ``target_model``
+
+        A new migration adds nullable shadow columns (``embedding_next``,
+        ``embedding_next_model``, ``embedding_next_generated_at``; metadata
+        only, no table rewrite) and a ``memory_chunks_next`` table for
+        passages. A trigger clears the shadow vector of a memory whose
+        content changes, so edits made during the migration are embedded
+        again. A partial index tracks the memories still missing a shadow
+        vector. Search keeps using the live columns throughout.
+
+        Args:
+            target_model: Model the shadow vectors come from
+            dimensions: Vector dimension of ``target_model``
+            source_model: Model of the live vectors, for reporting
+            lock_timeout: Longest wait in seconds for the brief DDL locks
+
+        Returns:
+            The migration row
+
+        Raises:
+            RuntimeError: If a migration to another model is in progress
+        """
+        await self._drop_retired_embeddings(lock_timeout)
+
+        async with self.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    "SELECT set_config('lock_timeout', $1, true)", f"{int(lock_timeout * 1000)}ms"
+                )
+                active = await conn.fetchrow(
+                    """
+                    SELECT target_model FROM embedding_migrations
+                    WHERE status = ANY($1::text[])
+                    FOR UPDATE
+                """,
+                    list(ACTIVE_MIGRATION_STATUSES),
+                )
+                if active is not None and active["target_model"] != target_model:
+                    raise RuntimeError(
+                        f"Embedding migration to {active['target_model']} is in progress; "
+                        "cancel it first"
+                    )
 
-    async def hybrid_search(
-        self,
-        query: str,
-        embedding: Optional[List[float]] = None,
-        limit: int = 10,
-        vector_weight: float = 0.5,
-        min_score: float = 0.0,
-        container_id: str = "default",
-    ) -> List[Dict[str, Any]]:
-        """Hybrid search combining vector and text search"""
+                if active is None:
+                    # Leftovers of an interrupted cancel must not mix with this model
+                    await self._drop_shadow(conn)
+                    await conn.execute(
+                        f"""
+                        ALTER TABLE memories
+                            ADD COLUMN embedding_next vector({int(dimensions)}),
+                            ADD COLUMN embedding_next_model TEXT,
+                            ADD COLUMN embedding_next_generated_at TIMESTAMPTZ
+                    """
+                    )
+                    await conn.execute(
+                        f"""
+                        CREATE TABLE memory_chunks_next (
+                            memory_id UUID NOT NULL REFERENCES memories(id) ON DELETE CASCADE,
+                            chunk_index INTEGER NOT NULL,
+                            start_char INTEGER NOT NULL,
+                            end_char INTEGER NOT NULL,
+                            embedding vector({int(dimensions)}) NOT NULL,
+                            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+                            CONSTRAINT memory_chunks_next_pkey PRIMARY KEY (memory_id, chunk_index)
+                        )
+                    """
+                    )
+                    await conn.execute(
+                        """
+                        CREATE OR REPLACE FUNCTION memories_reset_embedding_next()
+                        RETURNS trigger AS $$
+                        BEGIN
+                            NEW.embedding_next := NULL;
+                            NEW.embedding_next_model := NULL;
+                            NEW.embedding_next_generated_at := NULL;
+                            RETURN NEW;
+                        END;
+                        $$ LANGUAGE plpgsql
+                    """
+                    )
+                    await conn.execute(
+                        """
+                        CREATE OR REPLACE TRIGGER trg_memories_reset_embedding_next
+                        BEFORE UPDATE OF content ON memories
+                        FOR EACH ROW
+                        WHEN (NEW.content IS DISTINCT FROM OLD.content)
+                        EXECUTE FUNCTION memories_reset_embedding_next()
+                    """
+                    )
+                    row = await conn.fetchrow(
+                        """
+                        INSERT INTO embedding_migrations (
+                            target_model, source_model, status, dimensions
+                        )
+                        VALUES ($1, $2, 'running', $3)
+                        ON CONFLICT (target_model) DO UPDATE SET
+                            source_model = EXCLUDED.source_model,
+                            status = 'running',
+                            dimensions = EXCLUDED.dimensions,
+                            cursor_created_at = NULL,
+                            cursor_id = NULL,
+                            embedded = 0,
+                            failed = 0,
+                            last_error = NULL,
+                            started_at = NOW(),
+                            updated_at = NOW(),
+                            switched_at = NULL
+                        RETURNING *
+                    """,
+                        target_model,
+                        source_model,
+                        int(dimensions),
+                    )
+                else:
+                    row = await conn.fetchrow(
+                        """
+                        UPDATE embedding_migrations
+                        SET status = 'running', last_error = NULL, updated_at = NOW()
+                        WHERE target_model = $1
+                        RETURNING *
+                    """,
+                        target_model,
+                    )
 
-        if not embedding:
-            # Fall back to text-only search
-            return await self.text_search(query, limit, container_id)
+            # Serves both the keyset walk and the coverage check at switch time
+            await conn.execute(
+                """
+                CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_memories_embedding_next_missing
+                ON memories (created_at, id)
+                WHERE deleted_at IS NULL AND embedding_next IS NULL
+            """
+            )
+        return _record_to_plain_dict(row)
 
-        query_sql = """
-            SELECT * FROM hybrid_search($1, $2::vector, $3, $4, $5)
+    @asynccontextmanager
+    async def embedding_migration_lease(self):
         """
+        Hold the migration runner's advisory lock for the duration of the block
 
-        async with self.acquire() as conn:
-            rows = await conn.fetch(
-                query_sql, query, self._format_vector(embedding), limit, vector_weight, min_score
+        The session lock lives on a dedicated connection, so it is released
+        when the block ends or the process dies.
+
+        Raises:
+            RuntimeError: If another process holds the lock
+        """
+        async with self.acquire(mark_write=False) as conn:
+            if not await conn.fetchval(
+                "SELECT pg_try_advisory_lock($1)", EMBEDDING_MIGRATION_LOCK_KEY
+            ):
+                raise RuntimeError("An embedding migration is already running in another process")
+            try:
+                yield
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock($1)", EMBEDDING_MIGRATION_LOCK_KEY)
+
+    async def set_embedding_migration_status(
+        self, target_model: str, status: str, error: Optional[str] = None
+    ) -> None:
+        """
+        Record a migration state change (paused or failed)
+
+        Only a migration that is still filling changes, so a late runner
+        never overwrites a switch or cancel made elsewhere.
+        """
+        async with self.acquire(mark_write=False) as conn:
+            await conn.execute(
+                """
+                UPDATE embedding_migrations
+                SET status = $2, last_error = $3, updated_at = NOW()
+                WHERE target_model = $1 AND status = ANY($4::text[])
+            """,
+                target_model,
+                status,
+                error,
+                list(ACTIVE_MIGRATION_STATUSES),
             )
 
-            results = []
-            for row in rows:
-                memory = {
-                    "id": str(row["id"]),
-                    "content": row["content"],
-                    "memory_type": row["memory_type"],
-                    "importance_score": float(row["importance_score"]),
-                    "tags": row["tags"],
-                    "metadata": row["metadata"],
-                    "created_at": row["created_at"].isoformat(),
-                    "similarity_score": float(row["similarity_score"]),
-                    "text_rank": float(row["text_rank"]),
-                    "combined_score": float(row["combined_score"]),
-                }
-                results.append(memory)
+    async def fetch_migration_batch(
+        self,
+        after: Optional[Tuple[datetime, uuid.UUID]] = None,
+        batch_size: int = 100,
+    ) -> List[asyncpg.Record]:
+        """
+        Next keyset batch of live memories without a shadow vector
 
-            return results
+        Args:
+            after: (created_at, id) of the last memory of the previous batch
+            batch_size: Memories per batch
 
-    # ==================== Relationship Operations ====================
+        Returns:
+            Records with id, content, created_at and version, oldest first
+        """
+        params: List[Any] = [batch_size]
+        keyset = ""
+        if after is not None:
+            keyset = "AND (created_at, id) > ($2, $3)"
+            params.extend(after)
 
-    async def create_relationship(
+        # Reads the primary: a lagging replica would hand out rows already embedded
+        async with self.acquire(mark_write=False) as conn:
+            return await conn.fetch(
+                f"""
+                SELECT id, content, created_at, version FROM memories
+                WHERE deleted_at IS NULL
+                    AND embedding_next IS NULL
+                    {keyset}
+                ORDER BY created_at, id
+                LIMIT $1
+            """,
+                *params,
+            )
+
+    async def apply_migration_batch(
         self,
-        source_id: str,
-        target_id: str,
-        relationship_type: str,
-        strength: float = 0.5,
-        metadata: Optional[Dict[str, Any]] = None,
-    ) -> Dict[str, Any]:
-        """Create a relationship between memories"""
+        target_model: str,
+        embeddings: Sequence[Tuple[uuid.UUID, int, Embedding]],
+        cursor: Tuple[datetime, uuid.UUID],
+        failed: int = 0,
+        chunks: Optional[Dict[uuid.UUID, ChunkRows]] = None,
+    ) -> int:
+        """
+        Write one batch of shadow vectors and advance the migration checkpoint
 
-        query = """
-            INSERT INTO memory_relationships (
-                source_memory_id, target_memory_id, 
-                relationship_type, strength, metadata
-            ) VALUES ($1, $2, $3, $4, $5::jsonb)
-            ON CONFLICT (source_memory_id, target_memory_id, relationship_type)
-            DO UPDATE SET 
-                strength = EXCLUDED.strength,
-                metadata = EXCLUDED.metadata
-            RETURNING *
+        Works like apply_backfill_batch but fills the shadow columns and
+        memory_chunks_next. ``updated_at`` and the version are left alone:
+        the live memory does not change until the switch.
+
+        Returns:
+            Number of memories updated
+        """
+        async with self.acquire(mark_write=False) as conn:
+            async with conn.transaction():
+                updated = 0
+                if embeddings:
+                    await conn.execute(
+                        """
+                        CREATE TEMP TABLE migration_staging ON COMMIT DROP AS
+                        SELECT id, version, embedding_next AS embedding FROM memories WITH NO DATA
+                    """
+                    )
+                    await conn.copy_records_to_table(
+                        "migration_staging",
+                        records=list(embeddings),
+                        columns=["id", "version", "embedding"],
+                    )
+                    rows = await conn.fetch(
+                        """
+                        UPDATE memories m
+                        SET embedding_next = s.embedding,
+                            embedding_next_model = $1,
+                            embedding_next_generated_at = NOW()
+                        FROM migration_staging s
+                        WHERE m.id = s.id AND m.version = s.version AND m.deleted_at IS NULL
+                        RETURNING m.id
+                    """,
+                        target_model,
+                    )
+                    updated = len(rows)
+                    if chunks is not None:
+                        await self._replace_chunks(
+                            conn,
+                            {row["id"]: chunks.get(row["id"], ()) for row in rows},
+                            table="memory_chunks_next",
+                        )
+
+                await conn.execute(
+                    """
+                    UPDATE embedding_migrations
+                    SET cursor_created_at = $2,
+                        cursor_id = $3,
+                        embedded = embedded + $4,
+                        failed = failed + $5,
+                        updated_at = NOW()
+                    WHERE target_model = $1
+                """,
+                    target_model,
+                    cursor[0],
+                    cursor[1],
+                    updated,
+                    failed,
+                )
+        return updated
+
+    async def build_migration_indexes(self, timeout: float = 3600.0) -> Dict[str, Any]:
         """
+        Build ANN indexes on the shadow vectors that mirror the live ones
 
+        Each live index (memories and memory_chunks) is copied with its
+        method, options and predicate onto the shadow column or table and
+        built CONCURRENTLY, so the switch never leaves search without an
+        index. Live indexes that do not exist are not copied.
+
+        Returns:
+            Status of the vector indexes (see get_vector_index_status)
+        """
         async with self.acquire() as conn:
-            row = await conn.fetchrow(
-                query,
-                uuid.UUID(source_id),
-                uuid.UUID(target_id),
-                relationship_type,
-                strength,
-                json.dumps(metadata or {}),
+            rows = await conn.fetch(
+                """
+                SELECT i.relname AS name, ix.indisvalid AS valid,
+                    pg_get_indexdef(i.oid) AS definition
+                FROM pg_index ix
+                JOIN pg_class i ON i.oid = ix.indexrelid
+                WHERE i.relname = ANY($1::text[])
+            """,
+                [
+                    VECTOR_INDEX_NAME,
+                    f"{VECTOR_INDEX_NAME}_next",
+                    CHUNK_INDEX_NAME,
+                    f"{CHUNK_INDEX_NAME}_next",
+                ],
             )
+            indexes = {row["name"]: row for row in rows}
 
-            return {
-                "id": str(row["id"]),
-                "source_memory_id": str(row["source_memory_id"]),
-                "target_memory_id": str(row["target_memory_id"]),
-                "relationship_type": row["relationship_type"],
-                "strength": float(row["strength"]),
-                "metadata": row["metadata"],
-                "created_at": row["created_at"].isoformat(),
-            }
+            for name in (VECTOR_INDEX_NAME, CHUNK_INDEX_NAME):
+                live = indexes.get(name)
+                if live is None or not live["valid"]:
+                    continue
+                shadow = indexes.get(f"{name}_next")
+                if shadow is not None and shadow["valid"]:
+                    continue
+                # Leftovers of an interrupted build are invalid and must be dropped
+                await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}_next")
 
-    async def get_related_memories(
-        self, memory_id: str, relationship_type: Optional[str] = None, min_strength: float = 0.0
-    ) -> List[Dict[str, Any]]:
-        """Get memories related to a given memory"""
+                definition = live["definition"].replace(
+                    f"INDEX {name} ON", f"INDEX CONCURRENTLY {name}_next ON", 1
+                )
+                if name == VECTOR_INDEX_NAME:
+                    definition = definition.replace("(embedding ", "(embedding_next ", 1)
+                else:
+                    definition = re.sub(
+                        r"\bmemory_chunks USING", "memory_chunks_next USING", definition, count=1
+                    )
+                logger.info(f"Building shadow vector index {name}_next")
+                await conn.execute(definition, timeout=timeout)
 
-        where_clauses = ["r.strength >= $2"]
-        params = [uuid.UUID(memory_id), min_strength]
-        param_count = 2
+        return await self.get_vector_index_status()
 
-        if relationship_type:
-            param_count += 1
-            where_clauses.append(f"r.relationship_type = ${param_count}")
-            params.append(relationship_type)
+    async def switch_embedding_migration(
+        self, target_model: str, lock_timeout: float = 2.0
+    ) -> bool:
+        """
+        Atomically make the shadow vectors the live ones
 
-        query = f"""
-            SELECT 
-                m.*,
-                r.relationship_type,
-                r.strength as relationship_strength
-            FROM memory_relationships r
-            JOIN memories m ON (
-                (r.source_memory_id = $1 AND m.id = r.target_memory_id)
-                OR
-                (r.target_memory_id = $1 AND m.id = r.source_memory_id)
-            )
-            WHERE m.deleted_at IS NULL
-                AND {' AND '.join(where_clauses)}
-            ORDER BY r.strength DESC
+        In one transaction, under an ACCESS EXCLUSIVE lock on memories and the
+        passage tables: re-check that every live memory has a shadow vector,
+        rename the live columns, passage table and ANN indexes to ``*_retired``
+        and the shadow ones to the live names. Only catalog entries change, so
+        the lock is held for milliseconds; ``lock_timeout`` bounds how long
+        searches queue behind the lock request. Quantized columns hold
+        vectors of the old model and are dropped (re-run enable_quantization).
+        The retired columns and table are dropped after the commit.
+
+        Other processes keep embedding with the old model until they poll
+        get_switched_embedding_model. A trigger installed by the switch
+        rejects their vectors with SQLSTATE EMBEDDING_MODEL_MISMATCH, so
+        no vector of the old model lands in the new column; writers adopt
+        the new model and embed again, and queued jobs are retried. Run the
+        embedding backfill after a switch to embed memories whose rejected
+        vector was not retried.
+
+        Returns:
+            True if the switch happened; False if memories were written
+            since the last sweep or the lock was not granted in time
+
+        Raises:
+            RuntimeError: If the migration is not filling or a shadow index is missing
         """
+        try:
+            async with self.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(
+                        "SELECT set_config('lock_timeout', $1, true)",
+                        f"{int(lock_timeout * 1000)}ms",
+                    )
+                    await conn.execute(
+                        "LOCK TABLE memories, memory_chunks, memory_chunks_next "
+                        "IN ACCESS EXCLUSIVE MODE"
+                    )
+                    status = await conn.fetchval(
+                        """
+                        SELECT status FROM embedding_migrations
+                        WHERE target_model = $1
+                        FOR UPDATE
+                    """,
+                        target_model,
+                    )
+                    if status not in ACTIVE_MIGRATION_STATUSES:
+                        raise RuntimeError(f"No embedding migration to {target_model} to switch")
 
-        async with self.acquire() as conn:
-            rows = await conn.fetch(query, *params)
+                    missing = await conn.fetchval(
+                        """
+                        SELECT EXISTS (
+                            SELECT 1 FROM memories
+                            WHERE deleted_at IS NULL AND embedding_next IS NULL
+                        )
+                    """
+                    )
+                    if missing:
+                        return False
 
-            results = []
-            for row in rows:
-                memory = self._row_to_dict(row)
-                memory["relationship_type"] = row["relationship_type"]
-                memory["relationship_strength"] = float(row["relationship_strength"])
-                results.append(memory)
+                    valid = {
+                        row["name"]
+                        for row in await conn.fetch(
+                            """
+                            SELECT i.relname AS name
+                            FROM pg_index ix
+                            JOIN pg_class i ON i.oid = ix.indexrelid
+                            WHERE i.relname = ANY($1::text[]) AND ix.indisvalid
+                        """,
+                            [
+                                VECTOR_INDEX_NAME,
+                                f"{VECTOR_INDEX_NAME}_next",
+                                CHUNK_INDEX_NAME,
+                                f"{CHUNK_INDEX_NAME}_next",
+                            ],
+                        )
+                    }
+                    for name in (VECTOR_INDEX_NAME, CHUNK_INDEX_NAME):
+                        if name in valid and f"{name}_next" not in valid:
+                            raise RuntimeError(f"Shadow index {name}_next is not built")
 
-            return results
+                    await conn.execute(
+                        "DROP TRIGGER IF EXISTS trg_memories_reset_embedding_next ON memories"
+                    )
+                    await conn.execute("DROP INDEX IF EXISTS idx_memories_embedding_next_missing")
+                    for mode in QUANTIZATION_MODES.values():
+                        column = mode["column"]
+                        await conn.execute(
+                            f"DROP TRIGGER IF EXISTS trg_memories_sync_{column} ON memories"
+                        )
+                        await conn.execute(f"ALTER TABLE memories DROP COLUMN IF EXISTS {column}")
 
-    # ==================== Consolidation Operations ====================
+                    for live, shadow in MIGRATION_COLUMNS:
+                        await conn.execute(
+                            f"ALTER TABLE memories RENAME COLUMN {live} TO {live}_retired"
+                        )
+                        await conn.execute(f"ALTER TABLE memories RENAME COLUMN {shadow} TO {live}")
+                    await conn.execute("ALTER TABLE memory_chunks RENAME TO memory_chunks_retired")
+                    await conn.execute(
+                        "ALTER INDEX memory_chunks_pkey RENAME TO memory_chunks_retired_pkey"
+                    )
+                    await conn.execute("ALTER TABLE memory_chunks_next RENAME TO memory_chunks")
+                    await conn.execute(
+                        "ALTER INDEX memory_chunks_next_pkey RENAME TO memory_chunks_pkey"
+                    )
+                    for name in (VECTOR_INDEX_NAME, CHUNK_INDEX_NAME):
+                        await conn.execute(f"ALTER INDEX IF EXISTS {name} RENAME TO {name}_retired")
+                        await conn.execute(f"ALTER INDEX IF EXISTS {name}_next RENAME TO {name}")
+                    await self._install_embedding_model_guard(conn, target_model)
 
-    async def consolidate_memories(
-        self,
-        source_ids: List[str],
-        consolidated_content: str,
-        consolidation_type: str = "merge",
-        metadata: Optional[Dict[str, Any]] = None,
-    ) -> Dict[str, Any]:
-        """Consolidate multiple memories into one"""
+                    await conn.execute(
+                        """
+                        UPDATE embedding_migrations
+                        SET status = 'switched', last_error = NULL,
+                            updated_at = NOW(), switched_at = NOW()
+                        WHERE target_model = $1
+                    """,
+                        target_model,
+                    )
+        except asyncpg.exceptions.LockNotAvailableError:
+            logger.warning(f"Embedding switch to {target_model} timed out waiting for its lock")
+            return False
+
+        logger.info(f"Switched search to {target_model} embeddings")
+        self.quantization_ready = False
+        await self._drop_retired_embeddings(lock_timeout)
+        return True
+
+    async def _install_embedding_model_guard(self, conn: asyncpg.Connection, model: str):
+        """Reject writes of a vector labelled with any model but ``model``"""
+        await conn.execute(
+            f"""
+            CREATE OR REPLACE FUNCTION memories_check_embedding_model()
+            RETURNS trigger AS $$
+            BEGIN
+                IF NEW.embedding IS NOT NULL
+                    AND NEW.embedding_model IS DISTINCT FROM TG_ARGV[0] THEN
+                    RAISE EXCEPTION 'embedding from % rejected; memories use %',
+                        NEW.embedding_model, TG_ARGV[0]
+                        USING ERRCODE = '{EMBEDDING_MODEL_MISMATCH}';
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """
+        )
+        model_literal = "'" + model.replace("'", "''") + "'"
+        await conn.execute(
+            f"""
+            CREATE OR REPLACE TRIGGER trg_memories_check_embedding_model
+            BEFORE INSERT OR UPDATE OF embedding, embedding_model ON memories
+            FOR EACH ROW
+            EXECUTE FUNCTION memories_check_embedding_model({model_literal})
+        """
+        )
+
+    async def cancel_embedding_migration(self, lock_timeout: float = 2.0) -> bool:
+        """
+        Abandon the filling migration and drop its shadow columns and table
 
+        Returns:
+            True if a migration was cancelled
+        """
         async with self.acquire() as conn:
             async with conn.transaction():
-                # Create the consolidated memory
-                consolidated_memory = await self.create_memory(
-                    {
-                        "content": consolidated_content,
-                        "memory_type": "consolidated",
-                        "importance_score": 0.8,
-                        "metadata": {
-                            "consolidation_type": consolidation_type,
-                            "source_count": len(source_ids),
-                            **(metadata or {}),
-                        },
-                    }
-                )
-
-                # Record consolidation
                 await conn.execute(
+                    "SELECT set_config('lock_timeout', $1, true)", f"{int(lock_timeout * 1000)}ms"
+                )
+                cancelled = await conn.fetch(
                     """
-                    INSERT INTO memory_consolidations (
-                        consolidated_memory_id, source_memory_ids,
-                        consolidation_type, metadata
-                    ) VALUES ($1, $2, $3, $4::jsonb)
+                    UPDATE embedding_migrations
+                    SET status = 'cancelled', updated_at = NOW()
+                    WHERE status = ANY($1::text[])
+                    RETURNING target_model
                 """,
-                    uuid.UUID(consolidated_memory["id"]),
-                    [uuid.UUID(sid) for sid in source_ids],
-                    consolidation_type,
-                    json.dumps(metadata or {}),
+                    list(ACTIVE_MIGRATION_STATUSES),
                 )
+                await self._drop_shadow(conn)
+        return bool(cancelled)
 
-                # Soft delete source memories if merging
-                if consolidation_type == "merge":
-                    for source_id in source_ids:
-                        await self.delete_memory(source_id, soft=True)
+    async def _drop_shadow(self, conn: asyncpg.Connection):
+        """Drop the shadow columns, passages, indexes and trigger of a migration"""
+        await conn.execute("DROP TRIGGER IF EXISTS trg_memories_reset_embedding_next ON memories")
+        # Dropping the columns drops their indexes too
+        await conn.execute(
+            "ALTER TABLE memories "
+            + ", ".join(f"DROP COLUMN IF EXISTS {shadow}" for _, shadow in MIGRATION_COLUMNS)
+        )
+        await conn.execute("DROP TABLE IF EXISTS memory_chunks_next")
 
-                return consolidated_memory
+    async def _drop_retired_embeddings(self, lock_timeout: float = 2.0):
+        """
+        Drop the vectors retired by a switch (metadata only, like the switch)
 
-    async def find_duplicates(
-        self, similarity_threshold: float = 0.95
-    ) -> List[Tuple[str, str, float]]:
-        """Find duplicate memories based on embedding similarity"""
+        A failure is logged and retried by the next migration.
+        """
+        try:
+            async with self.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute(
+                        "SELECT set_config('lock_timeout', $1, true)",
+                        f"{int(lock_timeout * 1000)}ms",
+                    )
+                    await conn.execute(
+                        "ALTER TABLE memories "
+                        + ", ".join(
+                            f"DROP COLUMN IF EXISTS {live}_retired" for live, _ in MIGRATION_COLUMNS
+                        )
+                    )
+                    await conn.execute("DROP TABLE IF EXISTS memory_chunks_retired")
+        except Exception as e:
+            logger.warning(f"Failed to drop retired embeddings: {e}")
 
-        query = """
-            SELECT * FROM find_duplicate_memories($1)
+    # ==================== Text Index Feed ====================
+
+    async def get_change_horizon(self, lag_seconds: float = 30.0) -> datetime:
+        """Database time ``lag_seconds`` ago; changes up to it are visible to new readers"""
+        async with self.acquire_read() as conn:
+            return await conn.fetchval(
+                "SELECT NOW() - make_interval(secs => $1)", float(lag_seconds)
+            )
+
+    async def fetch_changed_memories(
+        self,
+        since: datetime,
+        until: datetime,
+        after_id: Optional[uuid.UUID] = None,
+        limit: int = 1000,
+        container_id: str = "default",
+    ) -> List[Dict[str, Any]]:
         """
+        Live memories whose updated_at is in (since, until], in (updated_at, id) order
 
-        async with self.acquire() as conn:
-            rows = await conn.fetch(query, similarity_threshold)
+        Pass the last row's updated_at as ``since`` and its id as ``after_id``
+        to fetch the next batch.
+        """
+        query = f"""
+            SELECT {projection_sql("full")} FROM memories
+            WHERE deleted_at IS NULL
+                AND container_id = $1
+                AND updated_at <= $3::timestamptz
+                AND (updated_at, id) > ($2::timestamptz, $4)
+            ORDER BY updated_at, id
+            LIMIT $5
+        """
 
-            return [
-                (str(row["memory1_id"]), str(row["memory2_id"]), float(row["similarity"]))
-                for row in rows
-            ]
+        async with self.acquire_read() as conn:
+            rows = await conn.fetch(
+                query, container_id, since, until, after_id or uuid.UUID(int=0), limit
+            )
+        return [self._row_to_dict(row) for row in rows]
+
+    async def fetch_deleted_memory_ids(
+        self, since: datetime, until: datetime, container_id: str = "default"
+    ) -> List[str]:
+        """IDs of memories soft-deleted in (since, until]"""
+        query = """
+            SELECT id FROM memories
+            WHERE deleted_at > $2::timestamptz
+                AND deleted_at <= $3::timestamptz
+                AND container_id = $1
+        """
+
+        async with self.acquire_read() as conn:
+            rows = await conn.fetch(query, container_id, since, until)
+        return [str(row["id"]) for row in rows]
 
     # ==================== Analytics Operations ====================
 
@@ -555,7 +4135,7 @@ class PostgresUnifiedBackend:
             SELECT * FROM memory_statistics
         """
 
-        async with self.acquire() as conn:
+        async with self.acquire_read() as conn:
             row = await conn.fetchrow(query)
 
             if row:
@@ -578,40 +4158,35 @@ class PostgresUnifiedBackend:
 
             return {"total_memories": 0, "backend": "postgresql_unified"}
 
-    async def record_search(
+    def record_search(
         self,
         query: str,
-        embedding: Optional[List[float]],
+        embedding: Optional[Embedding],
         results_count: int,
         selected_ids: List[str],
         search_type: str = "hybrid",
         metadata: Optional[Dict[str, Any]] = None,
         container_id: str = "default",
-    ):
-        """Record search history for learning patterns"""
-
-        query_sql = """
-            INSERT INTO search_history (
-                query, query_embedding, results_count,
-                selected_memory_ids, search_type, metadata, container_id
-            ) VALUES ($1, $2::vector, $3, $4, $5, $6::jsonb, $7)
+    ) -> bool:
         """
+        Record search history for learning patterns
 
-        async with self.acquire() as conn:
-            await conn.execute(
-                query_sql,
-                query,
-                self._format_vector(embedding) if embedding else None,
-                results_count,
-                [uuid.UUID(sid) for sid in selected_ids],
-                search_type,
-                json.dumps(metadata or {}),
-                container_id,
-            )
+        The row is buffered and written by the next batched flush; returns
+        False if the buffer was full and the search was dropped.
+        """
+        return self.search_recorder.record(
+            query=query,
+            embedding=embedding,
+            results_count=results_count,
+            selected_ids=selected_ids,
+            search_type=search_type,
+            metadata=metadata,
+            container_id=container_id,
+        )
 
     # ==================== Migration Operations ====================
 
-    async def migrate_from_sqlite(self, sqlite_path: str):
+    async def migrate_from_sqlite(self, sqlite_path: str, batch_size: int = 5000):
         """Migrate data from SQLite to PostgreSQL"""
         import aiosqlite
 
@@ -622,33 +4197,43 @@ class PostgresUnifiedBackend:
             """
             )
 
-            rows = await cursor.fetchall()
+            migrated = 0
+            while True:
+                rows = await cursor.fetchmany(batch_size)
+                if not rows:
+                    break
 
-            for row in rows:
-                # Convert SQLite row to dict
-                memory = {
-                    "id": row[0],
-                    "content": row[1],
-                    "memory_type": row[2],
-                    "importance_score": row[3],
-                    "tags": json.loads(row[4]) if row[4] else [],
-                    "metadata": json.loads(row[5]) if row[5] else {},
-                    "created_at": row[6],
-                    "updated_at": row[7],
-                }
+                # Convert SQLite rows to dicts and insert them in one COPY
+                batch = [
+                    {
+                        "id": row[0],
+                        "content": row[1],
+                        "memory_type": row[2],
+                        "importance_score": row[3],
+                        "tags": loads_json(row[4]) if row[4] else [],
+                        "metadata": loads_json(row[5]) if row[5] else {},
+                        "created_at": row[6],
+                        "updated_at": row[7],
+                    }
+                    for row in rows
+                ]
 
-                await self.create_memory(memory)
+                result = await self.create_memories(batch, return_ids=False)
+                migrated += result["inserted"]
 
-            logger.info(f"Migrated {len(rows)} memories from SQLite")
+            logger.info(f"Migrated {migrated} memories from SQLite")
 
     # ==================== Helper Methods ====================
 
-    def _format_vector(self, embedding: List[float]) -> str:
-        """Convert embedding list to PostgreSQL vector format"""
-        return f"[{','.join(str(x) for x in embedding)}]"
+    def _row_to_dict(
+        self, row: asyncpg.Record, include_embedding: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Convert database row to dictionary
 
-    def _row_to_dict(self, row: asyncpg.Record) -> Dict[str, Any]:
-        """Convert database row to dictionary"""
+        Rows from a projection carry ``has_embedding`` instead of the vector,
+        and summary rows carry ``content_length`` next to the preview.
+        """
         if not row:
             return None
 
@@ -669,13 +4254,24 @@ class PostgresUnifiedBackend:
             "version": row["version"],
         }
 
+        if row.get("content_length") is not None:
+            result["content_length"] = row["content_length"]
+        if row.get("embedding_pending") is not None:
+            result["embedding_pending"] = row["embedding_pending"]
+
+        has_embedding = row.get("has_embedding")
+        if has_embedding is None:
+            has_embedding = row.get("embedding") is not None
+
         # Only include embedding info if present
-        if row.get("embedding"):
+        if has_embedding:
             result["has_embedding"] = True
             result["embedding_model"] = row["embedding_model"]
             result["embedding_generated_at"] = (
                 row["embedding_generated_at"].isoformat() if row["embedding_generated_at"] else None
             )
+            if include_embedding:
+                result["embedding"] = row["embedding"].tolist()
         else:
             result["has_embedding"] = False
 
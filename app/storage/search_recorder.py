@@ -0,0 +1,177 @@
+"""
+Buffered search history recording
+Collects search telemetry in process and writes it with one COPY per flush
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# search_history columns written by each flush, in record order
+SEARCH_HISTORY_COLUMNS = (
+    "query",
+    "query_embedding",
+    "results_count",
+    "selected_memory_ids",
+    "search_type",
+    "metadata",
+    "container_id",
+    "created_at",
+)
+
+
+class SearchHistoryRecorder:
+    """
+    Buffers search_history rows and flushes them in batches
+
+    Searches call ``record`` instead of awaiting an INSERT, so telemetry is
+    off the latency-critical path. Rows are copied in every
+    ``flush_interval`` seconds, as soon as ``flush_threshold`` rows are
+    pending, and once more on shutdown. The buffer holds at most
+    ``max_buffer`` rows; searches recorded while it is full are dropped and
+    counted rather than slowing anything down.
+    """
+
+    def __init__(
+        self,
+        backend,
+        flush_interval: float = 5.0,
+        flush_threshold: int = 500,
+        max_buffer: int = 10000,
+    ):
+        """
+        Initialize the recorder
+
+        Args:
+            backend: PostgresUnifiedBackend used to acquire connections
+            flush_interval: Seconds between periodic flushes
+            flush_threshold: Pending rows that trigger an early flush
+            max_buffer: Most rows held in memory; further searches are dropped
+        """
+        self.backend = backend
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.max_buffer = max(1, max_buffer)
+
+        self._pending: List[Tuple[Any, ...]] = []
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._threshold_task: Optional[asyncio.Task] = None
+        self._stats = {"recorded": 0, "flushed": 0, "flushes": 0, "dropped": 0, "errors": 0}
+
+    def record(
+        self,
+        query: str,
+        embedding: Optional[Sequence[float]],
+        results_count: int,
+        selected_ids: Sequence[str],
+        search_type: str = "hybrid",
+        metadata: Optional[Dict[str, Any]] = None,
+        container_id: str = "default",
+    ) -> bool:
+        """
+        Buffer one search (never blocks on the database)
+
+        Returns:
+            False if the buffer was full and the search was dropped
+        """
+        if len(self._pending) >= self.max_buffer:
+            self._stats["dropped"] += 1
+            return False
+
+        self._pending.append(
+            (
+                query,
+                embedding,
+                results_count,
+                [uuid.UUID(str(memory_id)) for memory_id in selected_ids],
+                search_type,
+                metadata or {},
+                container_id,
+                datetime.now(timezone.utc),
+            )
+        )
+        self._stats["recorded"] += 1
+
+        if len(self._pending) >= self.flush_threshold and (
+            self._threshold_task is None or self._threshold_task.done()
+        ):
+            self._threshold_task = asyncio.create_task(self.flush())
+        return True
+
+    async def flush(self) -> int:
+        """
+        Copy all pending rows into search_history
+
+        Returns:
+            Number of rows written
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+
+            pending, self._pending = self._pending, []
+            try:
+                # Telemetry must not pin reads to the primary
+                async with self.backend.acquire(mark_write=False) as conn:
+                    await conn.copy_records_to_table(
+                        "search_history", records=pending, columns=list(SEARCH_HISTORY_COLUMNS)
+                    )
+            except asyncio.CancelledError:
+                # The COPY was aborted; the rows go back for the final flush
+                self._pending[:0] = pending
+                raise
+            except Exception as e:
+                # Keep as much as fits for the next flush, oldest first
+                room = max(0, self.max_buffer - len(self._pending))
+                self._stats["dropped"] += max(0, len(pending) - room)
+                self._pending[:0] = pending[:room]
+                self._stats["errors"] += 1
+                logger.error(f"Failed to flush search history: {e}")
+                return 0
+
+            self._stats["flushed"] += len(pending)
+            self._stats["flushes"] += 1
+            logger.debug(f"Flushed {len(pending)} search history rows")
+            return len(pending)
+
+    async def start(self):
+        """Start the periodic flush task"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic flush task and flush what is left"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        # A threshold flush in progress finishes instead of losing its rows
+        if self._threshold_task and not self._threshold_task.done():
+            await asyncio.gather(self._threshold_task, return_exceptions=True)
+        self._task = None
+        self._threshold_task = None
+
+        await self.flush()
+
+    async def _run(self):
+        """Periodically flush pending searches"""
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Search history recorder error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get recorder counters"""
+        return {**self._stats, "pending": len(self._pending), "max_buffer": self.max_buffer}
@@ -0,0 +1,254 @@
+"""
+In-process BM25 text index
+Inverted index with term frequencies, maintained incrementally, for search
+when PostgreSQL or the embedding model is unavailable
+"""
+
+import math
+import os
+import pickle
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Frequent English words carry almost no BM25 weight but have the longest postings
+STOPWORDS = frozenset(
+    """
+    a an and are as at be but by for from has have he her his i if in into is it
+    its me my no not of on or our she so that the their them then there these they
+    this to was we were what when which who will with you your
+    """.split()
+)
+
+# Bumped whenever the pickled layout changes; older snapshots are ignored
+SNAPSHOT_VERSION = 1
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords or single characters"""
+    return [
+        token
+        for token in _TOKEN_RE.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+class BM25Index:
+    """
+    Inverted index of token -> {doc: term frequency} scored with Okapi BM25
+
+    Documents are added, replaced and removed one at a time, so the index can
+    follow writes without rebuilding. Each document may carry a small payload
+    (for example a memory summary) that search results are built from.
+
+    Documents live in integer slots so a query is scored with NumPy over a
+    dense score array. Each term's postings are materialized as arrays on
+    first use and kept until a write touches that term, which keeps queries
+    containing very common words fast.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize an empty index
+
+        Args:
+            k1: Term-frequency saturation
+            b: Document length normalization
+        """
+        self.k1 = k1
+        self.b = b
+
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._arrays: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._slots: Dict[str, int] = {}
+        self._slot_ids: List[Optional[str]] = []
+        self._free_slots: List[int] = []
+        self._doc_terms: Dict[int, Tuple[str, ...]] = {}
+        self._lengths = np.zeros(1024, dtype=np.float32)
+        self._payloads: Dict[str, Any] = {}
+        self._total_length = 0
+        # Opaque position of the source the index is current up to (saved with snapshots)
+        self.watermark: Any = None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._slots
+
+    def add(self, doc_id: str, text: str, payload: Any = None) -> None:
+        """Index ``text`` under ``doc_id``, replacing any previous version"""
+        if doc_id in self._slots:
+            self.remove(doc_id)
+
+        slot = self._allocate(doc_id)
+        counts = Counter(tokenize(text))
+        for token, tf in counts.items():
+            self._postings.setdefault(token, {})[slot] = tf
+            self._arrays.pop(token, None)
+
+        length = sum(counts.values())
+        self._doc_terms[slot] = tuple(counts)
+        self._lengths[slot] = length
+        self._total_length += length
+        if payload is not None:
+            self._payloads[doc_id] = payload
+
+    def remove(self, doc_id: str) -> bool:
+        """Drop ``doc_id`` from the index; returns False if it was not indexed"""
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return False
+
+        for token in self._doc_terms.pop(slot):
+            postings = self._postings[token]
+            del postings[slot]
+            if not postings:
+                del self._postings[token]
+            self._arrays.pop(token, None)
+        self._total_length -= int(self._lengths[slot])
+        self._lengths[slot] = 0
+        self._slot_ids[slot] = None
+        self._free_slots.append(slot)
+        self._payloads.pop(doc_id, None)
+        return True
+
+    def _allocate(self, doc_id: str) -> int:
+        """Reuse a free slot or append one, growing the length array as needed"""
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slot_ids[slot] = doc_id
+        else:
+            slot = len(self._slot_ids)
+            self._slot_ids.append(doc_id)
+            if slot >= len(self._lengths):
+                self._lengths = np.concatenate(
+                    [self._lengths, np.zeros(len(self._lengths), dtype=np.float32)]
+                )
+        self._slots[doc_id] = slot
+        return slot
+
+    def _term_arrays(self, token: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(slots, term frequencies) of ``token``, cached until a write touches it"""
+        arrays = self._arrays.get(token)
+        if arrays is None:
+            postings = self._postings[token]
+            arrays = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=np.float32, count=len(postings)),
+            )
+            self._arrays[token] = arrays
+        return arrays
+
+    def get(self, doc_id: str) -> Any:
+        """Payload stored with ``doc_id`` (None if absent)"""
+        return self._payloads.get(doc_id)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+        """
+        Rank documents against ``query``
+
+        Args:
+            query: Free-text query (tokenized like documents)
+            limit: Maximum results
+
+        Returns:
+            (doc_id, score) pairs, best first
+        """
+        doc_count = len(self._slots)
+        terms = [token for token in set(tokenize(query)) if token in self._postings]
+        if not doc_count or not terms or limit <= 0:
+            return []
+
+        k1, b = self.k1, self.b
+        size = len(self._slot_ids)
+        avg_length = self._total_length / doc_count or 1.0
+        norm = k1 * (1 - b + b * self._lengths[:size] / avg_length)
+        scores = np.zeros(size, dtype=np.float32)
+
+        for token in terms:
+            slots, tfs = self._term_arrays(token)
+            df = len(slots)
+            idf = math.log(1 + (doc_count - df + 0.5) / (df + 0.5))
+            # Slots are unique within a term, so fancy-index addition is exact
+            scores[slots] += idf * tfs * (k1 + 1) / (tfs + norm[slots])
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > limit:
+            top = np.argpartition(scores[matched], -limit)[-limit:]
+            matched = matched[top]
+        ranked = matched[np.argsort(-scores[matched], kind="stable")]
+        return [(self._slot_ids[slot], float(scores[slot])) for slot in ranked]
+
+    def clear(self) -> None:
+        """Drop every document"""
+        self.__init__(k1=self.k1, b=self.b)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Write a snapshot to ``path`` atomically
+
+        The snapshot is a local pickle read back only by ``load``; never load
+        one from an untrusted location.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            "version": SNAPSHOT_VERSION,
+            "params": (self.k1, self.b),
+            "postings": self._postings,
+            "slot_ids": self._slot_ids,
+            "doc_terms": self._doc_terms,
+            "lengths": self._lengths[: len(self._slot_ids)],
+            "payloads": self._payloads,
+            "watermark": self.watermark,
+        }
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> Optional["BM25Index"]:
+        """Read a snapshot written by ``save``; None if missing or from another version"""
+        path = Path(path)
+        if not path.exists():
+            return None
+
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if not isinstance(state, dict) or state.get("version") != SNAPSHOT_VERSION:
+            return None
+
+        k1, b = state["params"]
+        index = cls(k1=k1, b=b)
+        index._postings = state["postings"]
+        index._slot_ids = state["slot_ids"]
+        index._doc_terms = state["doc_terms"]
+        index._payloads = state["payloads"]
+        index.watermark = state["watermark"]
+        for slot, doc_id in enumerate(index._slot_ids):
+            if doc_id is None:
+                index._free_slots.append(slot)
+            else:
+                index._slots[doc_id] = slot
+        lengths = state["lengths"]
+        index._lengths = np.zeros(max(1024, 2 * len(lengths)), dtype=np.float32)
+        index._lengths[: len(lengths)] = lengths
+        index._total_length = int(lengths.sum())
+        return index
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get document and term counts"""
+        return {
+            "documents": len(self._slots),
+            "terms": len(self._postings),
+            "avg_length": (
+                round(self._total_length / len(self._slots), 2) if self._slots else 0.0
+            ),
+        }
@@ -66,6 +66,44 @@ class LocalEmbeddingClient:
             logger.error(f"Failed to get text embedding: {e}")
             return None
     
+    async def get_embeddings(
+        self, texts: List[str], model: Optional[str] = None
+    ) -> List[List[float] | None] | None:
+        """Get text embeddings for many texts in one LM Studio request (input order kept).
+
+        ``model`` overrides the default text embedding model for this request.
+        """
+        if not texts:
+            return []
+
+        try:
+            async with aiohttp.ClientSession() as session:
+                payload = {
+                    "model": model or self.text_embedding_model,
+                    "input": list(texts)
+                }
+                
+                async with session.post(
+                    f"{self.lm_studio_url}/embeddings",
+                    json=payload,
+                    headers={"Content-Type": "application/json"}
+                ) as resp:
+                    if resp.status == 200:
+                        data = await resp.json()
+                        embeddings: List[List[float] | None] = [None] * len(texts)
+                        for position, item in enumerate(data["data"]):
+                            embeddings[item.get("index", position)] = item["embedding"]
+                        logger.debug(f"Generated {len(data['data'])} text embeddings in one batch")
+                        return embeddings
+                    else:
+                        error = await resp.text()
+                        logger.error(f"LM Studio batch embedding failed: {error}")
+                        return None
+                        
+        except Exception as e:
+            logger.error(f"Failed to get text embeddings: {e}")
+            return None
+    
     async def get_image_embedding(self, image_bytes: bytes) -> List[float] | None:
         """Get image embedding using CLIP (768 dimensions)."""
         try:
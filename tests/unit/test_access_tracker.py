@@ -0,0 +1,99 @@
+"""
+Tests for write-behind memory access tracking
+"""
+
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.storage.access_tracker import AccessTracker
+
+pytestmark = pytest.mark.unit
+
+
+class FakeBackend:
+    """Backend stub whose connection records executed statements"""
+
+    def __init__(self, fail: bool = False):
+        self.conn = AsyncMock()
+        if fail:
+            self.conn.execute.side_effect = RuntimeError("connection lost")
+        else:
+            self.conn.execute.return_value = "UPDATE 2"
+
+    @asynccontextmanager
+    async def acquire(self, mark_write: bool = True):
+        assert mark_write is False
+        yield self.conn
+
+
+class TestAccessTracker:
+    """Buffered access count flushing"""
+
+    @pytest.mark.asyncio
+    async def test_flush_aggregates_hits(self):
+        """Repeated reads collapse into one row per memory in a single UPDATE"""
+        backend = FakeBackend()
+        tracker = AccessTracker(backend)
+        a, b = uuid.uuid4(), uuid.uuid4()
+
+        for memory_id in (a, b, a, a):
+            tracker.record(memory_id)
+
+        assert await tracker.flush() == 2
+        backend.conn.execute.assert_awaited_once()
+
+        _, ids, hits = backend.conn.execute.call_args.args
+        assert ids == sorted([a, b])
+        assert dict(zip(ids, hits)) == {a: 3, b: 1}
+        assert tracker.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_noop_when_empty(self):
+        """Nothing is sent to the database when no reads were recorded"""
+        backend = FakeBackend()
+        tracker = AccessTracker(backend)
+
+        assert await tracker.flush() == 0
+        backend.conn.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_hits(self):
+        """Hits are merged back for the next flush when the UPDATE fails"""
+        tracker = AccessTracker(FakeBackend(fail=True))
+        memory_id = uuid.uuid4()
+        tracker.record(memory_id)
+        tracker.record(memory_id)
+
+        assert await tracker.flush() == 0
+        assert tracker._pending[memory_id] == 2
+        assert tracker.get_stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_threshold_triggers_flush(self):
+        """Reaching the pending threshold schedules an early flush"""
+        backend = FakeBackend()
+        tracker = AccessTracker(backend, flush_threshold=2)
+
+        tracker.record(uuid.uuid4())
+        tracker.record(uuid.uuid4())
+        await asyncio.sleep(0)
+        await tracker._threshold_task
+
+        backend.conn.execute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending(self):
+        """Stopping the tracker writes out anything still buffered"""
+        backend = FakeBackend()
+        tracker = AccessTracker(backend, flush_interval=3600)
+        await tracker.start()
+        tracker.record(uuid.uuid4())
+
+        await tracker.stop()
+
+        backend.conn.execute.assert_awaited_once()
+        assert tracker._task is None
@@ -0,0 +1,83 @@
+"""
+Tests for batched multi-get in the PostgreSQL memory service
+"""
+
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.memory_service_postgres import MemoryServicePostgres
+from app.storage.postgres_unified import PostgresUnifiedBackend
+
+pytestmark = pytest.mark.unit
+
+
+def _memory(memory_id: str) -> dict:
+    return {"id": memory_id, "content": f"memory {memory_id}", "memory_type": "semantic"}
+
+
+class TestBackendGetMemories:
+    """Ordering and tracking in the backend"""
+
+    def setup_method(self):
+        self.backend = PostgresUnifiedBackend("postgresql://unused")
+        self.conn = AsyncMock()
+
+        @asynccontextmanager
+        async def acquire():
+            yield self.conn
+
+        self.backend.acquire_read = acquire
+        self.backend._row_to_dict = lambda row, **_: {"id": str(row["id"])}
+
+    @pytest.mark.asyncio
+    async def test_one_query_in_input_order(self):
+        """Rows come back in request order regardless of database order"""
+        ids = [uuid.uuid4() for _ in range(3)]
+        self.conn.fetch.return_value = [{"id": ids[2]}, {"id": ids[0]}]
+
+        memories = await self.backend.get_memories([str(i) for i in ids + [ids[0]]])
+
+        self.conn.fetch.assert_awaited_once()
+        assert self.conn.fetch.call_args.args[1] == ids
+        assert [m["id"] for m in memories] == [str(ids[0]), str(ids[2])]
+
+    @pytest.mark.asyncio
+    async def test_tracking_is_optional(self):
+        """Only tracked reads are buffered as accesses"""
+        memory_id = uuid.uuid4()
+        self.conn.fetch.return_value = [{"id": memory_id}]
+
+        await self.backend.get_memories([str(memory_id)], track=False)
+        assert self.backend.access_tracker.get_stats()["pending"] == 0
+
+        await self.backend.get_memories([str(memory_id)])
+        assert self.backend.access_tracker.get_stats()["pending"] == 1
+
+    @pytest.mark.asyncio
+    async def test_empty_ids_skip_database(self):
+        """An empty id list returns without a query"""
+        assert await self.backend.get_memories([]) == []
+        self.conn.fetch.assert_not_awaited()
+
+
+class TestServiceBatching:
+    """Service call sites use one batched fetch"""
+
+    def setup_method(self):
+        self.service = MemoryServicePostgres(enable_embeddings=False)
+        self.service.backend = AsyncMock()
+
+    @pytest.mark.asyncio
+    async def test_consolidate_fetches_sources_once(self):
+        """Consolidation loads all source memories in a single call"""
+        ids = ["a", "b", "c"]
+        self.service.backend.get_memories.return_value = [_memory(i) for i in ids]
+        self.service.backend.consolidate_memories.return_value = {"id": "merged"}
+
+        await self.service.consolidate_memories(ids, summary="merged")
+
+        self.service.backend.get_memories.assert_awaited_once_with(ids, track=False)
+        self.service.backend.get_memory.assert_not_awaited()
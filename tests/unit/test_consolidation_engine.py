@@ -0,0 +1,229 @@
+"""
+Tests for cluster-based duplicate consolidation
+"""
+
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.degradation import DegradationLevel
+from app.models.synthesis.consolidation_models import ConsolidationRequest, MergeStrategy
+from app.services.consolidation_engine import ConsolidationEngine, group_duplicates
+from app.services.memory_service_postgres import MemoryServicePostgres
+from app.storage.postgres_unified import PostgresUnifiedBackend
+
+pytestmark = pytest.mark.unit
+
+PAIRS = [("a", "b", 0.97), ("b", "c", 0.96), ("x", "y", 0.99)]
+
+
+class TestGroupDuplicates:
+    """Union-find clustering of duplicate pairs"""
+
+    def test_transitive_pairs_form_one_group(self):
+        groups = group_duplicates(PAIRS, MergeStrategy.KEEP_NEWEST)
+
+        assert [group.memory_ids for group in groups] == [["a", "b", "c"], ["x", "y"]]
+        assert groups[0].group_id == "dup_a"
+        assert groups[0].similarity_score == 0.96
+        assert groups[0].metadata == {"pairs": 2, "max_similarity": 0.97}
+        assert groups[0].suggested_action == MergeStrategy.KEEP_NEWEST
+
+    def test_no_pairs(self):
+        assert group_duplicates([], MergeStrategy.KEEP_NEWEST) == []
+
+
+class TestConsolidationEngine:
+    """One merge per cluster, failures isolated per cluster"""
+
+    def setup_method(self):
+        self.backend = MagicMock()
+        self.backend.find_duplicates = AsyncMock(return_value=PAIRS)
+        self.backend.merge_duplicate_group = AsyncMock(
+            side_effect=[
+                {"kept": "a", "removed": ["b", "c"], "content_merged": False},
+                {"kept": "x", "removed": ["y"], "content_merged": False},
+            ]
+        )
+        self.engine = ConsolidationEngine(self.backend, max_pairs=50)
+
+    @pytest.mark.asyncio
+    async def test_merges_each_cluster_once(self):
+        result = await self.engine.consolidate(ConsolidationRequest(auto_merge=True))
+
+        assert self.backend.merge_duplicate_group.await_count == 2
+        first = self.backend.merge_duplicate_group.await_args_list[0]
+        assert first.args == (["a", "b", "c"], "keep_highest_importance")
+        assert result.duplicates_found == 5
+        assert result.memories_merged == 2
+        assert result.memories_deleted == 3
+        assert set(result.timings) == {"find_ms", "merge_ms"}
+        assert "merge_ms" in result.duplicate_groups[0].metadata
+
+    @pytest.mark.asyncio
+    async def test_dry_run_does_not_merge(self):
+        result = await self.engine.consolidate(
+            ConsolidationRequest(auto_merge=True, dry_run=True)
+        )
+
+        self.backend.merge_duplicate_group.assert_not_awaited()
+        assert len(result.duplicate_groups) == 2
+        assert result.memories_merged == 0
+
+    @pytest.mark.asyncio
+    async def test_manual_strategy_only_reports(self):
+        await self.engine.consolidate(
+            ConsolidationRequest(auto_merge=True, strategy=MergeStrategy.MANUAL)
+        )
+
+        self.backend.merge_duplicate_group.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_and_stale_clusters(self):
+        self.backend.merge_duplicate_group = AsyncMock(side_effect=[RuntimeError("boom"), None])
+
+        result = await self.engine.consolidate(ConsolidationRequest(auto_merge=True))
+
+        assert result.errors == 1
+        assert result.memories_merged == 0
+        assert result.duplicate_groups[0].metadata["error"] == "boom"
+        assert result.duplicate_groups[1].metadata["skipped"] == "already merged"
+
+    @pytest.mark.asyncio
+    async def test_scope_and_pair_limit(self):
+        await self.engine.find_groups(
+            ConsolidationRequest(memory_ids=["a", "b"], similarity_threshold=0.9)
+        )
+
+        self.backend.find_duplicates.assert_awaited_once_with(0.9, 50, memory_ids=["a", "b"])
+
+
+class TestMergeDuplicateGroupSql:
+    """Survivor selection and set-based soft delete on one connection"""
+
+    def setup_method(self):
+        self.backend = PostgresUnifiedBackend("postgresql://unused")
+        self.conn = AsyncMock()
+        transaction = MagicMock()
+        transaction.__aenter__ = AsyncMock()
+        transaction.__aexit__ = AsyncMock(return_value=False)
+        self.conn.transaction = MagicMock(return_value=transaction)
+
+        @asynccontextmanager
+        async def acquire(*args, **kwargs):
+            yield self.conn
+
+        self.backend.acquire = acquire
+        now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        self.rows = [
+            {
+                "id": uuid.UUID(int=i + 1),
+                "content": content,
+                "importance_score": importance,
+                "tags": [f"t{i}"],
+                "metadata": {},
+                "access_count": 1,
+                "created_at": now + timedelta(days=i),
+            }
+            for i, (content, importance) in enumerate([("one", 0.9), ("two", 0.2), ("one", 0.5)])
+        ]
+
+    @pytest.mark.asyncio
+    async def test_keep_highest_importance(self):
+        self.conn.fetch = AsyncMock(return_value=self.rows)
+
+        merged = await self.backend.merge_duplicate_group([str(r["id"]) for r in self.rows])
+
+        assert merged["kept"] == str(self.rows[0]["id"])
+        assert merged["removed"] == [str(self.rows[1]["id"]), str(self.rows[2]["id"])]
+        assert merged["content_merged"] is False
+        assert "FOR UPDATE" in self.conn.fetch.await_args.args[0]
+        self.conn.transaction.assert_called_once()
+        update = self.conn.execute.await_args_list[0].args
+        assert update[3] == ["t0", "t1", "t2"]
+        assert update[4] == 0.9 and update[5] == 3
+
+    @pytest.mark.asyncio
+    async def test_merge_content_queues_embedding(self):
+        self.conn.fetch = AsyncMock(return_value=self.rows)
+        self.backend._enqueue_embedding_jobs = AsyncMock()
+
+        merged = await self.backend.merge_duplicate_group(
+            [str(r["id"]) for r in self.rows], "merge_content"
+        )
+
+        assert merged["content_merged"] is True
+        assert self.conn.execute.await_args_list[0].args[2] == "one\n\ntwo"
+        self.backend._enqueue_embedding_jobs.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_merge_content_without_queue(self):
+        """Callers that embed merged content themselves get no job"""
+        self.conn.fetch = AsyncMock(return_value=self.rows)
+        self.backend._enqueue_embedding_jobs = AsyncMock()
+
+        merged = await self.backend.merge_duplicate_group(
+            [str(r["id"]) for r in self.rows], "merge_content", enqueue_embedding=False
+        )
+
+        assert merged["content_merged"] is True
+        self.backend._enqueue_embedding_jobs.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_already_merged_returns_none(self):
+        self.conn.fetch = AsyncMock(return_value=self.rows[:1])
+
+        assert await self.backend.merge_duplicate_group([str(r["id"]) for r in self.rows]) is None
+        self.conn.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_unknown_strategy(self):
+        with pytest.raises(ValueError):
+            await self.backend.merge_duplicate_group(["a", "b"], "coin_flip")
+
+
+class TestServiceConsolidation:
+    """Read-only mode blocks merges but not previews"""
+
+    def setup_method(self):
+        self.service = MemoryServicePostgres(enable_embeddings=False)
+        self.service.degradation_manager = MagicMock(current_level=DegradationLevel.READONLY)
+        self.service.backend = MagicMock()
+        self.service.backend.find_duplicates = AsyncMock(return_value=PAIRS)
+
+    @pytest.mark.asyncio
+    async def test_read_only_blocks_merge(self):
+        with pytest.raises(RuntimeError):
+            await self.service.auto_consolidate_duplicates(dry_run=False)
+
+    @pytest.mark.asyncio
+    async def test_dry_run_reports_groups(self):
+        results = await self.service.auto_consolidate_duplicates(dry_run=True)
+
+        assert results["found"] == 2
+        assert results["consolidated"] == 0
+        assert results["groups"][0]["memory_ids"] == ["a", "b", "c"]
+
+    @pytest.mark.asyncio
+    async def test_merged_content_embedded_inline_without_workers(self):
+        """Without async embeddings nothing is queued and the survivor is re-embedded"""
+        service = MemoryServicePostgres(enable_embeddings=True, async_embeddings=False)
+        service.degradation_manager = MagicMock(current_level=DegradationLevel.FULL)
+        service.backend = MagicMock()
+        service.backend.find_duplicates = AsyncMock(return_value=PAIRS[:1])
+        service.backend.merge_duplicate_group = AsyncMock(
+            return_value={"kept": "a", "removed": ["b"], "content_merged": True}
+        )
+        service.backend.get_memory = AsyncMock(return_value={"id": "a", "content": "one\n\ntwo"})
+        service.backend.update_memory = AsyncMock()
+        service._embed_content = AsyncMock(return_value=([0.1], None))
+
+        await service.auto_consolidate_duplicates(dry_run=False)
+
+        merge = service.backend.merge_duplicate_group.await_args
+        assert merge.kwargs["enqueue_embedding"] is False
+        service._embed_content.assert_awaited_once_with("one\n\ntwo")
+        assert service.backend.update_memory.await_args.args == ("a", {}, [0.1])
@@ -0,0 +1,105 @@
+"""
+Tests for incremental duplicate-candidate sweeps
+"""
+
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.memory_service_postgres import MemoryServicePostgres
+from app.storage.postgres_unified import PostgresUnifiedBackend
+
+pytestmark = pytest.mark.unit
+
+SINCE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+UNTIL = SINCE + timedelta(hours=1)
+
+
+def _changed(count: int, start: int = 0):
+    return [
+        {"id": uuid.uuid4(), "updated_at": SINCE + timedelta(seconds=start + i)}
+        for i in range(count)
+    ]
+
+
+class TestSweepDuplicateCandidates:
+    """Watermark handling and batching"""
+
+    def setup_method(self):
+        self.backend = PostgresUnifiedBackend("postgresql://unused")
+        self.conn = AsyncMock()
+        self.conn.fetchval.return_value = UNTIL
+
+        @asynccontextmanager
+        async def acquire(*args, **kwargs):
+            yield self.conn
+
+        self.backend.acquire = acquire
+        self.backend.acquire_read = acquire
+        self.backend._get_watermark = AsyncMock(return_value=SINCE)
+        self.backend._set_watermark = AsyncMock()
+        self.backend.refresh_duplicate_candidates = AsyncMock(return_value=3)
+
+    @pytest.mark.asyncio
+    async def test_batches_follow_keyset_cursor(self):
+        """Each batch starts after the last (updated_at, id) of the previous one"""
+        first, second = _changed(2), _changed(1, start=10)
+        self.conn.fetch.side_effect = [first, second, []]
+
+        result = await self.backend.sweep_duplicate_candidates(batch_size=2)
+
+        assert result["processed"] == 3
+        assert result["pairs"] == 6
+        cursors = [call.args[1::2] for call in self.conn.fetch.await_args_list]
+        assert cursors[0][0] == SINCE
+        assert cursors[1] == (first[-1]["updated_at"], first[-1]["id"])
+        assert cursors[2] == (second[-1]["updated_at"], second[-1]["id"])
+
+    @pytest.mark.asyncio
+    async def test_watermark_advances_to_upper_bound(self):
+        """The sweep records the lagged upper bound it covered"""
+        self.conn.fetch.side_effect = [[]]
+
+        result = await self.backend.sweep_duplicate_candidates()
+
+        self.backend._set_watermark.assert_awaited_once_with(
+            self.conn, "duplicate_candidates", UNTIL
+        )
+        assert result["watermark"] == UNTIL.isoformat()
+        self.backend.refresh_duplicate_candidates.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_sweep_reads_the_primary(self):
+        """A lagging replica must not set the watermark or hide changed rows"""
+        self.backend.acquire_read = None
+        self.conn.fetch.side_effect = [_changed(1), []]
+
+        result = await self.backend.sweep_duplicate_candidates()
+
+        assert result["processed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_skips_empty_ids(self):
+        """Refreshing no memories does not touch the database"""
+        backend = PostgresUnifiedBackend("postgresql://unused")
+
+        assert await backend.refresh_duplicate_candidates([]) == 0
+
+
+class TestServiceDuplicates:
+    """Duplicate listing through the service"""
+
+    @pytest.mark.asyncio
+    async def test_listing_is_limited_read(self):
+        """Listing passes the limit down instead of slicing all pairs"""
+        service = MemoryServicePostgres(enable_embeddings=False)
+        service.backend = AsyncMock()
+        service.backend.find_duplicates.return_value = [("a", "b", 0.99)]
+
+        pairs = await service.find_duplicate_memories(0.95, limit=5)
+
+        service.backend.find_duplicates.assert_awaited_once_with(0.95, 5)
+        assert pairs == [("a", "b", 0.99)]
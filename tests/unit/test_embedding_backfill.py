@@ -0,0 +1,278 @@
+"""
+Tests for the resumable embedding backfill
+"""
+
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.degradation import DegradationLevel
+from app.services.embedding_backfill import EmbeddingBackfill
+from app.services.memory_service_postgres import MemoryServicePostgres
+from app.storage.postgres_unified import PostgresUnifiedBackend
+
+pytestmark = pytest.mark.unit
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _rows(count: int, start: int = 0) -> list:
+    return [
+        {
+            "id": uuid.UUID(int=start + i + 1),
+            "content": f"memory {start + i}",
+            "created_at": BASE_TIME + timedelta(seconds=start + i),
+            "version": 1,
+        }
+        for i in range(count)
+    ]
+
+
+class FakeBackend:
+    """In-memory stand-in for the backfill methods of the backend"""
+
+    def __init__(self, rows: list, job: dict = None):
+        self.rows = rows
+        self.job = job
+        self.fetches = []
+        self.applied = []
+        self.statuses = []
+        self.embedded = set()
+        # Memories edited while being embedded: their first write is skipped
+        self.edited = set()
+
+    async def start_backfill_job(self, model, reset=False):
+        if self.job is None or reset:
+            self.job = {"model": model, "total": len(self.rows), "cursor_id": None}
+        return dict(self.job)
+
+    async def fetch_backfill_batch(self, model, after, batch_size):
+        self.fetches.append(after)
+        pending = [
+            r
+            for r in self.rows
+            if r["id"] not in self.embedded
+            and (after is None or (r["created_at"], r["id"]) > after)
+        ]
+        return pending[:batch_size]
+
+    async def apply_backfill_batch(self, model, embeddings, cursor, failed=0, chunks=None):
+        self.applied.append((list(embeddings), cursor, failed))
+        written = {memory_id for memory_id, _, _ in embeddings} - self.edited
+        self.edited.clear()
+        self.embedded |= written
+        return len(written)
+
+    async def set_backfill_status(self, model, status, error=None):
+        self.statuses.append((status, error))
+
+    async def get_backfill_job(self, model):
+        return self.job
+
+
+class TestEmbeddingBackfill:
+    """Keyset batching, checkpointing, concurrency and throttling"""
+
+    def setup_method(self):
+        self.service = MagicMock()
+        self.service.embedding_model = "test-model"
+        self.service.degradation_manager = MagicMock(current_level=DegradationLevel.FULL)
+        self.service._generate_embedding = AsyncMock(return_value=[0.1, 0.2])
+
+    @pytest.mark.asyncio
+    async def test_walks_corpus_in_keyset_batches(self):
+        """Each batch continues after the last (created_at, id) and is written once"""
+        rows = _rows(5)
+        self.service.backend = FakeBackend(rows)
+        backfill = EmbeddingBackfill(self.service, batch_size=2, rate_limit=None)
+
+        result = await backfill.run()
+
+        backend = self.service.backend
+        assert result["status"] == "completed"
+        assert result["processed"] == result["success"] == 5
+        assert len(backend.applied) == 3
+        assert backend.fetches[1] == (rows[1]["created_at"], rows[1]["id"])
+        assert backend.applied[-1][1] == (rows[4]["created_at"], rows[4]["id"])
+        assert backend.statuses == [("completed", None)]
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_checkpoint(self):
+        """A stored cursor is where the next run starts; earlier memories are swept after"""
+        rows = _rows(4)
+        job = {
+            "model": "test-model",
+            "total": 4,
+            "cursor_created_at": rows[1]["created_at"],
+            "cursor_id": str(rows[1]["id"]),
+        }
+        self.service.backend = FakeBackend(rows, job=job)
+        backfill = EmbeddingBackfill(self.service, batch_size=10, rate_limit=None)
+
+        result = await backfill.run()
+
+        assert self.service.backend.fetches[0] == (rows[1]["created_at"], rows[1]["id"])
+        assert self.service.backend.fetches[2] is None
+        assert result["processed"] == 4
+
+    @pytest.mark.asyncio
+    async def test_missed_memories_are_swept_again(self):
+        """Memories the cursor passed without embedding get another sweep"""
+        rows = _rows(3)
+        self.service.backend = FakeBackend(rows)
+        self.service.backend.edited = {rows[0]["id"]}
+        self.service._generate_embedding = AsyncMock(
+            side_effect=[[0.1], None, [0.1], [0.1], [0.1]]
+        )
+        backfill = EmbeddingBackfill(self.service, batch_size=3, rate_limit=None)
+
+        result = await backfill.run()
+
+        assert result["status"] == "completed"
+        assert self.service.backend.embedded == {row["id"] for row in rows}
+        assert backfill._stats["sweeps"] == 1
+
+    @pytest.mark.asyncio
+    async def test_max_memories_pauses(self):
+        """A capped run stops early and leaves the job resumable"""
+        self.service.backend = FakeBackend(_rows(5))
+        backfill = EmbeddingBackfill(self.service, batch_size=2, rate_limit=None)
+
+        result = await backfill.run(max_memories=3)
+
+        assert result["processed"] == 3
+        assert result["status"] == "paused"
+
+    @pytest.mark.asyncio
+    async def test_partial_failures_advance_and_total_failure_stops(self):
+        """Failed texts are counted; a batch with no embeddings keeps the checkpoint"""
+        self.service.backend = FakeBackend(_rows(2))
+        self.service._generate_embedding = AsyncMock(side_effect=[[0.1], None, None])
+        backfill = EmbeddingBackfill(self.service, batch_size=2, rate_limit=None)
+
+        result = await backfill.run()
+        assert result["errors"] == 1
+        assert self.service.backend.applied[0][2] == 1
+
+        self.service.backend = FakeBackend(_rows(2))
+        self.service._generate_embedding = AsyncMock(return_value=None)
+        result = await backfill.run()
+        assert result["status"] == "failed"
+        assert self.service.backend.applied == []
+
+    @pytest.mark.asyncio
+    async def test_bounded_concurrency(self):
+        """No more than ``concurrency`` embedding requests are in flight"""
+        self.service.backend = FakeBackend(_rows(8))
+        in_flight = peak = 0
+
+        async def embed(text):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.001)
+            in_flight -= 1
+            return [0.1]
+
+        self.service._generate_embedding = embed
+        backfill = EmbeddingBackfill(self.service, batch_size=8, concurrency=3, rate_limit=None)
+
+        await backfill.run()
+
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_sleeps_between_batches(self):
+        """Batches are stretched to batch_size / rate_limit seconds"""
+        self.service.backend = FakeBackend(_rows(4))
+        backfill = EmbeddingBackfill(self.service, batch_size=2, rate_limit=100.0)
+
+        await backfill.run()
+
+        assert backfill._stats["throttled_seconds"] > 0.03
+
+    @pytest.mark.asyncio
+    async def test_pauses_in_read_only_mode(self):
+        """Read-only mode stops the backfill before any write"""
+        self.service.backend = FakeBackend(_rows(2))
+        self.service.degradation_manager = MagicMock(current_level=DegradationLevel.READONLY)
+        backfill = EmbeddingBackfill(self.service, rate_limit=None)
+
+        result = await backfill.run()
+
+        assert result["status"] == "paused"
+        assert self.service.backend.fetches == []
+
+    @pytest.mark.asyncio
+    async def test_background_start_stop_and_status(self):
+        """A stopped job records 'paused'; a second run while running is refused"""
+        self.service.backend = FakeBackend(_rows(50))
+        backfill = EmbeddingBackfill(self.service, batch_size=1, rate_limit=1000.0)
+
+        status = await backfill.start()
+        assert status["running"] is True
+        with pytest.raises(RuntimeError):
+            await backfill.run()
+
+        await asyncio.sleep(0.01)
+        status = await backfill.stop()
+        assert status["running"] is False
+        assert self.service.backend.statuses[-1] == ("paused", "Stopped")
+        assert 0 < status["session"]["batches"] < 50
+
+
+class TestServiceBackfill:
+    """Service entry points"""
+
+    @pytest.mark.asyncio
+    async def test_start_refused_in_read_only_mode(self):
+        service = MemoryServicePostgres(enable_embeddings=True)
+        service.degradation_manager = MagicMock(current_level=DegradationLevel.READONLY)
+
+        with pytest.raises(RuntimeError):
+            await service.start_embedding_backfill()
+
+    @pytest.mark.asyncio
+    async def test_generate_embeddings_for_all_runs_backfill(self):
+        service = MemoryServicePostgres(enable_embeddings=False)
+        service.embedding_backfill.run = AsyncMock(return_value={"processed": 0})
+
+        await service.generate_embeddings_for_all(batch_size=5, max_memories=10)
+
+        service.embedding_backfill.run.assert_awaited_once_with(max_memories=10, batch_size=5)
+
+
+class TestApplyBackfillBatch:
+    """One COPY + UPDATE and the checkpoint share a transaction"""
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_and_checkpoint(self):
+        backend = PostgresUnifiedBackend("postgresql://unused")
+        conn = AsyncMock()
+        conn.execute = AsyncMock(side_effect=["SELECT 0", "UPDATE 2", "UPDATE 1"])
+        transaction = MagicMock()
+        transaction.__aenter__ = AsyncMock()
+        transaction.__aexit__ = AsyncMock(return_value=False)
+        conn.transaction = MagicMock(return_value=transaction)
+
+        @asynccontextmanager
+        async def acquire(*args, **kwargs):
+            yield conn
+
+        backend.acquire = acquire
+        rows = _rows(2)
+        embeddings = [(r["id"], r["version"], [0.1]) for r in rows]
+        cursor = (rows[-1]["created_at"], rows[-1]["id"])
+
+        updated = await backend.apply_backfill_batch("test-model", embeddings, cursor, failed=1)
+
+        assert updated == 2
+        conn.copy_records_to_table.assert_awaited_once()
+        update_sql = conn.execute.await_args_list[1].args[0]
+        assert "m.version = s.version" in update_sql
+        checkpoint = conn.execute.await_args_list[2].args
+        assert checkpoint[1:] == ("test-model", cursor[0], cursor[1], 3, 2, 1)
@@ -0,0 +1,91 @@
+"""
+Tests for the coalescing embedding micro-batcher
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.embedding_batcher import EmbeddingBatcher
+
+pytestmark = pytest.mark.unit
+
+
+class FakeModel:
+    """Multi-input embedding model recording each request"""
+
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+
+    async def embed_many(self, texts):
+        self.calls.append(list(texts))
+        await asyncio.sleep(0)
+        if self.fail:
+            raise RuntimeError("model offline")
+        return [[float(len(text))] for text in texts]
+
+
+class TestEmbeddingBatcher:
+    """Coalescing, routing and metrics"""
+
+    @pytest.mark.asyncio
+    async def test_each_caller_gets_its_own_vector(self):
+        """Concurrent callers share one request and receive their own results"""
+        model = FakeModel()
+        batcher = EmbeddingBatcher(model.embed_many, max_batch_size=8, max_wait_ms=5)
+
+        texts = ["a", "bb", "ccc"]
+        results = await asyncio.gather(*(batcher.embed(text) for text in texts))
+
+        assert results == [[1.0], [2.0], [3.0]]
+        assert model.calls == [texts]
+
+    @pytest.mark.asyncio
+    async def test_full_batch_dispatches_without_waiting(self):
+        """Reaching max_batch_size sends immediately and splits larger bursts"""
+        model = FakeModel()
+        batcher = EmbeddingBatcher(model.embed_many, max_batch_size=2, max_wait_ms=10_000)
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.embed(str(i)) for i in range(4))), timeout=1
+        )
+
+        assert len(results) == 4
+        assert model.calls == [["0", "1"], ["2", "3"]]
+
+    @pytest.mark.asyncio
+    async def test_wait_window_flushes_partial_batch(self):
+        """A lone request is sent once the wait window expires"""
+        model = FakeModel()
+        batcher = EmbeddingBatcher(model.embed_many, max_batch_size=16, max_wait_ms=1)
+
+        assert await asyncio.wait_for(batcher.embed("solo"), timeout=1) == [4.0]
+        assert model.calls == [["solo"]]
+
+    @pytest.mark.asyncio
+    async def test_failure_returns_none_to_every_caller(self):
+        """A failed model call resolves all waiting callers with None"""
+        batcher = EmbeddingBatcher(FakeModel(fail=True).embed_many, max_wait_ms=1)
+
+        results = await asyncio.gather(batcher.embed("x"), batcher.embed("y"))
+
+        assert results == [None, None]
+        assert batcher.get_stats()["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stats(self):
+        """Batch-size and wait-time metrics are reported"""
+        batcher = EmbeddingBatcher(FakeModel().embed_many, max_batch_size=3, max_wait_ms=1)
+
+        await asyncio.gather(*(batcher.embed(str(i)) for i in range(3)))
+        await batcher.embed("late")
+        await batcher.close()
+        stats = batcher.get_stats()
+
+        assert stats["requests"] == 4
+        assert stats["batches"] == 2
+        assert stats["avg_batch_size"] == 2.0
+        assert stats["max_batch_size_seen"] == 3
+        assert stats["max_wait_ms_seen"] >= 0
+        assert stats["pending"] == stats["in_flight"] == 0
@@ -0,0 +1,99 @@
+"""
+Tests for the content-hash embedding cache
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from app.services.embedding_cache import EmbeddingCache, content_hash
+
+pytestmark = pytest.mark.unit
+
+
+class TestContentHash:
+    """Cache keys"""
+
+    def test_whitespace_and_unicode_normalized(self):
+        """Equivalent texts share a key"""
+        assert content_hash("  hello\n world ") == content_hash("hello world")
+        assert content_hash("café") == content_hash("café")
+        assert content_hash("hello") != content_hash("Hello")
+
+
+class TestEmbeddingCache:
+    """Read-through order, single-flight and eviction"""
+
+    def setup_method(self):
+        self.backend = AsyncMock()
+        self.backend.get_cached_embeddings.return_value = {}
+        self.cache = EmbeddingCache(self.backend, model="nomic", max_entries=2)
+        self.compute = AsyncMock(return_value=[0.5, 0.25])
+
+    @pytest.mark.asyncio
+    async def test_miss_then_memory_hit(self):
+        """The model is called once; repeats come from the LRU"""
+        first = await self.cache.get_or_compute("text", self.compute)
+        second = await self.cache.get_or_compute("text", self.compute)
+
+        assert first == second == [0.5, 0.25]
+        self.compute.assert_awaited_once()
+        self.backend.store_cached_embeddings.assert_awaited_once_with(
+            "nomic", [(content_hash("text"), [0.5, 0.25])]
+        )
+        stats = self.cache.get_stats()
+        assert (stats["misses"], stats["memory_hits"]) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_persistent_hit_skips_model(self):
+        """Entries found in the table are not re-embedded"""
+        key = content_hash("stored")
+        self.backend.get_cached_embeddings.return_value = {
+            key: np.array([1.0, 2.0], dtype=np.float32)
+        }
+
+        assert await self.cache.get_or_compute("stored", self.compute) == [1.0, 2.0]
+        self.compute.assert_not_awaited()
+        assert self.cache.get_stats()["persistent_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_share_one_call(self):
+        """Simultaneous lookups of the same text embed it once"""
+
+        async def slow_compute():
+            await asyncio.sleep(0.01)
+            return [3.0]
+
+        compute = AsyncMock(side_effect=slow_compute)
+        results = await asyncio.gather(
+            *(self.cache.get_or_compute("same", compute) for _ in range(3))
+        )
+
+        assert results == [[3.0]] * 3
+        compute.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failures_not_cached_and_lru_bounded(self):
+        """None results are retried; the LRU evicts the least recently used entry"""
+        self.compute.return_value = None
+        assert await self.cache.get_or_compute("flaky", self.compute) is None
+        self.backend.store_cached_embeddings.assert_not_awaited()
+
+        self.compute.return_value = [1.0]
+        for text in ("a", "b", "c"):
+            await self.cache.get_or_compute(text, self.compute)
+
+        stats = self.cache.get_stats()
+        assert stats["size"] == 2
+        assert stats["evictions"] == 1
+
+    @pytest.mark.asyncio
+    async def test_table_errors_fall_back_to_model(self):
+        """A broken cache table never blocks embedding"""
+        self.backend.get_cached_embeddings.side_effect = RuntimeError("db down")
+        self.backend.store_cached_embeddings.side_effect = RuntimeError("db down")
+
+        assert await self.cache.get_or_compute("text", self.compute) == [0.5, 0.25]
+        assert self.cache.get_stats()["errors"] == 2
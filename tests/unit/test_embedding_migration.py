@@ -0,0 +1,451 @@
+"""
+Tests for the online embedding model migration
+"""
+
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import asyncpg
+import pytest
+
+from app.core.degradation import DegradationLevel
+from app.services.embedding_migration import EmbeddingMigration
+from app.services.embedding_worker import EmbeddingWorker
+from app.services.memory_service_postgres import MemoryServicePostgres
+from app.services.passages import PassageEmbedder
+from app.storage.postgres_unified import (
+    CHUNK_INDEX_NAME,
+    EMBEDDING_MODEL_MISMATCH,
+    VECTOR_INDEX_NAME,
+    PostgresUnifiedBackend,
+)
+
+pytestmark = pytest.mark.unit
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+class ModelMismatchError(Exception):
+    """What asyncpg raises when the switch's guard rejects a vector"""
+
+    sqlstate = EMBEDDING_MODEL_MISMATCH
+
+
+def _rows(count: int, start: int = 0) -> list:
+    return [
+        {
+            "id": uuid.UUID(int=start + i + 1),
+            "content": f"memory {start + i}",
+            "created_at": BASE_TIME + timedelta(seconds=start + i),
+            "version": 1,
+        }
+        for i in range(count)
+    ]
+
+
+class FakeBackend:
+    """In-memory stand-in for the migration methods of the backend"""
+
+    def __init__(self, rows: list, migration: dict = None, switches=(True,)):
+        self.rows = rows
+        self.migration = migration or {
+            "target_model": "new-model",
+            "status": "running",
+            "cursor_id": None,
+        }
+        self.switches = list(switches)
+        self.shadow = {}
+        self.fetches = []
+        self.applied = []
+        self.statuses = []
+        self.index_builds = 0
+        self.on_failed_switch = None
+        self.leased_elsewhere = False
+
+    @asynccontextmanager
+    async def embedding_migration_lease(self):
+        if self.leased_elsewhere:
+            raise RuntimeError("An embedding migration is already running in another process")
+        yield
+
+    async def start_embedding_migration(self, target_model, dimensions, **kwargs):
+        self.started = (target_model, dimensions, kwargs)
+        return dict(self.migration)
+
+    async def get_embedding_migration(self, target_model=None):
+        remaining = sum(1 for row in self.rows if row["id"] not in self.shadow)
+        return {
+            **self.migration,
+            "total": len(self.rows),
+            "remaining": remaining,
+            "covered": len(self.rows) - remaining,
+        }
+
+    async def set_embedding_migration_status(self, target_model, status, error=None):
+        self.statuses.append((status, error))
+        self.migration["status"] = status
+
+    async def fetch_migration_batch(self, after, batch_size):
+        self.fetches.append(after)
+        pending = [
+            row
+            for row in self.rows
+            if row["id"] not in self.shadow
+            and (after is None or (row["created_at"], row["id"]) > after)
+        ]
+        return pending[:batch_size]
+
+    async def apply_migration_batch(self, target_model, embeddings, cursor, failed=0, chunks=None):
+        self.applied.append((list(embeddings), cursor, failed, chunks))
+        for memory_id, _, embedding in embeddings:
+            self.shadow[memory_id] = embedding
+        return len(embeddings)
+
+    async def build_migration_indexes(self):
+        self.index_builds += 1
+
+    async def switch_embedding_migration(self, target_model, lock_timeout=2.0):
+        switched = self.switches.pop(0)
+        if switched:
+            self.migration["status"] = "switched"
+        elif self.on_failed_switch:
+            self.on_failed_switch()
+        return switched
+
+
+class TestEmbeddingMigration:
+    """Sweeps, switch retries, failures and progress"""
+
+    def setup_method(self):
+        self.service = MagicMock()
+        self.service.embedding_model = "old-model"
+        self.service.degradation_manager = MagicMock(current_level=DegradationLevel.FULL)
+        self.service.passage_embedder = None
+        self.service._use_embedding_model = AsyncMock()
+        self.batcher = MagicMock()
+        self.batcher.embed = AsyncMock(return_value=[0.5, 0.5, 0.5])
+        self.batcher.close = AsyncMock()
+        self.service._model_batcher = MagicMock(return_value=self.batcher)
+
+    def _migration(self, **kwargs) -> EmbeddingMigration:
+        kwargs.setdefault("rate_limit", None)
+        kwargs.setdefault("switch_retry_seconds", 0)
+        return EmbeddingMigration(self.service, **kwargs)
+
+    @pytest.mark.asyncio
+    async def test_fills_then_switches(self):
+        """Every memory gets a shadow vector before the indexes are built and search switches"""
+        rows = _rows(3)
+        self.service.backend = FakeBackend(rows)
+
+        result = await self._migration(batch_size=2).run()
+
+        backend = self.service.backend
+        assert result["status"] == "switched"
+        assert set(backend.shadow) == {row["id"] for row in rows}
+        assert backend.fetches[1] == (rows[1]["created_at"], rows[1]["id"])
+        assert backend.index_builds == 1
+        self.service._model_batcher.assert_called_once_with("new-model")
+        self.service._use_embedding_model.assert_awaited_once_with("new-model")
+        self.batcher.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_runner_in_another_process_is_left_alone(self):
+        """A second runner stops without touching the migration it does not own"""
+        self.service.backend = FakeBackend(_rows(2))
+        self.service.backend.leased_elsewhere = True
+
+        with pytest.raises(RuntimeError):
+            await self._migration().run()
+
+        assert self.service.backend.statuses == []
+        assert self.service.backend.fetches == []
+
+    @pytest.mark.asyncio
+    async def test_writes_during_switch_are_swept_again(self):
+        """A memory written before the switch took its lock is embedded and the switch retried"""
+        rows = _rows(2)
+        self.service.backend = FakeBackend(rows, switches=[False, True])
+        self.service.backend.on_failed_switch = lambda: rows.extend(_rows(1, start=10))
+        migration = self._migration(batch_size=10)
+
+        result = await migration.run()
+
+        assert result["status"] == "switched"
+        assert len(self.service.backend.shadow) == 3
+        assert migration._stats["switch_attempts"] == 2
+
+    @pytest.mark.asyncio
+    async def test_resumes_from_checkpoint_then_sweeps_from_start(self):
+        """A stored cursor is where filling resumes; memories before it are swept afterwards"""
+        rows = _rows(4)
+        migration = {
+            "target_model": "new-model",
+            "status": "paused",
+            "cursor_created_at": rows[1]["created_at"],
+            "cursor_id": str(rows[1]["id"]),
+        }
+        self.service.backend = FakeBackend(rows, migration=migration)
+
+        result = await self._migration(batch_size=10).run()
+
+        fetches = self.service.backend.fetches
+        assert fetches[0] == (rows[1]["created_at"], rows[1]["id"])
+        assert None in fetches
+        assert result["processed"] == 4
+        assert self.service.backend.statuses[0] == ("running", None)
+
+    @pytest.mark.asyncio
+    async def test_switch_attempts_exhausted_pauses(self):
+        """A switch that never succeeds leaves the migration paused and search untouched"""
+        self.service.backend = FakeBackend(_rows(1), switches=[False, False])
+
+        result = await self._migration(switch_attempts=2).run()
+
+        assert result["status"] == "paused"
+        assert self.service.backend.statuses[-1][0] == "paused"
+        self.service._use_embedding_model.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_unavailable_model_fails(self):
+        """A batch with no embeddings stops the run and keeps the checkpoint"""
+        self.service.backend = FakeBackend(_rows(2))
+        self.batcher.embed.return_value = None
+
+        result = await self._migration().run()
+
+        assert result["status"] == "failed"
+        assert self.service.backend.applied == []
+        assert self.service.backend.statuses[-1][0] == "failed"
+
+    @pytest.mark.asyncio
+    async def test_long_memories_write_shadow_passages(self):
+        """Passages are embedded by the target model with the service's chunk settings"""
+        rows = _rows(1)
+        rows[0]["content"] = "one two three four five six"
+        self.service.backend = FakeBackend(rows)
+        self.service.passage_embedder = PassageEmbedder(AsyncMock(), 4, 1)
+
+        await self._migration().run()
+
+        chunks = self.service.backend.applied[0][3]
+        assert [row[:3] for row in chunks[rows[0]["id"]]] == [(0, 0, 18), (1, 14, 27)]
+
+    @pytest.mark.asyncio
+    async def test_start_probes_target_dimensions(self):
+        """The shadow column is typed with the dimension of the target model"""
+        self.service.backend = FakeBackend([])
+        migration = self._migration()
+
+        await migration.start("new-model")
+        await migration._task
+
+        target, dimensions, kwargs = self.service.backend.started
+        assert (target, dimensions) == ("new-model", 3)
+        assert kwargs["source_model"] == "old-model"
+
+    @pytest.mark.asyncio
+    async def test_status_reports_percent_and_eta(self):
+        """Remaining memories over this process's throughput give the ETA"""
+        rows = _rows(4)
+        self.service.backend = FakeBackend(rows)
+        self.service.backend.shadow = {rows[0]["id"]: [0.1]}
+        migration = self._migration()
+        migration._stats.update(embedded=10, active_seconds=5.0)
+
+        status = await migration.get_status()
+
+        assert status["percent"] == 25.0
+        assert status["rate"] == 2.0
+        assert status["eta_seconds"] == 2
+
+
+class TestSwitchEmbeddingMigration:
+    """The atomic column swap"""
+
+    def setup_method(self):
+        self.backend = PostgresUnifiedBackend("postgresql://unused")
+        self.conn = AsyncMock()
+        transaction = MagicMock()
+        transaction.__aenter__ = AsyncMock()
+        transaction.__aexit__ = AsyncMock(return_value=False)
+        self.conn.transaction = MagicMock(return_value=transaction)
+        self.conn.fetch.return_value = []
+
+        @asynccontextmanager
+        async def acquire(*args, **kwargs):
+            yield self.conn
+
+        self.backend.acquire = acquire
+
+    def _executed(self) -> list:
+        return [" ".join(call.args[0].split()) for call in self.conn.execute.await_args_list]
+
+    @pytest.mark.asyncio
+    async def test_missing_vectors_abort_the_switch(self):
+        """A memory without a shadow vector keeps search on the live column"""
+        self.conn.fetchval.side_effect = ["running", True]
+
+        assert await self.backend.switch_embedding_migration("new-model") is False
+        assert not any("RENAME" in statement for statement in self._executed())
+
+    @pytest.mark.asyncio
+    async def test_renames_shadow_to_live_and_drops_retired(self):
+        """Columns, passage table and indexes swap names in one transaction"""
+        self.conn.fetchval.side_effect = ["running", False]
+        self.conn.fetch.return_value = [
+            {"name": VECTOR_INDEX_NAME},
+            {"name": f"{VECTOR_INDEX_NAME}_next"},
+        ]
+
+        assert await self.backend.switch_embedding_migration("new-model") is True
+
+        executed = self._executed()
+        assert "ALTER TABLE memories RENAME COLUMN embedding TO embedding_retired" in executed
+        assert "ALTER TABLE memories RENAME COLUMN embedding_next TO embedding" in executed
+        assert "ALTER TABLE memory_chunks_next RENAME TO memory_chunks" in executed
+        assert (
+            f"ALTER INDEX IF EXISTS {VECTOR_INDEX_NAME}_next RENAME TO {VECTOR_INDEX_NAME}"
+            in executed
+        )
+        assert any("status = 'switched'" in statement for statement in executed)
+        assert any("DROP COLUMN IF EXISTS embedding_retired" in s for s in executed)
+        assert any(
+            "trg_memories_check_embedding_model" in s and "('new-model')" in s for s in executed
+        )
+        assert self.backend.quantization_ready is False
+
+    @pytest.mark.asyncio
+    async def test_missing_shadow_index_refuses(self):
+        """Search is never switched onto a column without an index"""
+        self.conn.fetchval.side_effect = ["running", False]
+        self.conn.fetch.return_value = [{"name": VECTOR_INDEX_NAME}]
+
+        with pytest.raises(RuntimeError):
+            await self.backend.switch_embedding_migration("new-model")
+        assert not any("RENAME" in statement for statement in self._executed())
+
+    @pytest.mark.asyncio
+    async def test_status_change_only_touches_a_filling_migration(self):
+        """A late failure cannot overwrite a switch made by another process"""
+        await self.backend.set_embedding_migration_status("new-model", "failed", "boom")
+
+        statement, *args = self.conn.execute.await_args.args
+        assert "status = ANY($4::text[])" in statement
+        assert args[3] == ["running", "paused", "failed"]
+
+    @pytest.mark.asyncio
+    async def test_lock_timeout_returns_false(self):
+        """A switch that cannot get its lock in time is retried later"""
+
+        async def execute(statement, *args):
+            if statement.startswith("LOCK TABLE"):
+                raise asyncpg.exceptions.LockNotAvailableError("lock timeout")
+
+        self.conn.execute.side_effect = execute
+
+        assert await self.backend.switch_embedding_migration("new-model") is False
+
+    @pytest.mark.asyncio
+    async def test_shadow_indexes_mirror_live_definitions(self):
+        """Shadow indexes copy method, options and predicate of the live ones"""
+        self.conn.fetch.return_value = [
+            {
+                "name": VECTOR_INDEX_NAME,
+                "valid": True,
+                "definition": f"CREATE INDEX {VECTOR_INDEX_NAME} ON public.memories USING hnsw "
+                "(embedding vector_cosine_ops) WITH (m='16') WHERE (deleted_at IS NULL)",
+            },
+            {
+                "name": CHUNK_INDEX_NAME,
+                "valid": True,
+                "definition": f"CREATE INDEX {CHUNK_INDEX_NAME} ON public.memory_chunks "
+                "USING hnsw (embedding vector_cosine_ops) WITH (m='16')",
+            },
+        ]
+        self.backend.get_vector_index_status = AsyncMock(return_value={})
+
+        await self.backend.build_migration_indexes()
+
+        executed = [call.args[0] for call in self.conn.execute.await_args_list]
+        assert (
+            f"CREATE INDEX CONCURRENTLY {VECTOR_INDEX_NAME}_next ON public.memories USING hnsw "
+            "(embedding_next vector_cosine_ops) WITH (m='16') WHERE (deleted_at IS NULL)"
+        ) in executed
+        assert (
+            f"CREATE INDEX CONCURRENTLY {CHUNK_INDEX_NAME}_next ON public.memory_chunks_next "
+            "USING hnsw (embedding vector_cosine_ops) WITH (m='16')"
+        ) in executed
+
+
+class TestServiceEmbeddingModel:
+    """Adopting a switched model"""
+
+    @pytest.mark.asyncio
+    async def test_refresh_adopts_switched_model(self):
+        """Queries are embedded by the migrated model and stale cached vectors are dropped"""
+        service = MemoryServicePostgres(enable_embeddings=False)
+        service.backend = AsyncMock()
+        service.backend.get_switched_embedding_model.return_value = "new-model"
+        service.query_embedding_cache.put("query", [0.1])
+
+        assert await service.refresh_embedding_model() == "new-model"
+
+        assert service._text_model == "new-model"
+        assert service.query_embedding_cache.get("query") is None
+
+    @pytest.mark.asyncio
+    async def test_refresh_rechecks_quantization(self):
+        """A process that did not switch stops reading the dropped quantized column"""
+        service = MemoryServicePostgres(enable_embeddings=False)
+        service.backend = AsyncMock()
+        service.backend.get_switched_embedding_model.return_value = "new-model"
+
+        await service.refresh_embedding_model()
+
+        service.backend._refresh_quantization_state.assert_awaited_once()
+
+
+class TestStaleModelWrites:
+    """Writers that have not seen a switch yet"""
+
+    @pytest.mark.asyncio
+    async def test_create_reembeds_with_switched_model(self):
+        """A rejected vector is replaced by one from the switched model"""
+        service = MemoryServicePostgres(enable_embeddings=True, async_embeddings=False)
+        service.backend = AsyncMock()
+        service.backend.get_switched_embedding_model.return_value = "new-model"
+        service.backend.create_memory.side_effect = [
+            ModelMismatchError(),
+            {"id": str(uuid.uuid4()), "content": "note"},
+        ]
+        service._embed_content = AsyncMock(side_effect=[([0.1], None), ([0.2], None)])
+        service.degradation_manager = MagicMock(current_level=DegradationLevel.FULL)
+
+        await service.create_memory("note")
+
+        memory, embedding = service.backend.create_memory.await_args.args
+        assert embedding == [0.2]
+        assert memory["embedding_model"] == "new-model"
+
+    @pytest.mark.asyncio
+    async def test_worker_retries_jobs_with_switched_model(self):
+        """Rejected jobs are released at once and the worker adopts the new model"""
+        service = MagicMock()
+        service.embedding_model = "old-model"
+        service.degradation_manager = MagicMock(current_level=DegradationLevel.FULL)
+        service._generate_embedding = AsyncMock(return_value=[0.1])
+        service.refresh_embedding_model = AsyncMock()
+        job = {"memory_id": uuid.UUID(int=1), "version": 1, "content": "note"}
+        service.backend.claim_embedding_jobs = AsyncMock(return_value=[job])
+        service.backend.complete_embedding_jobs = AsyncMock(side_effect=ModelMismatchError())
+        service.backend.fail_embedding_jobs = AsyncMock()
+
+        assert await EmbeddingWorker(service).process_batch() == 1
+
+        service.refresh_embedding_model.assert_awaited_once()
+        service.backend.fail_embedding_jobs.assert_awaited_once_with(
+            [uuid.UUID(int=1)], "Embedding model switched", retry_seconds=0
+        )
@@ -0,0 +1,164 @@
+"""
+Tests for asynchronous embedding through the embedding_jobs outbox
+"""
+
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.degradation import DegradationLevel
+from app.services.embedding_worker import EmbeddingWorker
+from app.services.memory_service_postgres import MemoryServicePostgres
+from app.storage.postgres_unified import PostgresUnifiedBackend, projection_sql
+
+pytestmark = pytest.mark.unit
+
+
+def _jobs(count: int) -> list:
+    return [
+        {"memory_id": uuid.UUID(int=i + 1), "version": 1, "content": f"memory {i}"}
+        for i in range(count)
+    ]
+
+
+class TestEmbeddingWorker:
+    """Claim, embed, complete and retry"""
+
+    def setup_method(self):
+        self.service = MagicMock()
+        self.service.embedding_model = "test-model"
+        self.service.degradation_manager = MagicMock(current_level=DegradationLevel.FULL)
+        self.service._generate_embedding = AsyncMock(return_value=[0.1, 0.2])
+        self.service.backend.claim_embedding_jobs = AsyncMock(return_value=_jobs(3))
+        self.service.backend.complete_embedding_jobs = AsyncMock(return_value=3)
+        self.service.backend.fail_embedding_jobs = AsyncMock()
+        self.worker = EmbeddingWorker(self.service, batch_size=3, max_attempts=4)
+
+    @pytest.mark.asyncio
+    async def test_completes_batch_in_one_call(self):
+        """All embedded jobs are written back with a single bulk completion"""
+        assert await self.worker.process_batch() == 3
+
+        self.service.backend.claim_embedding_jobs.assert_awaited_once_with(
+            3, lease_seconds=300.0, max_attempts=4
+        )
+        model, done = self.service.backend.complete_embedding_jobs.await_args.args
+        assert model == "test-model"
+        assert [job_id for job_id, _, _ in done] == [job["memory_id"] for job in _jobs(3)]
+        self.service.backend.fail_embedding_jobs.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failed_embeddings_are_released_for_retry(self):
+        """Jobs without an embedding go back to the queue with a backoff"""
+        self.service._generate_embedding = AsyncMock(side_effect=[[0.1], None, RuntimeError()])
+        self.service.backend.complete_embedding_jobs = AsyncMock(return_value=1)
+
+        await self.worker.process_batch()
+
+        call = self.service.backend.fail_embedding_jobs.await_args
+        assert call.args[0] == [uuid.UUID(int=2), uuid.UUID(int=3)]
+        assert call.kwargs["max_attempts"] == 4
+        assert self.worker.get_stats()["failed"] == 2
+
+    @pytest.mark.asyncio
+    async def test_idle_in_read_only_mode(self):
+        """Read-only mode claims nothing"""
+        self.service.degradation_manager = MagicMock(current_level=DegradationLevel.READONLY)
+
+        assert await self.worker.process_batch() == 0
+        self.service.backend.claim_embedding_jobs.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_notify_wakes_idle_worker(self):
+        """A queued job is picked up without waiting for the poll interval"""
+        self.service.backend.claim_embedding_jobs = AsyncMock(side_effect=[[], _jobs(1), []])
+        worker = EmbeddingWorker(self.service, poll_interval=60)
+        await worker.start()
+        await asyncio.sleep(0.01)
+
+        worker.notify()
+        await asyncio.sleep(0.01)
+        await worker.stop()
+
+        assert self.service.backend.complete_embedding_jobs.await_count == 1
+
+
+class TestServiceEnqueue:
+    """Creates and updates queue a job instead of calling the model"""
+
+    def setup_method(self):
+        self.service = MemoryServicePostgres(enable_embeddings=True, async_embeddings=True)
+        self.service.degradation_manager = MagicMock(current_level=DegradationLevel.FULL)
+        self.service.backend = MagicMock()
+        self.service._generate_embedding = AsyncMock()
+        self.service.embedding_worker.notify = MagicMock()
+
+    @pytest.mark.asyncio
+    async def test_create_enqueues(self):
+        self.service.backend.create_memory = AsyncMock(
+            return_value={"id": str(uuid.uuid4()), "embedding_pending": True}
+        )
+
+        await self.service.create_memory("hello")
+
+        self.service._generate_embedding.assert_not_awaited()
+        args, kwargs = self.service.backend.create_memory.await_args
+        assert args[1] is None
+        assert kwargs["enqueue_embedding"] is True
+        self.service.embedding_worker.notify.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_content_update_enqueues(self):
+        self.service.backend.update_memory = AsyncMock(return_value={"id": "x"})
+
+        await self.service.update_memory("x", content="new")
+        await self.service.update_memory("x", tags=["t"])
+
+        first, second = self.service.backend.update_memory.await_args_list
+        assert first.kwargs["enqueue_embedding"] is True
+        assert second.kwargs["enqueue_embedding"] is False
+        self.service._generate_embedding.assert_not_awaited()
+
+
+class TestOutboxSql:
+    """Row and job are written together; claims skip locked jobs"""
+
+    def setup_method(self):
+        self.backend = PostgresUnifiedBackend("postgresql://unused")
+        self.conn = AsyncMock()
+        transaction = MagicMock()
+        transaction.__aenter__ = AsyncMock()
+        transaction.__aexit__ = AsyncMock(return_value=False)
+        self.conn.transaction = MagicMock(return_value=transaction)
+
+        @asynccontextmanager
+        async def acquire(*args, **kwargs):
+            yield self.conn
+
+        self.backend.acquire = acquire
+
+    @pytest.mark.asyncio
+    async def test_create_enqueues_in_transaction(self):
+        self.backend._row_to_dict = lambda row, **_: {"id": str(row["id"])}
+        self.conn.fetchrow = AsyncMock(return_value={"id": uuid.uuid4()})
+
+        result = await self.backend.create_memory({"content": "x"}, enqueue_embedding=True)
+
+        self.conn.transaction.assert_called_once()
+        assert "INSERT INTO embedding_jobs" in self.conn.execute.await_args.args[0]
+        assert result["embedding_pending"] is True
+
+    @pytest.mark.asyncio
+    async def test_claim_skips_locked(self):
+        self.conn.fetch = AsyncMock(return_value=[])
+
+        await self.backend.claim_embedding_jobs(8)
+
+        assert "FOR UPDATE SKIP LOCKED" in self.conn.fetch.await_args.args[0]
+
+    def test_projection_reports_pending(self):
+        assert "AS embedding_pending" in projection_sql("summary")
+        assert "j.memory_id = m.id" in projection_sql("full", "m")
@@ -2,9 +2,12 @@
 Test application factory pattern
 """
 
+import asyncio
+from unittest.mock import AsyncMock
+
 import pytest
 from fastapi.testclient import TestClient
-from app.factory import create_app, create_test_app, AppState
+from app.factory import create_app, create_test_app, AppState, ServiceRegistry
 
 
 class TestApplicationFactory:
@@ -88,4 +91,51 @@ class TestApplicationFactory:
         assert state.memory_service is None
         assert state.qdrant_client is None
         assert state.persistence_task is None
-        assert state.memory_count == 0
\ No newline at end of file
+        assert state.memory_count == 0
+
+class TestServiceRegistry:
+    """Test the application-scoped service registry"""
+
+    def test_memory_service_is_shared(self):
+        """Repeated lookups return the same service instance"""
+        registry = ServiceRegistry()
+
+        assert registry.memory_service is registry.memory_service
+
+    @pytest.mark.asyncio
+    async def test_start_initializes_once(self):
+        """Concurrent starts create a single connection pool"""
+        registry = ServiceRegistry()
+        postgres = registry.memory_service.service
+        postgres.initialize = AsyncMock()
+
+        await asyncio.gather(*(registry.start() for _ in range(5)))
+
+        postgres.initialize.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_close_releases_service(self):
+        """Closing the registry closes the pool and drops the service"""
+        registry = ServiceRegistry()
+        service = registry.memory_service
+        service.service.initialize = AsyncMock()
+        service.service.close = AsyncMock()
+
+        await registry.start()
+        await registry.close()
+
+        service.service.close.assert_awaited_once()
+        assert registry.memory_service is not service
+
+    @pytest.mark.asyncio
+    async def test_health_requires_started_service(self, monkeypatch):
+        """The memory service check fails until the pool has started"""
+        from app.routes.v2 import health
+
+        registry = ServiceRegistry()
+        monkeypatch.setattr("app.factory.get_service_registry", lambda: registry)
+        assert health.check_memory_service()["status"] == "unhealthy"
+
+        registry.memory_service.service.initialize = AsyncMock()
+        await registry.start()
+        assert health.check_memory_service()["status"] == "healthy"
@@ -0,0 +1,69 @@
+"""
+Tests for knowledge graph limits in the PostgreSQL memory service
+"""
+
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.memory_service_postgres import MemoryServicePostgres
+
+pytestmark = pytest.mark.unit
+
+
+class TestBuildKnowledgeGraph:
+    """Delegation to the single-query traversal"""
+
+    def setup_method(self):
+        self.service = MemoryServicePostgres(
+            enable_embeddings=False,
+            graph_limits={"max_depth": 2, "max_fanout": 5, "max_nodes": 50, "timeout_ms": 100},
+        )
+        self.service.backend = AsyncMock()
+
+    @pytest.mark.asyncio
+    async def test_limits_are_capped(self):
+        """Requested depth and node count never exceed the configured limits"""
+        self.service.backend.get_knowledge_graph.return_value = {
+            "nodes": [{"id": "root", "depth": 0}],
+            "edges": [],
+            "truncated": False,
+        }
+
+        graph = await self.service.build_knowledge_graph("root", depth=5, max_nodes=1000)
+
+        self.service.backend.get_knowledge_graph.assert_awaited_once_with(
+            center_memory_id="root",
+            depth=2,
+            min_strength=0.5,
+            max_fanout=5,
+            max_nodes=50,
+            timeout_ms=100,
+            projection="summary",
+        )
+        assert graph["center"] == "root"
+        assert graph["nodes"] == [{"id": "root", "depth": 0}]
+
+    @pytest.mark.asyncio
+    async def test_single_backend_call(self):
+        """The whole traversal is one backend call, with no per-node reads"""
+        self.service.backend.get_knowledge_graph.return_value = {
+            "nodes": [],
+            "edges": [],
+            "truncated": False,
+        }
+
+        await self.service.build_knowledge_graph("root", depth=2)
+
+        self.service.backend.get_knowledge_graph.assert_awaited_once()
+        self.service.backend.get_memory.assert_not_awaited()
+        self.service.backend.get_related_memories.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_failure_returns_empty_graph(self):
+        """A timeout or database error yields an empty graph, not an exception"""
+        self.service.backend.get_knowledge_graph.side_effect = RuntimeError("canceling statement")
+
+        graph = await self.service.build_knowledge_graph("root")
+
+        assert graph == {"nodes": [], "edges": [], "center": "root", "truncated": False}
@@ -0,0 +1,40 @@
+"""
+Tests for batched memory imports
+"""
+
+import json
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi import BackgroundTasks
+
+from app.routes import v2_api
+
+pytestmark = pytest.mark.unit
+
+
+class TestImportMemories:
+    """Counts are kept per committed batch"""
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_keeps_earlier_imports(self, monkeypatch):
+        """Rows of batches committed before a failure still count as imported"""
+        monkeypatch.setattr(v2_api, "IMPORT_BATCH_SIZE", 2)
+        rows = [{"content": f"memory {i}"} for i in range(5)] + [{"content": ""}]
+        upload = MagicMock(filename="memories.json")
+        upload.read = AsyncMock(return_value=json.dumps(rows).encode())
+        service = MagicMock()
+        service.create_memories = AsyncMock(
+            side_effect=[
+                {"inserted": 2, "skipped": 0},
+                RuntimeError("connection lost"),
+                {"inserted": 0, "skipped": 1},
+            ]
+        )
+
+        result = await v2_api.import_memories(
+            BackgroundTasks(), file=upload, generate_embeddings=False, memory_service=service
+        )
+
+        assert service.create_memories.await_count == 3
+        assert (result["imported"], result["failed"], result["total"]) == (2, 4, 6)
@@ -0,0 +1,163 @@
+"""
+Tests for streaming whole-corpus scans through a server-side cursor
+"""
+
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.config import Config
+from app.services.memory_service_postgres import MemoryServicePostgres
+from app.storage.postgres_unified import PostgresUnifiedBackend
+
+pytestmark = pytest.mark.unit
+
+
+class FakeCursor:
+    """Server-side cursor returning rows in fetch-sized chunks"""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.fetches = []
+
+    async def fetch(self, n):
+        self.fetches.append(n)
+        chunk, self.rows = self.rows[:n], self.rows[n:]
+        return chunk
+
+
+class FakeConnection:
+    """Connection recording transaction options and cursor queries"""
+
+    def __init__(self, rows):
+        self.cursor_obj = FakeCursor(rows)
+        self.transaction_kwargs = None
+        self.query = None
+        self.params = None
+
+    def transaction(self, **kwargs):
+        self.transaction_kwargs = kwargs
+        transaction = MagicMock()
+        transaction.__aenter__ = AsyncMock()
+        transaction.__aexit__ = AsyncMock(return_value=False)
+        return transaction
+
+    async def cursor(self, query, *params):
+        self.query = query
+        self.params = params
+        return self.cursor_obj
+
+
+async def _collect(batches):
+    return [batch async for batch in batches]
+
+
+class TestBackendIterateMemories:
+    """Batching, snapshot isolation and projection in the backend"""
+
+    def setup_method(self):
+        self.backend = PostgresUnifiedBackend("postgresql://unused")
+        self.rows = [{"id": uuid.uuid4(), "content": f"memory {i}"} for i in range(5)]
+        self.conn = FakeConnection(self.rows)
+
+        @asynccontextmanager
+        async def acquire():
+            yield self.conn
+
+        self.backend.acquire_read = acquire
+        self.backend._row_to_dict = lambda row, **_: {"id": str(row["id"])}
+
+    @pytest.mark.asyncio
+    async def test_batches_in_read_only_snapshot(self):
+        """Rows are fetched batch by batch inside a repeatable-read transaction"""
+        batches = await _collect(self.backend.iterate_memories(batch_size=2))
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+        assert self.conn.transaction_kwargs == {"isolation": "repeatable_read", "readonly": True}
+        assert self.conn.cursor_obj.fetches == [2, 2, 2]
+        assert "ORDER BY created_at DESC, id DESC" in self.conn.query
+
+    @pytest.mark.asyncio
+    async def test_filters_and_projection(self):
+        """Filters reuse the list WHERE clauses; projected rows keep string ids"""
+        batches = await _collect(
+            self.backend.iterate_memories(
+                filters={"memory_type": "semantic", "has_embedding": False},
+                columns=("id", "content"),
+            )
+        )
+
+        assert "SELECT id, content FROM memories" in self.conn.query
+        assert "embedding IS NULL" in self.conn.query
+        assert self.conn.params == ("default", "semantic")
+        assert batches[0][0] == {"id": str(self.rows[0]["id"]), "content": "memory 0"}
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_columns_and_filters(self):
+        """Column and filter names are validated before any SQL is built"""
+        with pytest.raises(ValueError):
+            await _collect(self.backend.iterate_memories(columns=("id; DROP TABLE memories",)))
+        with pytest.raises(ValueError):
+            await _collect(self.backend.iterate_memories(filters={"owner": "x"}))
+
+
+class TestServiceScans:
+    """Whole-corpus consumers stream instead of loading a fixed page"""
+
+    def setup_method(self):
+        self.service = MemoryServicePostgres(enable_embeddings=False)
+        self.service.backend = MagicMock()
+        self.batches = [
+            [{"id": "a", "content": "alpha"}, {"id": "b", "content": "beta"}],
+            [{"id": "c", "content": "alphabet"}],
+        ]
+
+        async def iterate_memories(**kwargs):
+            self.iterate_kwargs = kwargs
+            for batch in self.batches:
+                yield batch
+
+        self.service.backend.iterate_memories = iterate_memories
+
+    @pytest.mark.asyncio
+    async def test_fallback_search_scans_past_first_batch(self):
+        """Matches beyond the first batch are still found"""
+        results = await self.service._fallback_search("alpha", limit=5)
+
+        assert [m["id"] for m in results] == ["a", "c"]
+
+    @pytest.mark.asyncio
+    async def test_fallback_search_scan_is_bounded(self, monkeypatch):
+        """Without the text index only FALLBACK_SEARCH_MAX_SCAN memories are scanned"""
+        monkeypatch.setattr(Config, "FALLBACK_SEARCH_MAX_SCAN", 2)
+
+        results = await self.service._fallback_search("alpha", limit=5)
+
+        assert [m["id"] for m in results] == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_fallback_search_uses_ready_text_index(self):
+        """A ready text index answers without touching the database"""
+        self.service.text_index.ready = True
+        self.service.text_index.add({"id": "x", "content": "alpha notes"})
+        self.service.backend.iterate_memories = MagicMock()
+
+        results = await self.service._fallback_search("alpha", limit=5)
+
+        assert [m["id"] for m in results] == ["x"]
+        self.service.backend.iterate_memories.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_iteration_errors_propagate(self):
+        """A failing scan raises instead of looking like the end of the corpus"""
+
+        async def iterate_memories(**kwargs):
+            yield self.batches[0]
+            raise ConnectionError("connection lost")
+
+        self.service.backend.iterate_memories = iterate_memories
+
+        with pytest.raises(ConnectionError):
+            await _collect(self.service.iterate_memories())
@@ -0,0 +1,84 @@
+"""
+Tests for keyset pagination cursors and list_memories_page
+"""
+
+import uuid
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.memory_service_postgres import MemoryServicePostgres
+from app.storage.postgres_unified import decode_cursor, encode_cursor
+
+pytestmark = pytest.mark.unit
+
+
+def _memory(index: int) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "content": f"memory {index}",
+        "created_at": datetime(2024, 1, 1, 12, 0, index, 123456, tzinfo=timezone.utc).isoformat(),
+    }
+
+
+class TestCursor:
+    """Opaque cursor encoding"""
+
+    def test_roundtrip(self):
+        """A cursor decodes back to the (created_at, id) of the memory"""
+        memory = _memory(5)
+
+        created_at, memory_id = decode_cursor(encode_cursor(memory))
+
+        assert created_at == datetime.fromisoformat(memory["created_at"])
+        assert memory_id == uuid.UUID(memory["id"])
+
+    def test_cursor_is_url_safe(self):
+        """Cursors can be passed as query parameters unescaped"""
+        cursor = encode_cursor(_memory(1))
+
+        assert all(c.isalnum() or c in "-_" for c in cursor)
+
+    @pytest.mark.parametrize("cursor", ["not-a-cursor", "", "e30"])
+    def test_invalid_cursor(self, cursor):
+        """Malformed cursors raise ValueError"""
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+class TestListMemoriesPage:
+    """Page assembly in the service layer"""
+
+    def setup_method(self):
+        self.service = MemoryServicePostgres(enable_embeddings=False)
+        self.service.backend = AsyncMock()
+
+    @pytest.mark.asyncio
+    async def test_next_cursor_when_more_rows(self):
+        """An extra row yields a cursor pointing at the last returned memory"""
+        rows = [_memory(i) for i in range(3)]
+        self.service.backend.list_memories.return_value = rows
+        self.service.backend.count_memories.return_value = (42, True)
+
+        page = await self.service.list_memories_page(limit=2, memory_type="note")
+
+        assert page["memories"] == rows[:2]
+        assert decode_cursor(page["next_cursor"])[1] == uuid.UUID(rows[1]["id"])
+        assert page["total"] == 42
+        assert page["total_is_estimate"] is True
+
+        list_kwargs = self.service.backend.list_memories.await_args.kwargs
+        assert list_kwargs["limit"] == 3
+        assert list_kwargs["memory_type"] == "note"
+
+    @pytest.mark.asyncio
+    async def test_last_page_has_no_cursor(self):
+        """A short page ends pagination"""
+        self.service.backend.list_memories.return_value = [_memory(0)]
+        self.service.backend.count_memories.return_value = (1, False)
+
+        page = await self.service.list_memories_page(limit=2, exact_total=True)
+
+        assert page["next_cursor"] is None
+        assert self.service.backend.count_memories.await_args.kwargs["exact"] is True
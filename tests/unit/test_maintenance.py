@@ -0,0 +1,146 @@
+"""
+Tests for the soft-delete purge and table maintenance job
+"""
+
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.memory_service_postgres import MemoryServicePostgres
+from app.storage.postgres_unified import PostgresUnifiedBackend
+
+pytestmark = pytest.mark.unit
+
+
+def _table(live: int, dead: int) -> dict:
+    return {
+        "live_tuples": live,
+        "dead_tuples": dead,
+        "dead_ratio": dead / (live + dead) if live + dead else 0.0,
+    }
+
+
+class TestPurgeDeletedMemories:
+    """Batching of the hard-delete purge"""
+
+    def setup_method(self):
+        self.backend = PostgresUnifiedBackend("postgresql://unused")
+        self.conn = AsyncMock()
+        transaction = MagicMock()
+        transaction.__aenter__ = AsyncMock()
+        transaction.__aexit__ = AsyncMock(return_value=False)
+        self.conn.transaction = MagicMock(return_value=transaction)
+
+        @asynccontextmanager
+        async def acquire(*args, **kwargs):
+            yield self.conn
+
+        self.backend.acquire = acquire
+
+    @pytest.mark.asyncio
+    async def test_batches_until_short_batch(self):
+        """Full batches continue; a short batch ends the purge"""
+        ids = [uuid.uuid4() for _ in range(3)]
+        self.conn.fetch.side_effect = [[{"id": i} for i in ids[:2]], [{"id": ids[2]}]]
+        self.conn.execute.side_effect = [
+            "DELETE 1", "DELETE 0", "DELETE 2",
+            "DELETE 0", "DELETE 1", "DELETE 1",
+        ]
+
+        result = await self.backend.purge_deleted_memories(retention_days=7, batch_size=2)
+
+        assert result == {"memories": 3, "relationships": 2, "batches": 2}
+        assert self.conn.fetch.await_args_list[0].args[1:] == (7 * 86400.0, 2)
+        memory_deletes = [call.args[1] for call in self.conn.execute.await_args_list[2::3]]
+        assert memory_deletes == [ids[:2], ids[2:]]
+
+    @pytest.mark.asyncio
+    async def test_nothing_due(self):
+        """No expired rows means no deletes"""
+        self.conn.fetch.return_value = []
+
+        result = await self.backend.purge_deleted_memories()
+
+        assert result == {"memories": 0, "relationships": 0, "batches": 0}
+        self.conn.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_search_history_purge_batches(self):
+        """Search history is deleted in batches until one comes back short"""
+        self.conn.execute.side_effect = ["DELETE 2", "DELETE 2", "DELETE 1"]
+
+        deleted = await self.backend.purge_search_history(retention_days=30, batch_size=2)
+
+        assert deleted == 5
+        assert self.conn.execute.await_args_list[0].args[1:] == (30 * 86400.0, 2)
+
+    @pytest.mark.asyncio
+    async def test_search_history_purge_max_batches(self):
+        """max_batches bounds one maintenance run"""
+        self.conn.execute.return_value = "DELETE 2"
+
+        assert await self.backend.purge_search_history(batch_size=2, max_batches=3) == 6
+        assert self.conn.execute.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_vacuum_rejects_unknown_tables(self):
+        """Only maintained tables can be vacuumed"""
+        with pytest.raises(ValueError):
+            await self.backend.vacuum_tables(["pg_class"])
+
+
+class TestRunMaintenance:
+    """Threshold decisions in the service"""
+
+    def setup_method(self):
+        self.service = MemoryServicePostgres(enable_embeddings=False)
+        self.service.backend = AsyncMock()
+        self.service.backend.purge_deleted_memories.return_value = {
+            "memories": 10,
+            "relationships": 4,
+            "batches": 1,
+        }
+        self.service.backend.vacuum_tables.side_effect = lambda tables: tables
+        self.service.backend.reindex_vector_indexes.return_value = ["idx_memories_embedding_ann"]
+
+    @pytest.mark.asyncio
+    async def test_vacuums_only_bloated_tables(self):
+        """Tables under the ratio or the minimum dead tuples are left alone"""
+        self.service.backend.get_table_health.return_value = {
+            "tables": {
+                "memories": _table(live=10000, dead=2000),
+                "memory_relationships": _table(live=100, dead=50),
+                "memory_duplicate_candidates": _table(live=10000, dead=10),
+            }
+        }
+
+        result = await self.service.run_maintenance()
+
+        assert result["purged"]["memories"] == 10
+        assert result["vacuumed"] == ["memories"]
+        assert result["reindexed"] == []
+
+    @pytest.mark.asyncio
+    async def test_reindexes_heavily_bloated_memories(self):
+        """Past the reindex ratio the vector indexes are rebuilt before vacuuming"""
+        self.service.backend.get_table_health.return_value = {
+            "tables": {"memories": _table(live=10000, dead=6000)}
+        }
+
+        result = await self.service.run_maintenance()
+
+        assert result["reindexed"] == ["idx_memories_embedding_ann"]
+        assert result["vacuumed"] == ["memories"]
+
+    @pytest.mark.asyncio
+    async def test_skipped_in_read_only_mode(self):
+        """Read-only mode never deletes or vacuums"""
+        from app.core.degradation import DegradationLevel
+
+        self.service.degradation_manager = MagicMock(current_level=DegradationLevel.READONLY)
+        result = await self.service.run_maintenance()
+
+        assert result["purged"] is None
+        self.service.backend.purge_deleted_memories.assert_not_awaited()
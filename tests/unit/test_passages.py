@@ -0,0 +1,229 @@
+"""
+Tests for passage chunking of long memories and best-passage search
+"""
+
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.degradation import DegradationLevel
+from app.services.embedding_worker import EmbeddingWorker
+from app.services.passages import PassageEmbedder, mean_embedding, split_passages
+from app.storage.postgres_unified import PostgresUnifiedBackend
+
+pytestmark = pytest.mark.unit
+
+
+def _words(count: int) -> str:
+    return " ".join(f"w{i}" for i in range(count))
+
+
+def _row(number: int, similarity: float, **extra) -> dict:
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return {
+        "id": uuid.UUID(int=number),
+        "content": f"memory {number}",
+        "memory_type": "semantic",
+        "importance_score": 0.5,
+        "tags": [],
+        "metadata": {},
+        "access_count": 0,
+        "created_at": now,
+        "updated_at": now,
+        "last_accessed_at": None,
+        "container_id": "default",
+        "version": 1,
+        "has_embedding": False,
+        "similarity": similarity,
+        **extra,
+    }
+
+
+class TestSplitPassages:
+    """Token windows, overlap and character offsets"""
+
+    def test_short_text_is_not_split(self):
+        """Text that fits in one window has no passages"""
+        assert split_passages(_words(10), max_tokens=10) == []
+
+    def test_windows_overlap_and_cover_the_text(self):
+        """Consecutive windows share the overlap and the last one ends the text"""
+        text = _words(10)
+        passages = split_passages(text, max_tokens=4, overlap_tokens=1)
+
+        assert [p.text for p in passages] == [
+            "w0 w1 w2 w3",
+            "w3 w4 w5 w6",
+            "w6 w7 w8 w9",
+        ]
+        assert [p.index for p in passages] == [0, 1, 2]
+        for passage in passages:
+            assert text[passage.start : passage.end] == passage.text
+        assert passages[-1].end == len(text)
+
+    def test_punctuation_counts_as_tokens(self):
+        """Punctuation marks are tokens of their own"""
+        passages = split_passages("a, b. c", max_tokens=3, overlap_tokens=0)
+        assert [p.text for p in passages] == ["a, b", ". c"]
+
+    def test_mean_embedding_is_unit_length(self):
+        """The memory vector is the normalized mean of its passages"""
+        assert mean_embedding([[1.0, 0.0], [0.0, 1.0]]) == pytest.approx([0.7071, 0.7071], 1e-3)
+
+
+class TestPassageEmbedder:
+    """Embedding long content passage by passage"""
+
+    @pytest.mark.asyncio
+    async def test_short_text_embedded_whole(self):
+        """Short content costs one embedding call and has no passage rows"""
+        embed = AsyncMock(return_value=[1.0, 0.0])
+        embedder = PassageEmbedder(embed, max_tokens=8)
+
+        assert await embedder.embed("short note") == ([1.0, 0.0], [])
+        embed.assert_awaited_once_with("short note")
+
+    @pytest.mark.asyncio
+    async def test_long_text_returns_mean_and_rows(self):
+        """Each passage is embedded and stored with its offsets"""
+        vectors = {"w0 w1 w2 w3": [1.0, 0.0], "w3 w4 w5": [0.0, 1.0]}
+        embedder = PassageEmbedder(AsyncMock(side_effect=vectors.get), 4, 1)
+
+        embedding, rows = await embedder.embed(_words(6))
+
+        assert embedding == pytest.approx([0.7071, 0.7071], 1e-3)
+        assert rows == [(0, 0, 11, [1.0, 0.0]), (1, 9, 17, [0.0, 1.0])]
+        assert embedder.get_stats()["passages"] == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_passage_fails_the_memory(self):
+        """A memory is only embedded once every passage is"""
+        embed = AsyncMock(side_effect=[[1.0, 0.0], None])
+        embedder = PassageEmbedder(embed, max_tokens=4, overlap_tokens=1)
+
+        assert await embedder.embed(_words(6)) == (None, [])
+        assert embedder.get_stats()["failed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """No more than ``concurrency`` passages are embedded at once"""
+        in_flight = peak = 0
+
+        async def embed(text):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return [1.0]
+
+        embedder = PassageEmbedder(embed, max_tokens=2, overlap_tokens=0, concurrency=3)
+        _, rows = await embedder.embed(_words(20))
+
+        assert len(rows) == 10
+        assert peak == 3
+
+
+class TestChunkStorage:
+    """Passage rows are replaced in the caller's transaction"""
+
+    @pytest.mark.asyncio
+    async def test_replace_chunks_deletes_then_copies(self):
+        backend = PostgresUnifiedBackend("postgresql://unused")
+        conn = AsyncMock()
+        kept, cleared = uuid.UUID(int=1), uuid.UUID(int=2)
+
+        await backend._replace_chunks(conn, {kept: [(0, 0, 5, [0.1])], cleared: []})
+
+        assert conn.execute.await_args.args[1] == [kept, cleared]
+        copy = conn.copy_records_to_table.await_args
+        assert copy.args == ("memory_chunks",)
+        assert copy.kwargs["records"] == [(kept, 0, 0, 5, [0.1])]
+
+
+class TestChunkSearch:
+    """Vector search merges memory-level and best-passage matches"""
+
+    def setup_method(self):
+        self.backend = PostgresUnifiedBackend("postgresql://unused", chunk_search=True)
+        self.conn = AsyncMock()
+
+        @asynccontextmanager
+        async def search_connection(recall=None, candidates=0):
+            yield self.conn, "balanced"
+
+        self.backend._search_connection = search_connection
+
+    @pytest.mark.asyncio
+    async def test_best_passage_wins(self):
+        """A closer passage raises its memory's similarity and reports its offsets"""
+        self.conn.fetch.side_effect = [
+            [_row(1, 0.9), _row(2, 0.5)],
+            [
+                _row(2, 0.95, passage_start=100, passage_end=180),
+                _row(1, 0.7, passage_start=0, passage_end=50),
+                _row(3, 0.6, passage_start=10, passage_end=20),
+            ],
+        ]
+
+        results = await self.backend.vector_search([0.1], limit=2)
+
+        assert [(r["id"], r["similarity"]) for r in results] == [
+            (str(uuid.UUID(int=2)), 0.95),
+            (str(uuid.UUID(int=1)), 0.9),
+        ]
+        assert results[0]["passage"] == {"start": 100, "end": 180}
+        assert "passage" not in results[1]
+        assert "memory_chunks" in self.conn.fetch.await_args_list[1].args[0]
+
+    @pytest.mark.asyncio
+    async def test_filters_before_passage_limit(self):
+        """Deleted memories and other containers are excluded before the nearest passages are cut"""
+        self.conn.fetch.side_effect = [[], []]
+
+        await self.backend.vector_search([0.1], limit=2, container_id="work")
+
+        call = self.conn.fetch.await_args_list[1]
+        hits = call.args[0].split("best AS")[0]
+        assert "m.deleted_at IS NULL" in hits
+        assert "m.container_id = $2" in hits
+        assert call.args[2] == "work"
+
+    @pytest.mark.asyncio
+    async def test_disabled_skips_chunks(self):
+        """Without chunk search only the memory-level query runs"""
+        self.backend.chunk_search = False
+        self.conn.fetch.return_value = [_row(1, 0.9)]
+
+        await self.backend.vector_search([0.1], limit=2)
+
+        self.conn.fetch.assert_awaited_once()
+
+
+class TestWorkerPassages:
+    """Queued embeddings store passages with the memory vector"""
+
+    @pytest.mark.asyncio
+    async def test_chunks_completed_with_jobs(self):
+        service = MagicMock()
+        service.embedding_model = "test-model"
+        service.degradation_manager = MagicMock(current_level=DegradationLevel.FULL)
+        service._generate_embedding = AsyncMock(return_value=[1.0, 0.0])
+        jobs = [
+            {"memory_id": uuid.UUID(int=1), "version": 1, "content": "short"},
+            {"memory_id": uuid.UUID(int=2), "version": 3, "content": _words(6)},
+        ]
+        service.backend.claim_embedding_jobs = AsyncMock(return_value=jobs)
+        service.backend.complete_embedding_jobs = AsyncMock(return_value=2)
+        passages = PassageEmbedder(service._generate_embedding, max_tokens=4, overlap_tokens=1)
+        worker = EmbeddingWorker(service, batch_size=2, passages=passages)
+
+        await worker.process_batch()
+
+        chunks = service.backend.complete_embedding_jobs.await_args.kwargs["chunks"]
+        assert chunks[uuid.UUID(int=1)] == []
+        assert [row[:3] for row in chunks[uuid.UUID(int=2)]] == [(0, 0, 11), (1, 9, 17)]
@@ -0,0 +1,71 @@
+"""
+Tests for the binary asyncpg codecs used by the PostgreSQL unified backend
+"""
+
+import struct
+
+import numpy as np
+import pytest
+
+from app.storage.pg_codecs import decode_jsonb, decode_vector, encode_jsonb, encode_vector
+
+pytestmark = pytest.mark.unit
+
+
+class TestVectorCodec:
+    """pgvector binary encoding"""
+
+    def test_roundtrip_list(self):
+        """Lists of floats survive an encode/decode roundtrip"""
+        values = [0.1, -0.5, 3.25, 0.0]
+        decoded = decode_vector(encode_vector(values))
+
+        assert decoded.shape == (4,)
+        np.testing.assert_allclose(decoded, values, rtol=1e-6)
+
+    def test_roundtrip_numpy(self):
+        """NumPy arrays of any float dtype are accepted"""
+        values = np.random.default_rng(42).random(768)
+        decoded = decode_vector(encode_vector(values))
+
+        np.testing.assert_allclose(decoded, values.astype(np.float32))
+
+    def test_wire_format(self):
+        """Encoded value matches pgvector's binary send format"""
+        data = encode_vector([1.0, 2.0])
+
+        assert data[:4] == struct.pack(">HH", 2, 0)
+        assert struct.unpack(">ff", data[4:]) == (1.0, 2.0)
+
+    def test_decode_is_zero_copy_view(self):
+        """Decoded vectors are views over the received buffer"""
+        data = encode_vector([1.0, 2.0, 3.0])
+        decoded = decode_vector(data)
+
+        assert not decoded.flags.owndata
+        assert not decoded.flags.writeable
+
+    def test_rejects_multidimensional(self):
+        """Only 1-D embeddings can be encoded"""
+        with pytest.raises(ValueError):
+            encode_vector([[1.0, 2.0], [3.0, 4.0]])
+
+
+class TestJsonbCodec:
+    """JSONB binary encoding"""
+
+    def test_roundtrip(self):
+        """Nested structures survive an encode/decode roundtrip"""
+        value = {"source": "gdrive", "pages": [1, 2, 3], "nested": {"ok": True}}
+
+        assert decode_jsonb(encode_jsonb(value)) == value
+
+    def test_version_byte(self):
+        """Binary JSONB values start with the format version byte"""
+        assert encode_jsonb({})[:1] == b"\x01"
+
+    def test_numpy_values_serialized(self):
+        """NumPy scalars and arrays in metadata are converted to JSON natives"""
+        value = {"score": np.float32(0.5), "vec": np.array([1, 2])}
+
+        assert decode_jsonb(encode_jsonb(value)) == {"score": 0.5, "vec": [1, 2]}
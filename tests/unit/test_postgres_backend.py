@@ -141,7 +141,11 @@ async def test_get_memory(postgres_backend, sample_memories):
     assert retrieved is not None
     assert retrieved["id"] == created["id"]
     assert retrieved["content"] == created["content"]
-    assert retrieved["access_count"] == 1  # Should increment on retrieval
+
+    # Access counts are written behind; flush and re-read without tracking
+    await postgres_backend.access_tracker.flush()
+    reread = await postgres_backend.get_memory(created["id"], track=False)
+    assert reread["access_count"] == 1
 
 
 @pytest.mark.asyncio
@@ -183,6 +187,63 @@ async def test_delete_memory_soft(postgres_backend, sample_memories):
     assert retrieved is None
 
 
+@pytest.mark.asyncio
+async def test_purge_deleted_memories(postgres_backend, sample_memories):
+    """Test expired soft-deleted memories and their relationships are hard-deleted"""
+    first, second = [await postgres_backend.create_memory(m) for m in sample_memories[:2]]
+    await postgres_backend.create_relationship(first["id"], second["id"], "related", 0.9)
+    await postgres_backend.delete_memory(first["id"], soft=True)
+
+    kept = await postgres_backend.purge_deleted_memories(retention_days=1)
+    assert kept["memories"] == 0
+
+    purged = await postgres_backend.purge_deleted_memories(retention_days=0)
+    assert purged["memories"] == 1
+    assert purged["relationships"] == 1
+
+    health = await postgres_backend.get_table_health()
+    assert health["soft_deleted"] == 0
+    assert "memories" in health["tables"]
+
+
+@pytest.mark.asyncio
+async def test_get_memories_preserves_order(postgres_backend, sample_memories):
+    """Test batched retrieval keeps input order and drops missing ids"""
+    created = []
+    for memory_data in sample_memories:
+        memory_data["container_id"] = "test"
+        created.append(await postgres_backend.create_memory(memory_data))
+
+    ids = [m["id"] for m in reversed(created)]
+    await postgres_backend.delete_memory(ids[1], soft=True)
+    missing = str(uuid.uuid4())
+
+    memories = await postgres_backend.get_memories([ids[0], missing, ids[1], ids[2]])
+
+    assert [m["id"] for m in memories] == [ids[0], ids[2]]
+
+
+@pytest.mark.asyncio
+async def test_add_tags_and_delete_memories(postgres_backend, sample_memories):
+    """Test set-based tag merging and bulk deletion"""
+    created = []
+    for memory_data in sample_memories[:2]:
+        memory_data["container_id"] = "test"
+        created.append(await postgres_backend.create_memory(memory_data))
+    ids = [m["id"] for m in created]
+
+    tagged = await postgres_backend.add_tags(ids, ["bulk", created[0]["tags"][0]])
+    assert sorted(tagged) == sorted(ids)
+
+    first = await postgres_backend.get_memory(ids[0], track=False)
+    assert "bulk" in first["tags"]
+    assert len(first["tags"]) == len(set(first["tags"]))
+
+    deleted = await postgres_backend.delete_memories(ids)
+    assert sorted(deleted) == sorted(ids)
+    assert await postgres_backend.get_memories(ids) == []
+
+
 @pytest.mark.asyncio
 async def test_list_memories(postgres_backend, sample_memories):
     """Test listing memories with pagination"""
@@ -229,6 +290,54 @@ async def test_list_memories_with_filters(postgres_backend, sample_memories):
     assert len(important_memories) == 2
 
 
+@pytest.mark.asyncio
+async def test_list_memories_keyset(postgres_backend, sample_memories):
+    """Test keyset pagination visits every memory exactly once"""
+    from app.storage.postgres_unified import encode_cursor
+
+    for memory_data in sample_memories:
+        memory_data["container_id"] = "test"
+        await postgres_backend.create_memory(memory_data)
+
+    seen = []
+    cursor = None
+    while True:
+        page = await postgres_backend.list_memories(limit=2, after=cursor, container_id="test")
+        if not page:
+            break
+        seen.extend(m["id"] for m in page)
+        cursor = encode_cursor(page[-1])
+
+    assert len(seen) == len(set(seen)) == 3
+
+    total, is_estimate = await postgres_backend.count_memories(container_id="test")
+    assert total == 3
+    assert is_estimate is False
+
+
+@pytest.mark.asyncio
+async def test_iterate_memories(postgres_backend, sample_memories):
+    """Test the server-side cursor visits every memory in bounded batches"""
+    for memory_data in sample_memories:
+        memory_data["container_id"] = "test"
+        await postgres_backend.create_memory(memory_data)
+
+    batches = [
+        batch
+        async for batch in postgres_backend.iterate_memories(batch_size=2, container_id="test")
+    ]
+    assert [len(batch) for batch in batches] == [2, 1]
+    assert len({m["id"] for batch in batches for m in batch}) == 3
+
+    projected = [
+        batch
+        async for batch in postgres_backend.iterate_memories(
+            filters={"has_embedding": False}, columns=("id", "content"), container_id="test"
+        )
+    ]
+    assert set(projected[0][0]) == {"id", "content"}
+
+
 # ==================== Search Tests ====================
 
 @pytest.mark.asyncio
@@ -269,6 +378,52 @@ async def test_vector_search(postgres_backend, sample_memories, sample_embedding
         assert results[0]["similarity"] > 0
 
 
+@pytest.mark.asyncio
+async def test_vector_index_management(postgres_backend, sample_memories, sample_embedding):
+    """Test building the ANN index and searching with recall hints"""
+    memory_data = sample_memories[0]
+    memory_data["container_id"] = "test"
+    await postgres_backend.create_memory(memory_data, sample_embedding)
+
+    status = await postgres_backend.create_vector_index(method="hnsw", m=8, ef_construction=32)
+    names = [index["name"] for index in status["indexes"]]
+    assert "idx_memories_embedding_ann" in names
+
+    status = await postgres_backend.create_vector_index(method="ivfflat", lists=10, rebuild=True)
+    managed = [i for i in status["indexes"] if i["name"] == "idx_memories_embedding_ann"]
+    assert managed[0]["method"] == "ivfflat"
+    assert managed[0]["valid"] is True
+
+    for recall in ("fast", "high", "exact"):
+        results = await postgres_backend.vector_search(
+            sample_embedding, limit=5, container_id="test", recall=recall
+        )
+        assert len(results) == 1
+
+
+@pytest.mark.asyncio
+async def test_halfvec_quantization(postgres_backend, sample_memories, sample_embedding):
+    """Test quantized backfill, trigger sync and re-ranked search"""
+    memory_data = sample_memories[0]
+    memory_data["container_id"] = "test"
+    before = await postgres_backend.create_memory(memory_data, sample_embedding)
+
+    postgres_backend.quantization = "halfvec"
+    result = await postgres_backend.enable_quantization(batch_size=1)
+    assert result["ready"] is True
+    assert result["backfilled"] >= 1
+
+    # Rows written after setup are quantized by the trigger
+    after = await postgres_backend.create_memory(
+        {"content": "after quantization", "container_id": "test"}, sample_embedding
+    )
+
+    results = await postgres_backend.vector_search(
+        sample_embedding, limit=5, container_id="test", recall="high"
+    )
+    assert {before["id"], after["id"]} <= {r["id"] for r in results}
+
+
 @pytest.mark.asyncio
 async def test_hybrid_search(postgres_backend, sample_memories, sample_embedding):
     """Test hybrid search combining vector and text"""
@@ -373,6 +528,31 @@ async def test_consolidate_memories(postgres_backend, sample_memories):
     assert consolidated["metadata"]["source_count"] == 2
 
 
+@pytest.mark.asyncio
+async def test_merge_duplicate_group(postgres_backend):
+    """Test a duplicate cluster collapses into one survivor in one transaction"""
+    low = await postgres_backend.create_memory(
+        {"content": "Same idea", "importance_score": 0.2, "tags": ["a"]}
+    )
+    high = await postgres_backend.create_memory(
+        {"content": "Same idea", "importance_score": 0.9, "tags": ["b"]}
+    )
+    other = await postgres_backend.create_memory({"content": "Same idea, reworded"})
+
+    merged = await postgres_backend.merge_duplicate_group(
+        [low["id"], high["id"], other["id"]], "keep_highest_importance"
+    )
+
+    assert merged["kept"] == high["id"]
+    assert set(merged["removed"]) == {low["id"], other["id"]}
+    survivor = await postgres_backend.get_memory(high["id"], track=False)
+    assert set(survivor["tags"]) == {"a", "b"}
+    assert await postgres_backend.get_memory(low["id"], track=False) is None
+
+    # The cluster is already merged
+    assert await postgres_backend.merge_duplicate_group([low["id"], high["id"]]) is None
+
+
 @pytest.mark.asyncio
 async def test_find_duplicates(postgres_backend, sample_embedding):
     """Test finding duplicate memories"""
@@ -395,6 +575,9 @@ async def test_find_duplicates(postgres_backend, sample_embedding):
         similar_embedding
     )
     
+    # Candidates are recorded by the incremental sweep
+    await postgres_backend.sweep_duplicate_candidates(lag_seconds=0)
+
     # Find duplicates
     duplicates = await postgres_backend.find_duplicates(similarity_threshold=0.99)
     
@@ -410,6 +593,24 @@ async def test_find_duplicates(postgres_backend, sample_embedding):
     assert found_pair
 
 
+@pytest.mark.asyncio
+async def test_duplicate_sweep_is_incremental(postgres_backend, sample_embedding):
+    """Test that sweeps only revisit memories changed since the watermark"""
+    memory = await postgres_backend.create_memory(
+        {"content": "Sweep me", "container_id": "test"}, sample_embedding
+    )
+
+    first = await postgres_backend.sweep_duplicate_candidates(lag_seconds=0)
+    assert first["processed"] >= 1
+
+    second = await postgres_backend.sweep_duplicate_candidates(lag_seconds=0)
+    assert second["processed"] == 0
+
+    await postgres_backend.update_memory(memory["id"], {"content": "Sweep me again"})
+    third = await postgres_backend.sweep_duplicate_candidates(lag_seconds=0)
+    assert third["processed"] == 1
+
+
 # ==================== Analytics Tests ====================
 
 @pytest.mark.asyncio
@@ -432,7 +633,7 @@ async def test_get_statistics(postgres_backend, sample_memories):
 @pytest.mark.asyncio
 async def test_record_search_history(postgres_backend, sample_embedding):
     """Test recording search history"""
-    await postgres_backend.record_search(
+    postgres_backend.record_search(
         query="test search",
         embedding=sample_embedding,
         results_count=5,
@@ -442,7 +643,9 @@ async def test_record_search_history(postgres_backend, sample_embedding):
         container_id="test"
     )
     
-    # Verify search was recorded (would need a getter method)
+    # Searches are buffered until the recorder flushes
+    assert await postgres_backend.search_recorder.flush() == 1
+
     async with postgres_backend.acquire() as conn:
         count = await conn.fetchval(
             "SELECT COUNT(*) FROM search_history WHERE container_id = 'test'"
@@ -450,6 +653,141 @@ async def test_record_search_history(postgres_backend, sample_embedding):
         assert count > 0
 
 
+@pytest.mark.asyncio
+async def test_embedding_cache_table(postgres_backend, sample_embedding):
+    """Test cached embeddings are keyed by model and evicted least recently used first"""
+    from app.services.embedding_cache import content_hash
+
+    entries = [(content_hash(f"text {i}"), sample_embedding) for i in range(3)]
+    await postgres_backend.store_cached_embeddings("test-model", entries)
+
+    found = await postgres_backend.get_cached_embeddings(
+        "test-model", [key for key, _ in entries]
+    )
+    assert set(found) == {key for key, _ in entries}
+    assert await postgres_backend.get_cached_embeddings("other-model", [entries[0][0]]) == {}
+
+    assert await postgres_backend.evict_embedding_cache(max_rows=1) >= 2
+
+
+@pytest.mark.asyncio
+async def test_discover_similar_relationships(postgres_backend, sample_embedding):
+    """Test batched discovery writes one edge per near-duplicate pair, idempotently"""
+    first = await postgres_backend.create_memory({"content": "Twin A"}, sample_embedding)
+    second = await postgres_backend.create_memory({"content": "Twin B"}, sample_embedding)
+    ids = [first["id"], second["id"]]
+
+    assert await postgres_backend.discover_similar_relationships(ids, min_similarity=0.99) >= 1
+    await postgres_backend.discover_similar_relationships(ids, min_similarity=0.99)
+
+    async with postgres_backend.acquire() as conn:
+        edges = await conn.fetchval(
+            """
+            SELECT COUNT(*) FROM memory_relationships
+            WHERE relationship_type = 'similar'
+                AND source_memory_id = ANY($1::uuid[])
+                AND target_memory_id = ANY($1::uuid[])
+        """,
+            [uuid.UUID(memory_id) for memory_id in ids],
+        )
+    assert edges == 1
+
+
+@pytest.mark.asyncio
+async def test_embedding_job_outbox(postgres_backend, sample_embedding):
+    """Test queued embedding jobs are claimed once and superseded by newer content"""
+    memory = await postgres_backend.create_memory(
+        {"content": "Queued memory", "container_id": "test"}, enqueue_embedding=True
+    )
+    fetched = await postgres_backend.get_memory(memory["id"], track=False)
+    assert fetched["embedding_pending"] is True
+    assert fetched["has_embedding"] is False
+
+    jobs = await postgres_backend.claim_embedding_jobs(batch_size=10)
+    job = next(j for j in jobs if str(j["memory_id"]) == memory["id"])
+    # The lease hides the job from other workers
+    again = await postgres_backend.claim_embedding_jobs(batch_size=10)
+    assert memory["id"] not in {str(j["memory_id"]) for j in again}
+
+    # Content edited while the job was being embedded re-queues it
+    await postgres_backend.update_memory(
+        memory["id"], {"content": "Edited memory"}, enqueue_embedding=True
+    )
+    stale = await postgres_backend.complete_embedding_jobs(
+        "test-model", [(job["memory_id"], job["version"], sample_embedding)]
+    )
+    assert stale == 0
+
+    jobs = await postgres_backend.claim_embedding_jobs(batch_size=10)
+    job = next(j for j in jobs if str(j["memory_id"]) == memory["id"])
+    assert job["content"] == "Edited memory"
+    done = await postgres_backend.complete_embedding_jobs(
+        "test-model", [(job["memory_id"], job["version"], sample_embedding)]
+    )
+    assert done == 1
+
+    fetched = await postgres_backend.get_memory(memory["id"], track=False)
+    assert fetched["embedding_pending"] is False
+    assert fetched["has_embedding"] is True
+
+
+@pytest.mark.asyncio
+async def test_exhausted_embedding_job_not_pending(postgres_backend):
+    """Test a job out of attempts is given up and no longer reported as pending"""
+    memory = await postgres_backend.create_memory(
+        {"content": "Unembeddable memory", "container_id": "test"}, enqueue_embedding=True
+    )
+
+    await postgres_backend.claim_embedding_jobs(batch_size=10, max_attempts=1)
+    await postgres_backend.fail_embedding_jobs(
+        [uuid.UUID(memory["id"])], "Embedding generation failed", max_attempts=1
+    )
+
+    fetched = await postgres_backend.get_memory(memory["id"], track=False)
+    assert fetched["embedding_pending"] is False
+    stats = await postgres_backend.get_embedding_job_stats(max_attempts=1)
+    assert stats["failed"] >= 1
+
+    # Writing the memory again queues a fresh job
+    await postgres_backend.update_memory(
+        memory["id"], {"content": "Edited memory"}, enqueue_embedding=True
+    )
+    fetched = await postgres_backend.get_memory(memory["id"], track=False)
+    assert fetched["embedding_pending"] is True
+
+
+@pytest.mark.asyncio
+async def test_embedding_backfill_checkpoint(postgres_backend, sample_embedding):
+    """Test backfill batches resume from the checkpoint and skip rows changed meanwhile"""
+    created = await postgres_backend.create_memories(
+        [{"content": f"Backfill memory {i}", "container_id": "test"} for i in range(3)]
+    )
+    job = await postgres_backend.start_backfill_job("backfill-model", reset=True)
+    assert job["status"] == "running"
+    assert job["total"] >= 3
+
+    batch = await postgres_backend.fetch_backfill_batch("backfill-model", batch_size=2)
+    cursor = (batch[-1]["created_at"], batch[-1]["id"])
+    # A concurrent edit bumps the version of the first row before the write lands
+    await postgres_backend.update_memory(str(batch[0]["id"]), {"importance_score": 0.9})
+
+    updated = await postgres_backend.apply_backfill_batch(
+        "backfill-model",
+        [(row["id"], row["version"], sample_embedding) for row in batch],
+        cursor,
+    )
+    assert updated == 1
+
+    job = await postgres_backend.start_backfill_job("backfill-model")
+    assert job["processed"] == 2 and job["embedded"] == 1
+    rest = await postgres_backend.fetch_backfill_batch(
+        "backfill-model", (job["cursor_created_at"], uuid.UUID(job["cursor_id"]))
+    )
+    assert {str(row["id"]) for row in rest} >= set(created["ids"]) - {
+        str(row["id"]) for row in batch
+    }
+
+
 # ==================== Service Layer Tests ====================
 
 @pytest.mark.asyncio
@@ -512,6 +850,33 @@ async def test_service_knowledge_graph(memory_service):
     assert graph["center"] == memory1["id"]
 
 
+@pytest.mark.asyncio
+async def test_knowledge_graph_limits(postgres_backend):
+    """Test the recursive traversal honours depth, fan-out and node caps"""
+    center = await postgres_backend.create_memory({"content": "hub", "container_id": "test"})
+    spokes = []
+    for i in range(5):
+        spoke = await postgres_backend.create_memory(
+            {"content": f"spoke {i}", "container_id": "test"}
+        )
+        await postgres_backend.create_relationship(
+            center["id"], spoke["id"], "related", 0.5 + i / 10
+        )
+        spokes.append(spoke)
+    leaf = await postgres_backend.create_memory({"content": "leaf", "container_id": "test"})
+    await postgres_backend.create_relationship(spokes[-1]["id"], leaf["id"], "related", 0.9)
+
+    graph = await postgres_backend.get_knowledge_graph(center["id"], depth=1, max_fanout=3)
+    depths = {node["id"]: node["depth"] for node in graph["nodes"]}
+    assert depths[center["id"]] == 0
+    assert len(depths) == 4  # center + 3 strongest spokes
+    assert leaf["id"] not in depths
+
+    graph = await postgres_backend.get_knowledge_graph(center["id"], depth=2, max_nodes=3)
+    assert len(graph["nodes"]) == 3
+    assert graph["truncated"] is True
+
+
 @pytest.mark.asyncio
 async def test_service_auto_consolidation(memory_service):
     """Test automatic consolidation of duplicates"""
@@ -572,6 +937,33 @@ async def test_bulk_insert_performance(postgres_backend):
         assert count == 100
 
 
+@pytest.mark.asyncio
+async def test_create_memories_bulk(postgres_backend, sample_embedding):
+    """Test bulk COPY insert returns ids and skips existing rows"""
+    memories = [
+        {"content": f"Copy test memory {i}", "memory_type": "test", "container_id": "test"}
+        for i in range(1000)
+    ]
+    embeddings = [sample_embedding if i % 2 else None for i in range(1000)]
+
+    result = await postgres_backend.create_memories(memories, embeddings)
+
+    assert result["inserted"] == 1000
+    assert result["skipped"] == 0
+    assert len(result["ids"]) == 1000
+
+    fetched = await postgres_backend.get_memory(result["ids"][1])
+    assert fetched["has_embedding"] is True
+
+    # Re-importing the same ids is a no-op
+    again = await postgres_backend.create_memories(
+        [{"id": mid, "content": "dup", "container_id": "test"} for mid in result["ids"][:10]],
+        return_ids=False,
+    )
+    assert again["inserted"] == 0
+    assert again["skipped"] == 10
+
+
 @pytest.mark.asyncio
 async def test_search_performance(postgres_backend, sample_memories):
     """Test search performance with multiple memories"""
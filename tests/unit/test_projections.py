@@ -0,0 +1,139 @@
+"""
+Tests for projection profiles on memory reads
+"""
+
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from app.storage.postgres_unified import PostgresUnifiedBackend, projection_sql
+
+pytestmark = pytest.mark.unit
+
+
+def _row(**overrides) -> dict:
+    now = datetime.now(timezone.utc)
+    row = {
+        "id": uuid.uuid4(),
+        "content": "preview",
+        "memory_type": "semantic",
+        "importance_score": 0.5,
+        "tags": ["a"],
+        "metadata": {},
+        "access_count": 0,
+        "created_at": now,
+        "updated_at": now,
+        "last_accessed_at": None,
+        "container_id": "default",
+        "version": 1,
+        "embedding_model": "nomic",
+        "embedding_generated_at": now,
+        "has_embedding": True,
+    }
+    row.update(overrides)
+    return row
+
+
+class TestProjectionSql:
+    """SELECT lists per profile"""
+
+    def test_summary_is_preview_without_vector(self):
+        """Summary selects a content preview and its length, never the vector"""
+        sql = projection_sql("summary", content_chars=50)
+
+        assert "left(content, 50) AS content" in sql
+        assert "length(content) AS content_length" in sql
+        assert "embedding IS NOT NULL AS has_embedding" in sql
+        assert "embedding" not in [column.strip() for column in sql.split(",")]
+
+    def test_full_and_with_embedding(self):
+        """Full returns whole content; with_embedding adds the vector"""
+        assert "left(" not in projection_sql("full")
+        assert projection_sql("with_embedding", alias="m").endswith("m.content, m.embedding")
+
+    def test_unknown_profile_rejected(self):
+        """Unknown profiles raise instead of falling back to SELECT *"""
+        with pytest.raises(ValueError):
+            projection_sql("everything")
+
+
+class TestRowToDict:
+    """Projected rows convert to the usual memory dict"""
+
+    def setup_method(self):
+        self.backend = PostgresUnifiedBackend("postgresql://unused")
+
+    def test_summary_row(self):
+        """has_embedding comes from the projected flag and content_length is kept"""
+        memory = self.backend._row_to_dict(_row(content_length=5000))
+
+        assert memory["has_embedding"] is True
+        assert memory["content_length"] == 5000
+        assert "embedding" not in memory
+
+    def test_embedding_only_when_requested(self):
+        """The vector is only returned for the with_embedding profile"""
+        row = _row(embedding=np.array([0.5, 0.25], dtype=np.float32))
+
+        assert "embedding" not in self.backend._row_to_dict(row)
+        assert self.backend._row_to_dict(row, include_embedding=True)["embedding"] == [0.5, 0.25]
+
+
+class TestListProjection:
+    """List projections (full unless the route asks for summary)"""
+
+    def setup_method(self):
+        self.backend = PostgresUnifiedBackend("postgresql://unused")
+        self.conn = AsyncMock()
+        self.conn.fetch.return_value = [_row(content_length=7)]
+
+        @asynccontextmanager
+        async def acquire():
+            yield self.conn
+
+        self.backend.acquire_read = acquire
+
+    @pytest.mark.asyncio
+    async def test_list_summary_projection(self):
+        """fields=summary selects content previews"""
+        memories = await self.backend.list_memories(limit=5, projection="summary")
+
+        query = self.conn.fetch.call_args.args[0]
+        assert "SELECT *" not in query
+        assert "left(content" in query
+        assert memories[0]["content_length"] == 7
+
+    @pytest.mark.asyncio
+    async def test_list_defaults_to_full(self):
+        """Internal callers get complete content unless they ask for previews"""
+        await self.backend.list_memories(limit=5)
+
+        assert "left(content" not in self.conn.fetch.call_args.args[0]
+
+
+class TestHybridProjection:
+    """Hybrid results in the with_embedding profile"""
+
+    @pytest.mark.asyncio
+    async def test_text_only_match_without_vector(self):
+        """A memory found by text alone has no vector to return"""
+        backend = PostgresUnifiedBackend("postgresql://unused")
+        conn = AsyncMock()
+        conn.fetch.return_value = [
+            _row(embedding=None, similarity_score=0.0, text_rank=0.4, combined_score=0.2)
+        ]
+
+        @asynccontextmanager
+        async def search_connection(recall=None, candidates=0):
+            yield conn, "balanced"
+
+        backend._search_connection = search_connection
+
+        results = await backend.hybrid_search("query", [0.1], projection="with_embedding")
+
+        assert len(results) == 1
+        assert "embedding" not in results[0]
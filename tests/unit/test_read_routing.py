@@ -0,0 +1,100 @@
+"""
+Tests for read/write pool routing in the PostgreSQL unified backend
+"""
+
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.degradation import DegradationLevel
+from app.services.embedding_worker import EmbeddingWorker
+
+from app.storage.postgres_unified import PostgresUnifiedBackend
+
+pytestmark = pytest.mark.unit
+
+
+class FakePool:
+    """Pool stub that hands out its own name as the connection"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self.name
+
+
+class TestReadRouting:
+    """acquire_read and the read-your-writes window"""
+
+    def setup_method(self):
+        self.backend = PostgresUnifiedBackend(
+            "postgresql://primary/db",
+            read_connection_string="postgresql://replica/db",
+            read_your_writes_window=60.0,
+        )
+        self.backend.pool = FakePool("primary")
+        self.backend.read_pool = FakePool("replica")
+
+    @pytest.mark.asyncio
+    async def test_reads_use_replica(self):
+        """Without a recent write, reads go to the read pool"""
+        async with self.backend.acquire_read() as conn:
+            assert conn == "replica"
+
+    @pytest.mark.asyncio
+    async def test_reads_after_write_use_primary(self):
+        """Reads inside the read-your-writes window stay on the primary"""
+        async with self.backend.acquire() as conn:
+            assert conn == "primary"
+
+        async with self.backend.acquire_read() as conn:
+            assert conn == "primary"
+
+    @pytest.mark.asyncio
+    async def test_window_expires(self):
+        """Once the window has passed, reads return to the replica"""
+        self.backend.read_your_writes_window = 0.0
+        async with self.backend.acquire():
+            pass
+
+        async with self.backend.acquire_read() as conn:
+            assert conn == "replica"
+
+    @pytest.mark.asyncio
+    async def test_unmarked_writes_do_not_pin(self):
+        """Background writes that skip marking leave reads on the replica"""
+        async with self.backend.acquire(mark_write=False):
+            pass
+
+        async with self.backend.acquire_read() as conn:
+            assert conn == "replica"
+
+    @pytest.mark.asyncio
+    async def test_no_replica_uses_primary(self):
+        """Without a read pool, reads fall back to the primary"""
+        self.backend.read_pool = None
+
+        async with self.backend.acquire_read() as conn:
+            assert conn == "primary"
+
+    @pytest.mark.asyncio
+    async def test_idle_worker_poll_does_not_pin(self):
+        """Polling an empty embedding queue leaves reads on the replica"""
+        conn = AsyncMock()
+        conn.fetch.return_value = []
+
+        @asynccontextmanager
+        async def acquire():
+            yield conn
+
+        self.backend.pool = MagicMock(acquire=acquire)
+        service = MagicMock(backend=self.backend)
+        service.degradation_manager = MagicMock(current_level=DegradationLevel.FULL)
+
+        assert await EmbeddingWorker(service).process_batch() == 0
+
+        async with self.backend.acquire_read() as read_conn:
+            assert read_conn == "replica"
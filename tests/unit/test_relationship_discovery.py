@@ -0,0 +1,120 @@
+"""
+Tests for batched background discovery of "similar" relationships
+"""
+
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.degradation import DegradationLevel
+from app.services.memory_service_postgres import MemoryServicePostgres
+from app.storage.postgres_unified import PostgresUnifiedBackend
+
+pytestmark = pytest.mark.unit
+
+SINCE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+class TestDiscoverSimilarRelationships:
+    """One k-NN query and one upsert per batch"""
+
+    def setup_method(self):
+        self.backend = PostgresUnifiedBackend("postgresql://unused")
+        self.read_conn = AsyncMock()
+        self.write_conn = AsyncMock()
+        self.write_conn.execute.return_value = "INSERT 0 2"
+        transaction = MagicMock()
+        transaction.__aenter__ = AsyncMock()
+        transaction.__aexit__ = AsyncMock(return_value=False)
+        self.read_conn.transaction = MagicMock(return_value=transaction)
+
+        @asynccontextmanager
+        async def acquire_read():
+            yield self.read_conn
+
+        @asynccontextmanager
+        async def acquire(*args, **kwargs):
+            yield self.write_conn
+
+        self.backend.acquire_read = acquire_read
+        self.backend.acquire = acquire
+
+    @pytest.mark.asyncio
+    async def test_single_knn_query_and_unnest_upsert(self):
+        ids = [uuid.uuid4() for _ in range(3)]
+        self.read_conn.fetch.return_value = [
+            {"source_id": ids[0], "target_id": ids[1], "similarity": 0.97},
+            {"source_id": ids[1], "target_id": ids[2], "similarity": 0.96},
+        ]
+
+        written = await self.backend.discover_similar_relationships(
+            [str(i) for i in ids], neighbors=4, min_similarity=0.95
+        )
+
+        assert written == 2
+        self.read_conn.fetch.assert_awaited_once()
+        knn_sql, batch, neighbors, threshold = self.read_conn.fetch.await_args.args
+        assert "CROSS JOIN LATERAL" in knn_sql
+        assert batch == ids and neighbors == 4 and threshold == 0.95
+
+        self.write_conn.execute.assert_awaited_once()
+        upsert_sql, sources, targets, strengths = self.write_conn.execute.await_args.args
+        assert "unnest(" in upsert_sql and "ON CONFLICT" in upsert_sql
+        assert sources == [ids[0], ids[1]]
+        assert targets == [ids[1], ids[2]]
+        assert strengths == [0.97, 0.96]
+
+    @pytest.mark.asyncio
+    async def test_no_neighbours_no_write(self):
+        self.read_conn.fetch.return_value = []
+
+        assert await self.backend.discover_similar_relationships([str(uuid.uuid4())]) == 0
+        self.write_conn.execute.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_sweep_uses_its_own_watermark(self):
+        # Changed rows and the watermark come from the primary
+        self.write_conn.fetchval.return_value = SINCE + timedelta(hours=1)
+        self.write_conn.fetch.side_effect = [[{"id": uuid.uuid4(), "updated_at": SINCE}], []]
+        self.backend._get_watermark = AsyncMock(return_value=SINCE)
+        self.backend._set_watermark = AsyncMock()
+        self.backend.discover_similar_relationships = AsyncMock(return_value=1)
+
+        result = await self.backend.sweep_similar_relationships()
+
+        assert result["processed"] == 1 and result["edges"] == 1
+        assert self.backend._set_watermark.await_args.args[1] == "similar_relationships"
+
+
+class TestServiceRelationships:
+    """Creates no longer search and link inline"""
+
+    def setup_method(self):
+        self.service = MemoryServicePostgres(enable_embeddings=True, async_embeddings=False)
+        self.service.degradation_manager = MagicMock(current_level=DegradationLevel.FULL)
+        self.service.backend = MagicMock()
+
+    @pytest.mark.asyncio
+    async def test_create_does_not_search_or_link(self):
+        self.service._generate_embedding = AsyncMock(return_value=[0.1, 0.2])
+        self.service.backend.create_memory = AsyncMock(return_value={"id": str(uuid.uuid4())})
+        self.service.backend.vector_search = AsyncMock()
+        self.service.backend.create_relationship = AsyncMock()
+
+        await self.service.create_memory("hello")
+
+        self.service.backend.vector_search.assert_not_awaited()
+        self.service.backend.create_relationship.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_sweep_skipped_in_read_only_mode(self):
+        self.service.degradation_manager = MagicMock(current_level=DegradationLevel.READONLY)
+        self.service.backend.sweep_similar_relationships = AsyncMock()
+
+        result = await self.service.sweep_relationships()
+
+        assert result["edges"] == 0
+        self.service.backend.sweep_similar_relationships.assert_not_awaited()
@@ -0,0 +1,128 @@
+"""
+Tests for the query-embedding and search-result caches
+"""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.core.degradation import DegradationLevel
+from app.services.memory_service_postgres import MemoryServicePostgres
+from app.services.search_cache import QueryEmbeddingCache, SearchResultCache
+
+pytestmark = pytest.mark.unit
+
+
+class TestQueryEmbeddingCache:
+    """Normalized keys, expiry and eviction"""
+
+    def test_normalized_query_hits(self):
+        """Whitespace variants of a query share an entry"""
+        cache = QueryEmbeddingCache(max_entries=2)
+        cache.put("  machine   learning ", [0.1, 0.2])
+
+        assert cache.get("machine learning") == [0.1, 0.2]
+        assert cache.get("Machine learning") is None
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"]) == (1, 1)
+
+    def test_expired_entries_are_dropped(self):
+        """Entries older than the TTL are misses"""
+        cache = QueryEmbeddingCache(ttl_seconds=10)
+        with patch("app.services.search_cache.time.monotonic", return_value=100.0):
+            cache.put("query", [1.0])
+        with patch("app.services.search_cache.time.monotonic", return_value=111.0):
+            assert cache.get("query") is None
+        assert cache.get_stats()["expired"] == 1
+
+    def test_lru_eviction(self):
+        """The least recently used query is evicted first"""
+        cache = QueryEmbeddingCache(max_entries=2)
+        cache.put("a", [1.0])
+        cache.put("b", [2.0])
+        cache.get("a")
+        cache.put("c", [3.0])
+
+        assert cache.get("b") is None
+        assert cache.get("a") == [1.0]
+        assert cache.get_stats()["evictions"] == 1
+
+
+class TestSearchResultCache:
+    """Write-version invalidation"""
+
+    def setup_method(self):
+        self.cache = SearchResultCache(max_entries=4)
+        self.key = SearchResultCache.make_key("query", "hybrid", 10, {"tags": ["a"]})
+
+    def test_hit_until_container_write(self):
+        """A write to the searched container invalidates its results"""
+        self.cache.put(self.key, [{"id": "1"}], self.cache.version())
+        assert self.cache.get(self.key) == [{"id": "1"}]
+
+        self.cache.invalidate("other")
+        assert self.cache.get(self.key) == [{"id": "1"}]
+
+        self.cache.invalidate("default")
+        assert self.cache.get(self.key) is None
+        assert self.cache.get_stats()["stale"] == 1
+
+    def test_result_racing_a_write_is_not_served(self):
+        """Results computed before a write are discarded even if stored after it"""
+        version = self.cache.version()
+        self.cache.invalidate()
+        self.cache.put(self.key, [{"id": "1"}], version)
+
+        assert self.cache.get(self.key) is None
+
+    def test_key_covers_every_option(self):
+        """Different limits, types and filters do not share entries"""
+        keys = {
+            SearchResultCache.make_key("query", "hybrid", 10, {"tags": ["a"]}),
+            SearchResultCache.make_key("query", "hybrid", 20, {"tags": ["a"]}),
+            SearchResultCache.make_key("query", "text", 10, {"tags": ["a"]}),
+            SearchResultCache.make_key("query", "hybrid", 10, {"tags": ["b"]}),
+            SearchResultCache.make_key("query", "hybrid", 10, {"tags": ["a"]}, recall="high"),
+        }
+        assert len(keys) == 5
+        assert SearchResultCache.make_key(" query ", "hybrid", 10, {"tags": ["a"]}) == self.key
+
+
+class TestServiceSearchCaching:
+    """search_memories reuses embeddings and results"""
+
+    def setup_method(self):
+        self.service = MemoryServicePostgres(enable_embeddings=True)
+        self.service.backend = AsyncMock()
+        self.service.backend.hybrid_search.return_value = [{"id": "1", "score": 0.9}]
+        self.service.degradation_manager = MagicMock(current_level=DegradationLevel.FULL)
+        self.service.degradation_manager.is_feature_available.side_effect = (
+            lambda feature: feature == "semantic_search"
+        )
+        self.service._generate_embedding = AsyncMock(return_value=[0.1, 0.2])
+
+    @pytest.mark.asyncio
+    async def test_repeat_search_skips_model_and_database(self):
+        """The second identical search is answered from the cache"""
+        first = await self.service.search_memories("query")
+        first[0]["score"] = 0.0
+        second = await self.service.search_memories("query")
+
+        assert second == [{"id": "1", "score": 0.9}]
+        self.service._generate_embedding.assert_awaited_once()
+        self.service.backend.hybrid_search.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_write_invalidates_results_but_not_embeddings(self):
+        """A create forces a fresh search that reuses the query embedding"""
+        self.service.backend.create_memory.return_value = {"id": "2", "container_id": "default"}
+
+        await self.service.search_memories("query")
+        await self.service.create_memory("new memory", generate_embedding=False)
+        await self.service.search_memories("query")
+
+        assert self.service.backend.hybrid_search.await_count == 2
+        self.service._generate_embedding.assert_awaited_once()
+        stats = self.service.get_search_cache_stats()
+        assert stats["query_embeddings"]["hits"] == 1
+        assert stats["results"]["stale"] == 1
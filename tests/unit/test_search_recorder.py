@@ -0,0 +1,149 @@
+"""
+Tests for buffered search history recording
+"""
+
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.storage.search_recorder import SEARCH_HISTORY_COLUMNS, SearchHistoryRecorder
+
+pytestmark = pytest.mark.unit
+
+
+class FakeBackend:
+    """Backend stub whose connection records COPY calls"""
+
+    def __init__(self, fail: bool = False):
+        self.conn = AsyncMock()
+        if fail:
+
+            async def copy_records_to_table(*args, **kwargs):
+                await asyncio.sleep(0)
+                raise RuntimeError("connection lost")
+
+            self.conn.copy_records_to_table.side_effect = copy_records_to_table
+
+    @asynccontextmanager
+    async def acquire(self, mark_write: bool = True):
+        assert mark_write is False
+        yield self.conn
+
+
+def _record(recorder: SearchHistoryRecorder, query: str = "query") -> bool:
+    return recorder.record(
+        query=query,
+        embedding=[0.1, 0.2],
+        results_count=2,
+        selected_ids=[str(uuid.uuid4())],
+        search_type="hybrid",
+        container_id="default",
+    )
+
+
+class TestSearchHistoryRecorder:
+    """Buffered search history flushing"""
+
+    @pytest.mark.asyncio
+    async def test_flush_copies_all_pending_rows(self):
+        """Buffered searches are written with a single COPY"""
+        backend = FakeBackend()
+        recorder = SearchHistoryRecorder(backend)
+        _record(recorder, "first")
+        _record(recorder, "second")
+
+        assert await recorder.flush() == 2
+        backend.conn.copy_records_to_table.assert_awaited_once()
+
+        call = backend.conn.copy_records_to_table.call_args
+        assert call.args == ("search_history",)
+        assert call.kwargs["columns"] == list(SEARCH_HISTORY_COLUMNS)
+        assert [row[0] for row in call.kwargs["records"]] == ["first", "second"]
+        assert isinstance(call.kwargs["records"][0][3][0], uuid.UUID)
+        assert recorder.get_stats()["pending"] == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_noop_when_empty(self):
+        """Nothing is sent to the database when no searches were recorded"""
+        backend = FakeBackend()
+        recorder = SearchHistoryRecorder(backend)
+
+        assert await recorder.flush() == 0
+        backend.conn.copy_records_to_table.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_full_buffer_drops_searches(self):
+        """Searches recorded while the buffer is full are dropped and counted"""
+        recorder = SearchHistoryRecorder(FakeBackend(), flush_threshold=100, max_buffer=2)
+
+        assert [_record(recorder) for _ in range(3)] == [True, True, False]
+        stats = recorder.get_stats()
+        assert (stats["pending"], stats["dropped"]) == (2, 1)
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_requeues_what_fits(self):
+        """Rows are kept for the next flush, up to the buffer limit"""
+        recorder = SearchHistoryRecorder(FakeBackend(fail=True), flush_threshold=100, max_buffer=3)
+        for query in ("a", "b", "c"):
+            _record(recorder, query)
+
+        flushing = asyncio.create_task(recorder.flush())
+        await asyncio.sleep(0)
+        _record(recorder, "d")
+        assert await flushing == 0
+
+        stats = recorder.get_stats()
+        assert [row[0] for row in recorder._pending] == ["a", "b", "d"]
+        assert (stats["errors"], stats["dropped"]) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_threshold_triggers_flush(self):
+        """Reaching the pending threshold schedules an early flush"""
+        backend = FakeBackend()
+        recorder = SearchHistoryRecorder(backend, flush_threshold=2)
+
+        _record(recorder)
+        _record(recorder)
+        await recorder._threshold_task
+
+        backend.conn.copy_records_to_table.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending(self):
+        """Stopping the recorder writes out anything still buffered"""
+        backend = FakeBackend()
+        recorder = SearchHistoryRecorder(backend, flush_interval=3600)
+        await recorder.start()
+        _record(recorder)
+
+        await recorder.stop()
+
+        backend.conn.copy_records_to_table.assert_awaited_once()
+        assert recorder._task is None
+
+    @pytest.mark.asyncio
+    async def test_stop_during_flush_keeps_rows(self):
+        """Rows of a flush cancelled by stop are written by the final flush"""
+        backend = FakeBackend()
+        copied = []
+
+        async def copy_records_to_table(*args, records, **kwargs):
+            if not copied:
+                copied.append(None)
+                await asyncio.Event().wait()
+            copied.append([row[0] for row in records])
+
+        backend.conn.copy_records_to_table.side_effect = copy_records_to_table
+        recorder = SearchHistoryRecorder(backend, flush_interval=0)
+        _record(recorder, "a")
+        await recorder.start()
+        while not copied:
+            await asyncio.sleep(0)
+
+        await recorder.stop()
+
+        assert copied[-1] == ["a"]
+        assert recorder.get_stats()["pending"] == 0
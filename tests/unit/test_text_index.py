@@ -0,0 +1,189 @@
+"""
+Tests for the in-process BM25 index and degraded-mode search
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.core.degradation import DegradationLevel
+from app.services.degraded_search import DegradedSearchIndex
+from app.services.memory_service_postgres import MemoryServicePostgres
+from app.storage.text_index import BM25Index, tokenize
+
+pytestmark = pytest.mark.unit
+
+
+def _memory(number: int, content: str, updated_at: datetime = None) -> dict:
+    updated_at = updated_at or datetime(2026, 1, 1, tzinfo=timezone.utc)
+    return {
+        "id": str(uuid.UUID(int=number)),
+        "content": content,
+        "memory_type": "semantic",
+        "importance_score": 0.5,
+        "tags": [],
+        "created_at": updated_at.isoformat(),
+        "updated_at": updated_at.isoformat(),
+        "container_id": "default",
+    }
+
+
+class TestBM25Index:
+    """Ranking, incremental maintenance and snapshots"""
+
+    def setup_method(self):
+        self.index = BM25Index()
+        self.index.add("a", "PostgreSQL vector search with pgvector")
+        self.index.add("b", "Cooking pasta: boil water, add pasta, add salt")
+        self.index.add("c", "Vector notes: pgvector, Qdrant, vector indexes")
+
+    def test_tokenize_drops_stopwords(self):
+        """Tokens are lowercased words without stopwords"""
+        assert tokenize("The Vector and the Index!") == ["vector", "index"]
+
+    def test_ranks_by_term_frequency_and_rarity(self):
+        """Documents with more occurrences of rarer terms rank first"""
+        ranked = [doc_id for doc_id, _ in self.index.search("vector pgvector")]
+        assert ranked == ["c", "a"]
+        assert self.index.search("pasta")[0][0] == "b"
+        assert self.index.search("nothing matches") == []
+
+    def test_update_and_remove(self):
+        """Replaced and removed documents stop matching their old terms"""
+        self.index.add("b", "Vector math for pasta shapes")
+        assert "b" in {doc_id for doc_id, _ in self.index.search("vector")}
+        assert self.index.search("boil") == []
+
+        assert self.index.remove("c") is True
+        assert self.index.remove("c") is False
+        assert [doc_id for doc_id, _ in self.index.search("qdrant")] == []
+        assert len(self.index) == 2
+
+    def test_removed_slots_are_reused(self):
+        """A removed document's slot holds the next added one"""
+        self.index.remove("a")
+        self.index.add("d", "fresh pgvector notes")
+
+        assert [doc_id for doc_id, _ in self.index.search("fresh")] == ["d"]
+        assert len(self.index._slot_ids) == 3
+
+    def test_limit(self):
+        """Only the best ``limit`` documents are returned"""
+        assert [doc_id for doc_id, _ in self.index.search("vector", limit=1)] == ["c"]
+
+    def test_snapshot_round_trip(self, tmp_path):
+        """A loaded snapshot ranks, updates and keeps its watermark like the original"""
+        self.index.remove("b")
+        self.index.watermark = datetime(2026, 1, 1, tzinfo=timezone.utc)
+        path = tmp_path / "index.pkl"
+        self.index.save(path)
+
+        loaded = BM25Index.load(path)
+        assert loaded.search("vector pgvector") == self.index.search("vector pgvector")
+        assert loaded.watermark == self.index.watermark
+
+        loaded.add("e", "pasta again")
+        assert [doc_id for doc_id, _ in loaded.search("pasta")] == ["e"]
+        assert BM25Index.load(tmp_path / "missing.pkl") is None
+
+
+class TestDegradedSearchIndex:
+    """Catching up with the database"""
+
+    def setup_method(self):
+        self.backend = AsyncMock()
+        self.until = datetime(2026, 1, 2, tzinfo=timezone.utc)
+        self.backend.get_change_horizon.return_value = self.until
+        self.search = DegradedSearchIndex(self.backend, batch_size=2)
+
+    @pytest.mark.asyncio
+    async def test_first_refresh_builds_in_keyset_batches(self):
+        """An empty index is built from every live memory, batch by batch"""
+        memories = [_memory(i, f"note number{i}") for i in range(1, 4)]
+        self.backend.fetch_changed_memories.side_effect = [memories[:2], memories[2:], []]
+
+        assert await self.search.refresh() == {"indexed": 3, "removed": 0}
+
+        second_call = self.backend.fetch_changed_memories.await_args_list[1]
+        assert second_call.kwargs["after_id"] == uuid.UUID(memories[1]["id"])
+        self.backend.fetch_deleted_memory_ids.assert_not_awaited()
+        assert self.search.index.watermark == self.until
+        assert len(self.search.index) == 3
+
+    @pytest.mark.asyncio
+    async def test_later_refresh_applies_deletes(self):
+        """Soft deletes since the watermark leave the index"""
+        self.search.add(_memory(1, "stale note"))
+        self.search.index.watermark = self.until - timedelta(minutes=1)
+        self.backend.fetch_changed_memories.return_value = []
+        self.backend.fetch_deleted_memory_ids.return_value = [_memory(1, "")["id"]]
+
+        assert await self.search.refresh() == {"indexed": 0, "removed": 1}
+        assert self.search.search("stale") == []
+
+    @pytest.mark.asyncio
+    async def test_warm_start_from_snapshot(self, tmp_path):
+        """A snapshot is loaded and only changes since its watermark are fetched"""
+        snapshot = BM25Index()
+        snapshot.add("x", "snapshotted memory", {"id": "x", "content": "snapshotted memory"})
+        snapshot.watermark = self.until - timedelta(hours=1)
+        snapshot.save(tmp_path / "index.pkl")
+        self.backend.fetch_changed_memories.return_value = []
+        self.backend.fetch_deleted_memory_ids.return_value = []
+
+        search = DegradedSearchIndex(self.backend, snapshot_path=str(tmp_path / "index.pkl"))
+        await search.warm_start()
+
+        assert search.ready
+        assert self.backend.fetch_changed_memories.await_args.args[0] == snapshot.watermark
+        assert search.search("snapshotted")[0]["id"] == "x"
+
+
+class TestServiceDegradedSearch:
+    """search_memories routes to the index while degraded"""
+
+    def setup_method(self):
+        self.service = MemoryServicePostgres(enable_embeddings=False)
+        self.service.backend = AsyncMock()
+        self.service.degradation_manager = MagicMock(current_level=DegradationLevel.FULL)
+        self.disabled = set()
+        self.service.degradation_manager.is_feature_available.side_effect = (
+            lambda feature: feature not in self.disabled
+        )
+        self.service.text_index.ready = True
+        self.service.text_index.add(_memory(1, "Notes about pgvector tuning"))
+
+    @pytest.mark.asyncio
+    async def test_persistence_outage_uses_index(self):
+        """Without persistence every search type is answered in-process"""
+        self.disabled = {"persistence"}
+
+        results = await self.service.search_memories("pgvector", search_type="text")
+
+        assert [r["id"] for r in results] == [_memory(1, "")["id"]]
+        assert results[0]["text_rank"] > 0
+        self.service.backend.text_search.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_embedding_outage_only_affects_semantic_searches(self):
+        """Keyword searches stay on PostgreSQL when only embeddings are down"""
+        self.disabled = {"ai_features"}
+        self.service.backend.text_search.return_value = []
+
+        assert len(await self.service.search_memories("pgvector", search_type="hybrid")) == 1
+        await self.service.search_memories("pgvector", search_type="text")
+
+        self.service.backend.hybrid_search.assert_not_awaited()
+        self.service.backend.text_search.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_deletes_leave_the_index(self):
+        """Deleted memories are no longer found in degraded mode"""
+        self.disabled = {"persistence"}
+        self.service.backend.delete_memory.return_value = True
+
+        await self.service.delete_memory(_memory(1, "")["id"])
+
+        assert await self.service.search_memories("pgvector") == []
@@ -0,0 +1,196 @@
+"""
+Tests for ANN tuning and vector index management in the PostgreSQL backend
+"""
+
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.services.memory_service_postgres import MemoryServicePostgres
+from app.storage.postgres_unified import (
+    HNSW_MAX_EF_SEARCH,
+    RECALL_PROFILES,
+    PostgresUnifiedBackend,
+)
+
+pytestmark = pytest.mark.unit
+
+
+class TestSearchConnection:
+    """SET LOCAL of search-accuracy knobs"""
+
+    def setup_method(self):
+        self.backend = PostgresUnifiedBackend("postgresql://unused", exact_scan_threshold=1000)
+        self.conn = AsyncMock()
+        self.conn.transaction = MagicMock(return_value=AsyncMock())
+
+        @asynccontextmanager
+        async def acquire_read():
+            yield self.conn
+
+        self.backend.acquire_read = acquire_read
+
+    def _executed(self):
+        return [call.args for call in self.conn.execute.await_args_list]
+
+    @pytest.mark.asyncio
+    async def test_recall_profile_applied(self):
+        """A recall hint sets ef_search and probes for the transaction only"""
+        async with self.backend._search_connection("high"):
+            pass
+
+        (statement, ef_search, probes), = self._executed()
+        assert "set_config('hnsw.ef_search', $1, true)" in statement
+        assert ef_search == str(RECALL_PROFILES["high"]["hnsw.ef_search"])
+        assert probes == str(RECALL_PROFILES["high"]["ivfflat.probes"])
+        self.conn.transaction.assert_called_once_with(readonly=True)
+
+    @pytest.mark.asyncio
+    async def test_ef_search_capped_at_pgvector_limit(self):
+        """Large candidate counts never ask for more than pgvector accepts"""
+        async with self.backend._search_connection("high", candidates=5000):
+            pass
+
+        (_, ef_search, _), = self._executed()
+        assert ef_search == str(HNSW_MAX_EF_SEARCH)
+
+    @pytest.mark.asyncio
+    async def test_exact_disables_index_scan(self):
+        """The exact hint forces a sequential KNN scan"""
+        async with self.backend._search_connection("exact"):
+            pass
+
+        assert self._executed() == [("SET LOCAL enable_indexscan = off",)]
+
+    @pytest.mark.asyncio
+    async def test_small_collection_defaults_to_exact(self):
+        """Without a hint, collections under the threshold use an exact scan"""
+        self.conn.fetchval.return_value = 200.0
+
+        async with self.backend._search_connection():
+            pass
+
+        assert self._executed() == [("SET LOCAL enable_indexscan = off",)]
+
+    @pytest.mark.asyncio
+    async def test_large_collection_defaults_to_balanced(self):
+        """Without a hint, large collections use the balanced ANN profile"""
+        self.conn.fetchval.return_value = 50000.0
+
+        async with self.backend._search_connection():
+            pass
+
+        (_, ef_search, _), = self._executed()
+        assert ef_search == str(RECALL_PROFILES["balanced"]["hnsw.ef_search"])
+
+    @pytest.mark.asyncio
+    async def test_row_estimate_cached(self):
+        """The planner estimate is read once and reused"""
+        self.conn.fetchval.return_value = 50000.0
+
+        for _ in range(3):
+            async with self.backend._search_connection():
+                pass
+
+        self.conn.fetchval.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_unknown_recall_rejected(self):
+        """Unknown hints raise before touching the database"""
+        with pytest.raises(ValueError):
+            async with self.backend._search_connection("perfect"):
+                pass
+
+        self.conn.execute.assert_not_awaited()
+
+
+class TestQuantizedSearch:
+    """Quantized candidate retrieval with exact re-ranking"""
+
+    def setup_method(self):
+        self.backend = PostgresUnifiedBackend(
+            "postgresql://unused", quantization="halfvec", rerank_factor=5
+        )
+        self.conn = AsyncMock()
+        self.conn.transaction = MagicMock(return_value=AsyncMock())
+        self.conn.fetch.return_value = []
+
+        @asynccontextmanager
+        async def acquire_read():
+            yield self.conn
+
+        self.backend.acquire_read = acquire_read
+
+    @pytest.mark.asyncio
+    async def test_candidates_from_quantized_column(self):
+        """Ready quantization oversamples on the halfvec index, then re-ranks"""
+        self.backend.quantization_ready = True
+
+        await self.backend.vector_search([0.1, 0.2], limit=10, recall="fast")
+
+        query, *params = self.conn.fetch.await_args.args
+        assert "ORDER BY embedding_half <=> $1::vector::halfvec" in query
+        assert "ORDER BY m.embedding <=> $1::vector" in query
+        assert params[-1] == 50
+
+        # ef_search must cover every candidate the first stage asks for
+        (_, ef_search, _), = [c.args for c in self.conn.execute.await_args_list]
+        assert ef_search == "50"
+
+    @pytest.mark.asyncio
+    async def test_not_ready_uses_full_vectors(self):
+        """Until the column is backfilled and indexed, search stays on full vectors"""
+        await self.backend.vector_search([0.1, 0.2], limit=10, recall="fast")
+
+        query = self.conn.fetch.await_args.args[0]
+        assert "embedding_half" not in query
+
+    @pytest.mark.asyncio
+    async def test_exact_recall_skips_quantization(self):
+        """An exact hint always scans the full-precision vectors"""
+        self.backend.quantization_ready = True
+
+        await self.backend.vector_search([0.1, 0.2], limit=10, recall="exact")
+
+        query = self.conn.fetch.await_args.args[0]
+        assert "embedding_half" not in query
+
+    @pytest.mark.asyncio
+    async def test_unmeasured_recall_is_not_within_tolerance(self):
+        """Without sampled queries recall is unknown, not a pass"""
+        service = MemoryServicePostgres(enable_embeddings=False)
+        service.backend = AsyncMock()
+        service.backend.measure_quantized_recall.return_value = {"recall": None, "queries": 0}
+
+        result = await service.check_quantized_recall()
+
+        assert result["within_tolerance"] is None
+
+    def test_unknown_mode_rejected(self):
+        """Only halfvec and binary quantization are supported"""
+        with pytest.raises(ValueError):
+            PostgresUnifiedBackend("postgresql://unused", quantization="int8")
+
+
+class TestCreateVectorIndex:
+    """Index build parameter validation"""
+
+    @pytest.mark.asyncio
+    async def test_unknown_method_rejected(self):
+        """Only hnsw and ivfflat are supported"""
+        backend = PostgresUnifiedBackend("postgresql://unused")
+
+        with pytest.raises(ValueError):
+            await backend.create_vector_index(method="diskann")
+
+    @pytest.mark.asyncio
+    async def test_existing_valid_index_kept(self):
+        """Without rebuild, a valid index is left alone"""
+        backend = PostgresUnifiedBackend("postgresql://unused")
+        status = {"indexes": [{"name": "idx_memories_embedding_ann", "valid": True}]}
+        backend.get_vector_index_status = AsyncMock(return_value=status)
+        backend.acquire = MagicMock()
+
+        assert await backend.create_vector_index() == status
+        backend.acquire.assert_not_called()